@@ -13,15 +13,20 @@
 # limitations under the License.
 
 from __future__ import annotations
+import asyncio
+from contextlib import AsyncExitStack
 import json
+import os
 from pathlib import Path
-from typing import Any, Awaitable, Callable, Mapping, Optional, Sequence, cast
-from typing_extensions import override, Self
+from typing import Any, Awaitable, Callable, Literal, Mapping, Optional, Sequence, cast
+from typing_extensions import override, Self, TypedDict
 import aiofiles
 
 from parlant.core.persistence.common import (
+    FieldName,
+    IndexedDocuments,
+    ObjectId,
     Where,
-    matches_filters,
     ensure_is_total,
 )
 from parlant.core.async_utils import ReaderWriterLock
@@ -38,18 +43,44 @@ from parlant.core.persistence.document_database import (
 from parlant.core.loggers import Logger
 
 
+class _JournalEntry(TypedDict, total=False):
+    op: Literal["insert", "update", "delete"]
+    collection: str
+    id: Optional[ObjectId]
+    document: BaseDocument
+
+
 class JSONFileDocumentDatabase(DocumentDatabase):
+    """A document database persisted to a single JSON file.
+
+    By default, every mutation rewrites the whole file. When `journaled` is set,
+    mutations are instead appended to a line-delimited journal next to the file,
+    which is compacted into the JSON snapshot in the background once it grows past
+    `compaction_threshold` entries, and replayed into the snapshot on `__aenter__`.
+    """
+
     def __init__(
         self,
         logger: Logger,
         file_path: Path,
+        journaled: bool = False,
+        compaction_threshold: int = 10_000,
     ) -> None:
         self.file_path = file_path
+        self.journal_path = file_path.with_name(f"{file_path.name}.journal")
 
         self._logger = logger
         self._op_counter = 0
 
+        self._journaled = journaled
+        self._compaction_threshold = compaction_threshold
+
         self._lock = ReaderWriterLock()
+        self._journal_lock = asyncio.Lock()
+        self._snapshot_lock = asyncio.Lock()
+
+        self._journal_entry_count = 0
+        self._compaction_task: Optional[asyncio.Task[None]] = None
 
         if not self.file_path.exists():
             self.file_path.write_text(json.dumps({}))
@@ -57,14 +88,27 @@ class JSONFileDocumentDatabase(DocumentDatabase):
         self._raw_data: dict[str, Any] = {}
         self._collections: dict[str, JSONFileDocumentCollection[BaseDocument]] = {}
 
+    @property
+    def _compacting_journal_path(self) -> Path:
+        return self.journal_path.with_name(f"{self.journal_path.name}.compacting")
+
     async def flush(self) -> None:
-        async with self._lock.writer_lock:
-            await self._flush_unlocked()
+        if self._journaled:
+            await self._compact()
+        else:
+            async with self._lock.writer_lock:
+                await self._flush_unlocked()
 
     async def __aenter__(self) -> Self:
-        async with self._lock.reader_lock:
+        async with self._lock.writer_lock:
             self._raw_data = await self._load_raw_data()
 
+            if await self._replay_journals():
+                # Fold the replayed journals into the snapshot so that
+                # the next session starts out with an empty journal.
+                await self._save_data({})
+                self._remove_journals()
+
         return self
 
     async def __aexit__(
@@ -73,8 +117,15 @@ class JSONFileDocumentDatabase(DocumentDatabase):
         exc_value: Optional[BaseException],
         traceback: Optional[object],
     ) -> bool:
+        if self._compaction_task:
+            await self._compaction_task
+
         async with self._lock.writer_lock:
-            await self._flush_unlocked()
+            async with self._journal_lock:
+                await self._flush_unlocked()
+                self._remove_journals()
+                self._journal_entry_count = 0
+
         return False
 
     async def _load_raw_data(
@@ -91,17 +142,160 @@ class JSONFileDocumentDatabase(DocumentDatabase):
         self,
         data: Mapping[str, Sequence[Mapping[str, Any]]],
     ) -> None:
-        async with aiofiles.open(self.file_path, mode="w", encoding="utf-8") as file:
-            json_string = json.dumps(
-                {
-                    **self._raw_data,
-                    **data,
-                },
-                ensure_ascii=False,
-                indent=2,
-            )
+        async with self._snapshot_lock:
+            await self._save_data_unlocked(data)
+
+    async def _save_data_unlocked(
+        self,
+        data: Mapping[str, Sequence[Mapping[str, Any]]],
+    ) -> None:
+        json_string = await asyncio.to_thread(
+            json.dumps,
+            {
+                **self._raw_data,
+                **data,
+            },
+            ensure_ascii=False,
+            indent=2,
+        )
+
+        # Write to a temporary file first so that a crash mid-write
+        # never leaves a truncated snapshot behind.
+        temp_path = self.file_path.with_name(f"{self.file_path.name}.tmp")
+
+        async with aiofiles.open(temp_path, mode="w", encoding="utf-8") as file:
             await file.write(json_string)
 
+        os.replace(temp_path, self.file_path)
+
+    async def _replay_journals(self) -> int:
+        entries: list[_JournalEntry] = []
+
+        # A leftover compacting journal means we crashed mid-compaction.
+        # Its entries predate those of the live journal, so replay it first.
+        # Replaying is idempotent, so it doesn't matter whether the snapshot
+        # was already written.
+        for path in [self._compacting_journal_path, self.journal_path]:
+            if path.exists():
+                entries.extend(await self._read_journal(path))
+
+        if not entries:
+            return 0
+
+        collections: dict[str, dict[Any, Any]] = {}
+
+        for entry in entries:
+            name = entry["collection"]
+
+            if name not in collections:
+                collections[name] = {
+                    doc.get("id", object()): doc for doc in self._raw_data.get(name, [])
+                }
+
+            documents = collections[name]
+
+            if entry["op"] == "delete":
+                documents.pop(entry["id"], None)
+            elif entry["op"] == "update" and entry["id"] != entry["document"]["id"]:
+                documents.pop(entry["id"], None)
+                documents[entry["document"]["id"]] = entry["document"]
+            else:
+                documents[entry["document"]["id"]] = entry["document"]
+
+        for name, documents in collections.items():
+            self._raw_data[name] = list(documents.values())
+
+        return len(entries)
+
+    async def _read_journal(self, path: Path) -> list[_JournalEntry]:
+        entries = []
+
+        async with aiofiles.open(path, "r", encoding="utf-8") as file:
+            async for line in file:
+                if not line.strip():
+                    continue
+
+                try:
+                    entries.append(cast(_JournalEntry, json.loads(line)))
+                except json.JSONDecodeError:
+                    # Most likely a partial write from a crash; nothing after it is usable
+                    self._logger.warning(f"Ignoring corrupt journal entry in {path}: {line!r}")
+                    break
+
+        return entries
+
+    async def _append_journal(self, source: Path, target: Path) -> None:
+        async with aiofiles.open(source, "r", encoding="utf-8") as file:
+            content = await file.read()
+
+        async with aiofiles.open(target, "a", encoding="utf-8") as file:
+            await file.write(content)
+
+    def _remove_journals(self) -> None:
+        for path in [self._compacting_journal_path, self.journal_path]:
+            path.unlink(missing_ok=True)
+
+    async def _persist_change(self, entry: _JournalEntry) -> None:
+        if (
+            not self._journaled
+            or ("id" in entry and entry["id"] is None)
+            or ("document" in entry and "id" not in entry["document"])
+        ):
+            # Documents without an ID can't be addressed by the journal
+            await self.flush()
+            return
+
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+
+        async with self._journal_lock:
+            async with aiofiles.open(self.journal_path, "a", encoding="utf-8") as file:
+                await file.write(line)
+
+            self._journal_entry_count += 1
+
+            if self._journal_entry_count >= self._compaction_threshold and (
+                self._compaction_task is None or self._compaction_task.done()
+            ):
+                self._compaction_task = asyncio.create_task(
+                    self._compact_in_background(),
+                    name=f"compact-{self.file_path.name}",
+                )
+
+    async def _compact_in_background(self) -> None:
+        try:
+            await self._compact()
+        except Exception as exc:
+            self._logger.error(f"Failed to compact journal of {self.file_path}: {exc}")
+
+    async def _compact(self) -> None:
+        async with AsyncExitStack() as stack:
+            async with self._lock.writer_lock:
+                async with self._journal_lock:
+                    # Hold the snapshot lock from the rotation until the snapshot is saved,
+                    # so that no other compaction adds entries to the compacting journal
+                    # (or saves an older snapshot) in between.
+                    await stack.enter_async_context(self._snapshot_lock)
+
+                    # Snapshot the (immutable) documents and rotate the journal atomically,
+                    # so that every change after this point lands in the fresh journal.
+                    data = {name: list(c.documents) for name, c in self._collections.items()}
+
+                    if self.journal_path.exists():
+                        if self._compacting_journal_path.exists():
+                            # An earlier compaction failed to save its snapshot, so its journal
+                            # is still the only durable copy of its entries. Keep them, and add ours.
+                            await self._append_journal(
+                                self.journal_path, self._compacting_journal_path
+                            )
+                            self.journal_path.unlink()
+                        else:
+                            os.replace(self.journal_path, self._compacting_journal_path)
+
+                    self._journal_entry_count = 0
+
+            await self._save_data_unlocked(data)
+            self._compacting_journal_path.unlink(missing_ok=True)
+
     async def load_documents_with_loader(
         self,
         name: str,
@@ -213,7 +407,7 @@ class JSONFileDocumentDatabase(DocumentDatabase):
     async def _flush_unlocked(self) -> None:
         data = {}
         for collection_name in self._collections:
-            data[collection_name] = self._collections[collection_name].documents
+            data[collection_name] = list(self._collections[collection_name].documents)
         await self._save_data(data)
 
 
@@ -232,22 +426,27 @@ class JSONFileDocumentCollection(DocumentCollection[TDocument]):
 
         self._lock = ReaderWriterLock()
 
-        self.documents = list(data) if data else []
+        self._documents = IndexedDocuments(data or [])
+
+    @property
+    def documents(self) -> list[TDocument]:
+        return list(self._documents)
+
+    @override
+    async def create_index(
+        self,
+        field: FieldName,
+    ) -> None:
+        async with self._lock.writer_lock:
+            self._documents.create_index(field)
 
     @override
     async def find(
         self,
         filters: Where,
     ) -> Sequence[TDocument]:
-        result = []
         async with self._lock.reader_lock:
-            for doc in filter(
-                lambda d: matches_filters(filters, d),
-                self.documents,
-            ):
-                result.append(doc)
-
-        return result
+            return [doc for _, doc in self._documents.find(filters)]
 
     @override
     async def find_one(
@@ -255,9 +454,8 @@ class JSONFileDocumentCollection(DocumentCollection[TDocument]):
         filters: Where,
     ) -> Optional[TDocument]:
         async with self._lock.reader_lock:
-            for doc in self.documents:
-                if matches_filters(filters, doc):
-                    return doc
+            for _, doc in self._documents.find(filters, limit=1):
+                return doc
 
         return None
 
@@ -269,9 +467,12 @@ class JSONFileDocumentCollection(DocumentCollection[TDocument]):
         ensure_is_total(document, self._schema)
 
         async with self._lock.writer_lock:
-            self.documents.append(document)
+            self._documents.insert(document)
 
-        await self._database.flush()
+            # Journal under the lock, so that entries are in the order of the changes
+            await self._database._persist_change(
+                {"op": "insert", "collection": self._name, "document": document}
+            )
 
         return InsertResult(acknowledged=True)
 
@@ -283,18 +484,25 @@ class JSONFileDocumentCollection(DocumentCollection[TDocument]):
         upsert: bool = False,
     ) -> UpdateResult[TDocument]:
         async with self._lock.writer_lock:
-            for i, d in enumerate(self.documents):
-                if matches_filters(filters, d):
-                    self.documents[i] = cast(TDocument, {**self.documents[i], **params})
-
-                    await self._database.flush()
+            for key, d in self._documents.find(filters, limit=1):
+                updated_document = cast(TDocument, {**d, **params})
+                self._documents.replace(key, updated_document)
+
+                await self._database._persist_change(
+                    {
+                        "op": "update",
+                        "collection": self._name,
+                        "id": cast(Optional[ObjectId], d.get("id")),
+                        "document": updated_document,
+                    }
+                )
 
-                    return UpdateResult(
-                        acknowledged=True,
-                        matched_count=1,
-                        modified_count=1,
-                        updated_document=self.documents[i],
-                    )
+                return UpdateResult(
+                    acknowledged=True,
+                    matched_count=1,
+                    modified_count=1,
+                    updated_document=updated_document,
+                )
 
         if upsert:
             await self.insert_one(params)
@@ -319,15 +527,18 @@ class JSONFileDocumentCollection(DocumentCollection[TDocument]):
         filters: Where,
     ) -> DeleteResult[TDocument]:
         async with self._lock.writer_lock:
-            for i, d in enumerate(self.documents):
-                if matches_filters(filters, d):
-                    document = self.documents.pop(i)
-
-                    await self._database.flush()
+            for key, _ in self._documents.find(filters, limit=1):
+                document = self._documents.delete(key)
+
+                await self._database._persist_change(
+                    {
+                        "op": "delete",
+                        "collection": self._name,
+                        "id": cast(Optional[ObjectId], document.get("id")),
+                    }
+                )
 
-                    return DeleteResult(
-                        deleted_count=1, acknowledged=True, deleted_document=document
-                    )
+                return DeleteResult(deleted_count=1, acknowledged=True, deleted_document=document)
 
         return DeleteResult(
             acknowledged=True,
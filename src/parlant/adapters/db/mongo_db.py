@@ -16,7 +16,7 @@ from typing import Any, Awaitable, Callable, Optional, Sequence
 from bson import CodecOptions
 from typing_extensions import Self
 from parlant.core.loggers import Logger
-from parlant.core.persistence.common import Where
+from parlant.core.persistence.common import FieldName, Where
 from parlant.core.persistence.document_database import (
     BaseDocument,
     DeleteResult,
@@ -157,6 +157,9 @@ class MongoDocumentCollection(DocumentCollection[TDocument]):
         self._database = mongo_document_database
         self._collection = mongo_collection
 
+    async def create_index(self, field: FieldName) -> None:
+        await self._collection.create_index(field)
+
     async def find(self, filters: Where) -> Sequence[TDocument]:
         mongo_cursor = self._collection.find(filters)
         result = await mongo_cursor.to_list()
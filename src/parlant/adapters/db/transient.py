@@ -17,7 +17,13 @@ from typing import Awaitable, Callable, Optional, Sequence, cast
 from typing_extensions import override
 from typing_extensions import get_type_hints
 
-from parlant.core.persistence.common import matches_filters, Where, ObjectId, ensure_is_total
+from parlant.core.persistence.common import (
+    FieldName,
+    IndexedDocuments,
+    Where,
+    ObjectId,
+    ensure_is_total,
+)
 from parlant.core.persistence.document_database import (
     BaseDocument,
     DeleteResult,
@@ -98,30 +104,29 @@ class TransientDocumentCollection(DocumentCollection[TDocument]):
     ) -> None:
         self._name = name
         self._schema = schema
-        self._documents = list(data) if data else []
+        self._documents = IndexedDocuments(data or [])
+
+    @override
+    async def create_index(
+        self,
+        field: FieldName,
+    ) -> None:
+        self._documents.create_index(field)
 
     @override
     async def find(
         self,
         filters: Where,
     ) -> Sequence[TDocument]:
-        result = []
-        for doc in filter(
-            lambda d: matches_filters(filters, d),
-            self._documents,
-        ):
-            result.append(doc)
-
-        return result
+        return [doc for _, doc in self._documents.find(filters)]
 
     @override
     async def find_one(
         self,
         filters: Where,
     ) -> Optional[TDocument]:
-        for doc in self._documents:
-            if matches_filters(filters, doc):
-                return doc
+        for _, doc in self._documents.find(filters, limit=1):
+            return doc
 
         return None
 
@@ -132,7 +137,7 @@ class TransientDocumentCollection(DocumentCollection[TDocument]):
     ) -> InsertResult:
         ensure_is_total(document, self._schema)
 
-        self._documents.append(document)
+        self._documents.insert(document)
 
         return InsertResult(acknowledged=True)
 
@@ -143,16 +148,16 @@ class TransientDocumentCollection(DocumentCollection[TDocument]):
         params: TDocument,
         upsert: bool = False,
     ) -> UpdateResult[TDocument]:
-        for i, d in enumerate(self._documents):
-            if matches_filters(filters, d):
-                self._documents[i] = cast(TDocument, {**self._documents[i], **params})
+        for key, d in self._documents.find(filters, limit=1):
+            updated_document = cast(TDocument, {**d, **params})
+            self._documents.replace(key, updated_document)
 
-                return UpdateResult(
-                    acknowledged=True,
-                    matched_count=1,
-                    modified_count=1,
-                    updated_document=self._documents[i],
-                )
+            return UpdateResult(
+                acknowledged=True,
+                matched_count=1,
+                modified_count=1,
+                updated_document=updated_document,
+            )
 
         if upsert:
             await self.insert_one(params)
@@ -176,11 +181,10 @@ class TransientDocumentCollection(DocumentCollection[TDocument]):
         self,
         filters: Where,
     ) -> DeleteResult[TDocument]:
-        for i, d in enumerate(self._documents):
-            if matches_filters(filters, d):
-                document = self._documents.pop(i)
+        for key, _ in self._documents.find(filters, limit=1):
+            document = self._documents.delete(key)
 
-                return DeleteResult(deleted_count=1, acknowledged=True, deleted_document=document)
+            return DeleteResult(deleted_count=1, acknowledged=True, deleted_document=document)
 
         return DeleteResult(
             acknowledged=True,
@@ -15,8 +15,9 @@
 import asyncio
 from collections import deque
 from dataclasses import dataclass
-from typing import Any
+from typing import Any, Optional
 from fastapi import WebSocket
+from starlette.websockets import WebSocketState
 from typing_extensions import override
 
 from parlant.core.common import UniqueId, generate_id
@@ -28,91 +29,182 @@ from parlant.core.loggers import CorrelationalLogger, LogLevel
 class WebSocketSubscription:
     socket: WebSocket
     expiration: asyncio.Event
+    batched: bool = False
+    """Whether messages are sent as JSON arrays of up to a batch's size, rather than one per frame."""
+
+
+class _SubscriberQueue:
+    def __init__(self, subscription: WebSocketSubscription, max_size: int) -> None:
+        self.subscription = subscription
+        self.messages = deque[Any](maxlen=max_size)
+        self.pending = asyncio.Event()
+        self.dropped_messages = 0
+        self.sender: Optional[asyncio.Task[None]] = None
+
+    def put(self, payloads: list[Any]) -> None:
+        assert self.messages.maxlen
+
+        # The queue is a ring buffer, so a subscriber that can't keep up loses its oldest messages
+        self.dropped_messages += max(len(self.messages) + len(payloads) - self.messages.maxlen, 0)
+        self.messages.extend(payloads)
+        self.pending.set()
 
 
 class WebSocketLogger(CorrelationalLogger):
+    """A logger that streams messages to the sockets subscribed to it.
+
+    Messages below the logger's level, or logged while there are no subscribers,
+    are discarded right away. The rest go into a bounded buffer, from which they're
+    fanned out to a bounded queue per subscriber, each with its own send task,
+    so that a slow socket only holds up (and, when it falls behind, drops) its own messages.
+    """
+
     def __init__(
         self,
         correlator: ContextualCorrelator,
         log_level: LogLevel = LogLevel.DEBUG,
         logger_id: str | None = None,
+        buffer_size: int = 10_000,
+        subscriber_buffer_size: int = 1_000,
+        max_batch_size: int = 100,
     ) -> None:
         super().__init__(correlator, log_level, logger_id)
 
-        self._message_queue = deque[Any]()
-        self._messages_in_queue = asyncio.Semaphore(0)
+        self._subscriber_buffer_size = subscriber_buffer_size
+        self._max_batch_size = max_batch_size
+
+        self._message_queue = deque[Any](maxlen=buffer_size)
+        self._messages_in_queue = asyncio.Event()
         self._socket_subscriptions: dict[UniqueId, WebSocketSubscription] = {}
+        self._subscriber_queues: dict[UniqueId, _SubscriberQueue] = {}
         self._lock = asyncio.Lock()
 
-    def _enqueue_message(self, level: str, message: str) -> None:
-        payload = {
-            "level": level,
-            "correlation_id": self._correlator.correlation_id,
-            "message": message,
-        }
+        self.dropped_messages = 0
+        """The number of messages that were dropped because the buffer was full."""
 
-        self._message_queue.append(payload)
-        self._messages_in_queue.release()
+    def _enqueue_message(self, level: LogLevel, message: str) -> None:
+        if level < self.log_level or not self._socket_subscriptions:
+            return
 
-    async def subscribe(self, web_socket: WebSocket) -> WebSocketSubscription:
+        if len(self._message_queue) == self._message_queue.maxlen:
+            self.dropped_messages += 1
+
+        self._message_queue.append(
+            {
+                "level": level.name,
+                "correlation_id": self._correlator.correlation_id,
+                "message": f"{self.current_scope} {message}",
+            }
+        )
+        self._messages_in_queue.set()
+
+    async def subscribe(
+        self,
+        web_socket: WebSocket,
+        batched: bool = False,
+    ) -> WebSocketSubscription:
         socket_id = generate_id()
 
-        subscription = WebSocketSubscription(web_socket, asyncio.Event())
+        subscription = WebSocketSubscription(web_socket, asyncio.Event(), batched)
 
         async with self._lock:
             self._socket_subscriptions[socket_id] = subscription
 
         return subscription
 
+    def get_dropped_message_counts(self) -> dict[UniqueId, int]:
+        """Returns the number of messages each current subscriber has dropped for falling behind."""
+        return {socket_id: q.dropped_messages for socket_id, q in self._subscriber_queues.items()}
+
     @override
     def trace(self, message: str) -> None:
-        self._enqueue_message("TRACE", f"{self.current_scope} {message}")
+        self._enqueue_message(LogLevel.TRACE, message)
 
     @override
     def debug(self, message: str) -> None:
-        self._enqueue_message("DEBUG", f"{self.current_scope} {message}")
+        self._enqueue_message(LogLevel.DEBUG, message)
 
     @override
     def info(self, message: str) -> None:
-        self._enqueue_message("INFO", f"{self.current_scope} {message}")
+        self._enqueue_message(LogLevel.INFO, message)
 
     @override
     def warning(self, message: str) -> None:
-        self._enqueue_message("WARNING", f"{self.current_scope} {message}")
+        self._enqueue_message(LogLevel.WARNING, message)
 
     @override
     def error(self, message: str) -> None:
-        self._enqueue_message("ERROR", f"{self.current_scope} {message}")
+        self._enqueue_message(LogLevel.ERROR, message)
 
     @override
     def critical(self, message: str) -> None:
-        self._enqueue_message("CRITICAL", f"{self.current_scope} {message}")
+        self._enqueue_message(LogLevel.CRITICAL, message)
+
+    async def _send_messages(self, socket_id: UniqueId, queue: _SubscriberQueue) -> None:
+        subscription = queue.subscription
 
-    async def start(self) -> None:
         try:
             while True:
-                try:
-                    await self._messages_in_queue.acquire()
-                    payload = self._message_queue.popleft()
+                await queue.pending.wait()
+                queue.pending.clear()
+
+                # Subscribers may register before their socket is accepted,
+                # in which case their messages wait for the next wake-up
+                if subscription.socket.application_state == WebSocketState.CONNECTING:
+                    continue
+
+                while queue.messages:
+                    batch = [
+                        queue.messages.popleft()
+                        for _ in range(min(len(queue.messages), self._max_batch_size))
+                    ]
+
+                    if subscription.batched:
+                        await subscription.socket.send_json(batch)
+                    else:
+                        for payload in batch:
+                            await subscription.socket.send_json(payload)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            pass
+
+        async with self._lock:
+            self._socket_subscriptions.pop(socket_id, None)
+            self._subscriber_queues.pop(socket_id, None)
 
-                    async with self._lock:
-                        socket_subscriptions = dict(self._socket_subscriptions)
+        subscription.expiration.set()
 
-                    expired_ids = set()
+    async def _dispatch(self) -> None:
+        payloads = list(self._message_queue)
+        self._message_queue.clear()
 
-                    for socket_id, subscription in socket_subscriptions.items():
-                        try:
-                            await subscription.socket.send_json(payload)
-                        except Exception:
-                            expired_ids.add(socket_id)
+        async with self._lock:
+            socket_subscriptions = dict(self._socket_subscriptions)
+
+        for socket_id, subscription in socket_subscriptions.items():
+            if socket_id not in self._subscriber_queues:
+                queue = _SubscriberQueue(subscription, self._subscriber_buffer_size)
+                queue.sender = asyncio.create_task(self._send_messages(socket_id, queue))
+                self._subscriber_queues[socket_id] = queue
+
+            self._subscriber_queues[socket_id].put(payloads)
 
-                    async with self._lock:
-                        for socket_id in expired_ids:
-                            subscription = self._socket_subscriptions.pop(socket_id)
-                            subscription.expiration.set()
+    async def start(self) -> None:
+        try:
+            while True:
+                try:
+                    await self._messages_in_queue.wait()
+                    self._messages_in_queue.clear()
+
+                    await self._dispatch()
                 except asyncio.CancelledError:
                     return
         finally:
+            for queue in list(self._subscriber_queues.values()):
+                if queue.sender:
+                    queue.sender.cancel()
+
             async with self._lock:
                 for socket_id, subscription in self._socket_subscriptions.items():
                     subscription.expiration.set()
@@ -22,6 +22,7 @@ from anthropic import (
     InternalServerError,
     RateLimitError,
 )  # type: ignore
+from anthropic.types import TextBlockParam  # type: ignore
 from typing import Any, Mapping
 from typing_extensions import override
 import jsonfinder  # type: ignore
@@ -109,15 +110,26 @@ class AnthropicAISchematicGenerator(SchematicGenerator[T]):
         prompt: str | PromptBuilder,
         hints: Mapping[str, Any] = {},
     ) -> SchematicGenerationResult[T]:
+        content: list[TextBlockParam]
+
         if isinstance(prompt, PromptBuilder):
-            prompt = prompt.build()
+            static_prefix, volatile_suffix = prompt.build_parts()
+
+            # Marking the end of the static prefix lets Anthropic cache it across requests
+            content = [
+                {"type": "text", "text": static_prefix, "cache_control": {"type": "ephemeral"}},
+                {"type": "text", "text": volatile_suffix},
+            ]
+            content = [block for block in content if block["text"]]
+        else:
+            content = [{"type": "text", "text": prompt}]
 
         anthropic_api_arguments = {k: v for k, v in hints.items() if k in self.supported_hints}
 
         t_start = time.time()
         try:
             response = await self._client.messages.create(
-                messages=[{"role": "user", "content": prompt}],
+                messages=[{"role": "user", "content": content}],
                 model=self.model_name,
                 max_tokens=4096,
                 **anthropic_api_arguments,
@@ -165,6 +177,12 @@ class AnthropicAISchematicGenerator(SchematicGenerator[T]):
                     usage=UsageInfo(
                         input_tokens=response.usage.input_tokens,
                         output_tokens=response.usage.output_tokens,
+                        extra={
+                            "cached_input_tokens": response.usage.cache_read_input_tokens or 0,
+                            "cache_creation_input_tokens": (
+                                response.usage.cache_creation_input_tokens or 0
+                            ),
+                        },
                     ),
                 ),
             )
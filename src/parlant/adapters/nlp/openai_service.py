@@ -24,6 +24,7 @@ from openai import (
     InternalServerError,
     RateLimitError,
 )
+from openai.types.chat import ChatCompletionMessageParam
 from typing import Any, Mapping
 from typing_extensions import override
 import json
@@ -141,8 +142,16 @@ class OpenAISchematicGenerator(SchematicGenerator[T]):
         prompt: str | PromptBuilder,
         hints: Mapping[str, Any] = {},
     ) -> SchematicGenerationResult[T]:
+        # Sending the static part of the prompt as a message of its own keeps it a stable
+        # prefix across requests, which is what OpenAI's prompt caching matches on
+        messages: list[ChatCompletionMessageParam]
+
         if isinstance(prompt, PromptBuilder):
-            prompt = prompt.build()
+            messages = [
+                {"role": "developer", "content": part} for part in prompt.build_parts() if part
+            ]
+        else:
+            messages = [{"role": "developer", "content": prompt}]
 
         openai_api_arguments = {k: v for k, v in hints.items() if k in self.supported_openai_params}
 
@@ -150,7 +159,7 @@ class OpenAISchematicGenerator(SchematicGenerator[T]):
             t_start = time.time()
             try:
                 response = await self._client.beta.chat.completions.parse(
-                    messages=[{"role": "developer", "content": prompt}],
+                    messages=messages,
                     model=self.model_name,
                     response_format=self.schema,
                     **openai_api_arguments,
@@ -191,7 +200,7 @@ class OpenAISchematicGenerator(SchematicGenerator[T]):
             try:
                 t_start = time.time()
                 response = await self._client.chat.completions.create(
-                    messages=[{"role": "developer", "content": prompt}],
+                    messages=messages,
                     model=self.model_name,
                     response_format={"type": "json_object"},
                     **openai_api_arguments,
@@ -32,6 +32,7 @@ from parlant.core.nlp.embedding import (
     EmbedderFactory,
     EmbeddingCacheProvider,
     NoOpEmbedder,
+    embed_with_cache,
 )
 from parlant.core.persistence.common import Where, ensure_is_total
 from parlant.core.persistence.vector_database import (
@@ -45,6 +46,7 @@ from parlant.core.persistence.vector_database import (
     TDocument,
     identity_loader,
 )
+from parlant.core.persistence.vector_database_helper import QueryEmbeddingCache
 
 
 class ChromaDatabase(VectorDatabase):
@@ -154,6 +156,8 @@ class ChromaDatabase(VectorDatabase):
         if docs := unembedded_collection.get()["metadatas"]:
             unembedded_docs_by_id = {doc["id"]: doc for doc in docs}
 
+        changed_docs = []
+
         # Remove docs from embedded collection that no longer exist in unembedded
         # Update embeddings for changed docs
         if docs := collection.get()["metadatas"]:
@@ -162,29 +166,34 @@ class ChromaDatabase(VectorDatabase):
                     collection.delete(where={"id": cast(str, doc["id"])})
                 else:
                     if doc["checksum"] != unembedded_docs_by_id[doc["id"]]["checksum"]:
-                        embeddings = list(
-                            (
-                                await embedder.embed(
-                                    [cast(str, unembedded_docs_by_id[doc["id"]]["content"])]
-                                )
-                            ).vectors
-                        )
-
-                        collection.update(
-                            ids=[str(doc["id"])],
-                            documents=[cast(str, unembedded_docs_by_id[doc["id"]]["content"])],
-                            metadatas=unembedded_docs_by_id[doc["id"]],
-                            embeddings=embeddings,
-                        )
+                        changed_docs.append(unembedded_docs_by_id[doc["id"]])
                     unembedded_docs_by_id.pop(doc["id"])
 
+        # Embed all changed and new docs together, so that only those
+        # missing from the embedding cache are sent to the embedder
+        new_docs = list(unembedded_docs_by_id.values())
+
+        embeddings = await embed_with_cache(
+            embedder,
+            self._embedding_cache_provider(),
+            [cast(str, doc["content"]) for doc in changed_docs + new_docs],
+        )
+
+        for doc, embedding in zip(changed_docs, embeddings):
+            collection.update(
+                ids=[str(doc["id"])],
+                documents=[cast(str, doc["content"])],
+                metadatas=doc,
+                embeddings=[embedding],
+            )
+
         # Add new docs from unembedded to embedded collection
-        for doc in unembedded_docs_by_id.values():
+        for doc, embedding in zip(new_docs, embeddings[len(changed_docs) :]):
             collection.add(
                 ids=[str(doc["id"])],
                 documents=[cast(str, doc["content"])],
                 metadatas=[doc],
-                embeddings=list((await embedder.embed([cast(str, doc["content"])])).vectors),
+                embeddings=[embedding],
             )
 
         collection.metadata.update({"version": unembedded_collection.metadata["version"]})
@@ -457,6 +466,7 @@ class ChromaCollection(Generic[TDocument], VectorCollection[TDocument]):
         self._schema = schema
         self._embedder = embedder
         self._embedding_cache_provider = embedding_cache_provider
+        self._query_embeddings = QueryEmbeddingCache(embedder)
         self._version = version
 
         self._lock = ReaderWriterLock()
@@ -496,18 +506,11 @@ class ChromaCollection(Generic[TDocument], VectorCollection[TDocument]):
     ) -> InsertResult:
         ensure_is_total(document, self._schema)
 
-        if e := await self._embedding_cache_provider().get(
-            embedder_type=type(self._embedder),
-            texts=[document["content"]],
-        ):
-            embeddings = list(e.vectors)
-        else:
-            embeddings = list((await self._embedder.embed([document["content"]])).vectors)
-            await self._embedding_cache_provider().set(
-                embedder_type=type(self._embedder),
-                texts=[document["content"]],
-                vectors=embeddings,
-            )
+        embeddings = await embed_with_cache(
+            self._embedder,
+            self._embedding_cache_provider(),
+            [document["content"]],
+        )
 
         async with self._lock.writer_lock:
             self._version += 1
@@ -555,18 +558,11 @@ class ChromaCollection(Generic[TDocument], VectorCollection[TDocument]):
                     content = str(doc["content"])
                     document = str(doc["content"])
 
-                if e := await self._embedding_cache_provider().get(
-                    embedder_type=type(self._embedder),
-                    texts=[content],
-                ):
-                    embeddings = list(e.vectors)
-                else:
-                    embeddings = list((await self._embedder.embed([content])).vectors)
-                    await self._embedding_cache_provider().set(
-                        embedder_type=type(self._embedder),
-                        texts=[content],
-                        vectors=embeddings,
-                    )
+                embeddings = await embed_with_cache(
+                    self._embedder,
+                    self._embedding_cache_provider(),
+                    [content],
+                )
 
                 updated_document = {**doc, **params}
 
@@ -602,18 +598,11 @@ class ChromaCollection(Generic[TDocument], VectorCollection[TDocument]):
             elif upsert:
                 ensure_is_total(params, self._schema)
 
-                if e := await self._embedding_cache_provider().get(
-                    embedder_type=type(self._embedder),
-                    texts=[params["content"]],
-                ):
-                    embeddings = list(e.vectors)
-                else:
-                    embeddings = list((await self._embedder.embed([params["content"]])).vectors)
-                    await self._embedding_cache_provider().set(
-                        embedder_type=type(self._embedder),
-                        texts=[params["content"]],
-                        vectors=embeddings,
-                    )
+                embeddings = await embed_with_cache(
+                    self._embedder,
+                    self._embedding_cache_provider(),
+                    [params["content"]],
+                )
 
                 self._version += 1
 
@@ -697,8 +686,20 @@ class ChromaCollection(Generic[TDocument], VectorCollection[TDocument]):
         query: str,
         k: int,
     ) -> Sequence[SimilarDocumentResult[TDocument]]:
+        return (await self.find_similar_documents_batch(filters, [query], k))[0]
+
+    @override
+    async def find_similar_documents_batch(
+        self,
+        filters: Where,
+        queries: Sequence[str],
+        k: int,
+    ) -> Sequence[Sequence[SimilarDocumentResult[TDocument]]]:
+        if not queries:
+            return []
+
         async with self._lock.reader_lock:
-            query_embeddings = list((await self._embedder.embed([query])).vectors)
+            query_embeddings = await self._query_embeddings.embed(queries)
 
             docs = self.embedded_collection.query(
                 where=cast(chromadb.Where, filters) or None,
@@ -707,14 +708,17 @@ class ChromaCollection(Generic[TDocument], VectorCollection[TDocument]):
             )
 
             if not docs["metadatas"]:
-                return []
+                return [[] for _ in queries]
 
             self._logger.trace(
-                f"Similar documents found\n{json.dumps(docs['metadatas'][0], indent=2)}"
+                f"Similar documents found\n{json.dumps(docs['metadatas'], indent=2)}"
             )
 
             assert docs["distances"]
             return [
-                SimilarDocumentResult(document=cast(TDocument, m), distance=d)
-                for m, d in zip(docs["metadatas"][0], docs["distances"][0])
+                [
+                    SimilarDocumentResult(document=cast(TDocument, m), distance=d)
+                    for m, d in zip(metadatas, distances)
+                ]
+                for metadatas, distances in zip(docs["metadatas"], docs["distances"])
             ]
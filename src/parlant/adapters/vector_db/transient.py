@@ -11,57 +11,30 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-# ruff: noqa
 
 from __future__ import annotations
 import asyncio
 import json
-from typing import Any, Awaitable, Callable, Generic, Mapping, Optional, Sequence, cast
+from typing import Awaitable, Callable, Generic, Optional, Sequence, cast
 import numpy as np
+from numpy.typing import NDArray
 from typing_extensions import override
 
-import logging
-
-orig_basicConfig = logging.basicConfig
-orig_getLogger = logging.getLogger
-
-
-# nano_vectordb overrides logging's basicConfig and stuff... :S
-# So we need to protect it for a minute while importing
-def _null_basicConfig(*args: Any, **kwargs: Any) -> None:
-    pass
-
-
-class _NullLogger:
-    def info(self, *args: Any, **kwargs: Any) -> None:
-        pass
-
-    def debug(self, *args: Any, **kwargs: Any) -> None:
-        pass
-
-
-def _null_getLogger(*args: Any, **kwargs: Any) -> object:
-    return _NullLogger()
-
-
-logging.basicConfig = _null_basicConfig  # type: ignore
-logging.getLogger = _null_getLogger  # type: ignore
-
-import nano_vectordb  # type: ignore
-
-logging.basicConfig = orig_basicConfig
-logging.getLogger = orig_getLogger
-# Back to business
-
 from parlant.core.common import JSONSerializable
 from parlant.core.nlp.embedding import (
     Embedder,
     EmbedderFactory,
-    EmbeddingCache,
     EmbeddingCacheProvider,
+    embed_with_cache,
 )
 from parlant.core.loggers import Logger
-from parlant.core.persistence.common import ensure_is_total, matches_filters, Where
+from parlant.core.persistence.common import (
+    FieldName,
+    IndexedDocuments,
+    ObjectId,
+    ensure_is_total,
+    Where,
+)
 from parlant.core.persistence.vector_database import (
     BaseDocument,
     DeleteResult,
@@ -72,6 +45,7 @@ from parlant.core.persistence.vector_database import (
     VectorDatabase,
     TDocument,
 )
+from parlant.core.persistence.vector_database_helper import QueryEmbeddingCache
 
 
 class TransientVectorDatabase(VectorDatabase):
@@ -85,7 +59,6 @@ class TransientVectorDatabase(VectorDatabase):
         self._embedder_factory = embedder_factory
         self._embedding_cache_provider = embedding_cache_provider
 
-        self._databases: dict[str, nano_vectordb.NanoVectorDB] = {}
         self._collections: dict[str, TransientVectorCollection[BaseDocument]] = {}
         self._metadata: dict[str, JSONSerializable] = {}
 
@@ -99,16 +72,11 @@ class TransientVectorDatabase(VectorDatabase):
         if name in self._collections:
             raise ValueError(f'Collection "{name}" already exists.')
 
-        embedder = self._embedder_factory.create_embedder(embedder_type)
-
-        self._databases[name] = nano_vectordb.NanoVectorDB(embedder.dimensions)
-
         self._collections[name] = TransientVectorCollection(
             self._logger,
-            nano_db=self._databases[name],
             name=name,
             schema=schema,
-            embedder=embedder,
+            embedder=self._embedder_factory.create_embedder(embedder_type),
             embedding_cache_provider=self._embedding_cache_provider,
         )
 
@@ -139,13 +107,8 @@ class TransientVectorDatabase(VectorDatabase):
             assert schema == collection._schema
             return cast(TransientVectorCollection[TDocument], collection)
 
-        embedder = self._embedder_factory.create_embedder(embedder_type)
-
-        self._databases[name] = nano_vectordb.NanoVectorDB(embedder.dimensions)
-
         self._collections[name] = TransientVectorCollection(
             self._logger,
-            nano_db=self._databases[name],
             name=name,
             schema=schema,
             embedder=self._embedder_factory.create_embedder(embedder_type),
@@ -161,7 +124,6 @@ class TransientVectorDatabase(VectorDatabase):
     ) -> None:
         if name not in self._collections:
             raise ValueError(f'Collection "{name}" not found.')
-        del self._databases[name]
         del self._collections[name]
 
     @override
@@ -186,11 +148,135 @@ class TransientVectorDatabase(VectorDatabase):
         return self._metadata
 
 
+class _VectorMatrix:
+    """Keeps a collection's vectors in one contiguous float32 matrix, along with their norms,
+    so that cosine distances to a query can be computed for all rows in a single operation."""
+
+    def __init__(self, initial_capacity: int = 64) -> None:
+        self._initial_capacity = initial_capacity
+        self._vectors: Optional[NDArray[np.float32]] = None
+        self._norms = np.zeros(0, dtype=np.float32)
+        self._ids: list[ObjectId] = []
+        self._rows: dict[ObjectId, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def _ensure_capacity(self, dimensions: int) -> None:
+        if self._vectors is None:
+            self._vectors = np.zeros((self._initial_capacity, dimensions), dtype=np.float32)
+            self._norms = np.zeros(self._initial_capacity, dtype=np.float32)
+        elif len(self._ids) == self._vectors.shape[0]:
+            capacity = self._vectors.shape[0] * 2
+
+            vectors = np.zeros((capacity, dimensions), dtype=np.float32)
+            vectors[: len(self._ids)] = self._vectors[: len(self._ids)]
+            self._vectors = vectors
+
+            norms = np.zeros(capacity, dtype=np.float32)
+            norms[: len(self._ids)] = self._norms[: len(self._ids)]
+            self._norms = norms
+
+    def upsert(self, id: ObjectId, vector: NDArray[np.float32]) -> None:
+        if (row := self._rows.get(id)) is None:
+            self._ensure_capacity(vector.shape[0])
+
+            row = len(self._ids)
+            self._ids.append(id)
+            self._rows[id] = row
+
+        assert self._vectors is not None
+
+        self._vectors[row] = vector
+        self._norms[row] = np.linalg.norm(vector)
+
+    def delete(self, id: ObjectId) -> None:
+        if (row := self._rows.pop(id, None)) is None:
+            return
+
+        assert self._vectors is not None
+
+        # Keep rows contiguous by moving the last row into the freed one
+        last_row = len(self._ids) - 1
+        last_id = self._ids.pop()
+
+        if row != last_row:
+            self._vectors[row] = self._vectors[last_row]
+            self._norms[row] = self._norms[last_row]
+            self._ids[row] = last_id
+            self._rows[last_id] = row
+
+    def query(
+        self,
+        vectors: NDArray[np.float32],
+        k: int,
+        ids: Optional[set[ObjectId]] = None,
+    ) -> list[list[tuple[ObjectId, float]]]:
+        """Returns, for each of the given (query) vectors, the ids of its k nearest rows
+        along with their cosine distances, nearest first.
+
+        If ids is given, only rows holding one of these ids are considered."""
+        size = len(self._ids)
+
+        if self._vectors is None or size == 0 or k <= 0:
+            return [[] for _ in vectors]
+
+        rows: NDArray[np.intp]
+
+        if ids is None:
+            rows = np.arange(size)
+
+            # Slicing (unlike indexing by rows) doesn't copy the matrix
+            row_vectors = self._vectors[:size]
+            row_norms = self._norms[:size]
+        else:
+            mask = np.zeros(size, dtype=bool)
+            mask[[self._rows[id] for id in ids if id in self._rows]] = True
+            rows = np.flatnonzero(mask)
+
+            if rows.size == 0:
+                return [[] for _ in vectors]
+
+            row_vectors = self._vectors[rows]
+            row_norms = self._norms[rows]
+
+        # Scores all (row, query) pairs at once: shape is (len(rows), len(vectors))
+        norms = np.outer(row_norms, np.linalg.norm(vectors, axis=1))
+        dot_products = row_vectors @ vectors.T
+
+        similarities = np.divide(
+            dot_products,
+            norms,
+            out=np.zeros_like(dot_products),
+            where=norms > 0,
+        )
+
+        top: NDArray[np.intp]
+
+        if k < rows.size:
+            top = np.argpartition(-similarities, k - 1, axis=0)[:k]
+        else:
+            top = np.tile(np.arange(rows.size)[:, None], (1, len(vectors)))
+
+        top_similarities = np.take_along_axis(similarities, top, axis=0)
+        order = np.argsort(-top_similarities, axis=0, kind="stable")
+
+        top = np.take_along_axis(top, order, axis=0)
+        top_similarities = np.take_along_axis(top_similarities, order, axis=0)
+
+        return [
+            [
+                (self._ids[rows[i]], float(1.0 - similarity))
+                for i, similarity in zip(top[:, q], top_similarities[:, q])
+            ]
+            for q in range(len(vectors))
+        ]
+
+
 class TransientVectorCollection(Generic[TDocument], VectorCollection[TDocument]):
     def __init__(
         self,
         logger: Logger,
-        nano_db: nano_vectordb.NanoVectorDB,
         name: str,
         schema: type[TDocument],
         embedder: Embedder,
@@ -201,42 +287,34 @@ class TransientVectorCollection(Generic[TDocument], VectorCollection[TDocument])
         self._schema = schema
         self._embedder = embedder
         self._embedding_cache_provider = embedding_cache_provider
+        self._query_embeddings = QueryEmbeddingCache(embedder)
 
         self._lock = asyncio.Lock()
-        self._nano_db = nano_db
-        self._documents: list[TDocument] = []
-
-    @staticmethod
-    def _build_filter_lambda(
-        filters: Where,
-    ) -> nano_vectordb.dbs.ConditionLambda:
-        def filter_lambda(candidate: Mapping[str, Any]) -> bool:
-            return matches_filters(filters, candidate)
+        self._vectors = _VectorMatrix()
+        self._documents = IndexedDocuments[TDocument]()
+        self._documents.create_index("id")
 
-        return filter_lambda
+    @override
+    async def create_index(
+        self,
+        field: FieldName,
+    ) -> None:
+        self._documents.create_index(field)
 
     @override
     async def find(
         self,
         filters: Where,
     ) -> Sequence[TDocument]:
-        result = []
-        for doc in filter(
-            lambda d: matches_filters(filters, d),
-            self._documents,
-        ):
-            result.append(doc)
-
-        return result
+        return [doc for _, doc in self._documents.find(filters)]
 
     @override
     async def find_one(
         self,
         filters: Where,
     ) -> Optional[TDocument]:
-        for doc in self._documents:
-            if matches_filters(filters, doc):
-                return doc
+        for _, doc in self._documents.find(filters, limit=1):
+            return doc
 
         return None
 
@@ -247,29 +325,21 @@ class TransientVectorCollection(Generic[TDocument], VectorCollection[TDocument])
     ) -> InsertResult:
         ensure_is_total(document, self._schema)
 
-        if e := await self._embedding_cache_provider().get(
-            embedder_type=type(self._embedder),
-            texts=[document["content"]],
-        ):
-            embeddings = list(e.vectors)
-        else:
-            embeddings = list((await self._embedder.embed([document["content"]])).vectors)
-            await self._embedding_cache_provider().set(
-                embedder_type=type(self._embedder),
-                texts=[document["content"]],
-                vectors=embeddings,
-            )
-
-        vector = np.array(embeddings[0], dtype=np.float32)
-
-        data = {**document, "__id__": document["id"], "__vector__": vector}
-
         async with self._lock:
-            self._nano_db.upsert([data])
-            self._documents.append(document)
+            await self._insert_unlocked(document)
 
         return InsertResult(acknowledged=True)
 
+    async def _insert_unlocked(self, document: TDocument) -> None:
+        embeddings = await embed_with_cache(
+            self._embedder,
+            self._embedding_cache_provider(),
+            [document["content"]],
+        )
+
+        self._vectors.upsert(document["id"], np.array(embeddings[0], dtype=np.float32))
+        self._documents.insert(document)
+
     @override
     async def update_one(
         self,
@@ -278,42 +348,36 @@ class TransientVectorCollection(Generic[TDocument], VectorCollection[TDocument])
         upsert: bool = False,
     ) -> UpdateResult[TDocument]:
         async with self._lock:
-            for i, doc in enumerate(self._documents):
-                if matches_filters(filters, doc):
-                    if "content" in params:
-                        content = params["content"]
-                    else:
-                        content = str(doc["content"])
-
-                    if e := await self._embedding_cache_provider().get(
-                        embedder_type=type(self._embedder),
-                        texts=[content],
-                    ):
-                        embeddings = list(e.vectors)
-                    else:
-                        embeddings = list((await self._embedder.embed([content])).vectors)
-                        await self._embedding_cache_provider().set(
-                            embedder_type=type(self._embedder),
-                            texts=[content],
-                            vectors=embeddings,
-                        )
-
-                    vector = np.array(embeddings[0], dtype=np.float32)
-                    data = {**params, "__id__": doc["id"], "__vector__": vector}
-
-                    self._nano_db.upsert([data])
-                    self._documents[i] = cast(TDocument, {**self._documents[i], **params})
-
-                    return UpdateResult(
-                        acknowledged=True,
-                        matched_count=1,
-                        modified_count=1,
-                        updated_document=self._documents[i],
-                    )
+            for key, doc in self._documents.find(filters, limit=1):
+                if "content" in params:
+                    content = params["content"]
+                else:
+                    content = str(doc["content"])
+
+                embeddings = await embed_with_cache(
+                    self._embedder,
+                    self._embedding_cache_provider(),
+                    [content],
+                )
+
+                vector = np.array(embeddings[0], dtype=np.float32)
+
+                self._vectors.upsert(doc["id"], vector)
+
+                updated_document = cast(TDocument, {**doc, **params})
+                self._documents.replace(key, updated_document)
+
+                return UpdateResult(
+                    acknowledged=True,
+                    matched_count=1,
+                    modified_count=1,
+                    updated_document=updated_document,
+                )
 
             if upsert:
                 ensure_is_total(params, self._schema)
-                await self.insert_one(params)
+
+                await self._insert_unlocked(params)
 
                 return UpdateResult(
                     acknowledged=True,
@@ -334,13 +398,12 @@ class TransientVectorCollection(Generic[TDocument], VectorCollection[TDocument])
         self,
         filters: Where,
     ) -> DeleteResult[TDocument]:
-        for i, d in enumerate(self._documents):
-            if matches_filters(filters, d):
-                document = self._documents.pop(i)
+        for key, _ in self._documents.find(filters, limit=1):
+            document = self._documents.delete(key)
 
-                self._nano_db.delete([d["id"]])
+            self._vectors.delete(document["id"])
 
-                return DeleteResult(deleted_count=1, acknowledged=True, deleted_document=document)
+            return DeleteResult(deleted_count=1, acknowledged=True, deleted_document=document)
 
         return DeleteResult(
             acknowledged=True,
@@ -348,45 +411,50 @@ class TransientVectorCollection(Generic[TDocument], VectorCollection[TDocument])
             deleted_document=None,
         )
 
+    @override
     async def find_similar_documents(
         self,
         filters: Where,
         query: str,
         k: int,
     ) -> Sequence[SimilarDocumentResult[TDocument]]:
-        if not self._documents:
-            return []
+        return (await self.find_similar_documents_batch(filters, [query], k))[0]
 
-        query_embeddings = list((await self._embedder.embed([query])).vectors)
-        vector = np.array(query_embeddings[0], dtype=np.float32)
+    @override
+    async def find_similar_documents_batch(
+        self,
+        filters: Where,
+        queries: Sequence[str],
+        k: int,
+    ) -> Sequence[Sequence[SimilarDocumentResult[TDocument]]]:
+        if not queries:
+            return []
 
-        keys_to_exclude = {"__id__", "__metrics__"}
+        if not self._documents:
+            return [[] for _ in queries]
 
-        docs = [
-            {key: value for key, value in d.items() if key not in keys_to_exclude}
-            for d in self._nano_db.query(
-                query=vector,
-                top_k=k,
-                filter_lambda=self._build_filter_lambda(filters),
-            )
-        ]
+        query_embeddings = await self._query_embeddings.embed(queries)
+        vectors = np.array(query_embeddings, dtype=np.float32)
 
-        self._logger.trace(f"Similar documents found\n{json.dumps(docs, indent=2)}")
+        if filters:
+            ids: Optional[set[ObjectId]] = {doc["id"] for _, doc in self._documents.find(filters)}
+        else:
+            ids = None
 
-        # FIXME: Distances here are fake (rank → normalized 0–0.8).
-        # Proper cosine distance should be computed.
-        # Currently NanoDB doesn’t return similarity scores or embeddings, so
-        # this is only a placeholder for ordering. Replace once real scores
-        # are implemented in the database client.
-        n = len(docs)
+        results = [
+            [
+                SimilarDocumentResult(
+                    document=self._documents.find({"id": {"$eq": id}}, limit=1)[0][1],
+                    distance=distance,
+                )
+                for id, distance in query_results
+            ]
+            for query_results in self._vectors.query(vectors, k, ids)
+        ]
 
-        def distance_formula(i: int) -> float:
-            return ((i / (n - 1)) * 0.8) if n > 1 else 0.8
+        self._logger.trace(
+            "Similar documents found\n"
+            + json.dumps([[r.document for r in rs] for rs in results], indent=2)
+        )
 
-        return [
-            SimilarDocumentResult(
-                document=cast(TDocument, d),
-                distance=distance_formula(i),
-            )
-            for i, d in enumerate(docs)
-        ]
+        return results
@@ -3,9 +3,12 @@ import Chatbot from './components/chatbot/chatbot';
 import {useWebSocket} from './hooks/useWebSocket';
 import {BASE_URL} from './utils/api';
 import {handleChatLogs} from './utils/logs';
+import {Log} from './utils/interfaces';
+
+const handleChatLogBatch = (logs: Log[]) => logs.forEach(handleChatLogs);
 
 const WebSocketComp = () => {
-	const socket = useWebSocket(`${BASE_URL}/logs`, true, null, handleChatLogs);
+	const socket = useWebSocket(`${BASE_URL}/logs?batch=true`, true, null, handleChatLogBatch);
 	void socket;
 	return <div></div>;
 };
@@ -23,9 +23,10 @@ def create_router(
     router = APIRouter()
 
     @router.websocket("/logs")
-    async def stream_logs(websocket: WebSocket) -> None:
+    async def stream_logs(websocket: WebSocket, batch: bool = False) -> None:
+        # Subscribing first means no message logged once the client is connected is missed
+        subscription = await websocket_logger.subscribe(websocket, batched=batch)
         await websocket.accept()
-        subscription = await websocket_logger.subscribe(websocket)
         await subscription.expiration.wait()
 
     return router
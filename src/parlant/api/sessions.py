@@ -677,6 +677,14 @@ GenerationInfoDurationField: TypeAlias = Annotated[
     ),
 ]
 
+GenerationInfoCacheHitField: TypeAlias = Annotated[
+    bool,
+    Field(
+        description="Whether the generation was answered from a cache rather than the model",
+        examples=[False],
+    ),
+]
+
 
 generation_info_example = {
     "schema_name": "customer_response_v2",
@@ -696,6 +704,7 @@ class GenerationInfoDTO(
     model: GenerationInfoModelField
     duration: GenerationInfoDurationField
     usage: UsageInfoDTO
+    cache_hit: Optional[GenerationInfoCacheHitField] = None
 
 
 MessageGenerationInspectionMessagesField: TypeAlias = Annotated[
@@ -1012,6 +1021,7 @@ def generation_info_to_dto(gi: GenerationInfo) -> GenerationInfoDTO:
             output_tokens=gi.usage.output_tokens,
             extra=gi.usage.extra,
         ),
+        cache_hit=gi.cache.hit if gi.cache else None,
     )
 
 
@@ -48,7 +48,7 @@ from parlant.api.authorization import (
     ProductionAuthorizationPolicy,
 )
 from parlant.core.capabilities import CapabilityStore, CapabilityVectorStore
-from parlant.core.common import IdGenerator
+from parlant.core.common import DefaultBaseModel, IdGenerator
 from parlant.core.engines.alpha import message_generator
 from parlant.core.engines.alpha.guideline_matching.generic import (
     guideline_actionable_batch,
@@ -96,8 +96,13 @@ from parlant.core.engines.alpha.guideline_matching.guideline_matcher import (
     GuidelineMatchingStrategyResolver,
     ResponseAnalysisBatch,
 )
+from parlant.core.engines.alpha.guideline_matching.guideline_matching_cache import (
+    BasicGuidelineMatchingCache,
+    GuidelineMatchingCache,
+)
 from parlant.core.engines.alpha.hooks import EngineHooks
 from parlant.core.engines.alpha.optimization_policy import (
+    AdaptiveOptimizationPolicy,
     BasicOptimizationPolicy,
     OptimizationPolicy,
 )
@@ -106,6 +111,11 @@ from parlant.core.engines.alpha.perceived_performance_policy import (
     PerceivedPerformancePolicy,
 )
 from parlant.core.engines.alpha.relational_guideline_resolver import RelationalGuidelineResolver
+from parlant.core.engines.alpha.guideline_matching.guideline_screening import (
+    GuidelineScreener,
+    NullGuidelineScreener,
+    VectorGuidelineScreener,
+)
 from parlant.core.engines.alpha.tool_calling.overlapping_tools_batch import (
     OverlappingToolsBatchSchema,
 )
@@ -143,7 +153,11 @@ from parlant.core.services.indexing.tool_running_action_detector import (
     ToolRunningActionDetector,
     ToolRunningActionSchema,
 )
-from parlant.core.canned_responses import CannedResponseStore, CannedResponseVectorStore
+from parlant.core.canned_responses import (
+    CannedResponseStore,
+    CannedResponseTemplateCache,
+    CannedResponseVectorStore,
+)
 from parlant.core.nlp.service import NLPService
 from parlant.core.persistence.common import MigrationRequired, ServerOutdated
 from parlant.core.shots import ShotCollection
@@ -181,12 +195,24 @@ from parlant.core.nlp.embedding import (
     NullEmbeddingCache,
 )
 from parlant.core.nlp.generation import SchematicGenerator
+from parlant.core.nlp.generation_cache import (
+    BasicGenerationCache,
+    CachingSchematicGenerator,
+    GenerationCache,
+)
+from parlant.core.nlp.rate_limiting import (
+    GenerationPriority,
+    GenerationRateLimiters,
+    RateLimitedSchematicGenerator,
+    RateLimits,
+)
 from parlant.core.persistence.data_collection import DataCollectingSchematicGenerator
 from parlant.core.services.tools.service_registry import (
     ServiceRegistry,
     ServiceDocumentRegistry,
 )
 from parlant.core.sessions import (
+    NotifyingSessionListener,
     PollingSessionListener,
     SessionDocumentStore,
     SessionListener,
@@ -494,12 +520,32 @@ async def setup_container() -> AsyncIterator[Container]:
     _define_singleton(c, EntityCommands, EntityCommands)
 
     _define_singleton(c, ToolEventGenerator, ToolEventGenerator)
+    _define_singleton(c, CannedResponseTemplateCache, CannedResponseTemplateCache)
     _define_singleton(c, CannedResponseFieldExtractor, CannedResponseFieldExtractor)
     _define_singleton(c, CannedResponseGenerator, CannedResponseGenerator)
     _define_singleton(c, NoMatchResponseProvider, BasicNoMatchResponseProvider)
     _define_singleton(c, MessageGenerator, MessageGenerator)
     _define_singleton(c, PerceivedPerformancePolicy, BasicPerceivedPerformancePolicy)
-    _define_singleton(c, OptimizationPolicy, BasicOptimizationPolicy)
+
+    # Adaptive batching is opt-in, as it sizes guideline matching batches by the
+    # costs observed on this server instead of by the number of guidelines alone
+    if os.environ.get("PARLANT_ADAPTIVE_BATCHING", "false").lower() not in ["false", "no", "0"]:
+        _define_singleton_value(
+            c,
+            OptimizationPolicy,
+            AdaptiveOptimizationPolicy(
+                max_concurrent_batches=int(
+                    os.environ.get("PARLANT_MAX_CONCURRENT_GENERATIONS", "16"),
+                ),
+                token_budget=(
+                    int(token_budget)
+                    if (token_budget := os.environ.get("PARLANT_GUIDELINE_MATCHING_TOKEN_BUDGET"))
+                    else None
+                ),
+            ),
+        )
+    else:
+        _define_singleton(c, OptimizationPolicy, BasicOptimizationPolicy)
 
     _define_singleton(c, GuidelineConnectionProposer, GuidelineConnectionProposer)
     _define_singleton(c, CoherenceChecker, CoherenceChecker)
@@ -532,6 +578,7 @@ async def setup_container() -> AsyncIterator[Container]:
         c, GuidelineMatchingStrategyResolver, GenericGuidelineMatchingStrategyResolver
     )
 
+    _define_singleton(c, GuidelineMatchingCache, BasicGuidelineMatchingCache)
     _define_singleton(c, GuidelineMatcher, GuidelineMatcher)
 
     _define_singleton(c, ToolCallBatcher, DefaultToolCallBatcher)
@@ -581,12 +628,14 @@ async def initialize_container(
         store_interface: type,
         store_implementation: type,
         filename: str,
+        journaled: bool = False,
     ) -> None:
         if store_interface not in c.defined_types:
             db = await EXIT_STACK.enter_async_context(
                 JSONFileDocumentDatabase(
                     c[Logger],
                     PARLANT_HOME_DIR / filename,
+                    journaled=journaled,
                 )
             )
 
@@ -617,6 +666,7 @@ async def initialize_container(
         document_db_filename: str,
         embedder_type_provider: Callable[[], Awaitable[type[Embedder]]],
         embedder_factory: EmbedderFactory,
+        **kwargs: Any,
     ) -> None:
         if store_interface not in c.defined_types:
             vector_db = await vector_db_factory()
@@ -633,6 +683,7 @@ async def initialize_container(
                     document_db=document_db,
                     embedder_type_provider=embedder_type_provider,
                     embedder_factory=embedder_factory,
+                    **kwargs,
                 )
             )
             c[store_interface] = lambda _c: c[store_implementation]
@@ -653,8 +704,6 @@ async def initialize_container(
 
     await c[BackgroundTaskService].start(c[WebSocketLogger].start(), tag="websocket-logger")
 
-    try_define(SessionListener, PollingSessionListener)
-
     nlp_service_name: str
     nlp_service_instance: NLPService
 
@@ -679,10 +728,23 @@ async def initialize_container(
                 "guideline_tool_associations.json",
             ),
             (RelationshipStore, RelationshipDocumentStore, "relationships.json"),
-            (SessionStore, SessionDocumentStore, "sessions.json"),
         ]:
             await try_define_document_store(interface, implementation, filename)
 
+        # Sessions are by far the most write-heavy store, so we journal their
+        # changes instead of rewriting the entire file on every new event.
+        await try_define_document_store(
+            SessionStore, SessionDocumentStore, "sessions.json", journaled=True
+        )
+
+        # When all events are created in this process, waiters can be woken
+        # directly by the session store instead of repeatedly polling it.
+        if SessionListener not in c.defined_types:
+            if isinstance(session_store := c[SessionStore], SessionDocumentStore):
+                try_define(SessionListener, NotifyingSessionListener(session_store))
+            else:
+                try_define(SessionListener, PollingSessionListener)
+
         async def make_service_document_registry() -> ServiceRegistry:
             db = await EXIT_STACK.enter_async_context(
                 JSONFileDocumentDatabase(
@@ -711,11 +773,14 @@ async def initialize_container(
         shared_chroma_db: VectorDatabase | None = None
 
         if c[OptimizationPolicy].use_embedding_cache():
+            # Embeddings are cached one text at a time, so we journal
+            # new entries instead of rewriting the entire file for each.
             c[EmbeddingCache] = BasicEmbeddingCache(
                 await EXIT_STACK.enter_async_context(
                     JSONFileDocumentDatabase(
                         c[Logger],
                         PARLANT_HOME_DIR / "cache_embeddings.json",
+                        journaled=True,
                     )
                 )
             )
@@ -740,11 +805,16 @@ async def initialize_container(
         async def get_embedder_type() -> type[Embedder]:
             return type(await nlp_service_instance.get_embedder())
 
-        for store_interface, store_implementation, document_db_filename in [
-            (GlossaryStore, GlossaryVectorStore, "glossary_tags.json"),
-            (CannedResponseStore, CannedResponseVectorStore, "canned_responses.json"),
-            (JourneyStore, JourneyVectorStore, "journey_associations.json"),
-            (CapabilityStore, CapabilityVectorStore, "capabilities.json"),
+        for store_interface, store_implementation, document_db_filename, store_arguments in [
+            (GlossaryStore, GlossaryVectorStore, "glossary_tags.json", {}),
+            (
+                CannedResponseStore,
+                CannedResponseVectorStore,
+                "canned_responses.json",
+                {"template_cache": c[CannedResponseTemplateCache]},
+            ),
+            (JourneyStore, JourneyVectorStore, "journey_associations.json", {}),
+            (CapabilityStore, CapabilityVectorStore, "capabilities.json", {}),
         ]:
             await try_define_vector_store(
                 store_interface,
@@ -753,8 +823,32 @@ async def initialize_container(
                 document_db_filename,
                 get_embedder_type,
                 embedder_factory,
+                **store_arguments,
             )
 
+        # Screening guidelines before matching them is opt-in, as it trades
+        # some recall (which can be measured by auditing a share of screenings)
+        # for fewer guideline matching requests
+        if guideline_screening_size := os.environ.get("PARLANT_GUIDELINE_SCREENING_SIZE"):
+            try_define(
+                GuidelineScreener,
+                await EXIT_STACK.enter_async_context(
+                    VectorGuidelineScreener(
+                        vector_db=await get_shared_chroma_db(),
+                        embedder_type_provider=get_embedder_type,
+                        embedder_factory=embedder_factory,
+                        guideline_store=c[GuidelineStore],
+                        logger=c[Logger],
+                        max_candidates=int(guideline_screening_size),
+                        audit_rate=float(
+                            os.environ.get("PARLANT_GUIDELINE_SCREENING_AUDIT_RATE", "0.05")
+                        ),
+                    )
+                ),
+            )
+        else:
+            try_define(GuidelineScreener, NullGuidelineScreener)
+
     except MigrationRequired as e:
         c[Logger].critical(str(e))
         die("Please re-run with `--migrate` to migrate your data to the new version.")
@@ -764,6 +858,70 @@ async def initialize_container(
             "Your runtime data came from a higher server version and is not supported.\nPlease upgrade to the latest version of Parlant."
         )
 
+    # All generators of the same model share its rate limits, so that a burst of
+    # (e.g.) guideline matching batches can't starve the generation of messages.
+    rate_limiters = GenerationRateLimiters(
+        RateLimits(
+            max_concurrent_requests=int(
+                os.environ.get("PARLANT_MAX_CONCURRENT_GENERATIONS", "16"),
+            ),
+            max_tokens_per_minute=(
+                int(tokens_per_minute)
+                if (tokens_per_minute := os.environ.get("PARLANT_MAX_GENERATION_TOKENS_PER_MINUTE"))
+                else None
+            ),
+        )
+    )
+
+    message_generation_schemas: set[type[DefaultBaseModel]] = {
+        MessageSchema,
+        CannedResponseDraftSchema,
+        CannedResponseSelectionSchema,
+        CannedResponsePreambleSchema,
+        CannedResponseRevisionSchema,
+        CannedResponseFieldExtractionSchema,
+    }
+
+    background_schemas: set[type[DefaultBaseModel]] = {
+        ConditionsEntailmentTestsSchema,
+        ActionsContradictionTestsSchema,
+        GuidelineConnectionPropositionsSchema,
+        GuidelineActionPropositionSchema,
+        GuidelineContinuousPropositionSchema,
+        CustomerDependentActionSchema,
+        ToolRunningActionSchema,
+        AgentIntentionProposerSchema,
+        RelativeActionSchema,
+    }
+
+    guideline_matching_schemas: set[type[DefaultBaseModel]] = {
+        GenericResponseAnalysisSchema,
+        GenericPreviouslyAppliedActionableGuidelineMatchesSchema,
+        GenericActionableGuidelineMatchesSchema,
+        GenericPreviouslyAppliedActionableCustomerDependentGuidelineMatchesSchema,
+        GenericObservationalGuidelineMatchesSchema,
+        DisambiguationGuidelineMatchesSchema,
+        JourneyNodeSelectionSchema,
+    }
+
+    generation_cache: Optional[GenerationCache] = None
+
+    # Reusing generations is opt-in, as it's only safe where an identical
+    # prompt should get the same answer (e.g., when re-indexing an unchanged agent).
+    # Even then, it only applies to evaluations, indexing and guideline matching,
+    # so that (e.g.) regenerating a message still gets a fresh one.
+    if os.environ.get("PARLANT_GENERATION_CACHE", "false").lower() not in ["false", "no", "0"]:
+        generation_cache = BasicGenerationCache(
+            await EXIT_STACK.enter_async_context(
+                JSONFileDocumentDatabase(
+                    c[Logger],
+                    PARLANT_HOME_DIR / "cache_generations.json",
+                    journaled=True,
+                )
+            ),
+            max_entries=int(os.environ.get("PARLANT_GENERATION_CACHE_SIZE", "10000")),
+        )
+
     for schema in (
         GenericResponseAnalysisSchema,
         GenericPreviouslyAppliedActionableGuidelineMatchesSchema,
@@ -792,6 +950,26 @@ async def initialize_container(
     ):
         generator = await nlp_service_instance.get_schematic_generator(schema)
 
+        if schema in message_generation_schemas:
+            priority = GenerationPriority.MESSAGE
+        elif schema in background_schemas:
+            priority = GenerationPriority.BACKGROUND
+        else:
+            priority = GenerationPriority.INTERACTIVE
+
+        generator = RateLimitedSchematicGenerator[schema](  # type: ignore
+            generator,
+            rate_limiters.for_model(generator.id),
+            priority,
+            c[Logger],
+        )
+
+        if generation_cache and schema in background_schemas | guideline_matching_schemas:
+            generator = CachingSchematicGenerator[schema](  # type: ignore
+                generator,
+                generation_cache,
+            )
+
         if os.environ.get("PARLANT_DATA_COLLECTION", "false").lower() not in ["false", "no", "0"]:
             generator = DataCollectingSchematicGenerator[schema](  # type: ignore
                 generator,
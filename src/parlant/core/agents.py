@@ -16,11 +16,13 @@ from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from enum import Enum
-from typing import NewType, Optional, Sequence, cast
+from functools import cached_property
+from typing import Callable, NewType, Optional, Sequence, cast
 from typing_extensions import override, TypedDict, Self
 
 from parlant.core.async_utils import ReaderWriterLock
 from parlant.core.common import (
+    ChangeNotifier,
     ItemNotFoundError,
     UniqueId,
     Version,
@@ -121,6 +123,17 @@ class AgentStore(ABC):
         tag_id: TagId,
     ) -> None: ...
 
+    @cached_property
+    def _changes(self) -> ChangeNotifier:
+        return ChangeNotifier()
+
+    def subscribe_to_changes(
+        self,
+        callback: Callable[[], None],
+    ) -> None:
+        """Calls `callback` whenever the stored agents change (see `ChangeNotifier`)."""
+        self._changes.subscribe(callback)
+
 
 class _AgentDocument(TypedDict, total=False):
     id: ObjectId
@@ -236,12 +249,15 @@ class AgentDocumentStore(AgentStore):
                 schema=_AgentDocument,
                 document_loader=self._document_loader,
             )
+            await self._agents_collection.create_index("id")
 
             self._tag_association_collection = await self._database.get_or_create_collection(
                 name="agent_tags",
                 schema=_AgentTagAssociationDocument,
                 document_loader=self._association_document_loader,
             )
+            await self._tag_association_collection.create_index("agent_id")
+            await self._tag_association_collection.create_index("tag_id")
 
         return self
 
@@ -293,6 +309,8 @@ class AgentDocumentStore(AgentStore):
         tags: Optional[Sequence[TagId]] = None,
     ) -> Agent:
         async with self._lock.writer_lock:
+            self._changes.notify()
+
             creation_utc = creation_utc or datetime.now(timezone.utc)
             max_engine_iterations = max_engine_iterations or 3
 
@@ -356,6 +374,8 @@ class AgentDocumentStore(AgentStore):
         params: AgentUpdateParams,
     ) -> Agent:
         async with self._lock.writer_lock:
+            self._changes.notify()
+
             agent_document = await self._agents_collection.find_one(
                 filters={
                     "id": {"$eq": agent_id},
@@ -380,6 +400,8 @@ class AgentDocumentStore(AgentStore):
         agent_id: AgentId,
     ) -> None:
         async with self._lock.writer_lock:
+            self._changes.notify()
+
             result = await self._agents_collection.delete_one({"id": {"$eq": agent_id}})
 
             for doc in await self._tag_association_collection.find(
@@ -402,6 +424,8 @@ class AgentDocumentStore(AgentStore):
         creation_utc: Optional[datetime] = None,
     ) -> bool:
         async with self._lock.writer_lock:
+            self._changes.notify()
+
             agent = await self.read_agent(agent_id)
 
             if tag_id in agent.tags:
@@ -435,6 +459,8 @@ class AgentDocumentStore(AgentStore):
         tag_id: TagId,
     ) -> None:
         async with self._lock.writer_lock:
+            self._changes.notify()
+
             delete_result = await self._tag_association_collection.delete_one(
                 {
                     "agent_id": {"$eq": agent_id},
@@ -14,12 +14,14 @@
 
 from __future__ import annotations
 from abc import ABC, abstractmethod
+from collections import OrderedDict
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from itertools import chain
 import json
 from typing import Any, Awaitable, Callable, NewType, Optional, Sequence, cast
 import jinja2
+import jinja2.meta
 from typing_extensions import override, TypedDict, Self, Required
 
 from parlant.core import async_utils
@@ -39,7 +41,7 @@ from parlant.core.persistence.vector_database_helper import (
     VectorDocumentStoreMigrationHelper,
     VectorDocumentMigrationHelper,
     calculate_min_vectors_for_max_item_count,
-    query_chunks,
+    QueryChunker,
 )
 from parlant.core.tags import TagId
 from parlant.core.common import ItemNotFoundError, UniqueId, Version, IdGenerator, md5_checksum
@@ -89,6 +91,61 @@ class CannedResponse:
         return hash(self.id)
 
 
+@dataclass(frozen=True)
+class CompiledCannedResponse:
+    checksum: str
+    template: jinja2.Template
+    fields: frozenset[str]
+    """The names of the fields the template refers to."""
+
+
+class CannedResponseTemplateCache:
+    """A bounded cache of compiled canned response templates.
+
+    Entries are keyed by canned response ID, and are recompiled whenever
+    the response's value no longer matches the checksum they were compiled from.
+    """
+
+    def __init__(self, max_size: int = 4096) -> None:
+        self._max_size = max_size
+        self._environment = jinja2.Environment()
+        self._entries: OrderedDict[CannedResponseId, CompiledCannedResponse] = OrderedDict()
+
+    def _compile(self, value: str) -> CompiledCannedResponse:
+        ast = self._environment.parse(value)
+
+        return CompiledCannedResponse(
+            checksum=md5_checksum(value),
+            template=self._environment.from_string(ast),
+            fields=frozenset(jinja2.meta.find_undeclared_variables(ast)),
+        )
+
+    def get(self, canned_response: CannedResponse) -> CompiledCannedResponse:
+        """Returns the compiled template of a canned response, compiling it if needed.
+        Raises jinja2.TemplateSyntaxError if the response's value isn't a valid template."""
+        if canned_response.id == CannedResponse.TRANSIENT_ID:
+            return self._compile(canned_response.value)
+
+        entry = self._entries.get(canned_response.id)
+
+        if entry and entry.checksum == md5_checksum(canned_response.value):
+            self._entries.move_to_end(canned_response.id)
+            return entry
+
+        entry = self._compile(canned_response.value)
+
+        self._entries[canned_response.id] = entry
+        self._entries.move_to_end(canned_response.id)
+
+        if len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+        return entry
+
+    def discard(self, canned_response_id: CannedResponseId) -> None:
+        self._entries.pop(canned_response_id, None)
+
+
 @dataclass(frozen=True)
 class CannedResponseRelevantResult:
     canned_response: CannedResponse
@@ -240,9 +297,11 @@ class CannedResponseVectorStore(CannedResponseStore):
         document_db: DocumentDatabase,
         embedder_type_provider: Callable[[], Awaitable[type[Embedder]]],
         embedder_factory: EmbedderFactory,
+        template_cache: CannedResponseTemplateCache,
         allow_migration: bool = True,
     ) -> None:
         self._id_generator = id_generator
+        self._template_cache = template_cache
 
         self._vector_db = vector_db
         self._database = document_db
@@ -257,6 +316,7 @@ class CannedResponseVectorStore(CannedResponseStore):
         self._embedder_factory = embedder_factory
         self._embedder_type_provider = embedder_type_provider
         self._embedder: Embedder
+        self._query_chunker: QueryChunker
 
     async def _vector_document_loader(
         self, doc: VectorDocument
@@ -333,6 +393,7 @@ class CannedResponseVectorStore(CannedResponseStore):
         embedder_type = await self._embedder_type_provider()
 
         self._embedder = self._embedder_factory.create_embedder(embedder_type)
+        self._query_chunker = QueryChunker(self._embedder)
 
         async with VectorDocumentStoreMigrationHelper(
             store=self,
@@ -356,12 +417,15 @@ class CannedResponseVectorStore(CannedResponseStore):
                 schema=CannedResponseDocument,
                 document_loader=self._document_loader,
             )
+            await self._canreps_collection.create_index("id")
 
             self._canrep_tag_association_collection = await self._database.get_or_create_collection(
                 name="canned_response_tag_associations",
                 schema=CannedResponseTagAssociationDocument,
                 document_loader=self._association_document_loader,
             )
+            await self._canrep_tag_association_collection.create_index("canned_response_id")
+            await self._canrep_tag_association_collection.create_index("tag_id")
 
         return self
 
@@ -469,6 +533,8 @@ class CannedResponseVectorStore(CannedResponseStore):
 
             await self._insert_canned_response(canrep)
 
+            self._template_cache.get(canrep)
+
             for tag_id in tags or []:
                 tag_checksum = md5_checksum(f"{canrep.id}{tag_id}")
 
@@ -511,6 +577,9 @@ class CannedResponseVectorStore(CannedResponseStore):
         canned_response_id: CannedResponseId,
         params: CannedResponseUpdateParams,
     ) -> CannedResponse:
+        if "value" in params:
+            self._validate_template(params["value"])
+
         async with self._lock.writer_lock:
             doc = await self._canreps_collection.find_one(
                 filters={"id": {"$eq": canned_response_id}}
@@ -542,6 +611,8 @@ class CannedResponseVectorStore(CannedResponseStore):
 
             doc = await self._insert_canned_response(canrep)
 
+            self._template_cache.get(canrep)
+
         return await self._deserialize_canned_response(doc)
 
     async def list_canned_responses(
@@ -608,6 +679,8 @@ class CannedResponseVectorStore(CannedResponseStore):
 
             await async_utils.safe_gather(*tasks)
 
+            self._template_cache.discard(canned_response_id)
+
     @override
     async def upsert_tag(
         self,
@@ -667,25 +740,23 @@ class CannedResponseVectorStore(CannedResponseStore):
             return []
 
         async with self._lock.reader_lock:
-            queries = await query_chunks(query, self._embedder)
+            queries = await self._query_chunker.chunk(query)
             filters: Where = {
                 "canned_response_id": {"$in": [str(c.id) for c in available_canned_responses]}
             }
 
-            tasks = [
-                self._canreps_vector_collection.find_similar_documents(
-                    filters=filters,
-                    query=q,
-                    k=calculate_min_vectors_for_max_item_count(
-                        items=available_canned_responses,
-                        count_item_vectors=lambda c: len(self._list_canned_response_contents(c)),
-                        max_items_to_return=max_count,
-                    ),
-                )
-                for q in queries
-            ]
+            results = await self._canreps_vector_collection.find_similar_documents_batch(
+                filters=filters,
+                queries=queries,
+                k=calculate_min_vectors_for_max_item_count(
+                    items=available_canned_responses,
+                    count_item_vectors=lambda c: len(self._list_canned_response_contents(c)),
+                    max_items_to_return=max_count,
+                ),
+            )
 
-        all_sdocs = chain.from_iterable(await async_utils.safe_gather(*tasks))
+        # Closest first, so that stopping at max_count keeps the most relevant items
+        all_sdocs = sorted(chain.from_iterable(results), key=lambda r: r.distance)
 
         unique_sdocs: dict[str, SimilarDocumentResult[CannedResponseVectorDocument]] = {}
 
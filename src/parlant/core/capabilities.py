@@ -15,13 +15,21 @@
 from abc import abstractmethod
 from dataclasses import dataclass
 from datetime import datetime, timezone
+from functools import cached_property
 from itertools import chain
 from typing import Awaitable, Callable, NewType, Optional, Sequence, TypedDict, cast
 from typing_extensions import override, Self, Required
 
 from parlant.core import async_utils
 from parlant.core.async_utils import ReaderWriterLock
-from parlant.core.common import ItemNotFoundError, Version, IdGenerator, UniqueId, md5_checksum
+from parlant.core.common import (
+    ChangeNotifier,
+    ItemNotFoundError,
+    Version,
+    IdGenerator,
+    UniqueId,
+    md5_checksum,
+)
 from parlant.core.persistence.common import ObjectId, Where
 from parlant.core.nlp.embedding import Embedder, EmbedderFactory
 from parlant.core.persistence.vector_database import (
@@ -33,7 +41,7 @@ from parlant.core.persistence.vector_database import (
 from parlant.core.persistence.vector_database_helper import (
     VectorDocumentStoreMigrationHelper,
     calculate_min_vectors_for_max_item_count,
-    query_chunks,
+    QueryChunker,
 )
 from parlant.core.persistence.document_database import (
     DocumentCollection,
@@ -41,7 +49,7 @@ from parlant.core.persistence.document_database import (
     BaseDocument,
 )
 from parlant.core.persistence.document_database_helper import DocumentStoreMigrationHelper
-from parlant.core.tags import TagId
+from parlant.core.tags import TagAssociationIndex, TagId
 
 
 CapabilityId = NewType("CapabilityId", str)
@@ -125,6 +133,17 @@ class CapabilityStore:
         tag_id: TagId,
     ) -> None: ...
 
+    @cached_property
+    def _changes(self) -> ChangeNotifier:
+        return ChangeNotifier()
+
+    def subscribe_to_changes(
+        self,
+        callback: Callable[[], None],
+    ) -> None:
+        """Calls `callback` whenever the stored capabilities change (see `ChangeNotifier`)."""
+        self._changes.subscribe(callback)
+
 
 class CapabilityDocument_v0_1_0(TypedDict, total=False):
     id: ObjectId
@@ -183,10 +202,12 @@ class CapabilityVectorStore(CapabilityStore):
         self._vector_collection: VectorCollection[CapabilityVectorDocument]
         self._collection: DocumentCollection[CapabilityDocument]
         self._tag_association_collection: DocumentCollection[CapabilityTagAssociationDocument]
+        self._tag_index = TagAssociationIndex[CapabilityId]()
 
         self._embedder_factory = embedder_factory
         self._embedder_type_provider = embedder_type_provider
         self._embedder: Embedder
+        self._query_chunker: QueryChunker
 
         self._lock = ReaderWriterLock()
 
@@ -212,6 +233,7 @@ class CapabilityVectorStore(CapabilityStore):
     async def __aenter__(self) -> Self:
         embedder_type = await self._embedder_type_provider()
         self._embedder = self._embedder_factory.create_embedder(embedder_type)
+        self._query_chunker = QueryChunker(self._embedder)
 
         async with VectorDocumentStoreMigrationHelper(
             store=self,
@@ -235,12 +257,18 @@ class CapabilityVectorStore(CapabilityStore):
                 schema=CapabilityDocument,
                 document_loader=self._document_loader,
             )
+            await self._collection.create_index("id")
 
             self._tag_association_collection = await self._document_db.get_or_create_collection(
                 name="capability_tags",
                 schema=CapabilityTagAssociationDocument,
                 document_loader=self._association_document_loader,
             )
+            await self._tag_association_collection.create_index("capability_id")
+            await self._tag_association_collection.create_index("tag_id")
+
+        for association in await self._tag_association_collection.find(filters={}):
+            self._tag_index.add(CapabilityId(association["capability_id"]), association["tag_id"])
 
         return self
 
@@ -266,12 +294,7 @@ class CapabilityVectorStore(CapabilityStore):
         )
 
     async def _deserialize(self, doc: CapabilityDocument) -> Capability:
-        tags = [
-            d["tag_id"]
-            for d in await self._tag_association_collection.find(
-                {"capability_id": {"$eq": doc["id"]}}
-            )
-        ]
+        tags = self._tag_index.tags_of(CapabilityId(doc["id"]))
 
         return Capability(
             id=CapabilityId(doc["id"]),
@@ -318,6 +341,8 @@ class CapabilityVectorStore(CapabilityStore):
         tags: Optional[Sequence[TagId]] = None,
     ) -> Capability:
         async with self._lock.writer_lock:
+            self._changes.notify()
+
             creation_utc = creation_utc or datetime.now(timezone.utc)
 
             signals = list(signals) if signals else []
@@ -350,6 +375,8 @@ class CapabilityVectorStore(CapabilityStore):
                     }
                 )
 
+                self._tag_index.add(capability.id, tag_id)
+
         return capability
 
     @override
@@ -359,6 +386,8 @@ class CapabilityVectorStore(CapabilityStore):
         params: CapabilityUpdateParams,
     ) -> Capability:
         async with self._lock.writer_lock:
+            self._changes.notify()
+
             all_docs = await self._collection.find(filters={"id": {"$eq": capability_id}})
 
             if not all_docs:
@@ -402,43 +431,27 @@ class CapabilityVectorStore(CapabilityStore):
         self,
         tags: Optional[Sequence[TagId]] = None,
     ) -> Sequence[Capability]:
-        filters: Where = {}
         async with self._lock.reader_lock:
-            if tags is not None:
-                if len(tags) == 0:
-                    capability_ids = {
-                        doc["id"] for doc in await self._tag_association_collection.find(filters={})
-                    }
-
-                    if not capability_ids:
-                        filters = {}
-
-                    elif len(capability_ids) == 1:
-                        filters = {"id": {"$ne": capability_ids.pop()}}
-
-                    else:
-                        filters = {"$and": [{"id": {"$ne": id}} for id in capability_ids]}
-
-                else:
-                    tag_filters: Where = {"$or": [{"tag_id": {"$eq": tag}} for tag in tags]}
-                    tag_associations = await self._tag_association_collection.find(
-                        filters=tag_filters
-                    )
-
-                    capability_ids = {
-                        ObjectId(assoc["capability_id"]) for assoc in tag_associations
-                    }
-                    if not capability_ids:
-                        return []
-
-                    if len(capability_ids) == 1:
-                        filters = {"id": {"$eq": capability_ids.pop()}}
-
-                    else:
-                        filters = {"$or": [{"id": {"$eq": id}} for id in capability_ids]}
+            if tags is None:
+                documents = await self._collection.find(filters={})
+            elif len(tags) == 0:
+                documents = [
+                    d
+                    for d in await self._collection.find(filters={})
+                    if not self._tag_index.is_tagged(CapabilityId(d["id"]))
+                ]
+            else:
+                capability_ids = self._tag_index.entities_with_any_of(tags)
+
+                if not capability_ids:
+                    return []
+
+                documents = await self._collection.find(
+                    filters={"id": {"$in": sorted(capability_ids)}}
+                )
 
             docs = {}
-            for d in await self._collection.find(filters=filters):
+            for d in documents:
                 if d["id"] not in docs:
                     docs[d["id"]] = d
 
@@ -450,6 +463,8 @@ class CapabilityVectorStore(CapabilityStore):
         capability_id: CapabilityId,
     ) -> None:
         async with self._lock.writer_lock:
+            self._changes.notify()
+
             docs = await self._collection.find(filters={"id": {"$eq": capability_id}})
 
             tag_associations = await self._tag_association_collection.find(
@@ -467,6 +482,8 @@ class CapabilityVectorStore(CapabilityStore):
                     filters={"id": {"$eq": tag_assoc["id"]}}
                 )
 
+            self._tag_index.remove_entity(capability_id)
+
     @override
     async def find_relevant_capabilities(
         self,
@@ -478,23 +495,21 @@ class CapabilityVectorStore(CapabilityStore):
             return []
 
         async with self._lock.reader_lock:
-            queries = await query_chunks(query, self._embedder)
+            queries = await self._query_chunker.chunk(query)
             filters: Where = {"capability_id": {"$in": [str(c.id) for c in available_capabilities]}}
 
-            tasks = [
-                self._vector_collection.find_similar_documents(
-                    filters=filters,
-                    query=q,
-                    k=calculate_min_vectors_for_max_item_count(
-                        items=available_capabilities,
-                        count_item_vectors=lambda c: len(self._list_capability_contents(c)),
-                        max_items_to_return=max_count,
-                    ),
-                )
-                for q in queries
-            ]
+            results = await self._vector_collection.find_similar_documents_batch(
+                filters=filters,
+                queries=queries,
+                k=calculate_min_vectors_for_max_item_count(
+                    items=available_capabilities,
+                    count_item_vectors=lambda c: len(self._list_capability_contents(c)),
+                    max_items_to_return=max_count,
+                ),
+            )
 
-        all_sdocs = chain.from_iterable(await async_utils.safe_gather(*tasks))
+        # Closest first, so that stopping at max_count keeps the most relevant items
+        all_sdocs = sorted(chain.from_iterable(results), key=lambda r: r.distance)
 
         unique_sdocs: dict[str, SimilarDocumentResult[CapabilityVectorDocument]] = {}
 
@@ -529,6 +544,8 @@ class CapabilityVectorStore(CapabilityStore):
         creation_utc: Optional[datetime] = None,
     ) -> bool:
         async with self._lock.writer_lock:
+            self._changes.notify()
+
             capability = await self.read_capability(capability_id)
 
             if tag_id in capability.tags:
@@ -547,6 +564,7 @@ class CapabilityVectorStore(CapabilityStore):
             }
 
             _ = await self._tag_association_collection.insert_one(document=assoc_doc)
+            self._tag_index.add(capability_id, tag_id)
             doc = await self._collection.find_one({"id": {"$eq": capability_id}})
 
         if not doc:
@@ -561,6 +579,8 @@ class CapabilityVectorStore(CapabilityStore):
         tag_id: TagId,
     ) -> None:
         async with self._lock.writer_lock:
+            self._changes.notify()
+
             delete_result = await self._tag_association_collection.delete_one(
                 {
                     "capability_id": {"$eq": capability_id},
@@ -571,6 +591,8 @@ class CapabilityVectorStore(CapabilityStore):
             if delete_result.deleted_count == 0:
                 raise ItemNotFoundError(item_id=UniqueId(tag_id))
 
+            self._tag_index.remove(capability_id, tag_id)
+
             doc = await self._collection.find_one({"id": {"$eq": capability_id}})
 
         if not doc:
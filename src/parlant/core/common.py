@@ -18,7 +18,7 @@ from collections import defaultdict
 from enum import Enum
 import asyncio
 import hashlib
-from typing import Any, Mapping, NewType, Optional, Sequence, TypeAlias, Union
+from typing import Any, Callable, Mapping, NewType, Optional, Sequence, TypeAlias, Union
 from typing_extensions import Self
 
 import nanoid  # type: ignore
@@ -149,6 +149,29 @@ class CancellationSuppressionLatch:
         self._suppressed = True
 
 
+class ChangeNotifier:
+    """Lets a store announce that its contents have changed, so that anything
+    derived from them (such as a cache) can be invalidated.
+
+    A store exposes it through `subscribe_to_changes()`, and notifies it at the
+    start of every write, under its writer lock (so that readers waiting on the
+    lock see the write); a store that doesn't leaves its subscribers with stale results.
+    """
+
+    def __init__(self) -> None:
+        self._subscribers: list[Callable[[], None]] = []
+
+    def subscribe(self, callback: Callable[[], None]) -> None:
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable[[], None]) -> None:
+        self._subscribers.remove(callback)
+
+    def notify(self) -> None:
+        for callback in list(self._subscribers):
+            callback()
+
+
 id_generation_alphabet: str = "0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ"
 
 
@@ -182,12 +182,15 @@ class CustomerDocumentStore(CustomerStore):
                 schema=_CustomerDocument,
                 document_loader=self._document_loader,
             )
+            await self._customers_collection.create_index("id")
 
             self._tag_association_collection = await self._database.get_or_create_collection(
                 name="customer_tag_associations",
                 schema=_CustomerTagAssociationDocument,
                 document_loader=self._association_document_loader,
             )
+            await self._tag_association_collection.create_index("customer_id")
+            await self._tag_association_collection.create_index("tag_id")
 
         return self
 
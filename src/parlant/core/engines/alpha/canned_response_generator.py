@@ -22,8 +22,6 @@ from dataclasses import dataclass
 from itertools import chain
 from random import shuffle
 import re
-import jinja2
-import jinja2.meta
 import json
 import traceback
 from typing import Any, Iterable, Mapping, Optional, Sequence, cast
@@ -54,7 +52,12 @@ from parlant.core.entity_cq import EntityQueries
 from parlant.core.guidelines import GuidelineId
 from parlant.core.journeys import Journey
 from parlant.core.tags import Tag
-from parlant.core.canned_responses import CannedResponse, CannedResponseId, CannedResponseStore
+from parlant.core.canned_responses import (
+    CannedResponse,
+    CannedResponseId,
+    CannedResponseStore,
+    CannedResponseTemplateCache,
+)
 from parlant.core.nlp.generation import SchematicGenerator
 from parlant.core.nlp.generation_info import GenerationInfo
 from parlant.core.engines.alpha.guideline_matching.guideline_match import GuidelineMatch
@@ -130,6 +133,24 @@ class _CannedResponseRenderResult:
     rendered_text: str | None
 
 
+class _DeferredGenerativeFields:
+    """Stands in for the generative fields of a template that hasn't been chosen yet,
+    rendering each of them back as its own reference (e.g., {{generative.names}}).
+
+    Generating these fields takes an inference per field, so we only do it
+    for the template that actually gets chosen.
+    """
+
+    def __getattr__(self, name: str) -> str:
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        return f"{{{{generative.{name}}}}}"
+
+    def __getitem__(self, name: str) -> str:
+        return self.__getattr__(name)
+
+
 @dataclass(frozen=True)
 class _CannedResponseSelectionResult:
     message: str
@@ -316,6 +337,7 @@ class GenerativeFieldExtraction(CannedResponseFieldExtractionMethod):
         builder.add_section(
             "canned-response-generative-field-extraction-instructions",
             "Your only job is to extract a particular value in the most suitable way from the following context.",
+            static=True,
         )
 
         builder.add_agent_identity(context.agent)
@@ -438,12 +460,6 @@ class CannedResponseFieldExtractor(ABC):
         return False, None
 
 
-def _get_response_template_fields(template: str) -> set[str]:
-    env = jinja2.Environment()
-    parse_result = env.parse(template)
-    return jinja2.meta.find_undeclared_variables(parse_result)
-
-
 class CannedResponseGenerator(MessageEventComposer):
     def __init__(
         self,
@@ -461,6 +477,7 @@ class CannedResponseGenerator(MessageEventComposer):
         message_generator: MessageGenerator,
         entity_queries: EntityQueries,
         no_match_provider: NoMatchResponseProvider,
+        template_cache: CannedResponseTemplateCache,
     ) -> None:
         self._logger = logger
         self._correlator = correlator
@@ -474,9 +491,9 @@ class CannedResponseGenerator(MessageEventComposer):
         self._perceived_performance_policy = perceived_performance_policy
         self._field_extractor = field_extractor
         self._message_generator = message_generator
-        self._cached_response_fields: dict[CannedResponseId, set[str]] = {}
         self._entity_queries = entity_queries
         self._no_match_provider = no_match_provider
+        self._template_cache = template_cache
 
     async def shots(
         self, composition_mode: CompositionMode
@@ -734,20 +751,12 @@ You will now be given the current state of the interaction to which you must gen
         relevant_responses = []
 
         for canrep in all_candidates:
-            if (
-                canrep.id != CannedResponse.TRANSIENT_ID
-                and canrep.id not in self._cached_response_fields
-            ):
-                self._cached_response_fields[canrep.id] = _get_response_template_fields(
-                    canrep.value
-                )
-
             # Conditions for a response being relevant:
             # 1. It's a transient response just generated (e.g., by a tool)
             # 2. Its relevant fields are in-context
             if canrep.id == CannedResponse.TRANSIENT_ID or all(
                 field in fields_available_in_context
-                for field in self._cached_response_fields[canrep.id]
+                for field in self._template_cache.get(canrep).fields
             ):
                 relevant_responses.append(canrep)
 
@@ -1039,6 +1048,7 @@ Later in this prompt, you'll be provided with behavioral guidelines and other co
 
 """,
             props={},
+            static=True,
         )
 
         builder.add_agent_identity(agent)
@@ -1337,6 +1347,7 @@ Produce a valid JSON object according to the following spec. Use the values prov
 7. If there is any noticeable semantic deviation between the draft message and the template, i.e., the draft says "Do X" and the template says "Do Y" (even if Y is a sibling concept under the same category as X), you should not choose that template, even if it captures other parts of the draft message. We want to maintain true fidelity with the draft message.
 8. If the deviation between the draft and the template is quantitative in nature (e.g., the draft says "5 apples" and the template says "10 apples"), you should assume that the template has it right. Don't consider this a failure, as the template will definitely contain the correct information. So as long as it's a good *qualitative match*, you can assume that the *quantitative part* will be handled correctly.
 9. Keep in mind that these are Jinja 2 *templates*. Some of them refer to variables or contain procedural instructions. These will be substituted by real values and rendered later. You can assume that such substitution will be handled well to account for the data provided in the draft message! FYI, if you encounter a variable {{generative.<something>}}, that means that it will later be substituted with a dynamic, flexible, generated value based on the appropriate context. You just need to choose the most viable reply template to use, and assume it will be filled and rendered properly later.""",
+            static=True,
         )
 
         builder.add_glossary(context.terms)
@@ -1509,19 +1520,24 @@ Output a JSON object with three properties:
                 )
             )
 
-        # Step 3: Pre-render these templates so that matching works better
+        # Step 3: Pre-render these templates so that matching works better.
+        # Unless we're recomposing the draft from all of them, generative fields
+        # are only rendered once a template has been chosen.
         with self._logger.operation(
             "Rendering canned response templates", create_scope=False, level=LogLevel.TRACE
         ):
-            rendered_canreps = [
-                (r.response.id, str(r.rendered_text))
+            rendered_results = [
+                r
                 for r in await self._render_responses(
                     context=context,
                     responses=relevant_canreps,
+                    defer_generative_fields=composition_mode != CompositionMode.CANNED_COMPOSITED,
                 )
                 if not r.failed
             ]
 
+            rendered_canreps = [(r.response.id, str(r.rendered_text)) for r in rendered_results]
+
         # Step 4.1: In composited mode, recompose the draft message with the style of the rendered canned responses
         if composition_mode == CompositionMode.CANNED_COMPOSITED:
             with self._logger.operation(
@@ -1612,15 +1628,44 @@ Output a JSON object with three properties:
 
         # Step 5.3: Assuming a high-quality match or a partial match in strict mode
         selected_canrep_id = CannedResponseId(selection_response.content.chosen_template_id)
-        rendered_canned_response = next(
-            (value for crid, value in rendered_canreps if crid == selected_canrep_id),
+        selected_result = next(
+            (r for r in rendered_results if r.response.id == selected_canrep_id),
             None,
         )
 
+        if (
+            selected_result
+            and "generative" in self._template_cache.get(selected_result.response).fields
+        ):
+            # Now that it's been chosen, render its deferred generative fields
+            selected_result = await self._render_response(context, selected_result.response)
+
+            if selected_result.failed:
+                self._logger.error(
+                    f"Failed to render the generative fields of the chosen canned response '{selected_canrep_id}'"
+                )
+
+                if composition_mode != CompositionMode.CANNED_STRICT:
+                    return {
+                        "draft": draft_response.info,
+                        "selection": selection_response.info,
+                    }, _CannedResponseSelectionResult(
+                        message=draft_message,
+                        draft=None,
+                        canned_responses=[],
+                    )
+
+        rendered_canned_response = (
+            selected_result.rendered_text
+            if selected_result and not selected_result.failed
+            else None
+        )
+
         if not rendered_canned_response:
-            self._logger.error(
-                "Invalid canned response ID choice. Please review canned response selection prompt and completion."
-            )
+            if not selected_result:
+                self._logger.error(
+                    "Invalid canned response ID choice. Please review canned response selection prompt and completion."
+                )
 
             no_match_canrep = await self._no_match_provider.get_response(
                 loaded_context, draft_message
@@ -1648,21 +1693,31 @@ Output a JSON object with three properties:
         self,
         context: CannedResponseContext,
         responses: Iterable[CannedResponse],
+        defer_generative_fields: bool = False,
     ) -> Sequence[_CannedResponseRenderResult]:
-        render_tasks = [self._render_response(context, r) for r in responses]
+        render_tasks = [
+            self._render_response(context, r, defer_generative_fields) for r in responses
+        ]
         return await safe_gather(*render_tasks)
 
     async def _render_response(
         self,
         context: CannedResponseContext,
         response: CannedResponse,
+        defer_generative_fields: bool = False,
     ) -> _CannedResponseRenderResult:
         faulty_field_name: str | None = None
 
         try:
-            args = {}
+            compiled_response = self._template_cache.get(response)
+
+            args: dict[str, Any] = {}
+
+            for field_name in compiled_response.fields:
+                if field_name == "generative" and defer_generative_fields:
+                    args[field_name] = _DeferredGenerativeFields()
+                    continue
 
-            for field_name in _get_response_template_fields(response.value):
                 success, value = await self._field_extractor.extract(
                     response.value,
                     field_name,
@@ -1676,7 +1731,7 @@ Output a JSON object with three properties:
                     self._logger.error(f"CannedResponse field extraction: missing '{field_name}'")
                     raise KeyError(f"Missing field '{field_name}' in canned response")
 
-            result = jinja2.Template(response.value).render(**args)
+            result = compiled_response.template.render(**args)
 
             return _CannedResponseRenderResult(
                 response=response,
@@ -81,6 +81,7 @@ from parlant.core.engines.alpha.guideline_matching.guideline_matcher import (
     GuidelineMatchingResult,
 )
 from parlant.core.engines.alpha.guideline_matching.guideline_match import GuidelineMatch
+from parlant.core.engines.alpha.guideline_matching.guideline_screening import GuidelineScreener
 from parlant.core.engines.alpha.tool_event_generator import (
     ToolEventGenerationResult,
     ToolEventGenerator,
@@ -129,6 +130,7 @@ class AlphaEngine(Engine):
         entity_commands: EntityCommands,
         guideline_matcher: GuidelineMatcher,
         relational_guideline_resolver: RelationalGuidelineResolver,
+        guideline_screener: GuidelineScreener,
         tool_event_generator: ToolEventGenerator,
         fluid_message_generator: MessageGenerator,
         canned_response_generator: CannedResponseGenerator,
@@ -143,6 +145,7 @@ class AlphaEngine(Engine):
 
         self._guideline_matcher = guideline_matcher
         self._relational_guideline_resolver = relational_guideline_resolver
+        self._guideline_screener = guideline_screener
         self._tool_event_generator = tool_event_generator
         self._fluid_message_generator = fluid_message_generator
         self._canned_response_generator = canned_response_generator
@@ -1034,13 +1037,19 @@ class AlphaEngine(Engine):
             top_k=top_k,
         )
 
-        # Step 4: Filter the best matches out of those.
+        # Step 4: Filter the best matches out of those. With many guidelines, they may
+        # first be screened by their similarity to the interaction, so that only the
+        # likeliest ones cost LLM calls to match.
+        screening_result = await self._guideline_screener.screen(context, relevant_guidelines)
+
         matching_result = await self._guideline_matcher.match_guidelines(
             context=context,
             active_journeys=high_prob_journeys,  # Only consider the top K journeys
-            guidelines=relevant_guidelines,
+            guidelines=screening_result.candidates,
         )
 
+        self._guideline_screener.record_matches(screening_result, matching_result.matches)
+
         # Step 5: Filter the journeys that are activated by the matched guidelines.
         match_ids = set(map(lambda g: g.guideline.id, matching_result.matches))
         journeys = self._filter_activated_journeys(context, match_ids, sorted_journeys_by_relevance)
@@ -1069,6 +1078,8 @@ class AlphaEngine(Engine):
                 ),
                 batches=batches,
                 matches=matches,
+                cached_batch_count=matching_result.cached_batch_count
+                + second_match_result.cached_batch_count,
             )
 
         # Step 7: Build the set of matched guidelines as follows:
@@ -1163,6 +1174,8 @@ class AlphaEngine(Engine):
                 ),
                 batches=batches,
                 matches=matches,
+                cached_batch_count=matching_result.cached_batch_count
+                + second_match_result.cached_batch_count,
             )
 
         # Step 7: Build the final set of matched guidelines:
@@ -326,6 +326,7 @@ distinction is between:
 Always prioritize the customer's current request and intent over past ambiguities.
 """,
             props={},
+            static=True,
         )
         builder.add_section(
             name="guideline-ambiguity-evaluations-examples",
@@ -338,6 +339,7 @@ Examples of Guidelines Ambiguity Evaluation:
                 "formatted_shots": self._format_shots(shots),
                 "shots": shots,
             },
+            static=True,
         )
         builder.add_agent_identity(self._context.agent)
         builder.add_context_variables(self._context.context_variables)
@@ -0,0 +1,75 @@
+# Copyright 2025 Emcie Co Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import hashlib
+import json
+from typing import Sequence
+
+from parlant.core.engines.alpha.guideline_matching.guideline_matcher import (
+    GuidelineMatchingContext,
+)
+from parlant.core.engines.alpha.prompt_builder import PromptBuilder
+from parlant.core.engines.alpha.utils import context_variables_to_json
+from parlant.core.guidelines import Guideline
+from parlant.core.sessions import EventKind
+
+
+def guideline_matching_fingerprint(
+    batch_type: str,
+    model: str,
+    shots: str,
+    guidelines: Sequence[Guideline],
+    context: GuidelineMatchingContext,
+) -> str:
+    """Hashes what a generic matching batch's prompt is made of.
+
+    Only inputs that are rendered into the prompt are included, in the form
+    they're rendered in, so that (for example) status events or event IDs
+    don't tell apart two otherwise identical interactions.
+    """
+    fingerprint_content = json.dumps(
+        {
+            "batch_type": batch_type,
+            "model": model,
+            "shots": shots,
+            "guidelines": [
+                {
+                    "id": g.id,
+                    "condition": g.content.condition,
+                    "action": g.content.action,
+                    "tags": list(g.tags),
+                    "metadata": g.metadata,
+                }
+                for g in guidelines
+            ],
+            "agent": [context.agent.name, context.agent.description],
+            "context_variables": context_variables_to_json(context.context_variables),
+            "terms": [repr(t) for t in context.terms],
+            "capabilities": [[c.title, c.description] for c in context.capabilities],
+            "interaction_history": [
+                PromptBuilder.adapt_event(e)
+                for e in context.interaction_history
+                if e.kind != EventKind.STATUS
+            ],
+            "staged_tool_events": [
+                PromptBuilder.adapt_event(e)
+                for e in context.staged_events
+                if e.kind == EventKind.TOOL
+            ],
+        },
+        sort_keys=True,
+        default=str,
+    )
+
+    return hashlib.sha256(fingerprint_content.encode()).hexdigest()
@@ -15,7 +15,6 @@
 from collections import defaultdict
 from datetime import datetime
 from itertools import chain
-import math
 from typing import Mapping, Optional, Sequence, cast
 from typing_extensions import override
 
@@ -290,18 +289,13 @@ class GenericGuidelineMatchingStrategy(GuidelineMatchingStrategy):
 
         batches = []
 
-        guidelines_dict = {g.id: g for g in guidelines}
-        batch_size = self._get_optimal_batch_size(guidelines_dict)
-        guidelines_list = list(guidelines_dict.items())
-        batch_count = math.ceil(len(guidelines_dict) / batch_size)
-
-        for batch_number in range(batch_count):
-            start_offset = batch_number * batch_size
-            end_offset = start_offset + batch_size
-            batch = dict(guidelines_list[start_offset:end_offset])
+        for batch_guidelines in self._optimization_policy.get_guideline_matching_batches(
+            list({g.id: g for g in guidelines}.values()),
+            hints={"type": GenericObservationalGuidelineMatchingBatch.__name__},
+        ):
             batches.append(
                 self._create_batch_observational_guideline(
-                    guidelines=list(batch.values()),
+                    guidelines=batch_guidelines,
                     journeys=journeys,
                     context=GuidelineMatchingContext(
                         agent=context.agent,
@@ -349,18 +343,13 @@ class GenericGuidelineMatchingStrategy(GuidelineMatchingStrategy):
 
         batches = []
 
-        guidelines_dict = {g.id: g for g in guidelines}
-        batch_size = self._get_optimal_batch_size(guidelines_dict)
-        guidelines_list = list(guidelines_dict.items())
-        batch_count = math.ceil(len(guidelines_dict) / batch_size)
-
-        for batch_number in range(batch_count):
-            start_offset = batch_number * batch_size
-            end_offset = start_offset + batch_size
-            batch = dict(guidelines_list[start_offset:end_offset])
+        for batch_guidelines in self._optimization_policy.get_guideline_matching_batches(
+            list({g.id: g for g in guidelines}.values()),
+            hints={"type": GenericPreviouslyAppliedActionableGuidelineMatchingBatch.__name__},
+        ):
             batches.append(
                 self._create_batch_previously_applied_actionable_guideline(
-                    guidelines=list(batch.values()),
+                    guidelines=batch_guidelines,
                     journeys=journeys,
                     context=GuidelineMatchingContext(
                         agent=context.agent,
@@ -408,18 +397,15 @@ class GenericGuidelineMatchingStrategy(GuidelineMatchingStrategy):
 
         batches = []
 
-        guidelines_dict = {g.id: g for g in guidelines}
-        batch_size = self._get_optimal_batch_size(guidelines_dict)
-        guidelines_list = list(guidelines_dict.items())
-        batch_count = math.ceil(len(guidelines_dict) / batch_size)
-
-        for batch_number in range(batch_count):
-            start_offset = batch_number * batch_size
-            end_offset = start_offset + batch_size
-            batch = dict(guidelines_list[start_offset:end_offset])
+        for batch_guidelines in self._optimization_policy.get_guideline_matching_batches(
+            list({g.id: g for g in guidelines}.values()),
+            hints={
+                "type": GenericPreviouslyAppliedActionableCustomerDependentGuidelineMatchingBatch.__name__
+            },
+        ):
             batches.append(
                 self._create_batch_previously_applied_actionable_customer_dependent_guideline(
-                    guidelines=list(batch.values()),
+                    guidelines=batch_guidelines,
                     journeys=journeys,
                     context=GuidelineMatchingContext(
                         agent=context.agent,
@@ -467,18 +453,13 @@ class GenericGuidelineMatchingStrategy(GuidelineMatchingStrategy):
 
         batches = []
 
-        guidelines_dict = {g.id: g for g in guidelines}
-        batch_size = self._get_optimal_batch_size(guidelines_dict)
-        guidelines_list = list(guidelines_dict.items())
-        batch_count = math.ceil(len(guidelines_dict) / batch_size)
-
-        for batch_number in range(batch_count):
-            start_offset = batch_number * batch_size
-            end_offset = start_offset + batch_size
-            batch = dict(guidelines_list[start_offset:end_offset])
+        for batch_guidelines in self._optimization_policy.get_guideline_matching_batches(
+            list({g.id: g for g in guidelines}.values()),
+            hints={"type": GenericActionableGuidelineMatchingBatch.__name__},
+        ):
             batches.append(
                 self._create_batch_actionable_guideline(
-                    guidelines=list(batch.values()),
+                    guidelines=batch_guidelines,
                     journeys=journeys,
                     context=GuidelineMatchingContext(
                         agent=context.agent,
@@ -591,6 +572,3 @@ class GenericGuidelineMatchingStrategy(GuidelineMatchingStrategy):
             node_guidelines=step_guidelines,
             journey_path=context.journey_paths.get(examined_journey.id, []),
         )
-
-    def _get_optimal_batch_size(self, guidelines: dict[GuidelineId, Guideline]) -> int:
-        return self._optimization_policy.get_guideline_matching_batch_size(len(guidelines))
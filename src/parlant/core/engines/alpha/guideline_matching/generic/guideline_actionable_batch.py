@@ -18,12 +18,16 @@ from datetime import datetime, timezone
 import json
 import math
 import traceback
+from typing import Optional
 from typing_extensions import override
 from parlant.core.common import DefaultBaseModel, JSONSerializable
 from parlant.core.engines.alpha.guideline_matching.generic.common import (
     GuidelineInternalRepresentation,
     internal_representation,
 )
+from parlant.core.engines.alpha.guideline_matching.generic.fingerprint import (
+    guideline_matching_fingerprint,
+)
 from parlant.core.engines.alpha.guideline_matching.guideline_match import (
     GuidelineMatch,
 )
@@ -125,6 +129,12 @@ class GenericActionableGuidelineMatchingBatch(GuidelineMatchingBatch):
                         else:
                             self._logger.debug(f"Skipped:\n{match.model_dump_json(indent=2)}")
 
+                    self._optimization_policy.record_guideline_matching_batch(
+                        guideline_count=len(self._guidelines),
+                        generation_info=inference.info,
+                        hints={"type": self.__class__.__name__},
+                    )
+
                     return GuidelineMatchingBatchResult(
                         matches=matches,
                         generation_info=inference.info,
@@ -139,6 +149,16 @@ class GenericActionableGuidelineMatchingBatch(GuidelineMatchingBatch):
 
         raise GuidelineMatchingBatchError() from last_generation_exception
 
+    @override
+    async def fingerprint(self) -> Optional[str]:
+        return guideline_matching_fingerprint(
+            batch_type=self.__class__.__name__,
+            model=self._schematic_generator.id,
+            shots=self._format_shots(await self.shots()),
+            guidelines=list(self._guidelines.values()),
+            context=self._context,
+        )
+
     async def shots(self) -> Sequence[GenericActionableGuidelineGuidelineMatchingShot]:
         return await shot_collection.list()
 
@@ -245,6 +265,7 @@ The exact format of your response will be provided later in this prompt.
 
 """,
             props={},
+            static=True,
         )
         builder.add_section(
             name="guideline-matcher-examples-of-not-previously-applied-evaluations",
@@ -257,6 +278,7 @@ Examples of Guideline Match Evaluations:
                 "formatted_shots": self._format_shots(shots),
                 "shots": shots,
             },
+            static=True,
         )
         builder.add_agent_identity(self._context.agent)
         builder.add_context_variables(self._context.context_variables)
@@ -135,6 +135,12 @@ class GenericPreviouslyAppliedActionableCustomerDependentGuidelineMatchingBatch(
                         else:
                             self._logger.debug(f"Skipped:\n{match.model_dump_json(indent=2)}")
 
+                    self._optimization_policy.record_guideline_matching_batch(
+                        guideline_count=len(self._guidelines),
+                        generation_info=inference.info,
+                        hints={"type": self.__class__.__name__},
+                    )
+
                     return GuidelineMatchingBatchResult(
                         matches=matches,
                         generation_info=inference.info,
@@ -265,6 +271,7 @@ Key Evaluation Rules:
 
 """,
             props={},
+            static=True,
         )
         builder.add_section(
             name="guideline-matcher-examples-of-previously-applied-evaluations",
@@ -277,6 +284,7 @@ Examples of Guideline Match Evaluations:
                 "formatted_shots": self._format_shots(shots),
                 "shots": shots,
             },
+            static=True,
         )
         builder.add_agent_identity(self._context.agent)
         builder.add_context_variables(self._context.context_variables)
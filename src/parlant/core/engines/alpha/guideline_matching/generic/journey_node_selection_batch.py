@@ -718,6 +718,7 @@ Each journey consists of:
 Analyze the current conversation state and determine the next appropriate journey step, based on the last step that was performed and the current state of the conversation.
 """,
             props={"agent_name": self._context.agent.name},
+            static=True,
         )
         builder.add_section(
             name="journey-step-selection-task_description",
@@ -775,6 +776,7 @@ Continue advancing until you encounter:
 - Include "None" in follow_ups arrays for steps that have EXIT JOURNEY transitions
 - Set next_step to "None" when the journey should exit (either due to transitions or being outside journey context)
 """,
+            static=True,
         )
         builder.add_section(
             name="journey-step-selection-examples",
@@ -790,6 +792,7 @@ Example section is over. The following is the real data you need to use for your
                 "formatted_shots": self._format_shots(shots),
                 "shots": shots,
             },
+            static=True,
         )
         builder.add_agent_identity(self._context.agent)
         builder.add_context_variables(self._context.context_variables)
@@ -347,6 +347,7 @@ condition of a different guideline, or even offered spontaneously during the int
 
 """,
             props={},
+            static=True,
         )
         builder.add_section(
             name="guideline-previously-applied-examples",
@@ -359,6 +360,7 @@ Examples of ...:
                 "formatted_shots": self._format_shots(shots),
                 "shots": shots,
             },
+            static=True,
         )
         builder.add_agent_identity(self._context.agent)
         builder.add_context_variables(self._context.context_variables)
@@ -28,13 +28,17 @@ from parlant.core.agents import Agent
 from parlant.core.context_variables import ContextVariable, ContextVariableValue
 from parlant.core.customers import Customer
 from parlant.core.emissions import EmittedEvent
-from parlant.core.nlp.generation_info import GenerationInfo
+from parlant.core.nlp.generation_info import GenerationCacheInfo, GenerationInfo, UsageInfo
 
 
 from parlant.core.engines.alpha.guideline_matching.guideline_match import (
     GuidelineMatch,
     AnalyzedGuideline,
 )
+from parlant.core.engines.alpha.guideline_matching.guideline_matching_cache import (
+    CachedGuidelineMatches,
+    GuidelineMatchingCache,
+)
 from parlant.core.glossary import Term
 from parlant.core.guidelines import Guideline, GuidelineId
 from parlant.core.sessions import Event, Session
@@ -84,6 +88,8 @@ class GuidelineMatchingResult:
     batch_generations: Sequence[GenerationInfo]
     batches: Sequence[Sequence[GuidelineMatch]]
     matches: Sequence[GuidelineMatch]
+    cached_batch_count: int = 0
+    """How many of the batches were answered from the guideline matching cache."""
 
 
 @dataclass(frozen=True)
@@ -114,6 +120,11 @@ class GuidelineMatchingBatch(ABC):
     @abstractmethod
     async def process(self) -> GuidelineMatchingBatchResult: ...
 
+    async def fingerprint(self) -> Optional[str]:
+        """A hash of the guidelines and of every input this batch's verdicts depend on,
+        or None if its verdicts shouldn't be reused."""
+        return None
+
 
 class ResponseAnalysisBatch(ABC):
     @abstractmethod
@@ -152,9 +163,14 @@ class GuidelineMatcher:
         self,
         logger: Logger,
         strategy_resolver: GuidelineMatchingStrategyResolver,
+        cache: GuidelineMatchingCache,
     ) -> None:
         self._logger = logger
         self.strategy_resolver = strategy_resolver
+        self._cache = cache
+
+        self.cache_hits = 0
+        self.cache_misses = 0
 
     @policy(
         [
@@ -170,6 +186,52 @@ class GuidelineMatcher:
         with self._logger.scope(batch.__class__.__name__):
             return await batch.process()
 
+    async def _process_guideline_matching_batch(
+        self, batch: GuidelineMatchingBatch
+    ) -> tuple[GuidelineMatchingBatchResult, bool]:
+        t_start = time.time()
+
+        fingerprint = await batch.fingerprint()
+
+        if fingerprint is None:
+            return await self._process_guideline_matching_batch_with_retry(batch), False
+
+        if cached := await self._cache.get(fingerprint):
+            self.cache_hits += 1
+
+            self._logger.trace(
+                f"{batch.__class__.__name__}: Reusing the verdicts of an identical batch"
+            )
+
+            return GuidelineMatchingBatchResult(
+                matches=cached.matches,
+                generation_info=GenerationInfo(
+                    schema_name=cached.generation_info.schema_name,
+                    model=cached.generation_info.model,
+                    duration=time.time() - t_start,
+                    usage=UsageInfo(input_tokens=0, output_tokens=0),
+                    cache=GenerationCacheInfo(
+                        hit=True,
+                        hits=self.cache_hits,
+                        misses=self.cache_misses,
+                    ),
+                ),
+            ), True
+
+        self.cache_misses += 1
+
+        result = await self._process_guideline_matching_batch_with_retry(batch)
+
+        await self._cache.set(
+            fingerprint,
+            CachedGuidelineMatches(
+                matches=result.matches,
+                generation_info=result.generation_info,
+            ),
+        )
+
+        return result, False
+
     @policy(
         [
             retry(
@@ -233,14 +295,16 @@ class GuidelineMatcher:
 
             with self._logger.operation("Processing batches", create_scope=False):
                 batch_tasks = [
-                    self._process_guideline_matching_batch_with_retry(batch)
+                    self._process_guideline_matching_batch(batch)
                     for strategy_batches in batches
                     for batch in strategy_batches
                 ]
-                batch_results = await async_utils.safe_gather(*batch_tasks)
+                batch_outcomes = await async_utils.safe_gather(*batch_tasks)
 
         t_end = time.time()
 
+        batch_results = [result for result, _ in batch_outcomes]
+
         result_batches = [result.matches for result in batch_results]
         matches: Sequence[GuidelineMatch] = list(chain.from_iterable(result_batches))
 
@@ -253,6 +317,7 @@ class GuidelineMatcher:
             batch_generations=[result.generation_info for result in batch_results],
             batches=result_batches,
             matches=matches,
+            cached_batch_count=sum(1 for _, cached in batch_outcomes if cached),
         )
 
     async def analyze_response(
@@ -0,0 +1,79 @@
+# Copyright 2025 Emcie Co Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Sequence
+from typing_extensions import override
+
+from parlant.core.engines.alpha.guideline_matching.guideline_match import GuidelineMatch
+from parlant.core.nlp.generation_info import GenerationInfo
+
+
+@dataclass(frozen=True)
+class CachedGuidelineMatches:
+    matches: Sequence[GuidelineMatch]
+    generation_info: GenerationInfo
+
+
+class GuidelineMatchingCache(ABC):
+    """An interface for reusing the verdicts of guideline matching batches.
+
+    Entries are keyed by a batch's fingerprint, which covers the guidelines
+    it evaluates along with every input its verdicts depend on.
+    """
+
+    @abstractmethod
+    async def get(self, fingerprint: str) -> Optional[CachedGuidelineMatches]: ...
+
+    @abstractmethod
+    async def set(self, fingerprint: str, matches: CachedGuidelineMatches) -> None: ...
+
+
+class NullGuidelineMatchingCache(GuidelineMatchingCache):
+    @override
+    async def get(self, fingerprint: str) -> Optional[CachedGuidelineMatches]:
+        return None
+
+    @override
+    async def set(self, fingerprint: str, matches: CachedGuidelineMatches) -> None:
+        pass
+
+
+class BasicGuidelineMatchingCache(GuidelineMatchingCache):
+    """Keeps the most recently used verdicts in memory (at most `max_entries` batches)."""
+
+    def __init__(self, max_entries: int = 1_000) -> None:
+        self._max_entries = max_entries
+        self._entries: OrderedDict[str, CachedGuidelineMatches] = OrderedDict()
+
+    @property
+    def size(self) -> int:
+        return len(self._entries)
+
+    @override
+    async def get(self, fingerprint: str) -> Optional[CachedGuidelineMatches]:
+        if entry := self._entries.get(fingerprint):
+            self._entries.move_to_end(fingerprint)
+
+        return entry
+
+    @override
+    async def set(self, fingerprint: str, matches: CachedGuidelineMatches) -> None:
+        self._entries[fingerprint] = matches
+        self._entries.move_to_end(fingerprint)
+
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
@@ -0,0 +1,359 @@
+# Copyright 2025 Emcie Co Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from abc import ABC, abstractmethod
+import asyncio
+from collections import Counter
+from dataclasses import dataclass, field
+from itertools import chain
+import random
+from typing import Awaitable, Callable, Mapping, Optional, Sequence, cast
+from typing_extensions import override, Required, Self, TypedDict
+
+from parlant.core.common import Version, md5_checksum
+from parlant.core.engines.alpha.guideline_matching.guideline_match import GuidelineMatch
+from parlant.core.engines.alpha.loaded_context import LoadedContext
+from parlant.core.guidelines import Guideline, GuidelineId, GuidelineStore
+from parlant.core.loggers import Logger
+from parlant.core.nlp.embedding import Embedder, EmbedderFactory
+from parlant.core.persistence.common import ObjectId
+from parlant.core.persistence.vector_database import (
+    BaseDocument,
+    VectorCollection,
+    VectorDatabase,
+)
+from parlant.core.persistence.vector_database_helper import QueryChunker
+
+
+@dataclass(frozen=True)
+class GuidelineScreeningResult:
+    candidates: Sequence[Guideline]
+    """The guidelines that should be matched."""
+
+    ranks: Mapping[GuidelineId, int]
+    """The rank of each screened guideline by its similarity to the interaction (0 is the most similar).
+    Guidelines that are always matched aren't ranked."""
+
+    audited: bool = False
+    """Whether all guidelines were matched regardless of their rank, to measure the screen's recall."""
+
+
+@dataclass
+class GuidelineScreeningMetrics:
+    screenings: int = 0
+    screened_guidelines: int = 0
+    candidates: int = 0
+
+    audited_screenings: int = 0
+    matched_ranks: Counter[int] = field(default_factory=Counter)
+    """How many of the ranked guidelines matched in audited screenings had each rank."""
+
+    def recall(self, max_candidates: int) -> Optional[float]:
+        """Returns the share of matches (in audited screenings) that a screen
+        keeping `max_candidates` guidelines would have kept, or None if there are none yet."""
+        if not (match_count := sum(self.matched_ranks.values())):
+            return None
+
+        return (
+            sum(count for rank, count in self.matched_ranks.items() if rank < max_candidates)
+            / match_count
+        )
+
+
+class GuidelineScreener(ABC):
+    """Narrows down the guidelines to match before they're sent for (LLM-based) matching."""
+
+    @abstractmethod
+    async def screen(
+        self,
+        context: LoadedContext,
+        guidelines: Sequence[Guideline],
+    ) -> GuidelineScreeningResult: ...
+
+    @abstractmethod
+    def record_matches(
+        self,
+        result: GuidelineScreeningResult,
+        matches: Sequence[GuidelineMatch],
+    ) -> None:
+        """Records which of the screened guidelines matched, to measure the screen's recall."""
+        ...
+
+
+class NullGuidelineScreener(GuidelineScreener):
+    @override
+    async def screen(
+        self,
+        context: LoadedContext,
+        guidelines: Sequence[Guideline],
+    ) -> GuidelineScreeningResult:
+        return GuidelineScreeningResult(candidates=guidelines, ranks={})
+
+    @override
+    def record_matches(
+        self,
+        result: GuidelineScreeningResult,
+        matches: Sequence[GuidelineMatch],
+    ) -> None:
+        pass
+
+
+class _GuidelineConditionDocument(TypedDict, total=False):
+    id: ObjectId
+    guideline_id: GuidelineId
+    version: Version.String
+    content: str
+    checksum: Required[str]
+
+
+class VectorGuidelineScreener(GuidelineScreener):
+    """Screens guidelines by the similarity of their conditions to the recent interaction,
+    so that only the `max_candidates` most similar ones are matched.
+
+    Guidelines that are always matched—continuous ones, ones that were previously applied,
+    ones that are part of journeys and ones that have already matched while preparing
+    the current response—are exempt from the screen. Conditions are embedded once
+    (whenever guidelines are written), and kept in a vector collection.
+
+    To measure its recall, a share of screenings (the `audit_rate`) pass on all guidelines,
+    recording the ranks of those that matched.
+    """
+
+    VERSION = Version.from_string("0.1.0")
+
+    def __init__(
+        self,
+        vector_db: VectorDatabase,
+        embedder_type_provider: Callable[[], Awaitable[type[Embedder]]],
+        embedder_factory: EmbedderFactory,
+        guideline_store: GuidelineStore,
+        logger: Logger,
+        max_candidates: int = 30,
+        audit_rate: float = 0.0,
+        max_query_messages: int = 6,
+    ) -> None:
+        self._vector_db = vector_db
+        self._embedder_type_provider = embedder_type_provider
+        self._embedder_factory = embedder_factory
+        self._guideline_store = guideline_store
+        self._logger = logger
+
+        self._max_candidates = max_candidates
+        self._audit_rate = audit_rate
+        self._max_query_messages = max_query_messages
+
+        self._collection: VectorCollection[_GuidelineConditionDocument]
+        self._query_chunker: QueryChunker
+
+        self._checksums: dict[GuidelineId, str] = {}
+        self._lock = asyncio.Lock()
+
+        self._indexing_required = False
+        self._indexing_task: Optional[asyncio.Task[None]] = None
+
+        self.metrics = GuidelineScreeningMetrics()
+
+    async def _document_loader(self, doc: BaseDocument) -> Optional[_GuidelineConditionDocument]:
+        if doc["version"] == self.VERSION.to_string():
+            return cast(_GuidelineConditionDocument, doc)
+        return None
+
+    async def __aenter__(self) -> Self:
+        embedder_type = await self._embedder_type_provider()
+
+        self._query_chunker = QueryChunker(self._embedder_factory.create_embedder(embedder_type))
+
+        self._collection = await self._vector_db.get_or_create_collection(
+            name="guideline_conditions",
+            schema=_GuidelineConditionDocument,
+            embedder_type=embedder_type,
+            document_loader=self._document_loader,
+        )
+
+        self._checksums = {
+            doc["guideline_id"]: doc["checksum"] for doc in await self._collection.find({})
+        }
+
+        self._guideline_store.subscribe_to_changes(self._on_guidelines_changed)
+        await self._index(await self._guideline_store.list_guidelines(), prune=True)
+
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[object],
+    ) -> None:
+        if self._indexing_task:
+            self._indexing_task.cancel()
+            await asyncio.gather(self._indexing_task, return_exceptions=True)
+
+    def _on_guidelines_changed(self) -> None:
+        # Writes come in bursts (e.g., when an agent is set up),
+        # so a single task indexes all of the changes made while it runs
+        self._indexing_required = True
+
+        if self._indexing_task is None or self._indexing_task.done():
+            self._indexing_task = asyncio.get_running_loop().create_task(self._index_changes())
+
+    async def _index_changes(self) -> None:
+        while self._indexing_required:
+            self._indexing_required = False
+
+            try:
+                await self._index(await self._guideline_store.list_guidelines(), prune=True)
+            except Exception as exc:
+                self._logger.warning(f"Failed to index guideline conditions: {exc}")
+
+    async def _index(self, guidelines: Sequence[Guideline], prune: bool = False) -> None:
+        async with self._lock:
+            for g in guidelines:
+                checksum = md5_checksum(g.content.condition)
+
+                if self._checksums.get(g.id) == checksum:
+                    continue
+
+                await self._collection.update_one(
+                    filters={"guideline_id": {"$eq": g.id}},
+                    params=_GuidelineConditionDocument(
+                        id=ObjectId(g.id),
+                        guideline_id=g.id,
+                        version=self.VERSION.to_string(),
+                        content=g.content.condition,
+                        checksum=checksum,
+                    ),
+                    upsert=True,
+                )
+
+                self._checksums[g.id] = checksum
+
+            if prune:
+                for guideline_id in set(self._checksums).difference(g.id for g in guidelines):
+                    await self._collection.delete_one({"guideline_id": {"$eq": guideline_id}})
+                    del self._checksums[guideline_id]
+
+    def _is_always_matched(
+        self,
+        guideline: Guideline,
+        matched_guideline_ids: set[GuidelineId],
+    ) -> bool:
+        return bool(
+            guideline.metadata.get("continuous", False)
+            or "journey_node" in guideline.metadata
+            or guideline.id in matched_guideline_ids
+        )
+
+    def _get_matched_guideline_ids(self, context: LoadedContext) -> set[GuidelineId]:
+        # Guidelines applied in the last response, or matched earlier in preparing this one
+        applied_guideline_ids = (
+            context.session.agent_states[-1].applied_guideline_ids
+            if context.session.agent_states
+            else []
+        )
+
+        return {*applied_guideline_ids, *(g.id for g in context.state.guidelines)}
+
+    def _build_query(self, context: LoadedContext) -> str:
+        return "\n".join(
+            f"{m.source}: {m.content}"
+            for m in context.interaction.messages[-self._max_query_messages :]
+        )
+
+    async def _rank(
+        self,
+        query: str,
+        guidelines: Sequence[Guideline],
+    ) -> dict[GuidelineId, int]:
+        # Conditions that haven't been indexed yet (e.g., if the indexing task is still running)
+        await self._index(guidelines)
+
+        results = await self._collection.find_similar_documents_batch(
+            filters={"guideline_id": {"$in": [str(g.id) for g in guidelines]}},
+            queries=await self._query_chunker.chunk(query),
+            k=len(guidelines),
+        )
+
+        # Keep each guideline's best match across all query chunks, in order of similarity
+        ranked_ids = dict.fromkeys(
+            r.document["guideline_id"]
+            for r in sorted(chain.from_iterable(results), key=lambda r: r.distance)
+        )
+
+        return {guideline_id: rank for rank, guideline_id in enumerate(ranked_ids)}
+
+    @override
+    async def screen(
+        self,
+        context: LoadedContext,
+        guidelines: Sequence[Guideline],
+    ) -> GuidelineScreeningResult:
+        matched_guideline_ids = self._get_matched_guideline_ids(context)
+
+        screened_guidelines = [
+            g for g in guidelines if not self._is_always_matched(g, matched_guideline_ids)
+        ]
+
+        if len(screened_guidelines) <= self._max_candidates or not (
+            query := self._build_query(context)
+        ):
+            return GuidelineScreeningResult(candidates=guidelines, ranks={})
+
+        ranks = await self._rank(query, screened_guidelines)
+
+        # Guidelines that somehow weren't ranked are given the benefit of the doubt
+        screened_guideline_ids = {g.id for g in screened_guidelines}
+
+        candidates = [
+            g
+            for g in guidelines
+            if g.id not in screened_guideline_ids or ranks.get(g.id, 0) < self._max_candidates
+        ]
+
+        audited = random.random() < self._audit_rate
+
+        self.metrics.screenings += 1
+        self.metrics.screened_guidelines += len(screened_guidelines)
+        self.metrics.candidates += len(candidates)
+
+        self._logger.debug(
+            f"Screened {len(guidelines)} guidelines down to {len(candidates)}"
+            + (" (auditing, so all will be matched)" if audited else "")
+        )
+
+        return GuidelineScreeningResult(
+            candidates=guidelines if audited else candidates,
+            ranks=ranks,
+            audited=audited,
+        )
+
+    @override
+    def record_matches(
+        self,
+        result: GuidelineScreeningResult,
+        matches: Sequence[GuidelineMatch],
+    ) -> None:
+        if not result.audited:
+            return
+
+        self.metrics.audited_screenings += 1
+        self.metrics.matched_ranks.update(
+            result.ranks[m.guideline.id] for m in matches if m.guideline.id in result.ranks
+        )
+
+        if (recall := self.metrics.recall(self._max_candidates)) is not None:
+            self._logger.info(
+                f"Guideline screening recall (top {self._max_candidates}): {recall:.2f}, "
+                f"over {sum(self.metrics.matched_ranks.values())} audited matches"
+            )
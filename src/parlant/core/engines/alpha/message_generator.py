@@ -324,6 +324,7 @@ Later in this prompt, you'll be provided with behavioral guidelines and other co
 
 """,
             props={},
+            static=True,
         )
 
         builder.add_agent_identity(agent)
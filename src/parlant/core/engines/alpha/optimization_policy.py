@@ -1,7 +1,13 @@
 from abc import ABC, abstractmethod
-from typing import Any, Mapping, Sequence
+from collections import Counter
+from dataclasses import dataclass, field
+import math
+from typing import Any, Mapping, Optional, Sequence
 from typing_extensions import override
 
+from parlant.core.guidelines import Guideline
+from parlant.core.nlp.generation_info import GenerationInfo
+
 
 class OptimizationPolicy(ABC):
     """An interface for defining optimization policies for the engine."""
@@ -23,6 +29,28 @@ class OptimizationPolicy(ABC):
         """Gets the batch size for guideline matching."""
         ...
 
+    def get_guideline_matching_batches(
+        self,
+        guidelines: Sequence[Guideline],
+        hints: Mapping[str, Any] = {},
+    ) -> Sequence[Sequence[Guideline]]:
+        """Splits guidelines into batches for guideline matching."""
+        batch_size = self.get_guideline_matching_batch_size(len(guidelines), hints)
+
+        return [
+            list(guidelines[offset : offset + batch_size])
+            for offset in range(0, len(guidelines), batch_size)
+        ]
+
+    def record_guideline_matching_batch(
+        self,
+        guideline_count: int,
+        generation_info: GenerationInfo,
+        hints: Mapping[str, Any] = {},
+    ) -> None:
+        """Reports how a processed guideline matching batch performed."""
+        pass
+
     @abstractmethod
     def get_message_generation_retry_temperatures(
         self,
@@ -148,3 +176,253 @@ class BasicOptimizationPolicy(OptimizationPolicy):
             0.15,
             0.1,
         ]
+
+
+@dataclass(frozen=True)
+class GuidelineMatchingBatchingDecision:
+    guideline_count: int
+    batch_size: int
+    batch_count: int
+
+    learned: bool
+    """Whether the batch size was chosen by the learned model (rather than by the fallback)."""
+
+    estimated_duration: Optional[float] = None
+    estimated_tokens: Optional[float] = None
+
+
+@dataclass
+class GuidelineMatchingBatchingMetrics:
+    observations: int = 0
+    skipped_cache_hits: int = 0
+    decisions: int = 0
+    batch_sizes: Counter[int] = field(default_factory=Counter)
+    """How many times each batch size was chosen."""
+
+    last_decision: Optional[GuidelineMatchingBatchingDecision] = None
+
+
+class _DecayingLinearFit:
+    """A least-squares fit of y = intercept + slope * x, in which older samples weigh less."""
+
+    def __init__(self, decay: float) -> None:
+        self._decay = decay
+
+        self._n = 0.0
+        self._sum_x = 0.0
+        self._sum_y = 0.0
+        self._sum_xx = 0.0
+        self._sum_xy = 0.0
+
+    def add(self, x: float, y: float) -> None:
+        self._n = self._n * self._decay + 1
+        self._sum_x = self._sum_x * self._decay + x
+        self._sum_y = self._sum_y * self._decay + y
+        self._sum_xx = self._sum_xx * self._decay + x * x
+        self._sum_xy = self._sum_xy * self._decay + x * y
+
+    @property
+    def is_determined(self) -> bool:
+        """Whether the samples tell the fixed part of y from the part that grows with x,
+        which takes samples with at least two different values of x."""
+        return self._n > 0 and self._variance_x() > 1e-9
+
+    def _variance_x(self) -> float:
+        return self._sum_xx / self._n - (self._sum_x / self._n) ** 2
+
+    def predict(self, x: float) -> float:
+        mean_x = self._sum_x / self._n
+        mean_y = self._sum_y / self._n
+
+        if not self.is_determined:
+            return mean_y
+
+        slope = max((self._sum_xy / self._n - mean_x * mean_y) / self._variance_x(), 0.0)
+        intercept = mean_y - slope * mean_x
+
+        return max(intercept + slope * x, 0.0)
+
+
+@dataclass
+class _BatchCostModel:
+    duration: _DecayingLinearFit
+    input_tokens: _DecayingLinearFit
+    output_tokens: _DecayingLinearFit
+    observations: int = 0
+
+
+def _estimate_guideline_token_count(guideline: Guideline) -> int:
+    # A rough (4 characters per token) estimate is enough to balance batches
+    text = guideline.content.condition + (guideline.content.action or "")
+    return len(text) // 4 + 1
+
+
+class AdaptiveOptimizationPolicy(BasicOptimizationPolicy):
+    """An optimization policy that sizes guideline matching batches by their observed costs.
+
+    For every type of batch, it learns how the duration and token usage of a batch
+    grow with the number of guidelines in it, from the generations of processed batches
+    (excluding cache hits). It then picks the batch size that minimizes the estimated
+    time it takes to process all batches (given that only `max_concurrent_batches` run
+    at once), among those whose estimated total token usage is within `token_budget`.
+
+    Until it has observed `min_observations` batches of a type, with at least two
+    different sizes, it sizes them like BasicOptimizationPolicy does. Guidelines are
+    assigned to batches so as to balance their estimated prompt sizes.
+    """
+
+    def __init__(
+        self,
+        max_concurrent_batches: int = 16,
+        token_budget: Optional[int] = None,
+        max_batch_size: int = 5,
+        min_observations: int = 5,
+        decay: float = 0.98,
+    ) -> None:
+        self._max_concurrent_batches = max_concurrent_batches
+        self._token_budget = token_budget
+        self._max_batch_size = max_batch_size
+        self._min_observations = min_observations
+        self._decay = decay
+
+        self._models: dict[str, _BatchCostModel] = {}
+        self.metrics: dict[str, GuidelineMatchingBatchingMetrics] = {}
+
+    def _get_metrics(self, batch_type: str) -> GuidelineMatchingBatchingMetrics:
+        if batch_type not in self.metrics:
+            self.metrics[batch_type] = GuidelineMatchingBatchingMetrics()
+
+        return self.metrics[batch_type]
+
+    @override
+    def record_guideline_matching_batch(
+        self,
+        guideline_count: int,
+        generation_info: GenerationInfo,
+        hints: Mapping[str, Any] = {},
+    ) -> None:
+        batch_type = str(hints.get("type", generation_info.schema_name))
+        metrics = self._get_metrics(batch_type)
+
+        if generation_info.cache and generation_info.cache.hit:
+            # A cached generation says nothing about how long the model takes
+            metrics.skipped_cache_hits += 1
+            return
+
+        if batch_type not in self._models:
+            self._models[batch_type] = _BatchCostModel(
+                duration=_DecayingLinearFit(self._decay),
+                input_tokens=_DecayingLinearFit(self._decay),
+                output_tokens=_DecayingLinearFit(self._decay),
+            )
+
+        model = self._models[batch_type]
+
+        model.duration.add(guideline_count, generation_info.duration)
+        model.input_tokens.add(guideline_count, generation_info.usage.input_tokens)
+        model.output_tokens.add(guideline_count, generation_info.usage.output_tokens)
+        model.observations += 1
+
+        metrics.observations += 1
+
+    @override
+    def get_guideline_matching_batch_size(
+        self,
+        guideline_count: int,
+        hints: Mapping[str, Any] = {},
+    ) -> int:
+        batch_type = str(hints.get("type", ""))
+        model = self._models.get(batch_type)
+
+        if (
+            not model
+            or model.observations < self._min_observations
+            or not model.duration.is_determined
+            or guideline_count <= 1
+        ):
+            batch_size = super().get_guideline_matching_batch_size(guideline_count, hints)
+            decision = GuidelineMatchingBatchingDecision(
+                guideline_count=guideline_count,
+                batch_size=batch_size,
+                batch_count=math.ceil(guideline_count / batch_size),
+                learned=False,
+            )
+        else:
+            decision = self._decide(model, guideline_count)
+
+        metrics = self._get_metrics(batch_type)
+        metrics.decisions += 1
+        metrics.batch_sizes[decision.batch_size] += 1
+        metrics.last_decision = decision
+
+        return decision.batch_size
+
+    def _decide(
+        self,
+        model: _BatchCostModel,
+        guideline_count: int,
+    ) -> GuidelineMatchingBatchingDecision:
+        options = []
+
+        for batch_size in range(1, min(self._max_batch_size, guideline_count) + 1):
+            batch_count = math.ceil(guideline_count / batch_size)
+
+            # Batches beyond the concurrency limit wait for earlier ones to finish
+            waves = math.ceil(batch_count / self._max_concurrent_batches)
+
+            options.append(
+                GuidelineMatchingBatchingDecision(
+                    guideline_count=guideline_count,
+                    batch_size=batch_size,
+                    batch_count=batch_count,
+                    learned=True,
+                    estimated_duration=waves * model.duration.predict(batch_size),
+                    estimated_tokens=batch_count
+                    * (
+                        model.input_tokens.predict(batch_size)
+                        + model.output_tokens.predict(batch_size)
+                    ),
+                )
+            )
+
+        def tokens(d: GuidelineMatchingBatchingDecision) -> float:
+            return d.estimated_tokens or 0.0
+
+        def duration(d: GuidelineMatchingBatchingDecision) -> float:
+            return d.estimated_duration or 0.0
+
+        if within_budget := [
+            d for d in options if self._token_budget is None or tokens(d) <= self._token_budget
+        ]:
+            return min(within_budget, key=lambda d: (duration(d), tokens(d)))
+
+        return min(options, key=lambda d: (tokens(d), duration(d)))
+
+    @override
+    def get_guideline_matching_batches(
+        self,
+        guidelines: Sequence[Guideline],
+        hints: Mapping[str, Any] = {},
+    ) -> Sequence[Sequence[Guideline]]:
+        if not guidelines:
+            return []
+
+        batch_size = self.get_guideline_matching_batch_size(len(guidelines), hints)
+        batch_count = math.ceil(len(guidelines) / batch_size)
+
+        batch_indices: list[list[int]] = [[] for _ in range(batch_count)]
+        batch_token_counts = [0] * batch_count
+
+        estimated_token_counts = [_estimate_guideline_token_count(g) for g in guidelines]
+
+        # Place the largest guidelines first, each in the smallest batch that has room for it
+        for i in sorted(range(len(guidelines)), key=lambda i: -estimated_token_counts[i]):
+            target = min(
+                (b for b in range(batch_count) if len(batch_indices[b]) < batch_size),
+                key=lambda b: batch_token_counts[b],
+            )
+
+            batch_indices[target].append(i)
+            batch_token_counts[target] += estimated_token_counts[i]
+
+        return [[guidelines[i] for i in sorted(indices)] for indices in batch_indices]
@@ -68,6 +68,9 @@ class PromptSection:
     template: str
     props: dict[str, Any]
     status: Optional[SectionStatus]
+    static: bool = False
+    """Whether the section renders the same across requests (e.g., instructions and examples),
+    as opposed to depending on the interaction at hand (which is the default)"""
 
 
 class PromptBuilder:
@@ -86,10 +89,10 @@ class PromptBuilder:
 
         self._cached_results.add(prompt)
 
-    def build(self) -> str:
+    def _render(self, sections: Sequence[tuple[str | BuiltInSection, PromptSection]]) -> str:
         buffer = StringIO()
 
-        for section_name, section in self.sections.items():
+        for section_name, section in sections:
             try:
                 buffer.write(section.template.format(**section.props))
                 buffer.write("\n\n")
@@ -98,11 +101,24 @@ class PromptBuilder:
                     f"Error formatting section {section_name} with template: {section.template} and props: {section.props}"
                 ) from e
 
-        prompt = buffer.getvalue().strip()
+        return buffer.getvalue().strip()
+
+    def build_parts(self) -> tuple[str, str]:
+        """Builds the prompt as a static prefix, followed by a volatile suffix.
+
+        Static sections are laid out first (in the order they were added), so that
+        consecutive prompts share as long a prefix as possible, which is what
+        providers' prompt caching keys on. Adapters may send the two parts separately.
+        """
+        static_prefix = self._render([(n, s) for n, s in self.sections.items() if s.static])
+        volatile_suffix = self._render([(n, s) for n, s in self.sections.items() if not s.static])
 
-        self._call_on_build(prompt)
+        self._call_on_build("\n\n".join(p for p in (static_prefix, volatile_suffix) if p))
 
-        return prompt
+        return static_prefix, volatile_suffix
+
+    def build(self) -> str:
+        return "\n\n".join(p for p in self.build_parts() if p)
 
     def add_section(
         self,
@@ -110,6 +126,7 @@ class PromptBuilder:
         template: str,
         props: dict[str, Any] = {},
         status: Optional[SectionStatus] = None,
+        static: bool = False,
     ) -> PromptBuilder:
         if name in self.sections:
             raise ValueError(f"Section '{name}' was already added")
@@ -118,6 +135,7 @@ class PromptBuilder:
             template=template,
             props=props,
             status=status,
+            static=static,
         )
 
         return self
@@ -207,6 +225,7 @@ The following is a description of your background and personality: ###
                     "agent_description": agent.description,
                 },
                 status=SectionStatus.ACTIVE,
+                static=True,
             )
 
         return self
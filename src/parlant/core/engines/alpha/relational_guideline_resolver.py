@@ -14,13 +14,16 @@
 
 from collections import defaultdict
 from itertools import chain
-from typing import Optional, Sequence, cast
+from typing import Iterable, Optional, Sequence, cast
 
+from parlant.core.async_utils import safe_gather
 from parlant.core.common import JSONSerializable
 from parlant.core.journeys import Journey, JourneyId
 from parlant.core.loggers import Logger
 from parlant.core.engines.alpha.guideline_matching.guideline_match import GuidelineMatch
 from parlant.core.relationships import (
+    Relationship,
+    RelationshipEntityId,
     RelationshipEntityKind,
     RelationshipKind,
     RelationshipStore,
@@ -29,6 +32,76 @@ from parlant.core.guidelines import Guideline, GuidelineId, GuidelineStore
 from parlant.core.tags import TagId, Tag
 
 
+class _RelationalIndex:
+    """Memoizes the relationship and guideline lookups made while resolving a turn's matches,
+    so that each one is made at most once, however many matches lead to it."""
+
+    def __init__(
+        self,
+        relationship_store: RelationshipStore,
+        guideline_store: GuidelineStore,
+        usable_guidelines: Sequence[Guideline],
+    ) -> None:
+        self._relationship_store = relationship_store
+        self._guideline_store = guideline_store
+
+        self.guidelines_by_id = {g.id: g for g in usable_guidelines}
+
+        self._relationships: dict[
+            tuple[RelationshipKind, RelationshipEntityId, bool],
+            Sequence[Relationship],
+        ] = {}
+        self._tagged_guidelines: dict[TagId, Sequence[Guideline]] = {}
+
+    async def relationships(
+        self,
+        kind: RelationshipKind,
+        entity_id: RelationshipEntityId,
+        reverse: bool = False,
+    ) -> Sequence[Relationship]:
+        """Returns the (indirect) relationships from the entity, or to it if `reverse` is set."""
+        key = (kind, entity_id, reverse)
+
+        if key not in self._relationships:
+            self._relationships[key] = await self._relationship_store.list_relationships(
+                kind=kind,
+                indirect=True,
+                **({"target_id": entity_id} if reverse else {"source_id": entity_id}),
+            )
+
+        return self._relationships[key]
+
+    async def tagged_guidelines(self, tag_id: TagId) -> Sequence[Guideline]:
+        if tag_id not in self._tagged_guidelines:
+            self._tagged_guidelines[tag_id] = await self._guideline_store.list_guidelines(
+                tags=[tag_id]
+            )
+
+        return self._tagged_guidelines[tag_id]
+
+    async def prefetch(
+        self,
+        kind: RelationshipKind,
+        entity_ids: Iterable[RelationshipEntityId],
+        reverse: bool = False,
+    ) -> None:
+        """Looks up the relationships of all of the entities at once, along with
+        the guidelines of the tags they lead to."""
+        relationships = await safe_gather(
+            *(self.relationships(kind, entity_id, reverse) for entity_id in set(entity_ids))
+        )
+
+        related_entities = (
+            r.source if reverse else r.target for r in chain.from_iterable(relationships)
+        )
+
+        tag_ids = {
+            cast(TagId, e.id) for e in related_entities if e.kind == RelationshipEntityKind.TAG
+        }
+
+        await safe_gather(*(self.tagged_guidelines(tag_id) for tag_id in tag_ids))
+
+
 class RelationalGuidelineResolver:
     def __init__(
         self,
@@ -59,30 +132,60 @@ class RelationalGuidelineResolver:
 
         return None
 
+    def _create_index(self, usable_guidelines: Sequence[Guideline]) -> _RelationalIndex:
+        return _RelationalIndex(
+            relationship_store=self._relationship_store,
+            guideline_store=self._guideline_store,
+            usable_guidelines=usable_guidelines,
+        )
+
+    def _get_entity_ids(self, matches: Sequence[GuidelineMatch]) -> set[RelationshipEntityId]:
+        # The entities whose relationships apply to the matches: their guidelines and journeys
+        guideline_ids: set[RelationshipEntityId] = {m.guideline.id for m in matches}
+
+        return guideline_ids | {
+            Tag.for_journey_id(journey_id)
+            for m in matches
+            if (journey_id := self._extract_journey_id_from_guideline(m.guideline))
+        }
+
     async def resolve(
         self,
         usable_guidelines: Sequence[Guideline],
         matches: Sequence[GuidelineMatch],
         journeys: Sequence[Journey],
     ) -> Sequence[GuidelineMatch]:
+        # All of the turn's matches are resolved against one index,
+        # so lookups shared by several matches (or steps) are only made once
+        index = self._create_index(usable_guidelines)
+
         # Use the guideline matcher scope to associate logs with it
         with self._logger.scope("GuidelineMatcher"):
             with self._logger.scope("RelationalGuidelineResolver"):
-                result = await self.filter_unmet_dependencies(
-                    usable_guidelines=usable_guidelines,
+                entity_ids = self._get_entity_ids(matches)
+
+                await safe_gather(
+                    index.prefetch(RelationshipKind.DEPENDENCY, entity_ids),
+                    index.prefetch(RelationshipKind.PRIORITY, entity_ids, reverse=True),
+                    index.prefetch(RelationshipKind.ENTAILMENT, {m.guideline.id for m in matches}),
+                )
+
+                result = await self._filter_unmet_dependencies(
+                    index=index,
                     matches=matches,
                     journeys=journeys,
                 )
-                result = await self.replace_with_prioritized(
-                    result,
+                result = await self._replace_with_prioritized(
+                    index=index,
+                    matches=result,
                     journeys=journeys,
                 )
 
                 return list(
                     chain(
                         result,
-                        await self.get_entailed(
-                            usable_guidelines=usable_guidelines,
+                        await self._get_entailed(
+                            index=index,
                             matches=result,
                         ),
                     )
@@ -92,6 +195,22 @@ class RelationalGuidelineResolver:
         self,
         matches: Sequence[GuidelineMatch],
         journeys: Sequence[Journey],
+    ) -> Sequence[GuidelineMatch]:
+        index = self._create_index([])
+
+        await index.prefetch(
+            RelationshipKind.PRIORITY,
+            self._get_entity_ids(matches),
+            reverse=True,
+        )
+
+        return await self._replace_with_prioritized(index, matches, journeys)
+
+    async def _replace_with_prioritized(
+        self,
+        index: _RelationalIndex,
+        matches: Sequence[GuidelineMatch],
+        journeys: Sequence[Journey],
     ) -> Sequence[GuidelineMatch]:
         # Some guidelines have priority relationships that dictate activation.
         #
@@ -99,7 +218,8 @@ class RelationalGuidelineResolver:
         # and S is prioritized, only "When X, Then Y" should be activated.
         # Such priority relationships are stored in RelationshipStore,
         # and those are the ones we are loading here.
-        match_guideline_ids = {m.guideline.id for m in matches}
+        matches_by_guideline_id = {m.guideline.id: m for m in matches}
+        active_journey_ids = {j.id for j in journeys}
 
         iterated_guidelines: set[GuidelineId] = set()
 
@@ -107,19 +227,19 @@ class RelationalGuidelineResolver:
 
         for match in matches:
             priority_relationships = list(
-                await self._relationship_store.list_relationships(
-                    kind=RelationshipKind.PRIORITY,
-                    indirect=True,
-                    target_id=match.guideline.id,
+                await index.relationships(
+                    RelationshipKind.PRIORITY,
+                    match.guideline.id,
+                    reverse=True,
                 )
             )
 
             if journey_id := self._extract_journey_id_from_guideline(match.guideline):
                 priority_relationships.extend(
-                    await self._relationship_store.list_relationships(
-                        kind=RelationshipKind.PRIORITY,
-                        indirect=True,
-                        target_id=Tag.for_journey_id(journey_id),
+                    await index.relationships(
+                        RelationshipKind.PRIORITY,
+                        Tag.for_journey_id(journey_id),
+                        reverse=True,
                     )
                 )
 
@@ -129,6 +249,7 @@ class RelationalGuidelineResolver:
 
             deprioritized = False
             prioritized_guideline_id: GuidelineId | None = None
+            prioritized_journey_id: str | None = None
 
             while priority_relationships:
                 relationship = priority_relationships.pop()
@@ -137,7 +258,7 @@ class RelationalGuidelineResolver:
 
                 if (
                     prioritized_entity.kind == RelationshipEntityKind.GUIDELINE
-                    and prioritized_entity.id in match_guideline_ids
+                    and prioritized_entity.id in matches_by_guideline_id
                 ):
                     deprioritized = True
                     prioritized_guideline_id = cast(GuidelineId, prioritized_entity.id)
@@ -152,17 +273,15 @@ class RelationalGuidelineResolver:
                     # We then need to check if any of those guidelines have a priority relationship
                     #
                     # If not, we need to iterate over all those guidelines and add their priority relationships
-                    guideline_associated_with_prioritized_tag = (
-                        await self._guideline_store.list_guidelines(
-                            tags=[cast(TagId, prioritized_entity.id)]
-                        )
+                    guideline_associated_with_prioritized_tag = await index.tagged_guidelines(
+                        cast(TagId, prioritized_entity.id)
                     )
 
                     if prioritized_guideline_id := next(
                         (
                             g.id
                             for g in guideline_associated_with_prioritized_tag
-                            if g.id in match_guideline_ids and g.id != match.guideline.id
+                            if g.id in matches_by_guideline_id and g.id != match.guideline.id
                         ),
                         None,
                     ):
@@ -172,25 +291,25 @@ class RelationalGuidelineResolver:
                     for g in guideline_associated_with_prioritized_tag:
                         # In case we already iterated over this guideline,
                         # we don't need to iterate over it again.
-                        if g.id in iterated_guidelines or g.id in match_guideline_ids:
+                        if g.id in iterated_guidelines or g.id in matches_by_guideline_id:
                             continue
 
                         priority_relationships.extend(
-                            await self._relationship_store.list_relationships(
-                                kind=RelationshipKind.PRIORITY,
-                                indirect=True,
-                                target_id=g.id,
+                            await index.relationships(
+                                RelationshipKind.PRIORITY,
+                                g.id,
+                                reverse=True,
                             )
                         )
 
                     iterated_guidelines.update(
                         g.id
                         for g in guideline_associated_with_prioritized_tag
-                        if g.id not in match_guideline_ids
+                        if g.id not in matches_by_guideline_id
                     )
 
                     if journey_id := Tag.extract_journey_id(cast(TagId, prioritized_entity.id)):
-                        if any(journey.id == journey_id for journey in journeys):
+                        if journey_id in active_journey_ids:
                             deprioritized = True
                             prioritized_journey_id = journey_id
                             break
@@ -201,9 +320,9 @@ class RelationalGuidelineResolver:
                 result.append(match)
             else:
                 if prioritized_guideline_id:
-                    prioritized_guideline = next(
-                        m.guideline for m in matches if m.guideline.id == prioritized_guideline_id
-                    )
+                    prioritized_guideline = matches_by_guideline_id[
+                        prioritized_guideline_id
+                    ].guideline
 
                     self._logger.info(
                         f"Skipped: Guideline {match.guideline.id} ({match.guideline.content.action}) deactivated due to contextual prioritization by {prioritized_guideline_id} ({prioritized_guideline.content.action})"
@@ -219,6 +338,17 @@ class RelationalGuidelineResolver:
         self,
         usable_guidelines: Sequence[Guideline],
         matches: Sequence[GuidelineMatch],
+    ) -> Sequence[GuidelineMatch]:
+        index = self._create_index(usable_guidelines)
+
+        await index.prefetch(RelationshipKind.ENTAILMENT, {m.guideline.id for m in matches})
+
+        return await self._get_entailed(index, matches)
+
+    async def _get_entailed(
+        self,
+        index: _RelationalIndex,
+        matches: Sequence[GuidelineMatch],
     ) -> Sequence[GuidelineMatch]:
         # Some guidelines cannot be inferred simply by evaluating an interaction.
         #
@@ -233,29 +363,27 @@ class RelationalGuidelineResolver:
 
         for match in matches:
             relationships = list(
-                await self._relationship_store.list_relationships(
-                    kind=RelationshipKind.ENTAILMENT,
-                    indirect=True,
-                    source_id=match.guideline.id,
-                )
+                await index.relationships(RelationshipKind.ENTAILMENT, match.guideline.id)
             )
 
+            iterated_guidelines: set[GuidelineId] = set()
+
             while relationships:
                 relationship = relationships.pop()
 
                 if relationship.target.kind == RelationshipEntityKind.GUIDELINE:
-                    if any(relationship.target.id == m.guideline.id for m in matches):
+                    if relationship.target.id in match_guideline_ids:
                         # no need to add this related guideline as it's already an assumed match
                         continue
                     related_guidelines_by_match[match].add(
-                        next(g for g in usable_guidelines if g.id == relationship.target.id)
+                        index.guidelines_by_id[cast(GuidelineId, relationship.target.id)]
                     )
 
                 elif relationship.target.kind == RelationshipEntityKind.TAG:
                     # In case target is a tag, we need to find all guidelines
                     # that are associated with this tag.
-                    guidelines_associated_to_tag = await self._guideline_store.list_guidelines(
-                        tags=[cast(TagId, relationship.target.id)]
+                    guidelines_associated_to_tag = await index.tagged_guidelines(
+                        cast(TagId, relationship.target.id)
                     )
 
                     related_guidelines_by_match[match].update(
@@ -264,46 +392,32 @@ class RelationalGuidelineResolver:
 
                     # Add all the relationships for the related guidelines to the stack
                     for g in guidelines_associated_to_tag:
+                        # Tags can entail each other in a cycle, so only expand each guideline once
+                        if g.id in iterated_guidelines:
+                            continue
+
                         relationships.extend(
-                            await self._relationship_store.list_relationships(
-                                kind=RelationshipKind.ENTAILMENT,
-                                indirect=True,
-                                source_id=g.id,
-                            )
+                            await index.relationships(RelationshipKind.ENTAILMENT, g.id)
                         )
 
-        match_and_inferred_guideline_pairs: list[tuple[GuidelineMatch, Guideline]] = []
+                    iterated_guidelines.update(g.id for g in guidelines_associated_to_tag)
+
+        # Each related guideline is inferred from the highest-scoring match it's related to,
+        # as that score will go down as the inferred score of its own match
+        inferring_match_by_guideline: dict[Guideline, GuidelineMatch] = {}
 
         for match, related_guidelines in related_guidelines_by_match.items():
             for related_guideline in related_guidelines:
-                if existing_related_guidelines := [
-                    (match, inferred_guideline)
-                    for match, inferred_guideline in match_and_inferred_guideline_pairs
-                    if inferred_guideline == related_guideline
-                ]:
-                    assert len(existing_related_guidelines) == 1
-                    existing_related_guideline = existing_related_guidelines[0]
-
-                    # We're basically saying, if this related guideline is already
-                    # related to a match with a higher priority than the match
-                    # at hand, then we want to keep the associated with the match
-                    # that has the higher priority, because it will go down as the inferred
-                    # priority of our related guideline's match...
-                    #
-                    # Now try to read that out loud in one go :)
-                    if existing_related_guideline[0].score >= match.score:
+                if existing_match := inferring_match_by_guideline.get(related_guideline):
+                    if existing_match.score >= match.score:
                         continue  # Stay with existing one
-                    else:
-                        # This match's score is higher, so it's better that
-                        # we associate the related guideline with this one.
-                        # we'll add it soon, but meanwhile let's remove the old one.
-                        match_and_inferred_guideline_pairs.remove(
-                            existing_related_guideline,
-                        )
 
-                match_and_inferred_guideline_pairs.append(
-                    (match, related_guideline),
-                )
+                    # This match's score is higher, so it's better that
+                    # we associate the related guideline with this one.
+                    # We'll add it soon, but meanwhile let's remove the old one.
+                    del inferring_match_by_guideline[related_guideline]
+
+                inferring_match_by_guideline[related_guideline] = match
 
         entailed_matches = [
             GuidelineMatch(
@@ -311,7 +425,7 @@ class RelationalGuidelineResolver:
                 score=match.score,
                 rationale="Automatically inferred from context",
             )
-            for match, inferred_guideline in match_and_inferred_guideline_pairs
+            for inferred_guideline, match in inferring_match_by_guideline.items()
         ]
 
         for m in entailed_matches:
@@ -324,30 +438,38 @@ class RelationalGuidelineResolver:
         usable_guidelines: Sequence[Guideline],
         matches: Sequence[GuidelineMatch],
         journeys: Sequence[Journey],
+    ) -> Sequence[GuidelineMatch]:
+        index = self._create_index(usable_guidelines)
+
+        await index.prefetch(RelationshipKind.DEPENDENCY, self._get_entity_ids(matches))
+
+        return await self._filter_unmet_dependencies(index, matches, journeys)
+
+    async def _filter_unmet_dependencies(
+        self,
+        index: _RelationalIndex,
+        matches: Sequence[GuidelineMatch],
+        journeys: Sequence[Journey],
     ) -> Sequence[GuidelineMatch]:
         # Some guidelines have dependencies that dictate activation.
         #
         # For example, if we matched guidelines "When X, Then Y" (S) and "When Y, Then Z" (T),
         # and S is depends on T, then S should not be activated unless T is activated.
         matched_guideline_ids = {m.guideline.id for m in matches}
+        active_journey_ids = {j.id for j in journeys}
 
         result: list[GuidelineMatch] = []
 
         for match in matches:
             dependencies = list(
-                await self._relationship_store.list_relationships(
-                    kind=RelationshipKind.DEPENDENCY,
-                    indirect=True,
-                    source_id=match.guideline.id,
-                )
+                await index.relationships(RelationshipKind.DEPENDENCY, match.guideline.id)
             )
 
             if journey_id := self._extract_journey_id_from_guideline(match.guideline):
                 dependencies.extend(
-                    await self._relationship_store.list_relationships(
-                        kind=RelationshipKind.DEPENDENCY,
-                        indirect=True,
-                        source_id=Tag.for_journey_id(journey_id),
+                    await index.relationships(
+                        RelationshipKind.DEPENDENCY,
+                        Tag.for_journey_id(journey_id),
                     )
                 )
 
@@ -371,7 +493,7 @@ class RelationalGuidelineResolver:
 
                 if dependency.target.kind == RelationshipEntityKind.TAG:
                     if journey_id := Tag.extract_journey_id(cast(TagId, dependency.target.id)):
-                        if any(journey.id == journey_id for journey in journeys):
+                        if journey_id in active_journey_ids:
                             # If the tag is a journey tag and the journey is active,
                             # then this dependency is met.
                             continue
@@ -379,8 +501,8 @@ class RelationalGuidelineResolver:
                             dependent_on_inactive_guidelines = True
                             break
 
-                    guidelines_associated_to_tag = await self._guideline_store.list_guidelines(
-                        tags=[cast(TagId, dependency.target.id)]
+                    guidelines_associated_to_tag = await index.tagged_guidelines(
+                        cast(TagId, dependency.target.id)
                     )
 
                     for g in guidelines_associated_to_tag:
@@ -390,11 +512,7 @@ class RelationalGuidelineResolver:
 
                         if g.id not in iterated_guidelines:
                             dependencies.extend(
-                                await self._relationship_store.list_relationships(
-                                    kind=RelationshipKind.DEPENDENCY,
-                                    indirect=True,
-                                    source_id=g.id,
-                                )
+                                await index.relationships(RelationshipKind.DEPENDENCY, g.id)
                             )
 
                     iterated_guidelines.update(g.id for g in guidelines_associated_to_tag)
@@ -449,6 +449,7 @@ These calls do not require to be re-run at this time, unless you identify a vali
 
 """,
             props={},
+            static=True,
         )
         builder.add_agent_identity(agent)
         builder.add_section(
@@ -478,6 +479,7 @@ Only the responses are provided, without the interaction history or tool descrip
 
 """,
             props={},
+            static=True,
         )
         builder.add_section(
             name="tool-caller-examples",
@@ -487,6 +489,7 @@ EXAMPLES
 {formatted_shots}
 """,
             props={"formatted_shots": self._format_shots(shots), "shots": shots},
+            static=True,
         )
         builder.add_context_variables(context_variables)
         if terms:
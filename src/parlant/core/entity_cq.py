@@ -12,6 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from dataclasses import dataclass
 from itertools import chain
 from typing import Mapping, Optional, Sequence, cast
 
@@ -64,6 +65,18 @@ from parlant.core.tools import ToolId, ToolService
 from parlant.core.canned_responses import CannedResponse, CannedResponseStore
 
 
+@dataclass
+class _AgentEntitySnapshot:
+    """The agent-scoped (agent, global and agent-tag) entities of a single agent,
+    each resolved lazily, and all valid only for as long as the stores stay at `version`."""
+
+    version: int
+    guidelines: Optional[Sequence[Guideline]] = None
+    terms: Optional[Sequence[Term]] = None
+    capabilities: Optional[Sequence[Capability]] = None
+    journeys: Optional[Sequence[Journey]] = None
+
+
 class EntityQueries:
     def __init__(
         self,
@@ -99,6 +112,32 @@ class EntityQueries:
             maxsize=1024, ttl=120
         )
 
+        # Entities only change through admin edits, so we resolve them once per agent
+        # and re-resolve only after one of their stores reports a change.
+        self._snapshot_version = 0
+        self._agent_snapshots: dict[AgentId, _AgentEntitySnapshot] = {}
+
+        for store in (
+            agent_store,
+            guideline_store,
+            glossary_store,
+            journey_store,
+            capability_store,
+        ):
+            store.subscribe_to_changes(self._invalidate_agent_snapshots)
+
+    def _invalidate_agent_snapshots(self) -> None:
+        self._snapshot_version += 1
+
+    def _get_agent_snapshot(self, agent_id: AgentId) -> _AgentEntitySnapshot:
+        snapshot = self._agent_snapshots.get(agent_id)
+
+        if snapshot is None or snapshot.version != self._snapshot_version:
+            snapshot = _AgentEntitySnapshot(version=self._snapshot_version)
+            self._agent_snapshots[agent_id] = snapshot
+
+        return snapshot
+
     async def read_agent(
         self,
         agent_id: AgentId,
@@ -122,15 +161,10 @@ class EntityQueries:
         agent_id: AgentId,
         journeys: Sequence[Journey],
     ) -> Sequence[Guideline]:
-        agent_guidelines = await self._guideline_store.list_guidelines(
-            tags=[Tag.for_agent_id(agent_id)],
-        )
-        global_guidelines = await self._guideline_store.list_guidelines(tags=[])
+        snapshot = self._get_agent_snapshot(agent_id)
 
-        agent = await self._agent_store.read_agent(agent_id)
-        guidelines_for_agent_tags = await self._guideline_store.list_guidelines(
-            tags=[tag for tag in agent.tags]
-        )
+        if snapshot.guidelines is None:
+            snapshot.guidelines = await self._list_agent_guidelines(agent_id)
 
         guidelines_for_journeys = await self._guideline_store.list_guidelines(
             tags=[Tag.for_journey_id(journey.id) for journey in journeys]
@@ -144,9 +178,7 @@ class EntityQueries:
 
         all_guidelines = set(
             chain(
-                agent_guidelines,
-                global_guidelines,
-                guidelines_for_agent_tags,
+                snapshot.guidelines,
                 guidelines_for_journeys,
                 *projected_journey_guidelines,
             )
@@ -154,6 +186,19 @@ class EntityQueries:
 
         return list(all_guidelines)
 
+    async def _list_agent_guidelines(self, agent_id: AgentId) -> Sequence[Guideline]:
+        agent_guidelines = await self._guideline_store.list_guidelines(
+            tags=[Tag.for_agent_id(agent_id)],
+        )
+        global_guidelines = await self._guideline_store.list_guidelines(tags=[])
+
+        agent = await self._agent_store.read_agent(agent_id)
+        guidelines_for_agent_tags = await self._guideline_store.list_guidelines(
+            tags=[tag for tag in agent.tags]
+        )
+
+        return list(set(chain(agent_guidelines, global_guidelines, guidelines_for_agent_tags)))
+
     async def find_journey_related_guidelines(
         self,
         journey: Journey,
@@ -259,6 +304,20 @@ class EntityQueries:
         query: str,
         max_count: int,
     ) -> Sequence[Capability]:
+        snapshot = self._get_agent_snapshot(agent_id)
+
+        if snapshot.capabilities is None:
+            snapshot.capabilities = await self._list_agent_capabilities(agent_id)
+
+        result = await self._capability_store.find_relevant_capabilities(
+            query,
+            snapshot.capabilities,
+            max_count=max_count,
+        )
+
+        return result
+
+    async def _list_agent_capabilities(self, agent_id: AgentId) -> Sequence[Capability]:
         agent_capabilities = await self._capability_store.list_capabilities(
             tags=[Tag.for_agent_id(agent_id)],
         )
@@ -276,19 +335,21 @@ class EntityQueries:
             )
         )
 
-        result = await self._capability_store.find_relevant_capabilities(
-            query,
-            list(all_capabilities),
-            max_count=max_count,
-        )
-
-        return result
+        return list(all_capabilities)
 
     async def find_glossary_terms_for_context(
         self,
         agent_id: AgentId,
         query: str,
     ) -> Sequence[Term]:
+        snapshot = self._get_agent_snapshot(agent_id)
+
+        if snapshot.terms is None:
+            snapshot.terms = await self._list_agent_terms(agent_id)
+
+        return await self._glossary_store.find_relevant_terms(query, snapshot.terms)
+
+    async def _list_agent_terms(self, agent_id: AgentId) -> Sequence[Term]:
         agent_terms = await self._glossary_store.list_terms(
             tags=[Tag.for_agent_id(agent_id)],
         )
@@ -298,9 +359,7 @@ class EntityQueries:
             tags=[tag for tag in agent.tags]
         )
 
-        all_terms = set(chain(agent_terms, global_terms, glossary_for_agent_tags))
-
-        return await self._glossary_store.find_relevant_terms(query, list(all_terms))
+        return list(set(chain(agent_terms, global_terms, glossary_for_agent_tags)))
 
     async def read_tool_service(
         self,
@@ -312,6 +371,14 @@ class EntityQueries:
         self,
         agent_id: AgentId,
     ) -> Sequence[Journey]:
+        snapshot = self._get_agent_snapshot(agent_id)
+
+        if snapshot.journeys is None:
+            snapshot.journeys = await self._list_agent_journeys(agent_id)
+
+        return list(snapshot.journeys)
+
+    async def _list_agent_journeys(self, agent_id: AgentId) -> Sequence[Journey]:
         agent_journeys = await self._journey_store.list_journeys(
             tags=[Tag.for_agent_id(agent_id)],
         )
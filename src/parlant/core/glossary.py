@@ -15,13 +15,20 @@
 from abc import abstractmethod
 from dataclasses import dataclass
 from datetime import datetime, timezone
+from functools import cached_property
 from itertools import chain
 from typing import Awaitable, Callable, NewType, Optional, Sequence, TypedDict, cast
 from typing_extensions import override, Self, Required
 
-from parlant.core import async_utils
 from parlant.core.async_utils import ReaderWriterLock
-from parlant.core.common import ItemNotFoundError, Version, IdGenerator, UniqueId, md5_checksum
+from parlant.core.common import (
+    ChangeNotifier,
+    ItemNotFoundError,
+    Version,
+    IdGenerator,
+    UniqueId,
+    md5_checksum,
+)
 from parlant.core.persistence.common import ObjectId, Where
 from parlant.core.nlp.embedding import Embedder, EmbedderFactory
 from parlant.core.persistence.vector_database import (
@@ -30,9 +37,9 @@ from parlant.core.persistence.vector_database import (
     VectorDatabase,
 )
 from parlant.core.persistence.vector_database_helper import (
+    QueryChunker,
     VectorDocumentMigrationHelper,
     VectorDocumentStoreMigrationHelper,
-    query_chunks,
 )
 from parlant.core.persistence.document_database import (
     DocumentCollection,
@@ -40,7 +47,7 @@ from parlant.core.persistence.document_database import (
     BaseDocument,
 )
 from parlant.core.persistence.document_database_helper import DocumentStoreMigrationHelper
-from parlant.core.tags import TagId
+from parlant.core.tags import TagAssociationIndex, TagId
 
 
 TermId = NewType("TermId", str)
@@ -130,6 +137,17 @@ class GlossaryStore:
         tag_id: TagId,
     ) -> None: ...
 
+    @cached_property
+    def _changes(self) -> ChangeNotifier:
+        return ChangeNotifier()
+
+    def subscribe_to_changes(
+        self,
+        callback: Callable[[], None],
+    ) -> None:
+        """Calls `callback` whenever the stored glossary terms change (see `ChangeNotifier`)."""
+        self._changes.subscribe(callback)
+
 
 class TermDocument_v0_1_0(TypedDict, total=False):
     id: ObjectId
@@ -181,12 +199,14 @@ class GlossaryVectorStore(GlossaryStore):
 
         self._collection: VectorCollection[_TermDocument]
         self._association_collection: DocumentCollection[TermTagAssociationDocument]
+        self._tag_index = TagAssociationIndex[TermId]()
 
         self._allow_migration = allow_migration
 
         self._embedder_factory = embedder_factory
         self._embedder_type_provider = embedder_type_provider
         self._embedder: Embedder
+        self._query_chunker: QueryChunker
 
         self._lock = ReaderWriterLock()
 
@@ -212,6 +232,7 @@ class GlossaryVectorStore(GlossaryStore):
         embedder_type = await self._embedder_type_provider()
 
         self._embedder = self._embedder_factory.create_embedder(embedder_type)
+        self._query_chunker = QueryChunker(self._embedder)
 
         async with VectorDocumentStoreMigrationHelper(
             store=self,
@@ -224,6 +245,7 @@ class GlossaryVectorStore(GlossaryStore):
                 embedder_type=embedder_type,
                 document_loader=self._document_loader,
             )
+            await self._collection.create_index("id")
 
         async with DocumentStoreMigrationHelper(
             store=self,
@@ -235,6 +257,11 @@ class GlossaryVectorStore(GlossaryStore):
                 schema=TermTagAssociationDocument,
                 document_loader=self._association_document_loader,
             )
+            await self._association_collection.create_index("term_id")
+            await self._association_collection.create_index("tag_id")
+
+        for association in await self._association_collection.find(filters={}):
+            self._tag_index.add(association["term_id"], association["tag_id"])
 
         return self
 
@@ -264,9 +291,7 @@ class GlossaryVectorStore(GlossaryStore):
         )
 
     async def _deserialize(self, term_document: _TermDocument) -> Term:
-        tags = await self._association_collection.find(
-            filters={"term_id": {"$eq": term_document["id"]}}
-        )
+        tags = self._tag_index.tags_of(TermId(term_document["id"]))
 
         return Term(
             id=TermId(term_document["id"]),
@@ -274,7 +299,7 @@ class GlossaryVectorStore(GlossaryStore):
             name=term_document["name"],
             description=term_document["description"],
             synonyms=term_document["synonyms"].split(", ") if term_document["synonyms"] else [],
-            tags=[TagId(t["tag_id"]) for t in tags],
+            tags=tags,
         )
 
     @override
@@ -287,6 +312,8 @@ class GlossaryVectorStore(GlossaryStore):
         tags: Optional[Sequence[TagId]] = None,
     ) -> Term:
         async with self._lock.writer_lock:
+            self._changes.notify()
+
             creation_utc = creation_utc or datetime.now(timezone.utc)
 
             content = self._assemble_term_content(
@@ -326,6 +353,9 @@ class GlossaryVectorStore(GlossaryStore):
                         "tag_id": tag_id,
                     }
                 )
+
+                self._tag_index.add(term.id, tag_id)
+
         return term
 
     @override
@@ -348,6 +378,8 @@ class GlossaryVectorStore(GlossaryStore):
         params: TermUpdateParams,
     ) -> Term:
         async with self._lock.writer_lock:
+            self._changes.notify()
+
             document_to_update = await self._collection.find_one(filters={"id": {"$eq": term_id}})
 
             if not document_to_update:
@@ -387,38 +419,24 @@ class GlossaryVectorStore(GlossaryStore):
         self,
         tags: Optional[Sequence[TagId]] = None,
     ) -> Sequence[Term]:
-        filters: Where = {}
-
         async with self._lock.reader_lock:
-            if tags is not None:
-                if len(tags) == 0:
-                    term_ids = {
-                        doc["term_id"]
-                        for doc in await self._association_collection.find(filters={})
-                    }
-                    if not term_ids:
-                        filters = {}
-                    elif len(term_ids) == 1:
-                        filters = {"id": {"$ne": term_ids.pop()}}
-                    else:
-                        filters = {"$and": [{"id": {"$ne": id}} for id in term_ids]}
-
-                else:
-                    tag_filters: Where = {"$or": [{"tag_id": {"$eq": tag}} for tag in tags]}
-                    tag_associations = await self._association_collection.find(filters=tag_filters)
-                    term_ids = {assoc["term_id"] for assoc in tag_associations}
-
-                    if not term_ids:
-                        return []
-
-                    if len(term_ids) == 1:
-                        filters = {"id": {"$eq": term_ids.pop()}}
-                    else:
-                        filters = {"$or": [{"id": {"$eq": id}} for id in term_ids]}
-
-            return [
-                await self._deserialize(d) for d in await self._collection.find(filters=filters)
-            ]
+            if tags is None:
+                documents = await self._collection.find(filters={})
+            elif len(tags) == 0:
+                documents = [
+                    d
+                    for d in await self._collection.find(filters={})
+                    if not self._tag_index.is_tagged(TermId(d["id"]))
+                ]
+            else:
+                term_ids = self._tag_index.entities_with_any_of(tags)
+
+                if not term_ids:
+                    return []
+
+                documents = await self._collection.find(filters={"id": {"$in": sorted(term_ids)}})
+
+            return [await self._deserialize(d) for d in documents]
 
     @override
     async def delete_term(
@@ -426,6 +444,8 @@ class GlossaryVectorStore(GlossaryStore):
         term_id: TermId,
     ) -> None:
         async with self._lock.writer_lock:
+            self._changes.notify()
+
             term_document = await self._collection.find_one(filters={"id": {"$eq": term_id}})
             term_tag_associations = await self._association_collection.find(
                 filters={"term_id": {"$eq": term_id}}
@@ -440,6 +460,8 @@ class GlossaryVectorStore(GlossaryStore):
                     filters={"id": {"$eq": tag_association["id"]}}
                 )
 
+            self._tag_index.remove_entity(term_id)
+
     @override
     async def find_relevant_terms(
         self,
@@ -451,22 +473,20 @@ class GlossaryVectorStore(GlossaryStore):
             return []
 
         async with self._lock.reader_lock:
-            queries = await query_chunks(query, self._embedder)
+            queries = await self._query_chunker.chunk(query)
 
             filters: Where = {"id": {"$in": [str(t.id) for t in available_terms]}}
 
-            tasks = [
-                self._collection.find_similar_documents(
-                    filters=filters,
-                    query=q,
-                    k=max_terms,
-                )
-                for q in queries
-            ]
+            results = await self._collection.find_similar_documents_batch(
+                filters=filters,
+                queries=queries,
+                k=max_terms,
+            )
+
+        all_results = sorted(chain.from_iterable(results), key=lambda r: r.distance)
 
-        all_results = chain.from_iterable(await async_utils.safe_gather(*tasks))
-        unique_results = list(set(all_results))
-        top_results = sorted(unique_results, key=lambda r: r.distance)[:max_terms]
+        # Keep each term's best match across all query chunks
+        top_results = list(dict.fromkeys(all_results))[:max_terms]
 
         return [await self._deserialize(r.document) for r in top_results]
 
@@ -492,6 +512,8 @@ class GlossaryVectorStore(GlossaryStore):
         creation_utc: Optional[datetime] = None,
     ) -> bool:
         async with self._lock.writer_lock:
+            self._changes.notify()
+
             term = await self.read_term(term_id)
 
             if tag_id in term.tags:
@@ -511,6 +533,8 @@ class GlossaryVectorStore(GlossaryStore):
 
             _ = await self._association_collection.insert_one(document=association_document)
 
+            self._tag_index.add(term_id, tag_id)
+
             term_document = await self._collection.find_one({"id": {"$eq": term_id}})
 
         if not term_document:
@@ -525,6 +549,8 @@ class GlossaryVectorStore(GlossaryStore):
         tag_id: TagId,
     ) -> None:
         async with self._lock.writer_lock:
+            self._changes.notify()
+
             delete_result = await self._association_collection.delete_one(
                 {
                     "term_id": {"$eq": term_id},
@@ -535,6 +561,8 @@ class GlossaryVectorStore(GlossaryStore):
             if delete_result.deleted_count == 0:
                 raise ItemNotFoundError(item_id=UniqueId(tag_id))
 
+            self._tag_index.remove(term_id, tag_id)
+
             term_document = await self._collection.find_one({"id": {"$eq": term_id}})
 
         if not term_document:
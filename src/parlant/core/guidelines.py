@@ -12,14 +12,17 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from typing import Mapping, NewType, Optional, Sequence, cast
+from typing import Callable, Iterable, Mapping, NewType, Optional, Sequence, cast
 from typing_extensions import override, TypedDict, Self
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from datetime import datetime, timezone
+from functools import cached_property
+from itertools import count
 
 from parlant.core.async_utils import ReaderWriterLock
 from parlant.core.common import (
+    ChangeNotifier,
     ItemNotFoundError,
     JSONSerializable,
     UniqueId,
@@ -37,7 +40,7 @@ from parlant.core.persistence.document_database_helper import (
     DocumentStoreMigrationHelper,
     DocumentMigrationHelper,
 )
-from parlant.core.tags import TagId
+from parlant.core.tags import TagAssociationIndex, TagId
 
 GuidelineId = NewType("GuidelineId", str)
 
@@ -154,6 +157,17 @@ class GuidelineStore(ABC):
         key: str,
     ) -> Guideline: ...
 
+    @cached_property
+    def _changes(self) -> ChangeNotifier:
+        return ChangeNotifier()
+
+    def subscribe_to_changes(
+        self,
+        callback: Callable[[], None],
+    ) -> None:
+        """Calls `callback` whenever the stored guidelines change (see `ChangeNotifier`)."""
+        self._changes.subscribe(callback)
+
 
 class GuidelineDocument_v0_1_0(TypedDict, total=False):
     id: ObjectId
@@ -229,6 +243,16 @@ class GuidelineDocumentStore(GuidelineStore):
         self._collection: DocumentCollection[GuidelineDocument]
         self._tag_association_collection: DocumentCollection[GuidelineTagAssociationDocument]
 
+        # In-memory mirrors of both collections, so that listing guidelines
+        # by tags doesn't need to filter every document against every tagged id
+        self._documents_by_id: dict[GuidelineId, GuidelineDocument] = {}
+        self._tag_index = TagAssociationIndex[GuidelineId]()
+
+        # The (insertion) position of each guideline, so that guidelines
+        # listed by tags keep the collection's order without scanning it
+        self._positions: dict[GuidelineId, int] = {}
+        self._position_counter = count()
+
         self._allow_migration = allow_migration
         self._lock = ReaderWriterLock()
 
@@ -288,12 +312,22 @@ class GuidelineDocumentStore(GuidelineStore):
                 schema=GuidelineDocument,
                 document_loader=self._document_loader,
             )
+            await self._collection.create_index("id")
 
             self._tag_association_collection = await self._database.get_or_create_collection(
                 name="guideline_tag_associations",
                 schema=GuidelineTagAssociationDocument,
                 document_loader=self._association_document_loader,
             )
+            await self._tag_association_collection.create_index("guideline_id")
+            await self._tag_association_collection.create_index("tag_id")
+
+        for doc in await self._collection.find(filters={}):
+            self._documents_by_id[GuidelineId(doc["id"])] = doc
+            self._positions[GuidelineId(doc["id"])] = next(self._position_counter)
+
+        for association in await self._tag_association_collection.find(filters={}):
+            self._tag_index.add(association["guideline_id"], association["tag_id"])
 
         return self
 
@@ -323,12 +357,7 @@ class GuidelineDocumentStore(GuidelineStore):
         self,
         guideline_document: GuidelineDocument,
     ) -> Guideline:
-        tag_ids = [
-            d["tag_id"]
-            for d in await self._tag_association_collection.find(
-                {"guideline_id": {"$eq": guideline_document["id"]}}
-            )
-        ]
+        tag_ids = self._tag_index.tags_of(GuidelineId(guideline_document["id"]))
 
         return Guideline(
             id=GuidelineId(guideline_document["id"]),
@@ -352,6 +381,8 @@ class GuidelineDocumentStore(GuidelineStore):
         tags: Optional[Sequence[TagId]] = None,
     ) -> Guideline:
         async with self._lock.writer_lock:
+            self._changes.notify()
+
             creation_utc = creation_utc or datetime.now(timezone.utc)
 
             guideline_checksum = md5_checksum(f"{condition}{action or ''}{enabled}{metadata}")
@@ -368,11 +399,12 @@ class GuidelineDocumentStore(GuidelineStore):
                 metadata=metadata,
             )
 
-            await self._collection.insert_one(
-                document=self._serialize(
-                    guideline=guideline,
-                )
-            )
+            guideline_document = self._serialize(guideline=guideline)
+
+            await self._collection.insert_one(document=guideline_document)
+
+            self._documents_by_id[guideline.id] = guideline_document
+            self._positions[guideline.id] = next(self._position_counter)
 
             for tag_id in tags or []:
                 tag_checksum = md5_checksum(f"{guideline.id}{tag_id}")
@@ -387,6 +419,8 @@ class GuidelineDocumentStore(GuidelineStore):
                     }
                 )
 
+                self._tag_index.add(guideline.id, tag_id)
+
         return guideline
 
     @override
@@ -394,35 +428,31 @@ class GuidelineDocumentStore(GuidelineStore):
         self,
         tags: Optional[Sequence[TagId]] = None,
     ) -> Sequence[Guideline]:
-        filters: Where = {}
-
         async with self._lock.reader_lock:
-            if tags is not None:
-                if len(tags) == 0:
-                    guideline_ids = {
-                        doc["guideline_id"]
-                        for doc in await self._tag_association_collection.find(filters={})
-                    }
-                    filters = (
-                        {"$and": [{"id": {"$ne": id}} for id in guideline_ids]}
-                        if guideline_ids
-                        else {}
-                    )
-                else:
-                    tag_filters: Where = {"$or": [{"tag_id": {"$eq": tag}} for tag in tags]}
-                    tag_associations = await self._tag_association_collection.find(
-                        filters=tag_filters
-                    )
-                    guideline_ids = {assoc["guideline_id"] for assoc in tag_associations}
-
-                    if not guideline_ids:
-                        return []
-
-                    filters = {"$or": [{"id": {"$eq": id}} for id in guideline_ids]}
-
-            return [
-                await self._deserialize(d) for d in await self._collection.find(filters=filters)
-            ]
+            documents: Iterable[GuidelineDocument]
+
+            if tags is None:
+                documents = self._documents_by_id.values()
+            elif len(tags) == 0:
+                documents = (
+                    d
+                    for id, d in self._documents_by_id.items()
+                    if not self._tag_index.is_tagged(id)
+                )
+            else:
+                guideline_ids = [
+                    id
+                    for id in self._tag_index.entities_with_any_of(tags)
+                    if id in self._documents_by_id
+                ]
+
+                # Keep the collection's (insertion) order
+                documents = (
+                    self._documents_by_id[id]
+                    for id in sorted(guideline_ids, key=self._positions.__getitem__)
+                )
+
+            return [await self._deserialize(d) for d in documents]
 
     @override
     async def read_guideline(
@@ -447,12 +477,17 @@ class GuidelineDocumentStore(GuidelineStore):
         guideline_id: GuidelineId,
     ) -> None:
         async with self._lock.writer_lock:
+            self._changes.notify()
+
             result = await self._collection.delete_one(
                 filters={
                     "id": {"$eq": guideline_id},
                 }
             )
 
+            self._documents_by_id.pop(guideline_id, None)
+            self._positions.pop(guideline_id, None)
+
             for doc in await self._tag_association_collection.find(
                 filters={
                     "guideline_id": {"$eq": guideline_id},
@@ -462,6 +497,8 @@ class GuidelineDocumentStore(GuidelineStore):
                     filters={"id": {"$eq": doc["id"]}}
                 )
 
+            self._tag_index.remove_entity(guideline_id)
+
         if not result.deleted_document:
             raise ItemNotFoundError(item_id=UniqueId(guideline_id))
 
@@ -472,6 +509,8 @@ class GuidelineDocumentStore(GuidelineStore):
         params: GuidelineUpdateParams,
     ) -> Guideline:
         async with self._lock.writer_lock:
+            self._changes.notify()
+
             guideline_document = GuidelineDocument(
                 {
                     **({"condition": params["condition"]} if "condition" in params else {}),
@@ -485,7 +524,9 @@ class GuidelineDocumentStore(GuidelineStore):
                 params=guideline_document,
             )
 
-        assert result.updated_document
+            assert result.updated_document
+
+            self._documents_by_id[guideline_id] = result.updated_document
 
         return await self._deserialize(guideline_document=result.updated_document)
 
@@ -521,6 +562,8 @@ class GuidelineDocumentStore(GuidelineStore):
         creation_utc: Optional[datetime] = None,
     ) -> bool:
         async with self._lock.writer_lock:
+            self._changes.notify()
+
             guideline = await self.read_guideline(guideline_id)
 
             if tag_id in guideline.tags:
@@ -540,6 +583,8 @@ class GuidelineDocumentStore(GuidelineStore):
 
             _ = await self._tag_association_collection.insert_one(document=association_document)
 
+            self._tag_index.add(guideline_id, tag_id)
+
             guideline_document = await self._collection.find_one({"id": {"$eq": guideline_id}})
 
         if not guideline_document:
@@ -554,6 +599,8 @@ class GuidelineDocumentStore(GuidelineStore):
         tag_id: TagId,
     ) -> None:
         async with self._lock.writer_lock:
+            self._changes.notify()
+
             delete_result = await self._tag_association_collection.delete_one(
                 {
                     "guideline_id": {"$eq": guideline_id},
@@ -564,6 +611,8 @@ class GuidelineDocumentStore(GuidelineStore):
             if delete_result.deleted_count == 0:
                 raise ItemNotFoundError(item_id=UniqueId(tag_id))
 
+            self._tag_index.remove(guideline_id, tag_id)
+
             guideline_document = await self._collection.find_one({"id": {"$eq": guideline_id}})
 
         if not guideline_document:
@@ -577,6 +626,8 @@ class GuidelineDocumentStore(GuidelineStore):
         value: JSONSerializable,
     ) -> Guideline:
         async with self._lock.writer_lock:
+            self._changes.notify()
+
             guideline_document = await self._collection.find_one({"id": {"$eq": guideline_id}})
 
             if not guideline_document:
@@ -591,7 +642,9 @@ class GuidelineDocumentStore(GuidelineStore):
                 },
             )
 
-        assert result.updated_document
+            assert result.updated_document
+
+            self._documents_by_id[guideline_id] = result.updated_document
 
         return await self._deserialize(guideline_document=result.updated_document)
 
@@ -602,6 +655,8 @@ class GuidelineDocumentStore(GuidelineStore):
         key: str,
     ) -> Guideline:
         async with self._lock.writer_lock:
+            self._changes.notify()
+
             guideline_document = await self._collection.find_one({"id": {"$eq": guideline_id}})
 
             if not guideline_document:
@@ -616,6 +671,8 @@ class GuidelineDocumentStore(GuidelineStore):
                 },
             )
 
-        assert result.updated_document
+            assert result.updated_document
+
+            self._documents_by_id[guideline_id] = result.updated_document
 
         return await self._deserialize(guideline_document=result.updated_document)
@@ -15,13 +15,21 @@
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from datetime import datetime, timezone
+from functools import cached_property
 from itertools import chain
 from typing import Awaitable, Callable, Mapping, NewType, Optional, Sequence, cast
 from typing_extensions import override, TypedDict, Self, Required
 
-from parlant.core.async_utils import ReaderWriterLock, safe_gather
+from parlant.core.async_utils import ReaderWriterLock
 from parlant.core.common import JSONSerializable, md5_checksum
-from parlant.core.common import ItemNotFoundError, UniqueId, Version, IdGenerator, to_json_dict
+from parlant.core.common import (
+    ChangeNotifier,
+    ItemNotFoundError,
+    UniqueId,
+    Version,
+    IdGenerator,
+    to_json_dict,
+)
 from parlant.core.guidelines import GuidelineId
 from parlant.core.nlp.embedding import Embedder, EmbedderFactory
 from parlant.core.persistence.common import (
@@ -43,11 +51,11 @@ from parlant.core.persistence.vector_database import (
     BaseDocument as VectorDocument,
 )
 from parlant.core.persistence.vector_database_helper import (
+    QueryChunker,
     VectorDocumentMigrationHelper,
     VectorDocumentStoreMigrationHelper,
-    query_chunks,
 )
-from parlant.core.tags import TagId
+from parlant.core.tags import TagAssociationIndex, TagId
 from parlant.core.tools import ToolId
 
 JourneyId = NewType("JourneyId", str)
@@ -286,6 +294,17 @@ class JourneyStore(ABC):
         key: str,
     ) -> JourneyEdge: ...
 
+    @cached_property
+    def _changes(self) -> ChangeNotifier:
+        return ChangeNotifier()
+
+    def subscribe_to_changes(
+        self,
+        callback: Callable[[], None],
+    ) -> None:
+        """Calls `callback` whenever the stored journeys change (see `ChangeNotifier`)."""
+        self._changes.subscribe(callback)
+
 
 class JourneyDocument_v0_1_0(TypedDict, total=False):
     id: ObjectId
@@ -382,6 +401,7 @@ class JourneyVectorStore(JourneyStore):
         self._edge_association_collection: DocumentCollection[JourneyEdgeAssociationDocument]
 
         self._tag_association_collection: DocumentCollection[JourneyTagAssociationDocument]
+        self._tag_index = TagAssociationIndex[JourneyId]()
         self._condition_association_collection: DocumentCollection[
             JourneyConditionAssociationDocument
         ]
@@ -391,6 +411,7 @@ class JourneyVectorStore(JourneyStore):
         self._embedder_factory = embedder_factory
         self._embedder_type_provider = embedder_type_provider
         self._embedder: Embedder
+        self._query_chunker: QueryChunker
 
         self._lock = ReaderWriterLock()
 
@@ -485,6 +506,7 @@ class JourneyVectorStore(JourneyStore):
     async def __aenter__(self) -> Self:
         embedder_type = await self._embedder_type_provider()
         self._embedder = self._embedder_factory.create_embedder(embedder_type)
+        self._query_chunker = QueryChunker(self._embedder)
 
         async with VectorDocumentStoreMigrationHelper(
             store=self,
@@ -508,24 +530,30 @@ class JourneyVectorStore(JourneyStore):
                 schema=JourneyDocument,
                 document_loader=self._document_loader,
             )
+            await self._collection.create_index("id")
 
             self._node_association_collection = await self._document_db.get_or_create_collection(
                 name="journey_nodes",
                 schema=JourneyNodeAssociationDocument,
                 document_loader=self._node_association_loader,
             )
+            await self._node_association_collection.create_index("node_id")
+            await self._node_association_collection.create_index("journey_id")
 
             self._edge_association_collection = await self._document_db.get_or_create_collection(
                 name="journey_edges",
                 schema=JourneyEdgeAssociationDocument,
                 document_loader=self._edge_association_loader,
             )
+            await self._edge_association_collection.create_index("journey_id")
 
             self._tag_association_collection = await self._document_db.get_or_create_collection(
                 name="journey_tags",
                 schema=JourneyTagAssociationDocument,
                 document_loader=self._tag_association_loader,
             )
+            await self._tag_association_collection.create_index("journey_id")
+            await self._tag_association_collection.create_index("tag_id")
 
             self._condition_association_collection = (
                 await self._document_db.get_or_create_collection(
@@ -535,6 +563,9 @@ class JourneyVectorStore(JourneyStore):
                 )
             )
 
+        for association in await self._tag_association_collection.find(filters={}):
+            self._tag_index.add(association["journey_id"], association["tag_id"])
+
         return self
 
     async def __aexit__(
@@ -559,10 +590,7 @@ class JourneyVectorStore(JourneyStore):
         )
 
     async def _deserialize(self, doc: JourneyDocument) -> Journey:
-        tags = [
-            d["tag_id"]
-            for d in await self._tag_association_collection.find({"journey_id": {"$eq": doc["id"]}})
-        ]
+        tags = self._tag_index.tags_of(JourneyId(doc["id"]))
 
         conditions = [
             d["condition"]
@@ -655,6 +683,8 @@ class JourneyVectorStore(JourneyStore):
         tags: Optional[Sequence[TagId]] = None,
     ) -> Journey:
         async with self._lock.writer_lock:
+            self._changes.notify()
+
             creation_utc = creation_utc or datetime.now(timezone.utc)
 
             journey_checksum = md5_checksum(f"{title}{description}{conditions}")
@@ -715,6 +745,8 @@ class JourneyVectorStore(JourneyStore):
                     }
                 )
 
+                self._tag_index.add(journey.id, tag_id)
+
             for condition in conditions:
                 condition_checksum = md5_checksum(f"{journey.id}{condition}")
 
@@ -747,6 +779,8 @@ class JourneyVectorStore(JourneyStore):
         params: JourneyUpdateParams,
     ) -> Journey:
         async with self._lock.writer_lock:
+            self._changes.notify()
+
             doc = await self._collection.find_one({"id": {"$eq": journey_id}})
 
             if not doc:
@@ -787,42 +821,11 @@ class JourneyVectorStore(JourneyStore):
         tags: Optional[Sequence[TagId]] = None,
         condition: Optional[GuidelineId] = None,
     ) -> Sequence[Journey]:
-        filters: Where = {}
-        journey_ids: set[JourneyId] = set()
-        condition_journey_ids: set[JourneyId] = set()
+        journey_ids: Optional[set[JourneyId]] = None
 
         async with self._lock.reader_lock:
-            if tags is not None:
-                if len(tags) == 0:
-                    journey_ids = {
-                        doc["journey_id"]
-                        for doc in await self._tag_association_collection.find(filters={})
-                    }
-
-                    if not journey_ids:
-                        filters = {}
-
-                    elif len(journey_ids) == 1:
-                        filters = {"id": {"$ne": journey_ids.pop()}}
-
-                    else:
-                        filters = {"$and": [{"id": {"$ne": id}} for id in journey_ids]}
-
-                else:
-                    tag_filters: Where = {"$or": [{"tag_id": {"$eq": tag}} for tag in tags]}
-                    tag_associations = await self._tag_association_collection.find(
-                        filters=tag_filters
-                    )
-                    journey_ids = {assoc["journey_id"] for assoc in tag_associations}
-
-                    if not journey_ids:
-                        return []
-
-                    if len(journey_ids) == 1:
-                        filters = {"id": {"$eq": journey_ids.pop()}}
-
-                    else:
-                        filters = {"$or": [{"id": {"$eq": id}} for id in journey_ids]}
+            if tags:
+                journey_ids = self._tag_index.entities_with_any_of(tags)
 
             if condition is not None:
                 condition_journey_ids = {
@@ -832,17 +835,26 @@ class JourneyVectorStore(JourneyStore):
                     )
                 }
 
-                if not journey_ids:
+                if journey_ids is None:
                     journey_ids = condition_journey_ids
                 else:
                     journey_ids.intersection_update(condition_journey_ids)
 
-            if journey_ids:
-                filters = {"$or": [{"id": {"$eq": id}} for id in journey_ids]}
+            if journey_ids is None:
+                documents = await self._collection.find(filters={})
+            elif not journey_ids:
+                return []
+            else:
+                documents = await self._collection.find(
+                    filters={"id": {"$in": sorted(journey_ids)}}
+                )
+
+            if tags is not None and len(tags) == 0:
+                documents = [
+                    d for d in documents if not self._tag_index.is_tagged(JourneyId(d["id"]))
+                ]
 
-            return [
-                await self._deserialize(d) for d in await self._collection.find(filters=filters)
-            ]
+            return [await self._deserialize(d) for d in documents]
 
     @override
     async def delete_journey(
@@ -850,6 +862,8 @@ class JourneyVectorStore(JourneyStore):
         journey_id: JourneyId,
     ) -> None:
         async with self._lock.writer_lock:
+            self._changes.notify()
+
             for n_doc in await self._node_association_collection.find(
                 filters={
                     "journey_id": {"$eq": journey_id},
@@ -886,6 +900,8 @@ class JourneyVectorStore(JourneyStore):
                     filters={"id": {"$eq": t_doc["id"]}}
                 )
 
+            self._tag_index.remove_entity(journey_id)
+
             result = await self._collection.delete_one({"id": {"$eq": journey_id}})
 
         if result.deleted_count == 0:
@@ -898,6 +914,8 @@ class JourneyVectorStore(JourneyStore):
         condition: GuidelineId,
     ) -> bool:
         async with self._lock.writer_lock:
+            self._changes.notify()
+
             journey = await self.read_journey(journey_id)
 
             if condition in journey.conditions:
@@ -924,6 +942,8 @@ class JourneyVectorStore(JourneyStore):
         condition: GuidelineId,
     ) -> bool:
         async with self._lock.writer_lock:
+            self._changes.notify()
+
             await self._condition_association_collection.delete_one(
                 filters={
                     "journey_id": {"$eq": journey_id},
@@ -943,6 +963,8 @@ class JourneyVectorStore(JourneyStore):
         creation_utc = creation_utc or datetime.now(timezone.utc)
 
         async with self._lock.writer_lock:
+            self._changes.notify()
+
             journey = await self.read_journey(journey_id)
 
             if tag_id in journey.tags:
@@ -960,6 +982,8 @@ class JourneyVectorStore(JourneyStore):
 
             _ = await self._tag_association_collection.insert_one(document=association_document)
 
+            self._tag_index.add(journey_id, tag_id)
+
         return True
 
     @override
@@ -969,6 +993,8 @@ class JourneyVectorStore(JourneyStore):
         tag_id: TagId,
     ) -> None:
         async with self._lock.writer_lock:
+            self._changes.notify()
+
             delete_result = await self._tag_association_collection.delete_one(
                 {
                     "journey_id": {"$eq": journey_id},
@@ -979,6 +1005,8 @@ class JourneyVectorStore(JourneyStore):
             if delete_result.deleted_count == 0:
                 raise ItemNotFoundError(item_id=UniqueId(tag_id))
 
+            self._tag_index.remove(journey_id, tag_id)
+
     @override
     async def find_relevant_journeys(
         self,
@@ -990,27 +1018,33 @@ class JourneyVectorStore(JourneyStore):
             return []
 
         async with self._lock.reader_lock:
-            queries = await query_chunks(query, self._embedder)
+            queries = await self._query_chunker.chunk(query)
             filters: Where = {"journey_id": {"$in": [str(j.id) for j in available_journeys]}}
 
-            tasks = [
-                self._vector_collection.find_similar_documents(
-                    filters=filters,
-                    query=q,
-                    k=max_journeys,
-                )
-                for q in queries
-            ]
+            results = await self._vector_collection.find_similar_documents_batch(
+                filters=filters,
+                queries=queries,
+                k=max_journeys,
+            )
 
-        all_results = chain.from_iterable(await safe_gather(*tasks))
-        unique_results = list(set(all_results))
-        top_vectors = sorted(unique_results, key=lambda r: r.distance)[:max_journeys]
+        all_results = sorted(chain.from_iterable(results), key=lambda r: r.distance)
 
-        return [
-            await self._deserialize(doc)
+        # Keep each journey's best match across all query chunks, in order of relevance
+        top_journey_ids = list(dict.fromkeys(r.document["journey_id"] for r in all_results))[
+            :max_journeys
+        ]
+
+        documents = {
+            JourneyId(doc["id"]): doc
             for doc in await self._collection.find(
-                filters={"id": {"$in": [r.document["journey_id"] for r in top_vectors]}}
+                filters={"id": {"$in": [str(id) for id in top_journey_ids]}}
             )
+        }
+
+        return [
+            await self._deserialize(documents[journey_id])
+            for journey_id in top_journey_ids
+            if journey_id in documents
         ]
 
     @override
@@ -1026,6 +1060,8 @@ class JourneyVectorStore(JourneyStore):
         node_checksum = md5_checksum(f"{journey_id}{action}{tools}")
 
         async with self._lock.writer_lock:
+            self._changes.notify()
+
             node = JourneyNode(
                 id=JourneyNodeId(self._id_generator.generate(node_checksum)),
                 creation_utc=creation_utc,
@@ -1060,6 +1096,8 @@ class JourneyVectorStore(JourneyStore):
         params: JourneyNodeUpdateParams,
     ) -> JourneyNode:
         async with self._lock.writer_lock:
+            self._changes.notify()
+
             doc = await self._node_association_collection.find_one({"node_id": {"$eq": node_id}})
 
             if not doc:
@@ -1082,6 +1120,8 @@ class JourneyVectorStore(JourneyStore):
         node_id: JourneyNodeId,
     ) -> None:
         async with self._lock.writer_lock:
+            self._changes.notify()
+
             node_doc = await self._node_association_collection.find_one(
                 {"node_id": {"$eq": node_id}}
             )
@@ -1134,6 +1174,8 @@ class JourneyVectorStore(JourneyStore):
         value: JSONSerializable,
     ) -> JourneyNode:
         async with self._lock.writer_lock:
+            self._changes.notify()
+
             doc = await self._node_association_collection.find_one({"node_id": {"$eq": node_id}})
 
             if not doc:
@@ -1159,6 +1201,8 @@ class JourneyVectorStore(JourneyStore):
         key: str,
     ) -> JourneyNode:
         async with self._lock.writer_lock:
+            self._changes.notify()
+
             doc = await self._node_association_collection.find_one({"node_id": {"$eq": node_id}})
 
             if not doc:
@@ -1186,6 +1230,8 @@ class JourneyVectorStore(JourneyStore):
         condition: Optional[str] = None,
     ) -> JourneyEdge:
         async with self._lock.writer_lock:
+            self._changes.notify()
+
             edge_checksum = md5_checksum(f"{journey_id}{source}{target}{condition}")
 
             edge = JourneyEdge(
@@ -1223,6 +1269,8 @@ class JourneyVectorStore(JourneyStore):
         params: JourneyEdgeUpdateParams,
     ) -> JourneyEdge:
         async with self._lock.writer_lock:
+            self._changes.notify()
+
             doc = await self._edge_association_collection.find_one({"id": {"$eq": edge_id}})
 
             if not doc:
@@ -1272,6 +1320,8 @@ class JourneyVectorStore(JourneyStore):
         edge_id: JourneyEdgeId,
     ) -> None:
         async with self._lock.writer_lock:
+            self._changes.notify()
+
             result = await self._edge_association_collection.delete_one(
                 filters={"id": {"$eq": edge_id}}
             )
@@ -1287,6 +1337,8 @@ class JourneyVectorStore(JourneyStore):
         value: JSONSerializable,
     ) -> JourneyEdge:
         async with self._lock.writer_lock:
+            self._changes.notify()
+
             doc = await self._edge_association_collection.find_one({"id": {"$eq": edge_id}})
 
             if not doc:
@@ -1312,6 +1364,8 @@ class JourneyVectorStore(JourneyStore):
         key: str,
     ) -> JourneyEdge:
         async with self._lock.writer_lock:
+            self._changes.notify()
+
             doc = await self._edge_association_collection.find_one({"id": {"$eq": edge_id}})
 
             if not doc:
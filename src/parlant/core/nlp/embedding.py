@@ -13,11 +13,15 @@
 # limitations under the License.
 
 from abc import ABC, abstractmethod
+import asyncio
+import base64
+from collections import OrderedDict
 from collections.abc import Mapping
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 import hashlib
 import json
 from lagom import Container
+import numpy as np
 from typing import Any, Callable, Optional, Sequence, TypedDict, cast
 from typing_extensions import override
 
@@ -70,12 +74,20 @@ class EmbedderFactory:
 
     def __init__(self, container: Container):
         self._container = container
+        self._coalescing_embedders: dict[type[Embedder], CoalescingEmbedder] = {}
 
     def create_embedder(self, embedder_type: type[Embedder]) -> Embedder:
         if embedder_type == NoOpEmbedder:
             return NoOpEmbedder()
-        else:
-            return self._container[embedder_type]
+
+        # All users of an embedder type share the same coalescer,
+        # so that their concurrent requests can be sent together
+        if embedder_type not in self._coalescing_embedders:
+            self._coalescing_embedders[embedder_type] = CoalescingEmbedder(
+                self._container[embedder_type]
+            )
+
+        return self._coalescing_embedders[embedder_type]
 
 
 class NoOpEmbedder(Embedder):
@@ -112,10 +124,186 @@ class NoOpEmbedder(Embedder):
         return 1536  # Standard embedding dimension
 
 
+@dataclass
+class _EmbeddingRequest:
+    texts: list[str]
+    vectors: asyncio.Future[Sequence[Sequence[float]]]
+
+
+@dataclass
+class _PendingEmbeddings:
+    hints: Mapping[str, Any]
+    requests: list[_EmbeddingRequest] = field(default_factory=list)
+    texts: dict[str, None] = field(default_factory=dict)
+    token_count: int = 0
+    flush_handle: Optional[asyncio.TimerHandle] = None
+
+
+class CoalescingEmbedder(Embedder):
+    """Coalesces concurrent embedding requests into shared calls to a wrapped embedder.
+
+    Requests made within a short window of each other (and with the same hints) are
+    de-duplicated and sent in a single call, which is sent earlier if their texts
+    reach (about) the embedder's max_tokens. Each request then gets back its own vectors.
+    If the shared call fails, each request is retried on its own, so that a failure
+    only reaches the requests whose texts cause it.
+    """
+
+    def __init__(self, embedder: Embedder, window: float = 0.005) -> None:
+        self.wrapped = embedder
+
+        self._window = window
+        self._pending: dict[str, _PendingEmbeddings] = {}
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    @override
+    async def embed(
+        self,
+        texts: list[str],
+        hints: Mapping[str, Any] = {},
+    ) -> EmbeddingResult:
+        if not texts:
+            return EmbeddingResult(vectors=[])
+
+        key = json.dumps(hints, sort_keys=True, default=str)
+        loop = asyncio.get_running_loop()
+
+        if (batch := self._pending.get(key)) is not None:
+            # Rather than growing the pending call past max_tokens, send it as is
+            if (
+                batch.token_count + self._estimate_token_count(batch, texts)
+                > self.wrapped.max_tokens
+            ):
+                self._flush(key, batch)
+                batch = None
+
+        if batch is None:
+            batch = _PendingEmbeddings(hints=hints)
+            batch.flush_handle = loop.call_later(self._window, self._flush, key, batch)
+
+            self._pending[key] = batch
+
+        request = _EmbeddingRequest(texts=texts, vectors=loop.create_future())
+        batch.requests.append(request)
+
+        batch.token_count += self._estimate_token_count(batch, texts)
+        batch.texts.update(dict.fromkeys(texts))
+
+        if batch.token_count >= self.wrapped.max_tokens:
+            self._flush(key, batch)
+
+        return EmbeddingResult(vectors=await asyncio.shield(request.vectors))
+
+    def _estimate_token_count(self, batch: _PendingEmbeddings, texts: Sequence[str]) -> int:
+        return sum(
+            _estimate_token_count(text) for text in dict.fromkeys(texts) if text not in batch.texts
+        )
+
+    def _flush(self, key: str, batch: _PendingEmbeddings) -> None:
+        if self._pending.get(key) is not batch:
+            return
+
+        del self._pending[key]
+
+        if batch.flush_handle:
+            batch.flush_handle.cancel()
+
+        task = asyncio.create_task(self._embed_batch(batch))
+
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _embed_batch(self, batch: _PendingEmbeddings) -> None:
+        try:
+            await self._resolve_batch(batch)
+        except Exception as exc:
+            for request in batch.requests:
+                if not request.vectors.done():
+                    request.vectors.set_exception(exc)
+        finally:
+            # Whatever else went wrong (e.g., cancellation), no request is left waiting
+            for request in batch.requests:
+                if not request.vectors.done():
+                    request.vectors.cancel()
+
+    async def _resolve_batch(self, batch: _PendingEmbeddings) -> None:
+        texts = list(batch.texts)
+
+        try:
+            vectors = await self._embed_texts(texts, batch.hints)
+        except Exception as exc:
+            if len(batch.requests) == 1:
+                batch.requests[0].vectors.set_exception(exc)
+            else:
+                await asyncio.gather(
+                    *(self._embed_request(request, batch.hints) for request in batch.requests),
+                    return_exceptions=True,
+                )
+            return
+
+        vectors_by_text = dict(zip(texts, vectors))
+
+        for request in batch.requests:
+            request.vectors.set_result([vectors_by_text[t] for t in request.texts])
+
+    async def _embed_request(self, request: _EmbeddingRequest, hints: Mapping[str, Any]) -> None:
+        try:
+            request.vectors.set_result(await self._embed_texts(request.texts, hints))
+        except Exception as exc:
+            request.vectors.set_exception(exc)
+
+    async def _embed_texts(
+        self,
+        texts: list[str],
+        hints: Mapping[str, Any],
+    ) -> Sequence[Sequence[float]]:
+        result = await self.wrapped.embed(texts, hints)
+
+        if len(result.vectors) != len(texts):
+            raise ValueError(
+                f"Embedder '{self.wrapped.id}' returned {len(result.vectors)} vectors "
+                f"for {len(texts)} texts"
+            )
+
+        return result.vectors
+
+    @property
+    @override
+    def id(self) -> str:
+        return self.wrapped.id
+
+    @property
+    @override
+    def max_tokens(self) -> int:
+        return self.wrapped.max_tokens
+
+    @property
+    @override
+    def tokenizer(self) -> EstimatingTokenizer:
+        return self.wrapped.tokenizer
+
+    @property
+    @override
+    def dimensions(self) -> int:
+        return self.wrapped.dimensions
+
+
+def _estimate_token_count(text: str) -> int:
+    # Some tokenizers call their provider, which would cost more than it
+    # saves here, so this uses the common ~4 characters per token ratio
+    return len(text) // 4 + 1
+
+
+def _embedder_type(embedder: Embedder) -> type[Embedder]:
+    if isinstance(embedder, CoalescingEmbedder):
+        return _embedder_type(embedder.wrapped)
+    return type(embedder)
+
+
 class EmbedderResultDocument(TypedDict, total=False):
     id: ObjectId
     version: Version.String
-    vectors: Sequence[Sequence[float]]
+    vector: str
 
 
 class EmbeddingCache(ABC):
@@ -140,24 +328,106 @@ class EmbeddingCache(ABC):
     ) -> None:
         pass
 
+    async def get_many(
+        self,
+        embedder_type: type[Embedder],
+        texts: Sequence[str],
+        hints: Mapping[str, Any] = {},
+    ) -> list[Optional[Sequence[float]]]:
+        """Returns the cached vector of each of the given texts, or None where there is none.
+
+        By default, this gets each text on its own. Implementations may override
+        it to look all of them up at once.
+        """
+        results = [await self.get(embedder_type, [text], hints) for text in texts]
+        return [r.vectors[0] if r else None for r in results]
+
+    async def set_many(
+        self,
+        embedder_type: type[Embedder],
+        texts: Sequence[str],
+        vectors: Sequence[Sequence[float]],
+        hints: Mapping[str, Any] = {},
+    ) -> None:
+        """Caches the vector of each of the given texts, setting each on its own by default."""
+        for text, vector in zip(texts, vectors):
+            await self.set(embedder_type, [text], [vector], hints)
+
 
 EmbeddingCacheProvider = Callable[[], EmbeddingCache]
 
 
+def _batch_texts(texts: Sequence[str], max_tokens: int, max_texts: int) -> list[list[str]]:
+    batches: list[list[str]] = []
+    token_count = 0
+
+    for text in texts:
+        text_token_count = _estimate_token_count(text)
+
+        if (
+            not batches
+            or len(batches[-1]) >= max_texts
+            or token_count + text_token_count > max_tokens
+        ):
+            batches.append([])
+            token_count = 0
+
+        batches[-1].append(text)
+        token_count += text_token_count
+
+    return batches
+
+
+async def embed_with_cache(
+    embedder: Embedder,
+    cache: EmbeddingCache,
+    texts: Sequence[str],
+    hints: Mapping[str, Any] = {},
+    max_batch_size: int = 256,
+) -> list[Sequence[float]]:
+    """Embeds the given texts, sending only those missing from the cache to the embedder.
+
+    The missing texts are sent in batches of up to max_batch_size texts and
+    (about) the embedder's max_tokens, so that each call stays within provider limits.
+    """
+    # A coalescer shares the cache entries of the embedder it wraps
+    embedder_type = _embedder_type(embedder)
+
+    cached = await cache.get_many(embedder_type, texts, hints)
+
+    missing = list(dict.fromkeys(t for t, v in zip(texts, cached) if v is None))
+    embedded: dict[str, Sequence[float]] = {}
+
+    for batch in _batch_texts(missing, embedder.max_tokens, max_batch_size):
+        vectors = (await embedder.embed(batch, hints)).vectors
+        await cache.set_many(embedder_type, batch, vectors, hints)
+        embedded.update(zip(batch, vectors))
+
+    return [v if v is not None else embedded[t] for t, v in zip(texts, cached)]
+
+
 class BasicEmbeddingCache(EmbeddingCache):
-    """A basic embedding cache that uses a document database to store results."""
+    """A basic embedding cache that uses a document database to store results.
 
-    VERSION = Version.from_string("0.1.0")
+    Vectors are cached per text, as packed float32 blobs, with a bounded
+    in-memory LRU tier in front of the document database.
+    """
+
+    VERSION = Version.from_string("0.2.0")
 
     def __init__(
         self,
         document_database: DocumentDatabase,
+        max_memory_entries: int = 4096,
     ):
         self._database = document_database
         self._collections: dict[type[Embedder], DocumentCollection[EmbedderResultDocument]] = {}
 
+        self._max_memory_entries = max_memory_entries
+        self._memory: OrderedDict[tuple[type[Embedder], str], Sequence[float]] = OrderedDict()
+
     async def _document_loader(self, doc: BaseDocument) -> Optional[EmbedderResultDocument]:
-        if doc["version"] == "0.1.0":
+        if doc["version"] == "0.2.0":
             return cast(EmbedderResultDocument, doc)
         return None
 
@@ -166,57 +436,70 @@ class BasicEmbeddingCache(EmbeddingCache):
         embedder_type: type[Embedder],
     ) -> DocumentCollection[EmbedderResultDocument]:
         if embedder_type not in self._collections:
+            # Entries of version 0.1.0 were keyed by whole batches of texts, under the
+            # embedder's name. They can't be split per text, so they're left behind.
             collection = await self._database.get_or_create_collection(
-                name=embedder_type.__name__,
+                name=f"{embedder_type.__name__}_vectors",
                 schema=EmbedderResultDocument,
                 document_loader=self._document_loader,
             )
+            await collection.create_index("id")
+
             self._collections[embedder_type] = collection
 
         return self._collections[embedder_type]
 
     def _generate_id(
         self,
-        texts: list[str],
+        text: str,
         hints: Mapping[str, Any] = {},
     ) -> str:
         sorted_hints = json.dumps(dict(sorted(hints.items())), sort_keys=True)
-        key_content = f"{str(texts)}:{sorted_hints}"
+        key_content = f"{text}:{sorted_hints}"
         return hashlib.sha256(key_content.encode()).hexdigest()
 
     def _serialize_result(
         self,
         id: str,
-        vectors: Sequence[Sequence[float]],
+        vector: Sequence[float],
     ) -> EmbedderResultDocument:
         return EmbedderResultDocument(
             id=ObjectId(id),
             version=self.VERSION.to_string(),
-            vectors=vectors,
+            vector=base64.b64encode(np.asarray(vector, dtype="<f4").tobytes()).decode(),
         )
 
     def _deserialize_result(
         self,
         doc: EmbedderResultDocument,
-    ) -> EmbeddingResult:
-        return EmbeddingResult(vectors=doc["vectors"])
+    ) -> Sequence[float]:
+        return cast(
+            list[float],
+            np.frombuffer(base64.b64decode(doc["vector"]), dtype="<f4").tolist(),
+        )
+
+    def _remember(self, key: tuple[type[Embedder], str], vector: Sequence[float]) -> None:
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
 
+        if len(self._memory) > self._max_memory_entries:
+            self._memory.popitem(last=False)
+
+    @override
     async def get(
         self,
         embedder_type: type[Embedder],
         texts: list[str],
         hints: Mapping[str, Any] = {},
     ) -> Optional[EmbeddingResult]:
-        collection = await self._get_or_create_collection(embedder_type)
-
-        id = self._generate_id(texts, hints)
-        doc = await collection.find_one({"id": {"$eq": ObjectId(id)}})
+        vectors = await self.get_many(embedder_type, texts, hints)
 
-        if doc:
-            return self._deserialize_result(doc)
+        if any(v is None for v in vectors):
+            return None
 
-        return None
+        return EmbeddingResult(vectors=cast(list[Sequence[float]], vectors))
 
+    @override
     async def set(
         self,
         embedder_type: type[Embedder],
@@ -224,17 +507,59 @@ class BasicEmbeddingCache(EmbeddingCache):
         vectors: Sequence[Sequence[float]],
         hints: Mapping[str, Any] = {},
     ) -> None:
+        await self.set_many(embedder_type, texts, vectors, hints)
+
+    @override
+    async def get_many(
+        self,
+        embedder_type: type[Embedder],
+        texts: Sequence[str],
+        hints: Mapping[str, Any] = {},
+    ) -> list[Optional[Sequence[float]]]:
+        ids = [self._generate_id(t, hints) for t in texts]
+        found: dict[str, Sequence[float]] = {}
+
+        for id in ids:
+            if (vector := self._memory.get((embedder_type, id))) is not None:
+                self._memory.move_to_end((embedder_type, id))
+                found[id] = vector
+
+        if missing_ids := sorted(set(ids) - found.keys()):
+            collection = await self._get_or_create_collection(embedder_type)
+
+            for doc in await collection.find({"id": {"$in": list(missing_ids)}}):
+                found[doc["id"]] = self._deserialize_result(doc)
+                self._remember((embedder_type, doc["id"]), found[doc["id"]])
+
+        return [found.get(id) for id in ids]
+
+    @override
+    async def set_many(
+        self,
+        embedder_type: type[Embedder],
+        texts: Sequence[str],
+        vectors: Sequence[Sequence[float]],
+        hints: Mapping[str, Any] = {},
+    ) -> None:
+        entries = {self._generate_id(t, hints): v for t, v in zip(texts, vectors)}
+
         collection = await self._get_or_create_collection(embedder_type)
 
-        id = self._generate_id(texts, hints)
-        doc = self._serialize_result(id, vectors)
+        existing_ids = {
+            doc["id"] for doc in await collection.find({"id": {"$in": list(entries.keys())}})
+        }
+
+        for id, vector in entries.items():
+            if id not in existing_ids:
+                await collection.insert_one(self._serialize_result(id, vector))
 
-        await collection.insert_one(doc)
+            self._remember((embedder_type, id), vector)
 
 
 class NullEmbeddingCache(EmbeddingCache):
     """A no-op embedding cache that does nothing."""
 
+    @override
     async def get(
         self,
         embedder_type: type[Embedder],
@@ -243,6 +568,7 @@ class NullEmbeddingCache(EmbeddingCache):
     ) -> Optional[EmbeddingResult]:
         return None
 
+    @override
     async def set(
         self,
         embedder_type: type[Embedder],
@@ -251,3 +577,22 @@ class NullEmbeddingCache(EmbeddingCache):
         hints: Mapping[str, Any] = {},
     ) -> None:
         pass
+
+    @override
+    async def get_many(
+        self,
+        embedder_type: type[Embedder],
+        texts: Sequence[str],
+        hints: Mapping[str, Any] = {},
+    ) -> list[Optional[Sequence[float]]]:
+        return [None for _ in texts]
+
+    @override
+    async def set_many(
+        self,
+        embedder_type: type[Embedder],
+        texts: Sequence[str],
+        vectors: Sequence[Sequence[float]],
+        hints: Mapping[str, Any] = {},
+    ) -> None:
+        pass
@@ -0,0 +1,306 @@
+# Copyright 2025 Emcie Co Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from abc import ABC, abstractmethod
+import asyncio
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+import hashlib
+import json
+import time
+from typing import Any, Mapping, Optional, TypedDict, cast
+from typing_extensions import override
+
+from parlant.core.common import JSONSerializable, Version
+from parlant.core.engines.alpha.prompt_builder import PromptBuilder
+from parlant.core.nlp.generation import T, SchematicGenerationResult, SchematicGenerator
+from parlant.core.nlp.generation_info import GenerationCacheInfo, GenerationInfo, UsageInfo
+from parlant.core.nlp.tokenization import EstimatingTokenizer
+from parlant.core.persistence.common import ObjectId
+from parlant.core.persistence.document_database import (
+    BaseDocument,
+    DocumentCollection,
+    DocumentDatabase,
+)
+
+
+@dataclass(frozen=True)
+class CachedGeneration:
+    content: JSONSerializable
+    info: GenerationInfo
+
+
+class GenerationCache(ABC):
+    """An interface for caching the results of schematic generations."""
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[CachedGeneration]: ...
+
+    @abstractmethod
+    async def set(self, key: str, generation: CachedGeneration) -> None: ...
+
+
+class _UsageInfoDocument(TypedDict):
+    input_tokens: int
+    output_tokens: int
+    extra: Optional[Mapping[str, int]]
+
+
+class _GenerationInfoDocument(TypedDict):
+    schema_name: str
+    model: str
+    duration: float
+    usage: _UsageInfoDocument
+
+
+class _CachedGenerationDocument(TypedDict, total=False):
+    id: ObjectId
+    version: Version.String
+    creation_utc: str
+    last_access_utc: str
+    content: JSONSerializable
+    info: _GenerationInfoDocument
+
+
+class BasicGenerationCache(GenerationCache):
+    """A generation cache that stores results in a document database.
+
+    The cache holds at most `max_entries` results. When it's full, the
+    least recently used result is evicted first.
+    """
+
+    VERSION = Version.from_string("0.1.0")
+
+    def __init__(
+        self,
+        document_database: DocumentDatabase,
+        max_entries: int = 10_000,
+    ) -> None:
+        self._database = document_database
+        self._max_entries = max_entries
+
+        self._collection: Optional[DocumentCollection[_CachedGenerationDocument]] = None
+        self._recency: OrderedDict[str, None] = OrderedDict()
+        self._lock = asyncio.Lock()
+
+    async def _document_loader(self, doc: BaseDocument) -> Optional[_CachedGenerationDocument]:
+        if doc["version"] == "0.1.0":
+            return cast(_CachedGenerationDocument, doc)
+        return None
+
+    async def _get_collection(self) -> DocumentCollection[_CachedGenerationDocument]:
+        async with self._lock:
+            if self._collection is None:
+                collection = await self._database.get_or_create_collection(
+                    name="schematic_generations",
+                    schema=_CachedGenerationDocument,
+                    document_loader=self._document_loader,
+                )
+                await collection.create_index("id")
+
+                # Entries from previous runs start out in the order they were last used
+                for doc in sorted(
+                    await collection.find({}),
+                    key=lambda d: datetime.fromisoformat(d["last_access_utc"]),
+                ):
+                    self._recency[doc["id"]] = None
+
+                self._collection = collection
+
+            return self._collection
+
+    def _serialize(self, key: str, generation: CachedGeneration) -> _CachedGenerationDocument:
+        creation_utc = datetime.now(timezone.utc).isoformat()
+
+        return _CachedGenerationDocument(
+            id=ObjectId(key),
+            version=self.VERSION.to_string(),
+            creation_utc=creation_utc,
+            last_access_utc=creation_utc,
+            content=generation.content,
+            info=_GenerationInfoDocument(
+                schema_name=generation.info.schema_name,
+                model=generation.info.model,
+                duration=generation.info.duration,
+                usage=_UsageInfoDocument(
+                    input_tokens=generation.info.usage.input_tokens,
+                    output_tokens=generation.info.usage.output_tokens,
+                    extra=generation.info.usage.extra,
+                ),
+            ),
+        )
+
+    def _deserialize(self, doc: _CachedGenerationDocument) -> CachedGeneration:
+        return CachedGeneration(
+            content=doc["content"],
+            info=GenerationInfo(
+                schema_name=doc["info"]["schema_name"],
+                model=doc["info"]["model"],
+                duration=doc["info"]["duration"],
+                usage=UsageInfo(
+                    input_tokens=doc["info"]["usage"]["input_tokens"],
+                    output_tokens=doc["info"]["usage"]["output_tokens"],
+                    extra=doc["info"]["usage"]["extra"],
+                ),
+            ),
+        )
+
+    async def _touch(
+        self,
+        collection: DocumentCollection[_CachedGenerationDocument],
+        key: str,
+    ) -> None:
+        # Persisting when each entry was last used keeps the eviction order across restarts
+        await collection.update_one(
+            {"id": {"$eq": key}},
+            {"last_access_utc": datetime.now(timezone.utc).isoformat()},
+        )
+
+    @property
+    def size(self) -> int:
+        return len(self._recency)
+
+    @override
+    async def get(self, key: str) -> Optional[CachedGeneration]:
+        collection = await self._get_collection()
+
+        if key not in self._recency:
+            return None
+
+        if doc := await collection.find_one({"id": {"$eq": key}}):
+            if key in self._recency:
+                self._recency.move_to_end(key)
+                await self._touch(collection, key)
+            return self._deserialize(doc)
+
+        self._recency.pop(key, None)
+        return None
+
+    @override
+    async def set(self, key: str, generation: CachedGeneration) -> None:
+        collection = await self._get_collection()
+
+        if key in self._recency:
+            self._recency.move_to_end(key)
+            await self._touch(collection, key)
+            return
+
+        self._recency[key] = None
+        await collection.insert_one(self._serialize(key, generation))
+
+        while len(self._recency) > self._max_entries:
+            evicted_key, _ = self._recency.popitem(last=False)
+            await collection.delete_one({"id": {"$eq": evicted_key}})
+
+
+class CachingSchematicGenerator(SchematicGenerator[T]):
+    """A schematic generator that reuses the results of identical generations.
+
+    Generations are keyed by the model, the schema, the prompt and the hints
+    (which include the temperature), so only a byte-identical request is
+    answered from the cache. Use it where re-running the very same inference
+    is wasteful, such as when re-evaluating an unchanged agent.
+    """
+
+    def __init__(
+        self,
+        wrapped_generator: SchematicGenerator[T],
+        cache: GenerationCache,
+    ) -> None:
+        self._wrapped_generator = wrapped_generator
+        self._cache = cache
+
+        self.hits = 0
+        self.misses = 0
+
+    def _generate_key(self, prompt: str, hints: Mapping[str, Any]) -> str:
+        key_content = json.dumps(
+            {
+                "model": self.id,
+                "schema": self.schema.__name__,
+                "schema_definition": self.schema.model_json_schema(),
+                "prompt": prompt,
+                "hints": dict(hints),
+            },
+            sort_keys=True,
+            default=str,
+        )
+
+        return hashlib.sha256(key_content.encode()).hexdigest()
+
+    @override
+    async def generate(
+        self,
+        prompt: str | PromptBuilder,
+        hints: Mapping[str, Any] = {},
+    ) -> SchematicGenerationResult[T]:
+        t_start = time.time()
+
+        key = self._generate_key(
+            prompt.build() if isinstance(prompt, PromptBuilder) else prompt,
+            hints,
+        )
+
+        if cached := await self._cache.get(key):
+            self.hits += 1
+
+            return SchematicGenerationResult(
+                content=self.schema.model_validate(cached.content),
+                info=GenerationInfo(
+                    schema_name=cached.info.schema_name,
+                    model=cached.info.model,
+                    duration=time.time() - t_start,
+                    usage=UsageInfo(input_tokens=0, output_tokens=0),
+                    cache=GenerationCacheInfo(hit=True, hits=self.hits, misses=self.misses),
+                ),
+            )
+
+        self.misses += 1
+
+        result = await self._wrapped_generator.generate(prompt=prompt, hints=hints)
+
+        await self._cache.set(
+            key,
+            CachedGeneration(
+                content=result.content.model_dump(mode="json"),
+                info=result.info,
+            ),
+        )
+
+        return SchematicGenerationResult(
+            content=result.content,
+            info=GenerationInfo(
+                schema_name=result.info.schema_name,
+                model=result.info.model,
+                duration=result.info.duration,
+                usage=result.info.usage,
+                cache=GenerationCacheInfo(hit=False, hits=self.hits, misses=self.misses),
+            ),
+        )
+
+    @property
+    @override
+    def id(self) -> str:
+        return self._wrapped_generator.id
+
+    @property
+    @override
+    def max_tokens(self) -> int:
+        return self._wrapped_generator.max_tokens
+
+    @property
+    @override
+    def tokenizer(self) -> EstimatingTokenizer:
+        return self._wrapped_generator.tokenizer
@@ -23,9 +23,19 @@ class UsageInfo:
     extra: Optional[Mapping[str, int]] = None
 
 
+@dataclass(frozen=True)
+class GenerationCacheInfo:
+    hit: bool
+    """Whether this generation was answered from the cache."""
+
+    hits: int
+    misses: int
+
+
 @dataclass(frozen=True)
 class GenerationInfo:
     schema_name: str
     model: str
     duration: float
     usage: UsageInfo
+    cache: Optional[GenerationCacheInfo] = None
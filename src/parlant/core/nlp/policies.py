@@ -15,12 +15,50 @@
 from abc import ABC, abstractmethod
 import asyncio
 from collections import defaultdict
-from typing import Any, Coroutine, Callable, Optional, TypeAlias, TypeVar, Union
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+import email.utils
+from typing import (
+    Any,
+    Awaitable,
+    Coroutine,
+    Callable,
+    Iterator,
+    Optional,
+    TypeAlias,
+    TypeVar,
+    Union,
+)
 
 R = TypeVar("R")
 
 FunctionCallState: TypeAlias = dict["Policy", dict[str, Any]]
 
+MAX_RETRY_AFTER = 60.0
+"""The longest (in seconds) we'd wait for a provider that asked us to back off.
+A far-off Retry-After (e.g., of an exhausted daily quota) is clamped to this,
+so the request is retried after MAX_RETRY_AFTER rather than after the full wait."""
+
+RateLimitBackoff: TypeAlias = Callable[[float], Awaitable[None]]
+
+_rate_limit_backoff: ContextVar[Optional[RateLimitBackoff]] = ContextVar(
+    "rate_limit_backoff",
+    default=None,
+)
+
+
+@contextmanager
+def rate_limit_backoff(backoff: RateLimitBackoff) -> Iterator[None]:
+    """Makes the retry policies applied within this context wait out rate-limit errors
+    by awaiting `backoff` (with the time to wait), rather than by sleeping."""
+    token = _rate_limit_backoff.set(backoff)
+
+    try:
+        yield
+    finally:
+        _rate_limit_backoff.reset(token)
+
 
 class Policy(ABC):
     @abstractmethod
@@ -71,7 +109,59 @@ class RetryPolicy(Policy):
                     )
                 ]
 
-                await asyncio.sleep(wait_time)
+                # When the provider tells us how long to back off, that beats guessing
+                if (server_wait_time := retry_after(e)) is not None:
+                    wait_time = server_wait_time
+
+                if is_rate_limit_error(e) and (backoff := _rate_limit_backoff.get()):
+                    await backoff(wait_time)
+                else:
+                    await asyncio.sleep(wait_time)
+
+
+def _parse_retry_after(header: str, value: str) -> Optional[float]:
+    try:
+        seconds = float(value)
+        return seconds / 1000 if header == "retry-after-ms" else seconds
+    except ValueError:
+        pass
+
+    # Retry-After may also be an HTTP date
+    try:
+        retry_time = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    if retry_time.tzinfo is None:
+        retry_time = retry_time.replace(tzinfo=timezone.utc)
+
+    return max((retry_time - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+def retry_after(exception: BaseException) -> Optional[float]:
+    """Returns how many seconds the provider asked us to wait before retrying (at most
+    MAX_RETRY_AFTER), based on the Retry-After headers of the HTTP response attached
+    to the exception (if any)."""
+    response = getattr(exception, "response", None)
+    headers = getattr(response, "headers", None)
+
+    if not headers:
+        return None
+
+    for header in ["retry-after-ms", "retry-after"]:
+        if (value := headers.get(header)) is not None:
+            if (seconds := _parse_retry_after(header, str(value).strip())) is not None:
+                return min(seconds, MAX_RETRY_AFTER)
+
+    return None
+
+
+def is_rate_limit_error(exception: BaseException) -> bool:
+    return (
+        getattr(exception, "status_code", None) == 429
+        or "RateLimit" in type(exception).__name__
+        or "TooManyRequests" in type(exception).__name__
+    )
 
 
 def retry(
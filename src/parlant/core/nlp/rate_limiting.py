@@ -0,0 +1,305 @@
+# Copyright 2025 Emcie Co Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from enum import IntEnum
+import heapq
+import itertools
+import time
+from typing import Any, AsyncIterator, Callable, Mapping, Optional
+from typing_extensions import override
+
+from parlant.core.engines.alpha.prompt_builder import PromptBuilder
+from parlant.core.loggers import Logger
+from parlant.core.nlp.generation import T, SchematicGenerationResult, SchematicGenerator
+from parlant.core.nlp.policies import is_rate_limit_error, rate_limit_backoff, retry_after
+from parlant.core.nlp.tokenization import EstimatingTokenizer
+
+
+class GenerationPriority(IntEnum):
+    """The order in which queued generation requests are sent (lowest first)."""
+
+    MESSAGE = 0
+    """Generating a message that a customer is waiting for."""
+
+    INTERACTIVE = 1
+    """Any other inference that's part of processing a session (e.g., guideline matching)."""
+
+    BACKGROUND = 2
+    """Work nobody is actively waiting for, such as indexing and evaluations."""
+
+
+@dataclass(frozen=True)
+class RateLimits:
+    max_concurrent_requests: int = 16
+    max_tokens_per_minute: Optional[int] = None
+
+
+@dataclass(order=True)
+class _QueuedRequest:
+    priority: int
+    sequence: int
+    token_count: int = field(compare=False)
+    admission: asyncio.Future[None] = field(compare=False)
+
+
+class ModelRateLimiter:
+    """Admits the requests to a single model by priority, within its rate limits.
+
+    Concurrency is governed adaptively: a rate-limit error halves the number of
+    requests allowed in flight and pauses admission (for as long as the provider
+    asked, if it did), after which successes gradually raise it back to the maximum.
+    Tokens per minute are governed by a token bucket, which is charged with the
+    estimated input tokens upfront and corrected with the actual usage afterwards.
+    """
+
+    def __init__(
+        self,
+        limits: RateLimits,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.limits = limits
+
+        self._clock = clock
+
+        self._queue: list[_QueuedRequest] = []
+        self._sequence = itertools.count()
+
+        self._in_flight = 0
+        self._concurrency_limit = float(limits.max_concurrent_requests)
+
+        self._available_tokens = float(limits.max_tokens_per_minute or 0)
+        self._tokens_updated_at = clock()
+
+        self._paused_until = 0.0
+        self._wakeup: Optional[asyncio.TimerHandle] = None
+
+    @property
+    def concurrency_limit(self) -> int:
+        return max(int(self._concurrency_limit), 1)
+
+    @property
+    def queue_size(self) -> int:
+        return sum(1 for r in self._queue if not r.admission.done())
+
+    @asynccontextmanager
+    async def reserve(
+        self,
+        priority: GenerationPriority,
+        token_count: int = 0,
+    ) -> AsyncIterator[None]:
+        await self._acquire(priority, token_count)
+
+        try:
+            yield
+        finally:
+            self._in_flight -= 1
+            self._dispatch()
+
+    async def _acquire(self, priority: GenerationPriority, token_count: int) -> None:
+        request = _QueuedRequest(
+            priority=int(priority),
+            sequence=next(self._sequence),
+            token_count=token_count,
+            admission=asyncio.get_running_loop().create_future(),
+        )
+
+        heapq.heappush(self._queue, request)
+        self._dispatch()
+
+        try:
+            await request.admission
+        except asyncio.CancelledError:
+            if request.admission.done() and not request.admission.cancelled():
+                # We were admitted just as we were cancelled, so give our slot back
+                self._in_flight -= 1
+
+            request.admission.cancel()
+            self._dispatch()
+            raise
+
+    def record_usage(self, estimated_token_count: int, actual_token_count: int) -> None:
+        if self.limits.max_tokens_per_minute:
+            self._refill_tokens()
+            self._available_tokens -= actual_token_count - estimated_token_count
+
+    def record_success(self) -> None:
+        self._concurrency_limit = min(
+            self._concurrency_limit + 1 / self.concurrency_limit,
+            float(self.limits.max_concurrent_requests),
+        )
+        self._dispatch()
+
+    def record_rate_limit(self, wait_time: Optional[float]) -> None:
+        self._concurrency_limit = max(self._concurrency_limit / 2, 1.0)
+        self._paused_until = max(self._paused_until, self._clock() + (wait_time or 1.0))
+
+    async def readmit(self, priority: GenerationPriority) -> None:
+        """Gives up a reserved slot and waits to be admitted again (e.g., before retrying
+        a rate-limited request), so that the wait doesn't hold a slot others could use."""
+        self._in_flight -= 1
+
+        try:
+            await self._acquire(priority, token_count=0)
+        except BaseException:
+            # Our reservation gives a slot back when it ends, whether we got one or not
+            self._in_flight += 1
+            raise
+
+    def _refill_tokens(self) -> None:
+        assert self.limits.max_tokens_per_minute
+
+        now = self._clock()
+        elapsed = now - self._tokens_updated_at
+        self._tokens_updated_at = now
+
+        self._available_tokens = min(
+            self._available_tokens + elapsed * self.limits.max_tokens_per_minute / 60,
+            float(self.limits.max_tokens_per_minute),
+        )
+
+    def _dispatch(self) -> None:
+        if self._wakeup:
+            self._wakeup.cancel()
+            self._wakeup = None
+
+        while self._queue and self._queue[0].admission.done():
+            heapq.heappop(self._queue)
+
+        while self._queue and self._in_flight < self.concurrency_limit:
+            request = self._queue[0]
+
+            if (pause := self._paused_until - self._clock()) > 0:
+                self._schedule_dispatch(pause)
+                return
+
+            if self.limits.max_tokens_per_minute:
+                self._refill_tokens()
+
+                # A request larger than the whole bucket only has to wait for a full one
+                required_tokens = min(request.token_count, self.limits.max_tokens_per_minute)
+
+                if self._available_tokens < required_tokens:
+                    self._schedule_dispatch(
+                        (required_tokens - self._available_tokens)
+                        * 60
+                        / self.limits.max_tokens_per_minute
+                    )
+                    return
+
+                self._available_tokens -= request.token_count
+
+            heapq.heappop(self._queue)
+            self._in_flight += 1
+            request.admission.set_result(None)
+
+            while self._queue and self._queue[0].admission.done():
+                heapq.heappop(self._queue)
+
+    def _schedule_dispatch(self, delay: float) -> None:
+        self._wakeup = asyncio.get_running_loop().call_later(delay, self._dispatch)
+
+
+class RateLimitedSchematicGenerator(SchematicGenerator[T]):
+    """A schematic generator whose requests are admitted by a (shared) model rate limiter."""
+
+    def __init__(
+        self,
+        wrapped_generator: SchematicGenerator[T],
+        limiter: ModelRateLimiter,
+        priority: GenerationPriority,
+        logger: Logger,
+    ) -> None:
+        self._wrapped_generator = wrapped_generator
+        self._limiter = limiter
+        self._priority = priority
+        self._logger = logger
+
+    @override
+    async def generate(
+        self,
+        prompt: str | PromptBuilder,
+        hints: Mapping[str, Any] = {},
+    ) -> SchematicGenerationResult[T]:
+        token_count = 0
+
+        # Token counts are only needed when there's a token rate to govern,
+        # and some tokenizers have to call their provider to produce them
+        if self._limiter.limits.max_tokens_per_minute:
+            token_count = await self.tokenizer.estimate_token_count(
+                prompt.build() if isinstance(prompt, PromptBuilder) else prompt
+            )
+
+        async with self._limiter.reserve(self._priority, token_count):
+            try:
+                # The wrapped generator's retry policy reports every rate-limit error
+                # it's about to retry, rather than waiting it out within our reservation
+                with rate_limit_backoff(self._back_off):
+                    result = await self._wrapped_generator.generate(prompt=prompt, hints=hints)
+            except Exception as exc:
+                if is_rate_limit_error(exc):
+                    self._record_rate_limit(retry_after(exc))
+
+                raise
+
+            self._limiter.record_usage(
+                token_count,
+                result.info.usage.input_tokens + result.info.usage.output_tokens,
+            )
+            self._limiter.record_success()
+
+            return result
+
+    async def _back_off(self, wait_time: float) -> None:
+        self._record_rate_limit(wait_time)
+        await self._limiter.readmit(self._priority)
+
+    def _record_rate_limit(self, wait_time: Optional[float]) -> None:
+        self._limiter.record_rate_limit(wait_time)
+
+        self._logger.warning(
+            f"{self.id} is rate-limited; backing off for {wait_time or 1.0:.1f}s "
+            f"and lowering its concurrency to {self._limiter.concurrency_limit}"
+        )
+
+    @property
+    @override
+    def id(self) -> str:
+        return self._wrapped_generator.id
+
+    @property
+    @override
+    def max_tokens(self) -> int:
+        return self._wrapped_generator.max_tokens
+
+    @property
+    @override
+    def tokenizer(self) -> EstimatingTokenizer:
+        return self._wrapped_generator.tokenizer
+
+
+class GenerationRateLimiters:
+    """Hands out one rate limiter per model, shared by all of its schematic generators."""
+
+    def __init__(self, limits: RateLimits) -> None:
+        self._limits = limits
+        self._limiters: dict[str, ModelRateLimiter] = {}
+
+    def for_model(self, model_id: str) -> ModelRateLimiter:
+        if model_id not in self._limiters:
+            self._limiters[model_id] = ModelRateLimiter(self._limits)
+
+        return self._limiters[model_id]
@@ -12,7 +12,23 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from typing import Any, Callable, Mapping, NewType, Protocol, Union, cast, get_type_hints
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import (
+    Any,
+    Callable,
+    Generic,
+    Iterable,
+    Iterator,
+    Mapping,
+    NewType,
+    Optional,
+    Protocol,
+    TypeVar,
+    Union,
+    cast,
+    get_type_hints,
+)
 from typing_extensions import Literal, TypedDict
 
 from parlant.core.common import Version
@@ -76,66 +92,116 @@ LogicalOperator = TypedDict(
 Where = Union[WhereExpression, LogicalOperator]
 
 
-def _evaluate_filter(
-    operator: str,
-    field_value: LiteralValue,
+_COMPARISONS: dict[str, Callable[[Any, Any], bool]] = {
+    "$eq": lambda field_value, filter_value: field_value == filter_value,
+    "$ne": lambda field_value, filter_value: field_value != filter_value,
+    "$gt": lambda field_value, filter_value: field_value > filter_value,
+    "$gte": lambda field_value, filter_value: field_value >= filter_value,
+    "$lt": lambda field_value, filter_value: field_value < filter_value,
+    "$lte": lambda field_value, filter_value: field_value <= filter_value,
+}
+
+WherePredicate = Callable[[Mapping[str, Any]], bool]
+
+
+def _match_all(candidate: Mapping[str, Any]) -> bool:
+    return True
+
+
+def _all_of(predicates: list[WherePredicate]) -> WherePredicate:
+    if not predicates:
+        return _match_all
+    if len(predicates) == 1:
+        return predicates[0]
+
+    return lambda candidate: all(p(candidate) for p in predicates)
+
+
+def _any_of(predicates: list[WherePredicate]) -> WherePredicate:
+    return lambda candidate: any(p(candidate) for p in predicates)
+
+
+def _compile_membership(
+    field_name: FieldName,
+    values: list[LiteralValue],
+    negate: bool,
+) -> WherePredicate:
+    value_set = frozenset(values)
+
+    def contains(field_value: Any) -> bool:
+        try:
+            return field_value in value_set
+        except TypeError:
+            # Unhashable field values can't equal any of the literals
+            return False
+
+    if negate:
+        return lambda candidate: not contains(candidate[field_name])
+    else:
+        return lambda candidate: contains(candidate[field_name])
+
+
+def _compile_comparison(
+    field_name: FieldName,
+    comparison: Callable[[Any, Any], bool],
     filter_value: LiteralValue,
-) -> bool:
-    tests: dict[str, Callable[[Any, Any], bool]] = {
-        "$eq": lambda field_value, filter_value: field_value == filter_value,
-        "$ne": lambda field_value, filter_value: field_value != filter_value,
-        "$gt": lambda field_value, filter_value: field_value > filter_value,
-        "$gte": lambda field_value, filter_value: field_value >= filter_value,
-        "$lt": lambda field_value, filter_value: field_value < filter_value,
-        "$lte": lambda field_value, filter_value: field_value <= filter_value,
-    }
+) -> WherePredicate:
+    return lambda candidate: comparison(candidate[field_name], filter_value)
 
-    return tests[operator](field_value, filter_value)
 
+def compile_where(where: Where) -> WherePredicate:
+    """Compiles a filter into a predicate over documents.
 
-def matches_filters(
-    where: Where,
-    candidate: Mapping[str, Any],
-) -> bool:
+    Compile once per query and apply the result to every candidate, rather than
+    re-interpreting the filter for each one. $in and $nin become set lookups.
+    """
     if not where:
-        return True
+        return _match_all
+
+    predicates: list[WherePredicate] = []
 
     if next(iter(where.keys())) in ("$and", "$or"):
         op = cast(LogicalOperator, where)
-        for operator in op:
+        for logical_operator in op:
             operands: list[Union[WhereExpression, LogicalOperator]] = op[
-                cast(Literal["$and", "$or"], operator)
+                cast(Literal["$and", "$or"], logical_operator)
             ]
-            if operator == "$and":
-                if not all(matches_filters(sub_filter, candidate) for sub_filter in operands):
-                    return False
-            elif operator == "$or":
-                if not any(matches_filters(sub_filter, candidate) for sub_filter in operands):
-                    return False
+            compiled_operands = [compile_where(sub_filter) for sub_filter in operands]
+
+            if logical_operator == "$and":
+                predicates.append(_all_of(compiled_operands))
+            elif logical_operator == "$or":
+                predicates.append(_any_of(compiled_operands))
 
     else:
         field_filters = cast(WhereExpression, where)
         for field_name, field_filter in field_filters.items():
-            for operator, filter_value in field_filter.items():
-                if operator == "$in":
-                    if not any(
-                        candidate[field_name] == val
-                        for val in cast(list[LiteralValue], filter_value)
-                    ):
-                        return False
-                elif operator == "$nin":
-                    if any(
-                        candidate[field_name] == val
-                        for val in cast(list[LiteralValue], filter_value)
-                    ):
-                        return False
+            for field_operator, filter_value in field_filter.items():
+                if field_operator in ("$in", "$nin"):
+                    predicates.append(
+                        _compile_membership(
+                            field_name,
+                            cast(list[LiteralValue], filter_value),
+                            negate=field_operator == "$nin",
+                        )
+                    )
                 else:
-                    if not _evaluate_filter(
-                        operator, candidate[field_name], cast(LiteralValue, filter_value)
-                    ):
-                        return False
+                    predicates.append(
+                        _compile_comparison(
+                            field_name,
+                            _COMPARISONS[field_operator],
+                            cast(LiteralValue, filter_value),
+                        )
+                    )
 
-    return True
+    return _all_of(predicates)
+
+
+def matches_filters(
+    where: Where,
+    candidate: Mapping[str, Any],
+) -> bool:
+    return compile_where(where)(candidate)
 
 
 def ensure_is_total(document: Mapping[str, Any], schema: type[Mapping[str, Any]]) -> None:
@@ -147,3 +213,252 @@ def ensure_is_total(document: Mapping[str, Any], schema: type[Mapping[str, Any]]
             f"Provided TypedDict '{schema.__qualname__}' is missing required keys: {missing_keys}. "
             f"Expected at least the keys: {list(required_keys)}."
         )
+
+
+class FieldIndex:
+    """A hash index mapping the values of a single field to the keys of the documents holding them.
+
+    Documents whose value for the field is missing or unhashable are not indexed,
+    since they can never equal a (hashable) literal filter value anyway.
+    """
+
+    def __init__(self, field: FieldName) -> None:
+        self.field = field
+        self._entries: dict[Any, dict[int, None]] = {}
+
+    def add(self, key: int, document: Mapping[str, Any]) -> None:
+        try:
+            self._entries.setdefault(document[self.field], {})[key] = None
+        except (KeyError, TypeError):
+            pass
+
+    def remove(self, key: int, document: Mapping[str, Any]) -> None:
+        try:
+            value = document[self.field]
+            keys = self._entries[value]
+        except (KeyError, TypeError):
+            return
+
+        keys.pop(key, None)
+
+        if not keys:
+            del self._entries[value]
+
+    def lookup(self, values: Iterable[LiteralValue]) -> set[int]:
+        result: set[int] = set()
+
+        for value in values:
+            result.update(self._entries.get(value, ()))
+
+        return result
+
+
+@dataclass(frozen=True)
+class QueryPlan:
+    candidates: Optional[set[int]]
+    """The keys of the documents that may match, or None if all documents must be scanned."""
+
+    residual: Where
+    """The part of the filter that the indexes could not answer, to be checked per candidate."""
+
+
+def plan_query(
+    where: Where,
+    indexes: Mapping[FieldName, FieldIndex],
+) -> QueryPlan:
+    """Answers as much of a filter as possible from hash indexes.
+
+    `$eq` and `$in` on indexed fields are resolved to candidate sets, `$and` intersects
+    the candidates of its operands, and `$or` unions them (when all of its operands
+    are indexed). Whatever remains is returned as a residual filter.
+    """
+
+    if not where:
+        return QueryPlan(candidates=None, residual={})
+
+    if next(iter(where.keys())) in ("$and", "$or"):
+        return _plan_logical(cast(LogicalOperator, where), indexes)
+
+    return _plan_expression(cast(WhereExpression, where), indexes)
+
+
+def _intersect(
+    candidates: Optional[set[int]],
+    other: Optional[set[int]],
+) -> Optional[set[int]]:
+    if candidates is None:
+        return other
+    if other is None:
+        return candidates
+    return candidates & other
+
+
+def _conjunction(filters: list[Where]) -> Where:
+    filters = [f for f in filters if f]
+
+    if not filters:
+        return {}
+    if len(filters) == 1:
+        return filters[0]
+
+    return {"$and": filters}
+
+
+def _plan_expression(
+    where: WhereExpression,
+    indexes: Mapping[FieldName, FieldIndex],
+) -> QueryPlan:
+    candidates: Optional[set[int]] = None
+    residual: WhereExpression = {}
+
+    for field_name, field_filter in where.items():
+        remaining: dict[str, Any] = {}
+
+        for operator, filter_value in field_filter.items():
+            index = indexes.get(field_name)
+
+            try:
+                if index and operator == "$eq":
+                    matches = index.lookup([cast(LiteralValue, filter_value)])
+                elif index and operator == "$in":
+                    matches = index.lookup(cast(list[LiteralValue], filter_value))
+                else:
+                    remaining[operator] = filter_value
+                    continue
+            except TypeError:
+                # Unhashable filter value; let the scan deal with it
+                remaining[operator] = filter_value
+                continue
+
+            candidates = _intersect(candidates, matches)
+
+        if remaining:
+            residual[field_name] = cast(WhereOperator, remaining)
+
+    return QueryPlan(candidates=candidates, residual=residual)
+
+
+def _plan_logical(
+    where: LogicalOperator,
+    indexes: Mapping[FieldName, FieldIndex],
+) -> QueryPlan:
+    candidates: Optional[set[int]] = None
+    residuals: list[Where] = []
+
+    for operator in where:
+        operands: list[Union[WhereExpression, LogicalOperator]] = where[
+            cast(Literal["$and", "$or"], operator)
+        ]
+        plans = [plan_query(operand, indexes) for operand in operands]
+
+        if operator == "$and":
+            for plan in plans:
+                candidates = _intersect(candidates, plan.candidates)
+                residuals.append(plan.residual)
+
+        elif operator == "$or":
+            if plans and all(plan.candidates is not None for plan in plans):
+                union: set[int] = set()
+
+                for plan in plans:
+                    union.update(cast(set[int], plan.candidates))
+
+                candidates = _intersect(candidates, union)
+
+                if any(plan.residual for plan in plans):
+                    # A candidate may come from one operand yet only match
+                    # the residual of another, so the whole $or must be re-checked.
+                    residuals.append({"$or": operands})
+            else:
+                residuals.append({"$or": operands})
+
+    return QueryPlan(candidates=candidates, residual=_conjunction(residuals))
+
+
+TMapping = TypeVar("TMapping", bound=Mapping[str, Any])
+
+
+class IndexedDocuments(Generic[TMapping]):
+    """An insertion-ordered, in-memory document list with optional hash indexes.
+
+    Documents are addressed by an internal key that is stable across updates,
+    so results always come back in insertion order, just like a list scan.
+    """
+
+    def __init__(self, documents: Iterable[TMapping] = ()) -> None:
+        self._documents: dict[int, TMapping] = {}
+        self._indexes: dict[FieldName, FieldIndex] = {}
+        self._next_key = 0
+
+        for document in documents:
+            self.insert(document)
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def __iter__(self) -> Iterator[TMapping]:
+        return iter(list(self._documents.values()))
+
+    def create_index(self, field: FieldName) -> None:
+        if field in self._indexes:
+            return
+
+        index = FieldIndex(field)
+
+        for key, document in self._documents.items():
+            index.add(key, document)
+
+        self._indexes[field] = index
+
+    def insert(self, document: TMapping) -> int:
+        key = self._next_key
+        self._next_key += 1
+
+        self._documents[key] = document
+
+        for index in self._indexes.values():
+            index.add(key, document)
+
+        return key
+
+    def replace(self, key: int, document: TMapping) -> None:
+        for index in self._indexes.values():
+            index.remove(key, self._documents[key])
+            index.add(key, document)
+
+        self._documents[key] = document
+
+    def delete(self, key: int) -> TMapping:
+        document = self._documents.pop(key)
+
+        for index in self._indexes.values():
+            index.remove(key, document)
+
+        return document
+
+    def find(
+        self,
+        where: Where,
+        limit: Optional[int] = None,
+    ) -> list[tuple[int, TMapping]]:
+        plan = plan_query(where, self._indexes)
+
+        candidates: Iterable[tuple[int, TMapping]]
+
+        if plan.candidates is None:
+            candidates = list(self._documents.items())
+        else:
+            candidates = [(key, self._documents[key]) for key in sorted(plan.candidates)]
+
+        matches = compile_where(plan.residual)
+
+        result = []
+
+        for key, document in candidates:
+            if matches(document):
+                result.append((key, document))
+
+                if limit is not None and len(result) >= limit:
+                    break
+
+        return result
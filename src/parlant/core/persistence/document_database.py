@@ -26,7 +26,7 @@ from typing import (
     cast,
 )
 
-from parlant.core.persistence.common import ObjectId, Where
+from parlant.core.persistence.common import FieldName, ObjectId, Where
 from parlant.core.common import Version
 
 
@@ -161,3 +161,11 @@ class DocumentCollection(ABC, Generic[TDocument]):
     ) -> DeleteResult[TDocument]:
         """Deletes the first document that matches the query criteria."""
         ...
+
+    async def create_index(
+        self,
+        field: FieldName,
+    ) -> None:
+        """Declares a secondary index on the given field, to speed up $eq/$in lookups.
+        Backends that have no use for it may ignore it."""
+        pass
@@ -18,9 +18,10 @@ from dataclasses import dataclass
 from typing import Awaitable, Callable, Generic, Optional, Sequence, TypeVar, TypedDict
 from typing_extensions import Required
 
+from parlant.core.async_utils import safe_gather
 from parlant.core.common import JSONSerializable, Version
 from parlant.core.nlp.embedding import Embedder
-from parlant.core.persistence.common import ObjectId, Where
+from parlant.core.persistence.common import FieldName, ObjectId, Where
 
 
 class BaseDocument(TypedDict, total=False):
@@ -163,3 +164,24 @@ class VectorCollection(ABC, Generic[TDocument]):
         query: str,
         k: int,
     ) -> Sequence[SimilarDocumentResult[TDocument]]: ...
+
+    async def find_similar_documents_batch(
+        self,
+        filters: Where,
+        queries: Sequence[str],
+        k: int,
+    ) -> Sequence[Sequence[SimilarDocumentResult[TDocument]]]:
+        """Like find_similar_documents, for several queries at once.
+        Returns the results of each query, in the order of the given queries.
+        Backends that can embed the queries together should override it."""
+        return await safe_gather(
+            *(self.find_similar_documents(filters, query, k) for query in queries)
+        )
+
+    async def create_index(
+        self,
+        field: FieldName,
+    ) -> None:
+        """Declares a secondary index on the given field, to speed up $eq/$in lookups.
+        Backends that have no use for it may ignore it."""
+        pass
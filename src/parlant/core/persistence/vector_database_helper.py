@@ -12,6 +12,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from collections import OrderedDict
+import hashlib
 import heapq
 from typing import Awaitable, Callable, Generic, Mapping, Optional, Sequence, TypeVar, cast
 from typing_extensions import Self
@@ -21,24 +23,89 @@ from parlant.core.persistence.common import MigrationRequired, ServerOutdated, V
 from parlant.core.persistence.vector_database import BaseDocument, TDocument, VectorDatabase
 
 
+class QueryChunker:
+    """Splits similarity queries into chunks that fit the embedder's input size.
+
+    A chunk's size depends only on the words it may span, so a query which grows at its
+    tail (e.g., the same interaction with one more message) yields the same leading chunks
+    as before. Token estimates are cached by text fingerprint, so only the new tail is
+    tokenized, and the unchanged chunks can be served from query embedding caches.
+    """
+
+    def __init__(self, embedder: Embedder, max_cached_estimates: int = 4096) -> None:
+        self._embedder = embedder
+        self._max_cached_estimates = max_cached_estimates
+        self._token_counts: OrderedDict[str, int] = OrderedDict()
+
+    async def _estimate_token_count(self, text: str) -> int:
+        fingerprint = hashlib.sha256(text.encode()).hexdigest()
+
+        if (token_count := self._token_counts.get(fingerprint)) is not None:
+            self._token_counts.move_to_end(fingerprint)
+            return token_count
+
+        token_count = await self._embedder.tokenizer.estimate_token_count(text)
+
+        self._token_counts[fingerprint] = token_count
+
+        if len(self._token_counts) > self._max_cached_estimates:
+            self._token_counts.popitem(last=False)
+
+        return token_count
+
+    async def chunk(self, query: str) -> list[str]:
+        max_length = max(self._embedder.max_tokens // 5, 1)
+
+        words = query.split()
+        chunks = []
+
+        i = 0
+        while i < len(words):
+            # A chunk never spans more words than it has tokens, so its size
+            # is estimated from the token density of the next max_length words
+            window = words[i : i + max_length]
+            token_count = await self._estimate_token_count(" ".join(window))
+
+            if token_count:
+                words_per_chunk = min(
+                    max(int(max_length * len(window) / token_count), 1), len(window)
+                )
+                chunks.append(" ".join(window[:words_per_chunk]))
+            else:
+                words_per_chunk = len(window)
+                chunks.append("")
+
+            i += words_per_chunk
+
+        return chunks
+
+
 async def query_chunks(query: str, embedder: Embedder) -> list[str]:
-    max_length = embedder.max_tokens // 5
-    total_token_count = await embedder.tokenizer.estimate_token_count(query)
+    return await QueryChunker(embedder).chunk(query)
+
+
+class QueryEmbeddingCache:
+    """A bounded, in-memory LRU cache of the embeddings of recent similarity queries."""
+
+    def __init__(self, embedder: Embedder, max_size: int = 1024) -> None:
+        self._embedder = embedder
+        self._max_size = max_size
+        self._vectors: OrderedDict[str, Sequence[float]] = OrderedDict()
 
-    words = query.split()
-    total_word_count = len(words)
+    async def embed(self, queries: Sequence[str]) -> list[Sequence[float]]:
+        vectors = {q: self._vectors[q] for q in queries if q in self._vectors}
 
-    tokens_per_word = total_token_count / total_word_count
+        if missing := list(dict.fromkeys(q for q in queries if q not in vectors)):
+            vectors.update(zip(missing, (await self._embedder.embed(missing)).vectors))
 
-    words_per_chunk = max(int(max_length / tokens_per_word), 1)
+        for query in queries:
+            self._vectors[query] = vectors[query]
+            self._vectors.move_to_end(query)
 
-    chunks = []
-    for i in range(0, total_word_count, words_per_chunk):
-        chunk_words = words[i : i + words_per_chunk]
-        chunk = " ".join(chunk_words)
-        chunks.append(chunk)
+        while len(self._vectors) > self._max_size:
+            self._vectors.popitem(last=False)
 
-    return [text if await embedder.tokenizer.estimate_token_count(text) else "" for text in chunks]
+        return [vectors[q] for q in queries]
 
 
 T = TypeVar("T")
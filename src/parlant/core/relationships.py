@@ -162,6 +162,15 @@ class RelationshipDocument(TypedDict, total=False):
     kind: str
 
 
+@dataclass(frozen=True)
+class _Reachability:
+    relationship_ids: Sequence[RelationshipId]
+    """The relationships through which the reachable entities were first reached, in BFS order."""
+
+    entity_ids: frozenset[RelationshipEntityId]
+    """The reachable entities, including the one the search started from."""
+
+
 class RelationshipDocumentStore(RelationshipStore):
     VERSION = Version.from_string("0.3.0")
 
@@ -176,6 +185,11 @@ class RelationshipDocumentStore(RelationshipStore):
         self._database = database
         self._collection: DocumentCollection[RelationshipDocument]
         self._graphs: dict[RelationshipKind | RelationshipKind, networkx.DiGraph] = {}
+        self._relationships: dict[RelationshipId, Relationship] = {}
+        self._reachability: dict[
+            RelationshipKind,
+            dict[tuple[RelationshipEntityId, bool], _Reachability],
+        ] = {}
         self._allow_migration = allow_migration
         self._lock = ReaderWriterLock()
 
@@ -205,6 +219,8 @@ class RelationshipDocumentStore(RelationshipStore):
                 schema=RelationshipDocument,
                 document_loader=self._document_loader,
             )
+            await self._collection.create_index("id")
+            await self._collection.create_index("kind")
 
         return self
 
@@ -289,6 +305,8 @@ class RelationshipDocumentStore(RelationshipStore):
             edges = list()
 
             for r in relationships:
+                self._relationships[r.id] = r
+
                 nodes.add(r.source.id)
                 nodes.add(r.target.id)
                 edges.append(
@@ -304,9 +322,64 @@ class RelationshipDocumentStore(RelationshipStore):
             g.update(edges=edges, nodes=nodes)
 
             self._graphs[kind] = g
+            self._reachability[kind] = {}
 
         return self._graphs[kind]
 
+    def _compute_reachability(
+        self,
+        graph: networkx.DiGraph,
+        entity_id: RelationshipEntityId,
+        reverse: bool,
+    ) -> _Reachability:
+        if not graph.has_node(entity_id):
+            return _Reachability(relationship_ids=[], entity_ids=frozenset({entity_id}))
+
+        relationship_ids = []
+        entity_ids = {entity_id}
+
+        for edge_source, edge_target in networkx.bfs_edges(graph, entity_id, reverse=reverse):
+            edge = (edge_target, edge_source) if reverse else (edge_source, edge_target)
+
+            relationship_ids.append(graph.edges[edge]["id"])
+            entity_ids.add(edge_target)
+
+        return _Reachability(relationship_ids=relationship_ids, entity_ids=frozenset(entity_ids))
+
+    async def _get_reachable_relationships(
+        self,
+        kind: RelationshipKind,
+        entity_id: RelationshipEntityId,
+        reverse: bool,
+    ) -> Sequence[Relationship]:
+        graph = await self._get_relationships_graph(kind)
+        reachability = self._reachability[kind]
+
+        if (entity_id, reverse) not in reachability:
+            reachability[(entity_id, reverse)] = self._compute_reachability(
+                graph, entity_id, reverse
+            )
+
+        return [
+            self._relationships[id] for id in reachability[(entity_id, reverse)].relationship_ids
+        ]
+
+    def _invalidate_reachability(
+        self,
+        kind: RelationshipKind,
+        source_id: RelationshipEntityId,
+        target_id: RelationshipEntityId,
+    ) -> None:
+        # Adding or removing an edge only changes the descendants of the entities that
+        # reach its source, and the ancestors of the entities that its target reaches
+        reachability = self._reachability[kind]
+
+        for entity_id, reverse in list(reachability):
+            if (target_id if reverse else source_id) in reachability[
+                (entity_id, reverse)
+            ].entity_ids:
+                del reachability[(entity_id, reverse)]
+
     @override
     async def create_relationship(
         self,
@@ -342,6 +415,12 @@ class RelationshipDocumentStore(RelationshipStore):
 
             graph = await self._get_relationships_graph(kind)
 
+            if graph.has_edge(source.id, target.id):
+                self._relationships.pop(graph.edges[source.id, target.id]["id"], None)
+
+            self._relationships[relationship.id] = relationship
+            self._invalidate_reachability(kind, source.id, target.id)
+
             graph.add_node(source.id)
             graph.add_node(target.id)
 
@@ -383,6 +462,13 @@ class RelationshipDocumentStore(RelationshipStore):
 
             graph.remove_edge(relationship.source.id, relationship.target.id)
 
+            self._relationships.pop(relationship.id, None)
+            self._invalidate_reachability(
+                relationship.kind,
+                relationship.source.id,
+                relationship.target.id,
+            )
+
             await self._collection.delete_one(filters={"id": {"$eq": id}})
 
     @override
@@ -393,32 +479,6 @@ class RelationshipDocumentStore(RelationshipStore):
         source_id: Optional[RelationshipEntityId] = None,
         target_id: Optional[RelationshipEntityId] = None,
     ) -> Sequence[Relationship]:
-        async def get_node_relationships_by_kind(
-            source_id: RelationshipEntityId,
-            reversed_graph: bool = False,
-        ) -> Sequence[Relationship]:
-            if not graph.has_node(source_id):
-                return []
-
-            _graph = graph.reverse() if reversed_graph else graph
-
-            descendant_edges = networkx.bfs_edges(_graph, source_id)
-            relationships = []
-
-            for edge_source, edge_target in descendant_edges:
-                edge_data = _graph.get_edge_data(edge_source, edge_target)
-
-                relationship_document = await self._collection.find_one(
-                    filters={"id": {"$eq": edge_data["id"]}},
-                )
-
-                if not relationship_document:
-                    raise ItemNotFoundError(item_id=UniqueId(edge_data["id"]))
-
-                relationships.append(self._deserialize(relationship_document))
-
-            return relationships
-
         async with self._lock.reader_lock:
             if not source_id and not target_id:
                 filters = {**({"kind": {"$eq": kind.value}} if kind else {})}
@@ -430,23 +490,14 @@ class RelationshipDocumentStore(RelationshipStore):
             relationships: list[Relationship] = []
 
             if indirect:
-                for _kind in (
-                    [kind]
-                    if kind
-                    else [
-                        *list(RelationshipKind),
-                        *list(RelationshipKind),
-                    ]
-                ):
-                    graph = await self._get_relationships_graph(_kind)
-
+                for _kind in [kind] if kind else list(RelationshipKind):
                     if source_id:
                         relationships.extend(
-                            await get_node_relationships_by_kind(source_id, reversed_graph=False)
+                            await self._get_reachable_relationships(_kind, source_id, reverse=False)
                         )
                     if target_id:
                         relationships.extend(
-                            await get_node_relationships_by_kind(target_id, reversed_graph=True)
+                            await self._get_reachable_relationships(_kind, target_id, reverse=True)
                         )
 
                 return relationships
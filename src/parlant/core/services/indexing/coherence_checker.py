@@ -434,6 +434,7 @@ Expected Output:
 ###
 """,
             props={"formatted_task_description": self.get_task_description()},
+            static=True,
         )
 
         builder.add_agent_identity(agent)
@@ -687,6 +688,7 @@ Expected Output:
 
 ###""",
             props={"formatted_task_description": self.get_task_description()},
+            static=True,
         )
         builder.add_agent_identity(agent)
         terms = await self._entity_queries.find_glossary_terms_for_context(
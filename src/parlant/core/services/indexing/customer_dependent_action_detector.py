@@ -120,6 +120,7 @@ Any instruction described here applies only to the agent, and not to the user.
 While an action can only instruct the agent to do something, it may require something from the customer to be considered completed.
 For example, the action "get the customer's account number" requires the customer to provide their account number for it to be considered completed.
 """,
+            static=True,
         )
 
         builder.add_section(
@@ -147,6 +148,7 @@ If you determine the action is customer dependent, you must also split it into:
 Your decision will be used to asses whether this guideline was completed at different stages of the conversation. You should split the action such that it is considered complete if and only if both the agent and customer portions were completed.
 For example, the customer dependent action "ask the customer for their age" should be split into the agent_action "the agent asked the customer for their age" and the customer_action "the customer provided their age"
 """,
+            static=True,
         )
         builder.add_section(
             name="customer-dependent-action-shots",
@@ -155,6 +157,7 @@ EXAMPLES
 -----------
 {shots_text}""",
             props={"shots_text": self._format_shots(shots)},
+            static=True,
         )
         builder.add_section(
             name="customer-dependent-action-detector-guideline",
@@ -180,6 +180,7 @@ If available, use the tool description to incorporate any relevant information t
 Note that the tool name and description may be uninformative, so you may need to infer the tool's purpose from its parameters.
 
 """,
+            static=True,
         )
         builder.add_section(
             name="guideline-action-proposer-example",
@@ -274,6 +275,7 @@ Action: Check for severe weather and reschedule outdoor events if necessary.
 
 --------------------------------------------------------------------------------
 """,
+            static=True,
         )
 
         builder.add_section(
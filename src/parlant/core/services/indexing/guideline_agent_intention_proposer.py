@@ -114,6 +114,7 @@ Each guideline is composed of two parts:
 Any instruction described here applies only to you, and not to the user.
 
 """,
+            static=True,
         )
 
         builder.add_section(
@@ -138,6 +139,7 @@ Although the original condition can be written in present tense, guideline match
 
 
 """,
+            static=True,
         )
         builder.add_section(
             name="agent-intention-shots",
@@ -146,6 +148,7 @@ EXAMPLES
 -----------
 {shots_text}""",
             props={"shots_text": self._format_shots(shots)},
+            static=True,
         )
         builder.add_section(
             name="agent-intention-guideline",
@@ -111,6 +111,7 @@ Such guidelines will be called ‘continuous’.
 
 Your task is to evaluate if a given guideline is continuous.
 """,
+            static=True,
         )
 
         builder.add_section(
@@ -125,6 +126,7 @@ Note that:
     4. Some guidelines may involve actions that unfold over multiple steps and require several responses to complete. These actions might require ongoing interaction with the user throughout the conversation.
     However, if the steps can be fully completed at some point in the exchange, the guideline should NOT be considered continuous — since the action, once fulfilled, does not need to be repeated.
 """,
+            static=True,
         )
 
         builder.add_section(
@@ -140,6 +142,7 @@ Examples of non continuous guidelines:
         This involves several steps that need to be completed, but once the process finished, the guideline is fulfilled and doesn't need to be repeated.
 
 """,
+            static=True,
         )
 
         builder.add_section(
@@ -162,6 +162,7 @@ Action: What the agent should do
 These condition-action pairs are then sent to an agent for execution. However, many actions are written with implicit dependencies on earlier journey context, making them unclear when viewed in isolation.
 
 """,
+            static=True,
         )
 
         builder.add_section(
@@ -188,6 +189,7 @@ Standard, unambiguous pronouns (don't need clarification): We are in the context
 No need to rewrite such actions (needs_rewrite is False)
 
 """,
+            static=True,
         )
         builder.add_section(
             name="relative-action-proposer-shots",
@@ -197,6 +199,7 @@ EXAMPLES
 {shots_text}
 """,
             props={"shots_text": self._format_shots(shots)},
+            static=True,
         )
 
         builder.add_section(
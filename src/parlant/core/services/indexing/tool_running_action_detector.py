@@ -167,6 +167,7 @@ Some of these guidelines are equipped with external tools — functions that ena
 the corresponding action should involve utilizing those tools. 
 
 """,
+            static=True,
         )
 
         builder.add_section(
@@ -186,6 +187,7 @@ Even when multiple tools are involved, the action should be considered tool-only
 If the action includes multiple steps or instructions, you should evaluate each one individually. The action is tool-only only if all steps involve
 running tools without requiring any user facing communication.
 """,
+            static=True,
         )
         builder.add_section(
             name="tool-running-action-shots",
@@ -194,6 +196,7 @@ EXAMPLES
 -----------
 {shots_text}""",
             props={"shots_text": self._format_shots(shots)},
+            static=True,
         )
         builder.add_section(
             name="tool-running-action-detector-guideline",
@@ -39,6 +39,7 @@ from parlant.core.tools import (
 from parlant.core.common import JSONSerializable
 from parlant.core.contextual_correlator import ContextualCorrelator
 from parlant.core.emissions import EventEmitterFactory
+from parlant.core.services.tools.tool_cache import ToolCache, ToolListing
 
 DEFAULT_MCP_PORT: int = 8181
 
@@ -140,6 +141,8 @@ class MCPToolClient(ToolService):
             self.url = url
             self.port = port
 
+        self._tool_cache = ToolCache(self._fetch_tools)
+
     async def __aenter__(self) -> MCPToolClient:
         try:
             self._client = Client(StreamableHttpTransport(url=f"{self.url}:{self.port}/mcp"))
@@ -163,26 +166,40 @@ class MCPToolClient(ToolService):
                 pass
         return False
 
+    def invalidate_tool_cache(self) -> None:
+        self._tool_cache.invalidate()
+
+    async def _fetch_tools(self, etag: Optional[str]) -> Optional[ToolListing]:
+        if not self._client:
+            raise ToolError("Client not initialized.")
+
+        tools = await self._client.list_tools()
+
+        # MCP tools have no server-side choice providers, so none depend on the context
+        return ToolListing(
+            tools=[mcp_tool_to_parlant_tool(t) for t in tools],
+            context_dependent_tools=[],
+        )
+
     @override
     async def list_tools(self) -> Sequence[Tool]:
         try:
-            if not self._client:
-                raise ToolError("Client not initialized.")
-
-            tools = await self._client.list_tools()
-            return [mcp_tool_to_parlant_tool(t) for t in tools]
+            return await self._tool_cache.list_tools()
         except Exception as e:
             raise ToolError(str(e))
 
     @override
     async def read_tool(self, name: str) -> Tool:
         try:
-            tools = await self._client.list_tools()
-            tool = next(t for t in tools if t.name == name)
-            return mcp_tool_to_parlant_tool(tool)
+            tool = await self._tool_cache.find_tool(name)
         except Exception as e:
             raise ToolError(str(e))
 
+        if not tool:
+            raise ToolError(name, f"Tool '{name}' not found")
+
+        return tool
+
     @override
     async def resolve_tool(
         self,
@@ -42,7 +42,7 @@ from typing import (
 )
 from pydantic import BaseModel
 from typing_extensions import Unpack, override
-from fastapi import FastAPI, HTTPException, status, Query
+from fastapi import FastAPI, HTTPException, Request, Response, status, Query
 from fastapi.responses import StreamingResponse
 import httpx
 from urllib.parse import urljoin
@@ -64,13 +64,21 @@ from parlant.core.tools import (
     validate_tool_arguments,
     ToolOverlap,
 )
-from parlant.core.common import DefaultBaseModel, ItemNotFoundError, JSONSerializable, UniqueId
+from parlant.core.common import (
+    DefaultBaseModel,
+    ItemNotFoundError,
+    JSONSerializable,
+    UniqueId,
+    md5_checksum,
+)
 from parlant.core.contextual_correlator import ContextualCorrelator
 from parlant.core.emissions import EventEmitterFactory
+from parlant.core.services.tools.tool_cache import ToolCache, ToolListing
 from parlant.core.sessions import SessionId, SessionStatus
 from parlant.core.tools import ToolExecutionError, ToolService
 
 TOOL_RESULT_MAX_PAYLOAD_KB = int(os.environ.get("PARLANT_TOOL_RESULT_MAX_PAYLOAD_KB", 16))
+"""The maximum size of a single item (the result, or an emitted event) in a tool call's response."""
 
 ToolFunction = Union[
     Callable[
@@ -451,6 +459,7 @@ def tool(
 
 class ListToolsResponse(DefaultBaseModel):
     tools: list[Tool]
+    context_dependent_tools: Optional[list[str]] = None
 
 
 class ReadToolResponse(DefaultBaseModel):
@@ -574,8 +583,27 @@ class PluginServer:
         app = FastAPI()
 
         @app.get("/tools")
-        async def list_tools() -> ListToolsResponse:
-            return ListToolsResponse(tools=[t.tool for t in self.tools.values()])
+        async def list_tools(request: Request) -> Response:
+            content = ListToolsResponse(
+                tools=[t.tool for t in self.tools.values()],
+                context_dependent_tools=[
+                    name
+                    for name, t in self.tools.items()
+                    if any(options.choice_provider for _, options in t.tool.parameters.values())
+                ],
+            ).model_dump_json()
+
+            # Clients keep the listing in memory, and revalidate it with this ETag
+            etag = f'"{md5_checksum(content)}"'
+
+            if request.headers.get("if-none-match") == etag:
+                return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+            return Response(
+                content=content,
+                media_type="application/json",
+                headers={"ETag": etag},
+            )
 
         @app.get("/tools/{name}")
         async def read_tool(name: str) -> ReadToolResponse:
@@ -620,6 +648,16 @@ class PluginServer:
                     detail=f"Tool: '{name}' does not exists",
                 )
 
+            def frame(chunk: str) -> str:
+                # Each item is sent as a line of JSON, so the client can tell
+                # where it ends regardless of how the network splits the stream
+                if len(chunk.encode()) > TOOL_RESULT_MAX_PAYLOAD_KB * 1024:
+                    chunk = json.dumps(
+                        {"result_error": f"Response exceeds {TOOL_RESULT_MAX_PAYLOAD_KB}KB limit"}
+                    )
+
+                return chunk + "\n"
+
             end = asyncio.Event()
             chunks_received = asyncio.Semaphore(value=0)
             lock = asyncio.Lock()
@@ -640,7 +678,7 @@ class PluginServer:
                     if chunks_received_future.done():
                         async with lock:
                             next_chunk = chunks.pop(0)
-                        yield next_chunk
+                        yield frame(next_chunk)
                         # proceed to next potential acquire/end,
                         # skipping the end-check, otherwise
                         # we may skip emitted chunks.
@@ -664,9 +702,9 @@ class PluginServer:
                                 )
                             ).model_dump_json()
 
-                            yield final_result_chunk
+                            yield frame(final_result_chunk)
                         except Exception as exc:
-                            yield json.dumps({"error": str(exc)})
+                            yield frame(json.dumps({"error": str(exc)}))
 
                         return
                     else:
@@ -727,12 +765,80 @@ class PluginServer:
 
             return StreamingResponse(
                 content=chunk_generator(result_future),
-                media_type="text/plain",
+                media_type="application/x-ndjson",
             )
 
         return app
 
 
+_JSON_DECODER = json.JSONDecoder()
+
+
+def _pop_json_values(buffer: bytearray) -> list[Any]:
+    """Removes and returns the complete JSON values at the start of the buffer."""
+    text = buffer.decode("utf-8")
+    values = []
+    position = 0
+
+    while True:
+        while position < len(text) and text[position].isspace():
+            position += 1
+
+        if position == len(text):
+            break
+
+        try:
+            value, position = _JSON_DECODER.raw_decode(text, position)
+        except json.JSONDecodeError:
+            break
+
+        values.append(value)
+
+    del buffer[: len(text[:position].encode("utf-8"))]
+
+    return values
+
+
+async def _read_json_lines(
+    chunks: AsyncIterator[bytes],
+    max_line_size: int,
+    on_line_too_long: Callable[[], Exception],
+    newline_delimited: bool = True,
+) -> AsyncIterator[Any]:
+    """Decodes a stream of newline-delimited JSON, however it's been split into chunks.
+
+    No more than a single line (of up to max_line_size bytes) is ever buffered.
+    Unless newline_delimited is set, items may also follow each other without newlines.
+    """
+    buffer = bytearray()
+
+    async for chunk in chunks:
+        buffer += chunk
+
+        while (line_end := buffer.find(b"\n")) != -1:
+            if line_end > max_line_size:
+                raise on_line_too_long()
+
+            line = bytes(buffer[:line_end])
+            del buffer[: line_end + 1]
+
+            if line.strip():
+                yield json.loads(line)
+
+        # Plugin servers of earlier versions send their items back to back, without
+        # newlines. An item can only be complete where the buffer ends with "}", so
+        # that's the only time it's worth trying to decode the buffer again.
+        if not newline_delimited and buffer.rstrip().endswith(b"}"):
+            for value in _pop_json_values(buffer):
+                yield value
+
+        if len(buffer) > max_line_size:
+            raise on_line_too_long()
+
+    if buffer.strip():
+        yield json.loads(bytes(buffer))
+
+
 class PluginClient(ToolService):
     def __init__(
         self,
@@ -746,6 +852,8 @@ class PluginClient(ToolService):
         self._logger = logger
         self._correlator = correlator
 
+        self._tool_cache = ToolCache(self._fetch_tools)
+
     async def __aenter__(self) -> PluginClient:
         self._http_client = await httpx.AsyncClient(
             follow_redirects=True,
@@ -774,45 +882,56 @@ class PluginClient(ToolService):
             for name, (descriptor, options) in parameters.items()
         }
 
+    def invalidate_tool_cache(self) -> None:
+        self._tool_cache.invalidate()
+
+    async def _fetch_tools(self, etag: Optional[str]) -> Optional[ToolListing]:
+        response = await self._http_client.get(
+            self._get_url("/tools"),
+            headers={"If-None-Match": etag} if etag else {},
+        )
+
+        if response.status_code == status.HTTP_304_NOT_MODIFIED:
+            return None
+
+        response.raise_for_status()
+
+        content = response.json()
+
+        return ToolListing(
+            tools=[
+                Tool(
+                    name=t["name"],
+                    creation_utc=dateutil.parser.parse(t["creation_utc"]),
+                    description=t["description"],
+                    metadata=t["metadata"],
+                    parameters=self._translate_parameters(t["parameters"]),
+                    required=t["required"],
+                    consequential=t["consequential"],
+                    overlap=ToolOverlap(t["overlap"]),
+                )
+                for t in content["tools"]
+            ],
+            etag=response.headers.get("ETag"),
+            # Older plugin servers don't tell, so we resolve all of their tools remotely
+            context_dependent_tools=content.get("context_dependent_tools"),
+        )
+
     @override
     async def list_tools(self) -> Sequence[Tool]:
-        response = await self._http_client.get(self._get_url("/tools"))
-        content = response.json()
-        return [
-            Tool(
-                name=t["name"],
-                creation_utc=dateutil.parser.parse(t["creation_utc"]),
-                description=t["description"],
-                metadata=t["metadata"],
-                parameters=self._translate_parameters(t["parameters"]),
-                required=t["required"],
-                consequential=t["consequential"],
-                overlap=ToolOverlap(t["overlap"]),
-            )
-            for t in content["tools"]
-        ]
+        return await self._tool_cache.list_tools()
 
     @override
     async def read_tool(self, name: str) -> Tool:
-        response = await self._http_client.get(self._get_url(f"/tools/{name}"))
+        try:
+            tool = await self._tool_cache.find_tool(name)
+        except httpx.HTTPError:
+            raise ToolError(name, "Failed to read tool from remote service")
 
-        if response.status_code == status.HTTP_404_NOT_FOUND:
+        if not tool:
             raise ItemNotFoundError(UniqueId(name))
-        if response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR:
-            raise ToolError(name, "Failed to read tool from remote service")
 
-        content = response.json()
-        t = content["tool"]
-        return Tool(
-            name=t["name"],
-            creation_utc=dateutil.parser.parse(t["creation_utc"]),
-            description=t["description"],
-            metadata=t["metadata"],
-            parameters=self._translate_parameters(t["parameters"]),
-            required=t["required"],
-            consequential=t["consequential"],
-            overlap=ToolOverlap(t["overlap"]),
-        )
+        return tool
 
     @override
     async def resolve_tool(
@@ -820,6 +939,9 @@ class PluginClient(ToolService):
         name: str,
         context: ToolContext,
     ) -> Tool:
+        if not await self._tool_cache.is_context_dependent(name):
+            return await self.read_tool(name)
+
         response = await self._http_client.get(
             self._get_url(f"/tools/{name}/resolve"),
             params={
@@ -902,15 +1024,17 @@ class PluginClient(ToolService):
                     session_id=SessionId(context.session_id),
                 )
 
-                async for chunk in response.aiter_text():
-                    if len(chunk) > (TOOL_RESULT_MAX_PAYLOAD_KB * 1024):
-                        raise ToolResultError(
-                            tool_name=name,
-                            message=f"url='{self.url}', arguments='{arguments}', Response exceeds {TOOL_RESULT_MAX_PAYLOAD_KB}KB limit",
-                        )
-
-                    chunk_dict = json.loads(chunk)
-
+                async for chunk_dict in _read_json_lines(
+                    response.aiter_bytes(),
+                    max_line_size=TOOL_RESULT_MAX_PAYLOAD_KB * 1024,
+                    on_line_too_long=lambda: ToolResultError(
+                        tool_name=name,
+                        message=f"url='{self.url}', arguments='{arguments}', Response exceeds {TOOL_RESULT_MAX_PAYLOAD_KB}KB limit",
+                    ),
+                    newline_delimited=response.headers.get("content-type", "").startswith(
+                        "application/x-ndjson"
+                    ),
+                ):
                     if "data" and "metadata" in chunk_dict.get("result", {}):
                         return _ToolResultShim.model_validate(chunk_dict).result
                     elif "status" in chunk_dict:
@@ -936,6 +1060,11 @@ class PluginClient(ToolService):
                             tool_name=name,
                             message=f"url='{self.url}', arguments='{arguments}', error: {chunk_dict['error']}",
                         )
+                    elif "result_error" in chunk_dict:
+                        raise ToolResultError(
+                            tool_name=name,
+                            message=f"url='{self.url}', arguments='{arguments}', {chunk_dict['result_error']}",
+                        )
                     else:
                         raise ToolResultError(
                             tool_name=name,
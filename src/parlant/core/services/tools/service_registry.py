@@ -303,9 +303,15 @@ class ServiceDocumentRegistry(ServiceRegistry):
                 raise ValueError(f"Unsupported ToolService kind: {kind}")
 
             if name in self._running_services:
-                await (
-                    self._cast_to_specific_tool_service_class(self._running_services[name])
-                ).__aexit__(None, None, None)
+                previous_service = self._cast_to_specific_tool_service_class(
+                    self._running_services[name]
+                )
+
+                # Whoever still holds the previous client shouldn't be served its stale tools
+                if isinstance(previous_service, (PluginClient, MCPToolClient)):
+                    previous_service.invalidate_tool_cache()
+
+                await previous_service.__aexit__(None, None, None)
 
             await self._exit_stack.enter_async_context(
                 self._cast_to_specific_tool_service_class(service)
@@ -0,0 +1,108 @@
+# Copyright 2025 Emcie Co Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+from dataclasses import dataclass
+import time
+from typing import Awaitable, Callable, Collection, Optional, Sequence
+
+from parlant.core.tools import Tool
+
+
+@dataclass(frozen=True)
+class ToolListing:
+    tools: Sequence[Tool]
+
+    etag: Optional[str] = None
+    """An opaque version of the listing, which the service can use to tell it hasn't changed."""
+
+    context_dependent_tools: Optional[Collection[str]] = None
+    """The tools whose resolution depends on the tool context, or None if that's unknown."""
+
+
+ToolListingFetcher = Callable[[Optional[str]], Awaitable[Optional[ToolListing]]]
+"""Fetches a tool service's listing, given the ETag of the cached one (if any).
+Returns None if the cached listing is still up to date."""
+
+
+class ToolCache:
+    """Keeps a tool service's listing in memory, so that reading a tool
+    doesn't cost a round-trip to the service.
+
+    The listing is refetched (or, where the service supports ETags, revalidated)
+    once it's older than the TTL, when a tool that isn't in it is requested,
+    and after it's been explicitly invalidated.
+    """
+
+    def __init__(
+        self,
+        fetch: ToolListingFetcher,
+        ttl: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._fetch = fetch
+        self._ttl = ttl
+        self._clock = clock
+
+        self._listing: Optional[ToolListing] = None
+        self._tools: dict[str, Tool] = {}
+        self._fetched_at = 0.0
+        self._lock = asyncio.Lock()
+
+    def invalidate(self) -> None:
+        self._listing = None
+        self._tools = {}
+
+    async def list_tools(self) -> Sequence[Tool]:
+        listing = await self._get_listing()
+        return listing.tools
+
+    async def find_tool(self, name: str) -> Optional[Tool]:
+        await self._get_listing()
+
+        if name not in self._tools:
+            # The tool may have been added since we last fetched the listing
+            await self._get_listing(refresh=True)
+
+        return self._tools.get(name)
+
+    async def is_context_dependent(self, name: str) -> bool:
+        listing = await self._get_listing()
+
+        if listing.context_dependent_tools is None:
+            return True
+
+        return name in listing.context_dependent_tools
+
+    async def _get_listing(self, refresh: bool = False) -> ToolListing:
+        requested_at = self._clock()
+
+        async with self._lock:
+            # If the listing was fetched while we were waiting for the lock, it's fresh enough
+            is_fresh = self._listing is not None and (
+                self._fetched_at >= requested_at
+                or (not refresh and requested_at - self._fetched_at < self._ttl)
+            )
+
+            if not is_fresh:
+                etag = self._listing.etag if self._listing else None
+
+                if listing := await self._fetch(etag):
+                    self._listing = listing
+                    self._tools = {t.name: t for t in listing.tools}
+
+                self._fetched_at = self._clock()
+
+            assert self._listing
+            return self._listing
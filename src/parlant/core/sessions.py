@@ -15,10 +15,13 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
+import asyncio
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from enum import Enum
+import weakref
 from typing import (
+    Callable,
     Literal,
     Mapping,
     NewType,
@@ -43,7 +46,7 @@ from parlant.core.context_variables import ContextVariableId
 from parlant.core.customers import CustomerId
 from parlant.core.guidelines import GuidelineId
 from parlant.core.journeys import JourneyId
-from parlant.core.nlp.generation_info import GenerationInfo, UsageInfo
+from parlant.core.nlp.generation_info import GenerationCacheInfo, GenerationInfo, UsageInfo
 from parlant.core.persistence.common import (
     ObjectId,
     Where,
@@ -430,11 +433,18 @@ class _UsageInfoDocument(TypedDict):
     extra: Optional[Mapping[str, int]]
 
 
+class _GenerationCacheInfoDocument(TypedDict):
+    hit: bool
+    hits: int
+    misses: int
+
+
 class _GenerationInfoDocument(TypedDict):
     schema_name: str
     model: str
     duration: float
     usage: _UsageInfoDocument
+    cache: NotRequired[_GenerationCacheInfoDocument]
 
 
 class _GuidelineMatchInspectionDocument(TypedDict):
@@ -550,6 +560,35 @@ class _ToolEventData_v0_5_0(TypedDict):
     tool_calls: list[_ToolCall_v0_5_0]
 
 
+class SessionEventBus:
+    """An in-process bus on which a session store announces the events it creates
+    and the sessions it deletes."""
+
+    def __init__(self) -> None:
+        self._subscribers: list[Callable[[SessionId, Event], None]] = []
+        self._deletion_subscribers: list[Callable[[SessionId], None]] = []
+
+    def subscribe(self, callback: Callable[[SessionId, Event], None]) -> None:
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable[[SessionId, Event], None]) -> None:
+        self._subscribers.remove(callback)
+
+    def subscribe_to_deletions(self, callback: Callable[[SessionId], None]) -> None:
+        self._deletion_subscribers.append(callback)
+
+    def unsubscribe_from_deletions(self, callback: Callable[[SessionId], None]) -> None:
+        self._deletion_subscribers.remove(callback)
+
+    def publish(self, session_id: SessionId, event: Event) -> None:
+        for callback in list(self._subscribers):
+            callback(session_id, event)
+
+    def publish_deletion(self, session_id: SessionId) -> None:
+        for callback in list(self._deletion_subscribers):
+            callback(session_id)
+
+
 class SessionDocumentStore(SessionStore):
     VERSION = Version.from_string("0.6.0")
 
@@ -560,7 +599,38 @@ class SessionDocumentStore(SessionStore):
         self._inspection_collection: DocumentCollection[_InspectionDocument]
         self._allow_migration = allow_migration
 
+        # The store-wide lock is only taken exclusively for operations spanning
+        # multiple sessions. Event appends hold it shared, and serialize on
+        # a per-session lock instead, so different sessions don't block each other.
         self._lock = ReaderWriterLock()
+        self._session_locks: weakref.WeakValueDictionary[SessionId, asyncio.Lock] = (
+            weakref.WeakValueDictionary()
+        )
+
+        # Next event offset per session, lazily rebuilt from the events collection
+        self._next_event_offsets: dict[SessionId, int] = {}
+
+        self.event_bus = SessionEventBus()
+
+    def _get_session_lock(self, session_id: SessionId) -> asyncio.Lock:
+        if (lock := self._session_locks.get(session_id)) is None:
+            lock = asyncio.Lock()
+            self._session_locks[session_id] = lock
+
+        return lock
+
+    async def _get_next_event_offset(self, session_id: SessionId) -> int:
+        if session_id not in self._next_event_offsets:
+            self._next_event_offsets[session_id] = len(
+                await self._event_collection.find(
+                    filters={
+                        "session_id": {"$eq": session_id},
+                        "deleted": {"$eq": False},
+                    }
+                )
+            )
+
+        return self._next_event_offsets[session_id]
 
     async def _session_document_loader(self, doc: BaseDocument) -> Optional[_SessionDocument]:
         async def v0_1_0_to_v0_4_0(doc: BaseDocument) -> Optional[BaseDocument]:
@@ -836,16 +906,21 @@ class SessionDocumentStore(SessionStore):
                 schema=_SessionDocument,
                 document_loader=self._session_document_loader,
             )
+            await self._session_collection.create_index("id")
             self._event_collection = await self._database.get_or_create_collection(
                 name="events",
                 schema=_EventDocument,
                 document_loader=self._event_document_loader,
             )
+            await self._event_collection.create_index("id")
+            await self._event_collection.create_index("session_id")
+            await self._event_collection.create_index("correlation_id")
             self._inspection_collection = await self._database.get_or_create_collection(
                 name="inspections",
                 schema=_InspectionDocument,
                 document_loader=self._inspection_document_loader,
             )
+            await self._inspection_collection.create_index("correlation_id")
 
         return self
 
@@ -967,7 +1042,7 @@ class SessionDocumentStore(SessionStore):
         correlation_id: str,
     ) -> _InspectionDocument:
         def serialize_generation_info(generation: GenerationInfo) -> _GenerationInfoDocument:
-            return _GenerationInfoDocument(
+            document = _GenerationInfoDocument(
                 schema_name=generation.schema_name,
                 model=generation.model,
                 duration=generation.duration,
@@ -978,6 +1053,15 @@ class SessionDocumentStore(SessionStore):
                 ),
             )
 
+            if generation.cache:
+                document["cache"] = _GenerationCacheInfoDocument(
+                    hit=generation.cache.hit,
+                    hits=generation.cache.hits,
+                    misses=generation.cache.misses,
+                )
+
+            return document
+
         return _InspectionDocument(
             id=ObjectId(generate_id()),
             version=self.VERSION.to_string(),
@@ -1031,6 +1115,13 @@ class SessionDocumentStore(SessionStore):
                     output_tokens=generation_document["usage"]["output_tokens"],
                     extra=generation_document["usage"]["extra"],
                 ),
+                cache=GenerationCacheInfo(
+                    hit=cache["hit"],
+                    hits=cache["hits"],
+                    misses=cache["misses"],
+                )
+                if (cache := generation_document.get("cache"))
+                else None,
             )
 
         return Inspection(
@@ -1112,6 +1203,10 @@ class SessionDocumentStore(SessionStore):
 
             await self._session_collection.delete_one({"id": {"$eq": session_id}})
 
+            self._next_event_offsets.pop(session_id, None)
+
+        self.event_bus.publish_deletion(session_id)
+
     @override
     async def read_session(
         self,
@@ -1177,15 +1272,12 @@ class SessionDocumentStore(SessionStore):
         data: JSONSerializable,
         creation_utc: Optional[datetime] = None,
     ) -> Event:
-        async with self._lock.writer_lock:
+        async with self._lock.reader_lock, self._get_session_lock(session_id):
             if not await self._session_collection.find_one(filters={"id": {"$eq": session_id}}):
                 raise ItemNotFoundError(item_id=UniqueId(session_id), message="Session not found")
 
-            session_events = await self.list_events(
-                session_id
-            )  # FIXME: we need a more efficient way to do this
             creation_utc = creation_utc or datetime.now(timezone.utc)
-            offset = len(list(session_events))
+            offset = await self._get_next_event_offset(session_id)
 
             event = Event(
                 id=EventId(generate_id()),
@@ -1202,6 +1294,10 @@ class SessionDocumentStore(SessionStore):
                 document=self._serialize_event(event, session_id)
             )
 
+            self._next_event_offsets[session_id] = offset + 1
+
+            self.event_bus.publish(session_id, event)
+
         return event
 
     @override
@@ -1226,14 +1322,33 @@ class SessionDocumentStore(SessionStore):
         self,
         event_id: EventId,
     ) -> None:
-        async with self._lock.writer_lock:
-            result = await self._event_collection.update_one(
-                filters={"id": {"$eq": event_id}},
-                params={"deleted": True},
+        async with self._lock.reader_lock:
+            event_document = await self._event_collection.find_one(
+                filters={"id": {"$eq": event_id}}
             )
 
-        if result.matched_count == 0:
-            raise ItemNotFoundError(item_id=UniqueId(event_id), message="Event not found")
+            if not event_document:
+                raise ItemNotFoundError(item_id=UniqueId(event_id), message="Event not found")
+
+            session_id = event_document["session_id"]
+
+            async with self._get_session_lock(session_id):
+                # Re-read under the session lock, as it may have been deleted meanwhile
+                event_document = await self._event_collection.find_one(
+                    filters={"id": {"$eq": event_id}}
+                )
+
+                if not event_document:
+                    raise ItemNotFoundError(item_id=UniqueId(event_id), message="Event not found")
+
+                await self._event_collection.update_one(
+                    filters={"id": {"$eq": event_id}},
+                    params={"deleted": True},
+                )
+
+                # Offsets count non-deleted events, so a deleted event frees up its offset
+                if not event_document["deleted"] and session_id in self._next_event_offsets:
+                    self._next_event_offsets[session_id] -= 1
 
     @override
     async def list_events(
@@ -1376,3 +1491,102 @@ class PollingSessionListener(SessionListener):
                 return False
             else:
                 await timeout.wait_up_to(0.25)
+
+
+@dataclass(frozen=True)
+class _EventWaiter:
+    kinds: frozenset[EventKind]
+    min_offset: Optional[int]
+    source: Optional[EventSource]
+    correlation_id: Optional[str]
+    future: asyncio.Future[None]
+
+    def matches(self, event: Event) -> bool:
+        return (
+            (not self.kinds or event.kind in self.kinds)
+            and (not self.min_offset or event.offset >= self.min_offset)
+            and (not self.source or event.source == self.source)
+            and (not self.correlation_id or event.correlation_id == self.correlation_id)
+        )
+
+
+class NotifyingSessionListener(SessionListener):
+    """Wakes waiters directly when the session store publishes a matching event.
+
+    This relies on every event being created through the given store in this process.
+    When other processes write to the same (external) database, use PollingSessionListener.
+    """
+
+    def __init__(self, session_store: SessionDocumentStore) -> None:
+        self._session_store = session_store
+        self._waiters: dict[SessionId, set[_EventWaiter]] = {}
+
+        # The highest event offset created in this process, per session
+        self._watermarks: dict[SessionId, int] = {}
+
+        session_store.event_bus.subscribe(self._on_event_created)
+        session_store.event_bus.subscribe_to_deletions(self._on_session_deleted)
+
+    def _on_event_created(self, session_id: SessionId, event: Event) -> None:
+        self._watermarks[session_id] = max(event.offset, self._watermarks.get(session_id, -1))
+
+        for waiter in self._waiters.get(session_id, ()):
+            if not waiter.future.done() and waiter.matches(event):
+                waiter.future.set_result(None)
+
+    def _on_session_deleted(self, session_id: SessionId) -> None:
+        self._watermarks.pop(session_id, None)
+
+    @override
+    async def wait_for_events(
+        self,
+        session_id: SessionId,
+        kinds: Sequence[EventKind] = [],
+        min_offset: Optional[int] = None,
+        source: Optional[EventSource] = None,
+        correlation_id: Optional[str] = None,
+        timeout: Timeout = Timeout.infinite(),
+    ) -> bool:
+        # Trigger exception if not found
+        _ = await self._session_store.read_session(session_id)
+
+        waiter = _EventWaiter(
+            kinds=frozenset(kinds),
+            min_offset=min_offset,
+            source=source,
+            correlation_id=correlation_id,
+            future=asyncio.get_running_loop().create_future(),
+        )
+
+        # Register before looking at existing events, so that
+        # we can't miss one created in between.
+        self._waiters.setdefault(session_id, set()).add(waiter)
+
+        try:
+            watermark = self._watermarks.get(session_id)
+
+            # If we know that no event has reached min_offset yet, there's no need to look
+            if not (min_offset and watermark is not None and watermark < min_offset):
+                if await self._session_store.list_events(
+                    session_id,
+                    min_offset=min_offset,
+                    source=source,
+                    kinds=kinds,
+                    correlation_id=correlation_id,
+                ):
+                    return True
+
+            if timeout.expired():
+                return False
+
+            try:
+                await asyncio.wait_for(waiter.future, timeout.remaining())
+                return True
+            except asyncio.TimeoutError:
+                return False
+        finally:
+            session_waiters = self._waiters[session_id]
+            session_waiters.discard(waiter)
+
+            if not session_waiters:
+                del self._waiters[session_id]
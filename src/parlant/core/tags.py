@@ -13,9 +13,10 @@
 # limitations under the License.
 
 from abc import ABC, abstractmethod
+from collections import defaultdict
 from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import NewType, Optional, Sequence, cast
+from typing import Generic, NewType, Optional, Sequence, TypeVar, cast
 from typing_extensions import override, TypedDict, Self
 
 
@@ -92,6 +93,56 @@ class TagUpdateParams(TypedDict, total=False):
     name: str
 
 
+TEntityId = TypeVar("TEntityId", bound=str)
+
+
+class TagAssociationIndex(Generic[TEntityId]):
+    """An in-memory mirror of a store's tag associations, indexed both ways.
+
+    Stores keep it in sync with their association collection, so that tag
+    lookups don't have to scan (and filter by) every association document.
+    """
+
+    def __init__(self) -> None:
+        self._entity_ids_by_tag: dict[TagId, set[TEntityId]] = defaultdict(set)
+        self._tag_ids_by_entity: dict[TEntityId, list[TagId]] = defaultdict(list)
+
+    def add(self, entity_id: TEntityId, tag_id: TagId) -> None:
+        if tag_id not in self._tag_ids_by_entity[entity_id]:
+            self._tag_ids_by_entity[entity_id].append(tag_id)
+        self._entity_ids_by_tag[tag_id].add(entity_id)
+
+    def remove(self, entity_id: TEntityId, tag_id: TagId) -> None:
+        if tag_ids := self._tag_ids_by_entity.get(entity_id):
+            if tag_id in tag_ids:
+                tag_ids.remove(tag_id)
+            if not tag_ids:
+                del self._tag_ids_by_entity[entity_id]
+
+        if entity_ids := self._entity_ids_by_tag.get(tag_id):
+            entity_ids.discard(entity_id)
+            if not entity_ids:
+                del self._entity_ids_by_tag[tag_id]
+
+    def remove_entity(self, entity_id: TEntityId) -> None:
+        for tag_id in list(self._tag_ids_by_entity.get(entity_id, [])):
+            self.remove(entity_id, tag_id)
+
+    def tags_of(self, entity_id: TEntityId) -> list[TagId]:
+        return list(self._tag_ids_by_entity.get(entity_id, []))
+
+    def entities_with_any_of(self, tag_ids: Sequence[TagId]) -> set[TEntityId]:
+        result: set[TEntityId] = set()
+
+        for tag_id in tag_ids:
+            result.update(self._entity_ids_by_tag.get(tag_id, ()))
+
+        return result
+
+    def is_tagged(self, entity_id: TEntityId) -> bool:
+        return entity_id in self._tag_ids_by_entity
+
+
 class TagStore(ABC):
     @abstractmethod
     async def create_tag(
@@ -135,7 +135,9 @@ from parlant.core.sessions import (
     MessageEventData,
     Session,
     SessionId,
+    PollingSessionListener,
     SessionDocumentStore,
+    SessionListener,
     SessionStore,
     StatusEventData,
     ToolCall as _SessionToolCall,
@@ -146,6 +148,7 @@ from parlant.core.canned_responses import (
     CannedResponseVectorStore,
     CannedResponseId,
     CannedResponseStore,
+    CannedResponseTemplateCache,
 )
 from parlant.core.evaluations import (
     EvaluationDocumentStore,
@@ -187,6 +190,7 @@ from parlant.core.engines.alpha.canned_response_generator import (
 from parlant.core.engines.alpha.optimization_policy import (
     OptimizationPolicy,
     BasicOptimizationPolicy,
+    AdaptiveOptimizationPolicy,
 )
 from parlant.core.engines.alpha.perceived_performance_policy import (
     PerceivedPerformancePolicy,
@@ -2796,11 +2800,14 @@ class Server:
 
                 return shim()
 
-            def make_json_db(file_path: Path) -> Awaitable[DocumentDatabase]:
+            def make_json_db(
+                file_path: Path, journaled: bool = False
+            ) -> Awaitable[DocumentDatabase]:
                 return self._exit_stack.enter_async_context(
                     JSONFileDocumentDatabase(
                         c()[Logger],
                         file_path,
+                        journaled=journaled,
                     ),
                 )
 
@@ -2833,7 +2840,13 @@ class Server:
 
                 return db
 
-            async def make_persistable_store(t: type[T], spec: str, name: str, **kwargs: Any) -> T:
+            async def make_persistable_store(
+                t: type[T],
+                spec: str,
+                name: str,
+                journaled: bool = False,
+                **kwargs: Any,
+            ) -> T:
                 store: T
 
                 if spec in ["transient", "local"]:
@@ -2844,7 +2857,8 @@ class Server:
                                 {
                                     "transient": make_transient_db,
                                     "local": lambda: make_json_db(
-                                        PARLANT_HOME_DIR / f"{name}.json"
+                                        PARLANT_HOME_DIR / f"{name}.json",
+                                        journaled=journaled,
                                     ),
                                 },
                             )[spec](),
@@ -2874,9 +2888,14 @@ class Server:
                 c()[SessionStore] = self._session_store
             else:
                 c()[SessionStore] = await make_persistable_store(
-                    SessionDocumentStore, self._session_store, "sessions"
+                    SessionDocumentStore, self._session_store, "sessions", journaled=True
                 )
 
+                # Other processes may write to a shared external database,
+                # so in that case we can't rely on in-process notifications.
+                if self._session_store.startswith(("mongodb://", "mongodb+srv://")):
+                    c()[SessionListener] = PollingSessionListener(c()[SessionStore])
+
             if isinstance(self._customer_store, CustomerStore):
                 c()[CustomerStore] = self._customer_store
             else:
@@ -2903,11 +2922,15 @@ class Server:
             async def get_embedder_type() -> type[Embedder]:
                 return type(await c()[NLPService].get_embedder())
 
-            for vector_store_interface, vector_store_type in [
-                (GlossaryStore, GlossaryVectorStore),
-                (CannedResponseStore, CannedResponseVectorStore),
-                (CapabilityStore, CapabilityVectorStore),
-                (JourneyStore, JourneyVectorStore),
+            for vector_store_interface, vector_store_type, vector_store_arguments in [
+                (GlossaryStore, GlossaryVectorStore, {}),
+                (
+                    CannedResponseStore,
+                    CannedResponseVectorStore,
+                    {"template_cache": c()[CannedResponseTemplateCache]},
+                ),
+                (CapabilityStore, CapabilityVectorStore, {}),
+                (JourneyStore, JourneyVectorStore, {}),
             ]:
                 c()[vector_store_interface] = await self._exit_stack.enter_async_context(
                     vector_store_type(
@@ -2920,6 +2943,7 @@ class Server:
                         document_db=TransientDocumentDatabase(),
                         embedder_factory=embedder_factory,
                         embedder_type_provider=get_embedder_type,
+                        **vector_store_arguments,
                     )  # type: ignore
                 )
 
@@ -3045,6 +3069,7 @@ __all__ = [
     "PromptBuilder",
     "PromptSection",
     "BasicOptimizationPolicy",
+    "AdaptiveOptimizationPolicy",
     "PerceivedPerformancePolicy",
     "BasicPerceivedPerformancePolicy",
     "NullPerceivedPerformancePolicy",
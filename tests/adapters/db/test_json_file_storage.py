@@ -12,6 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
 from dataclasses import dataclass
 from datetime import datetime, timezone
 import json
@@ -44,14 +45,14 @@ from parlant.core.guidelines import (
     GuidelineId,
 )
 from parlant.adapters.db.json_file import JSONFileDocumentDatabase
-from parlant.core.persistence.common import MigrationRequired
+from parlant.core.persistence.common import MigrationRequired, ObjectId
 from parlant.core.persistence.document_database import (
     BaseDocument,
     DocumentCollection,
     identity_loader,
 )
 from parlant.core.persistence.document_database_helper import DocumentStoreMigrationHelper
-from parlant.core.sessions import EventKind, EventSource, SessionDocumentStore
+from parlant.core.sessions import EventKind, EventSource, SessionDocumentStore, SessionId
 from parlant.core.guideline_tool_associations import (
     GuidelineToolAssociationDocumentStore,
 )
@@ -188,6 +189,51 @@ async def test_event_creation(
     assert datetime.fromisoformat(json_event["creation_utc"]) == event.creation_utc
 
 
+async def test_that_event_offsets_continue_from_persisted_events_after_reopening(
+    context: _TestContext,
+    new_file: Path,
+) -> None:
+    async def create_events(session_store: SessionDocumentStore, session_id: SessionId) -> None:
+        await asyncio.gather(
+            *(
+                session_store.create_event(
+                    session_id=session_id,
+                    source=EventSource.CUSTOMER,
+                    kind=EventKind.MESSAGE,
+                    correlation_id="<main>",
+                    data={"message": f"Message {i}"},
+                )
+                for i in range(3)
+            )
+        )
+
+    async with JSONFileDocumentDatabase(context.container[Logger], new_file) as session_db:
+        async with SessionDocumentStore(session_db) as session_store:
+            first_session = await session_store.create_session(
+                customer_id=CustomerId("test_customer"),
+                agent_id=context.agent_id,
+            )
+            second_session = await session_store.create_session(
+                customer_id=CustomerId("test_customer"),
+                agent_id=context.agent_id,
+            )
+
+            await asyncio.gather(
+                create_events(session_store, first_session.id),
+                create_events(session_store, second_session.id),
+            )
+
+    async with JSONFileDocumentDatabase(context.container[Logger], new_file) as session_db:
+        async with SessionDocumentStore(session_db) as session_store:
+            await create_events(session_store, first_session.id)
+
+            first_session_events = await session_store.list_events(first_session.id)
+            second_session_events = await session_store.list_events(second_session.id)
+
+            assert sorted(e.offset for e in first_session_events) == list(range(6))
+            assert sorted(e.offset for e in second_session_events) == list(range(3))
+
+
 async def test_guideline_creation_and_loading_data_from_file(
     context: _TestContext,
     new_file: Path,
@@ -837,3 +883,162 @@ async def test_that_persistence_and_store_version_match_allows_store_to_open_whe
 
             assert meta_document
             assert meta_document["version"] == "2.0.0"
+
+
+async def test_that_journaled_database_appends_changes_to_journal_instead_of_rewriting_file(
+    context: _TestContext,
+    new_file: Path,
+) -> None:
+    db = await JSONFileDocumentDatabase(
+        context.container[Logger],
+        new_file,
+        journaled=True,
+    ).__aenter__()
+
+    collection = await db.get_or_create_collection("dummy", BaseDocument, identity_loader)
+
+    await collection.insert_one({"id": ObjectId("1"), "version": Version.String("1.0.0")})
+    await collection.insert_one({"id": ObjectId("2"), "version": Version.String("1.0.0")})
+    await collection.update_one({"id": {"$eq": "1"}}, {"version": Version.String("2.0.0")})
+    await collection.delete_one({"id": {"$eq": "2"}})
+
+    assert "dummy" not in new_file.read_text()
+
+    with open(db.journal_path) as f:
+        assert [json.loads(line)["op"] for line in f] == ["insert", "insert", "update", "delete"]
+
+    await db.__aexit__(None, None, None)
+
+    assert not db.journal_path.exists()
+
+    with open(new_file) as f:
+        assert json.load(f)["dummy"] == [{"id": "1", "version": "2.0.0"}]
+
+
+async def test_that_journal_is_replayed_when_database_is_reopened(
+    context: _TestContext,
+    new_file: Path,
+) -> None:
+    # Simulate a crash by never exiting the first database's context
+    crashed_db = await JSONFileDocumentDatabase(
+        context.container[Logger],
+        new_file,
+        journaled=True,
+    ).__aenter__()
+
+    collection = await crashed_db.get_or_create_collection("dummy", BaseDocument, identity_loader)
+
+    await collection.insert_one({"id": ObjectId("1"), "version": Version.String("1.0.0")})
+    await collection.insert_one({"id": ObjectId("2"), "version": Version.String("1.0.0")})
+    await collection.update_one({"id": {"$eq": "2"}}, {"version": Version.String("2.0.0")})
+    await collection.delete_one({"id": {"$eq": "1"}})
+
+    async with JSONFileDocumentDatabase(context.container[Logger], new_file) as db:
+        collection = await db.get_collection("dummy", BaseDocument, identity_loader)
+
+        assert await collection.find({}) == [{"id": "2", "version": "2.0.0"}]
+
+    assert not crashed_db.journal_path.exists()
+
+
+async def test_that_journal_is_compacted_into_file_once_it_reaches_the_threshold(
+    context: _TestContext,
+    new_file: Path,
+) -> None:
+    async with JSONFileDocumentDatabase(
+        context.container[Logger],
+        new_file,
+        journaled=True,
+        compaction_threshold=3,
+    ) as db:
+        collection = await db.get_or_create_collection("dummy", BaseDocument, identity_loader)
+
+        for i in range(3):
+            await collection.insert_one(
+                {"id": ObjectId(str(i)), "version": Version.String("1.0.0")}
+            )
+
+        assert db._compaction_task
+        await db._compaction_task
+
+        with open(new_file) as f:
+            assert [d["id"] for d in json.load(f)["dummy"]] == ["0", "1", "2"]
+
+        assert not db.journal_path.exists()
+
+        await collection.insert_one({"id": ObjectId("3"), "version": Version.String("1.0.0")})
+
+        with open(db.journal_path) as f:
+            assert len(f.readlines()) == 1
+
+
+async def test_that_entries_of_a_failed_compaction_survive_another_failed_compaction(
+    context: _TestContext,
+    new_file: Path,
+) -> None:
+    # Simulate a crash by never exiting the first database's context
+    crashed_db = await JSONFileDocumentDatabase(
+        context.container[Logger],
+        new_file,
+        journaled=True,
+        compaction_threshold=1_000,
+    ).__aenter__()
+
+    async def fail_to_save_data(data: Any) -> None:
+        raise OSError("Disk full")
+
+    setattr(crashed_db, "_save_data_unlocked", fail_to_save_data)
+
+    collection = await crashed_db.get_or_create_collection("dummy", BaseDocument, identity_loader)
+
+    await collection.insert_one({"id": ObjectId("1"), "version": Version.String("1.0.0")})
+
+    with raises(OSError):
+        await crashed_db.flush()
+
+    await collection.insert_one({"id": ObjectId("2"), "version": Version.String("1.0.0")})
+
+    with raises(OSError):
+        await crashed_db.flush()
+
+    async with JSONFileDocumentDatabase(context.container[Logger], new_file) as db:
+        collection = await db.get_collection("dummy", BaseDocument, identity_loader)
+
+        assert [d["id"] for d in await collection.find({})] == ["1", "2"]
+
+
+async def test_that_a_document_deleted_while_being_inserted_stays_deleted_after_reopening(
+    context: _TestContext,
+    new_file: Path,
+) -> None:
+    # Simulate a crash by never exiting the first database's context
+    crashed_db = await JSONFileDocumentDatabase(
+        context.container[Logger],
+        new_file,
+        journaled=True,
+    ).__aenter__()
+
+    persist_change = crashed_db._persist_change
+
+    async def persist_change_slowly(entry: Any) -> None:
+        if entry["op"] == "insert":
+            # Give the concurrent delete every chance to be journaled first
+            await asyncio.sleep(0.01)
+
+        await persist_change(entry)
+
+    setattr(crashed_db, "_persist_change", persist_change_slowly)
+
+    collection = await crashed_db.get_or_create_collection("dummy", BaseDocument, identity_loader)
+
+    await asyncio.gather(
+        collection.insert_one({"id": ObjectId("1"), "version": Version.String("1.0.0")}),
+        collection.delete_one({"id": {"$eq": "1"}}),
+    )
+
+    assert await collection.find({}) == []
+
+    async with JSONFileDocumentDatabase(context.container[Logger], new_file) as db:
+        collection = await db.get_collection("dummy", BaseDocument, identity_loader)
+
+        assert await collection.find({}) == []
@@ -0,0 +1,173 @@
+# Copyright 2025 Emcie Co Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from typing import TypedDict
+from lagom import Container
+from pytest import approx, fixture
+from typing_extensions import Required
+
+from parlant.adapters.vector_db.transient import TransientVectorDatabase
+from parlant.core.common import Version
+from parlant.core.loggers import Logger
+from parlant.core.nlp.embedding import EmbedderFactory, NullEmbeddingCache
+from parlant.core.persistence.common import ObjectId
+from parlant.core.persistence.vector_database import VectorCollection
+
+from tests.test_utilities import DummyEmbedder
+
+
+_VECTORS = {
+    "north": [0.0, 1.0, 0.0],
+    "north-east": [0.6, 0.8, 0.0],
+    "east": [1.0, 0.0, 0.0],
+    "south": [0.0, -1.0, 0.0],
+    "nowhere": [0.0, 0.0, 0.0],
+}
+
+
+class _TestDocument(TypedDict, total=False):
+    id: ObjectId
+    version: Version.String
+    content: str
+    checksum: Required[str]
+
+
+@fixture
+async def collection(container: Container) -> VectorCollection[_TestDocument]:
+    container[DummyEmbedder] = DummyEmbedder(_VECTORS.__getitem__, dimensions=3)
+
+    database = TransientVectorDatabase(
+        container[Logger],
+        EmbedderFactory(container),
+        lambda: NullEmbeddingCache(),
+    )
+
+    collection = await database.create_collection(
+        "directions",
+        schema=_TestDocument,
+        embedder_type=DummyEmbedder,
+    )
+
+    for content in ["north", "north-east", "east", "south"]:
+        await collection.insert_one(
+            _TestDocument(
+                id=ObjectId(content),
+                version=Version.String("0.1.0"),
+                content=content,
+                checksum=content,
+            )
+        )
+
+    return collection
+
+
+async def test_that_similar_documents_are_returned_with_cosine_distances(
+    collection: VectorCollection[_TestDocument],
+) -> None:
+    results = await collection.find_similar_documents({}, "north", k=3)
+
+    assert [r.document["id"] for r in results] == ["north", "north-east", "east"]
+    assert [r.distance for r in results] == approx([0.0, 0.2, 1.0])
+
+
+async def test_that_similar_documents_are_restricted_by_filters(
+    collection: VectorCollection[_TestDocument],
+) -> None:
+    results = await collection.find_similar_documents(
+        {"id": {"$in": ["east", "south"]}},
+        "north",
+        k=5,
+    )
+
+    assert [r.document["id"] for r in results] == ["east", "south"]
+    assert [r.distance for r in results] == approx([1.0, 2.0])
+
+
+async def test_that_updated_and_deleted_documents_are_reflected_in_similarity_search(
+    collection: VectorCollection[_TestDocument],
+) -> None:
+    await collection.delete_one({"id": {"$eq": "north"}})
+    await collection.update_one(
+        {"id": {"$eq": "south"}},
+        {"content": "north", "checksum": "north"},
+    )
+
+    results = await collection.find_similar_documents({}, "north", k=2)
+
+    assert [r.document["id"] for r in results] == ["south", "north-east"]
+    assert [r.distance for r in results] == approx([0.0, 0.2])
+
+
+async def test_that_a_zero_query_vector_does_not_produce_invalid_distances(
+    collection: VectorCollection[_TestDocument],
+) -> None:
+    results = await collection.find_similar_documents({}, "nowhere", k=4)
+
+    assert len(results) == 4
+    assert all(r.distance == 1.0 for r in results)
+
+
+async def test_that_batched_queries_return_the_results_of_each_query_in_order(
+    collection: VectorCollection[_TestDocument],
+) -> None:
+    results = await collection.find_similar_documents_batch(
+        {"id": {"$ne": "north-east"}},
+        ["north-east", "north", "south"],
+        k=2,
+    )
+
+    assert [[r.document["id"] for r in rs] for rs in results] == [
+        ["north", "east"],
+        ["north", "east"],
+        ["south", "east"],
+    ]
+    assert [[r.distance for r in rs] for rs in results] == [
+        approx([0.2, 0.4]),
+        approx([0.0, 1.0]),
+        approx([0.0, 1.0]),
+    ]
+
+
+async def test_that_batched_queries_default_to_querying_one_at_a_time(
+    collection: VectorCollection[_TestDocument],
+) -> None:
+    queries = ["north-east", "north", "south"]
+
+    results = await VectorCollection.find_similar_documents_batch(collection, {}, queries, k=2)
+
+    assert [[r.document["id"] for r in rs] for rs in results] == [
+        [r.document["id"] for r in await collection.find_similar_documents({}, query, k=2)]
+        for query in queries
+    ]
+
+
+async def test_that_a_document_can_be_upserted(
+    collection: VectorCollection[_TestDocument],
+) -> None:
+    result = await collection.update_one(
+        {"id": {"$eq": "nowhere"}},
+        _TestDocument(
+            id=ObjectId("nowhere"),
+            version=Version.String("0.1.0"),
+            content="north",
+            checksum="north",
+        ),
+        upsert=True,
+    )
+
+    assert result.updated_document
+
+    results = await collection.find_similar_documents({}, "north", k=2)
+
+    assert {r.document["id"] for r in results} == {"north", "nowhere"}
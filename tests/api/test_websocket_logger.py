@@ -69,3 +69,23 @@ async def test_that_websocket_reconnects_and_receives_messages(
         assert "Second connection test" in data2["message"]
         assert data2["level"] == "INFO"
         assert data2["correlation_id"] == correlator.correlation_id
+
+
+async def test_that_websocket_logger_sends_batched_messages_above_its_level(
+    container: Container,
+    test_client: TestClient,
+) -> None:
+    ws_logger = container[WebSocketLogger]
+
+    with test_client.websocket_connect("/logs?batch=true") as ws:
+        ws_logger.trace("Not at this level")
+        ws_logger.info("First message")
+        ws_logger.warning("Second message")
+        await asyncio.sleep(1)
+
+        batch = ws.receive_json()
+
+        assert [(m["level"], m["message"].strip()) for m in batch] == [
+            ("INFO", "First message"),
+            ("WARNING", "Second message"),
+        ]
@@ -93,6 +93,10 @@ from parlant.core.engines.alpha.guideline_matching.generic.response_analysis_bat
 from parlant.core.engines.alpha import message_generator
 from parlant.core.engines.alpha.hooks import EngineHooks
 from parlant.core.engines.alpha.relational_guideline_resolver import RelationalGuidelineResolver
+from parlant.core.engines.alpha.guideline_matching.guideline_screening import (
+    GuidelineScreener,
+    NullGuidelineScreener,
+)
 from parlant.core.engines.alpha.tool_calling.default_tool_call_batcher import DefaultToolCallBatcher
 from parlant.core.engines.alpha.canned_response_generator import (
     CannedResponseDraftSchema,
@@ -137,7 +141,11 @@ from parlant.core.services.indexing.tool_running_action_detector import (
     ToolRunningActionDetector,
     ToolRunningActionSchema,
 )
-from parlant.core.canned_responses import CannedResponseStore, CannedResponseVectorStore
+from parlant.core.canned_responses import (
+    CannedResponseStore,
+    CannedResponseTemplateCache,
+    CannedResponseVectorStore,
+)
 from parlant.core.nlp.embedding import (
     BasicEmbeddingCache,
     Embedder,
@@ -172,6 +180,10 @@ from parlant.core.engines.alpha.guideline_matching.guideline_matcher import (
     GuidelineMatchingStrategyResolver,
     ResponseAnalysisBatch,
 )
+from parlant.core.engines.alpha.guideline_matching.guideline_matching_cache import (
+    BasicGuidelineMatchingCache,
+    GuidelineMatchingCache,
+)
 
 from parlant.core.engines.alpha.guideline_matching.generic.observational_batch import (
     GenericObservationalGuidelineMatchesSchema,
@@ -426,6 +438,7 @@ async def container(
             )
         )
 
+        container[CannedResponseTemplateCache] = Singleton(CannedResponseTemplateCache)
         container[CannedResponseStore] = await stack.enter_async_context(
             CannedResponseVectorStore(
                 container[IdGenerator],
@@ -435,6 +448,7 @@ async def container(
                 document_db=TransientDocumentDatabase(),
                 embedder_factory=embedder_factory,
                 embedder_type_provider=get_embedder_type,
+                template_cache=container[CannedResponseTemplateCache],
             )
         )
 
@@ -543,6 +557,7 @@ async def container(
             GenericPreviouslyAppliedActionableCustomerDependentGuidelineMatching
         )
         container[ResponseAnalysisBatch] = Singleton(GenericResponseAnalysisBatch)
+        container[GuidelineMatchingCache] = Singleton(BasicGuidelineMatchingCache)
         container[GuidelineMatcher] = Singleton(GuidelineMatcher)
         container[GuidelineEvaluator] = Singleton(GuidelineEvaluator)
 
@@ -550,6 +565,7 @@ async def container(
         container[ToolCallBatcher] = lambda container: container[DefaultToolCallBatcher]
         container[ToolCaller] = Singleton(ToolCaller)
         container[RelationalGuidelineResolver] = Singleton(RelationalGuidelineResolver)
+        container[GuidelineScreener] = Singleton(NullGuidelineScreener)
         container[CannedResponseGenerator] = Singleton(CannedResponseGenerator)
         container[NoMatchResponseProvider] = Singleton(BasicNoMatchResponseProvider)
         container[CannedResponseFieldExtractor] = Singleton(CannedResponseFieldExtractor)
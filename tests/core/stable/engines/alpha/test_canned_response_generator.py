@@ -0,0 +1,320 @@
+# Copyright 2025 Emcie Co Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from dataclasses import dataclass
+import re
+from typing import Any, Callable, Mapping, Optional, Sequence, cast
+from unittest.mock import AsyncMock
+
+from lagom import Container, Singleton
+from pytest import mark
+
+from parlant.core.agents import AgentStore, CompositionMode
+from parlant.core.canned_responses import (
+    CannedResponse,
+    CannedResponseId,
+    CannedResponseRelevantResult,
+    CannedResponseStore,
+)
+from parlant.core.contextual_correlator import ContextualCorrelator
+from parlant.core.customers import CustomerStore
+from parlant.core.emission.event_buffer import EventBuffer
+from parlant.core.engines.alpha.canned_response_generator import (
+    DEFAULT_NO_MATCH_CANREP,
+    CannedResponseContext,
+    CannedResponseDraftSchema,
+    CannedResponseFieldExtractionSchema,
+    CannedResponseFieldExtractor,
+    CannedResponseGenerator,
+    CannedResponseSelectionSchema,
+)
+from parlant.core.engines.alpha.loaded_context import Interaction, LoadedContext, ResponseState
+from parlant.core.engines.alpha.prompt_builder import PromptBuilder
+from parlant.core.engines.alpha.tool_calling.tool_caller import ToolInsights
+from parlant.core.engines.types import Context
+from parlant.core.entity_cq import EntityQueries
+from parlant.core.loggers import Logger
+from parlant.core.nlp.generation import T, SchematicGenerationResult, SchematicGenerator
+from parlant.core.nlp.generation_info import GenerationInfo, UsageInfo
+from parlant.core.nlp.tokenization import EstimatingTokenizer, ZeroEstimatingTokenizer
+from parlant.core.sessions import EventKind, EventSource, MessageEventData, SessionStore
+
+from tests.test_utilities import create_session, make_canned_response
+
+
+class _FakeSchematicGenerator(SchematicGenerator[T]):
+    def __init__(self, respond: Callable[[str], T]) -> None:
+        self._respond = respond
+        self.prompts: list[str] = []
+
+    async def generate(
+        self,
+        prompt: str | PromptBuilder,
+        hints: Mapping[str, Any] = {},
+    ) -> SchematicGenerationResult[T]:
+        prompt = prompt.build() if isinstance(prompt, PromptBuilder) else prompt
+        self.prompts.append(prompt)
+
+        return SchematicGenerationResult(
+            content=self._respond(prompt),
+            info=GenerationInfo(
+                schema_name=self.schema.__name__,
+                model="fake",
+                duration=0.0,
+                usage=UsageInfo(input_tokens=0, output_tokens=0),
+            ),
+        )
+
+    @property
+    def id(self) -> str:
+        return "fake"
+
+    @property
+    def max_tokens(self) -> int:
+        return 8192
+
+    @property
+    def tokenizer(self) -> EstimatingTokenizer:
+        return ZeroEstimatingTokenizer()
+
+
+class _NonDeferringCannedResponseGenerator(CannedResponseGenerator):
+    """Renders the generative fields of every candidate, as before deferral."""
+
+    async def _render_responses(
+        self,
+        context: CannedResponseContext,
+        responses: Any,
+        defer_generative_fields: bool = False,
+    ) -> Any:
+        return await super()._render_responses(context, responses, defer_generative_fields=False)
+
+
+@dataclass(frozen=True)
+class _SelectionFixture:
+    draft: str
+    canned_responses: Sequence[CannedResponse]
+    field_values: Mapping[str, str]
+    expected_canned_response_id: Optional[str]
+
+
+_SELECTION_FIXTURES = [
+    _SelectionFixture(
+        draft="Your flight LY001 departs at 10:00 from gate B4.",
+        canned_responses=[
+            make_canned_response(
+                "flight_details",
+                "Your flight {{generative.flight_number}} departs at "
+                "{{generative.departure_time}} from gate {{generative.gate}}.",
+            ),
+            make_canned_response("flight_cancelled", "Your flight was cancelled."),
+            make_canned_response("hotel", "We found {{generative.hotel_name}} for you."),
+        ],
+        field_values={
+            "flight_number": "LY001",
+            "departure_time": "10:00",
+            "gate": "B4",
+            "hotel_name": "the Grand Hotel",
+        },
+        expected_canned_response_id="flight_details",
+    ),
+    _SelectionFixture(
+        draft="We found the Grand Hotel for you.",
+        canned_responses=[
+            make_canned_response("hotel", "We found {{generative.hotel_name}} for you."),
+            make_canned_response("flight", "Your flight is {{generative.flight_number}}."),
+        ],
+        field_values={"hotel_name": "the Grand Hotel", "flight_number": "LY001"},
+        expected_canned_response_id="hotel",
+    ),
+    _SelectionFixture(
+        draft="I'm afraid I can't discuss the weather.",
+        canned_responses=[
+            make_canned_response("hotel", "We found {{generative.hotel_name}} for you."),
+            make_canned_response("flight", "Your flight is {{generative.flight_number}}."),
+        ],
+        field_values={"hotel_name": "the Grand Hotel", "flight_number": "LY001"},
+        expected_canned_response_id=None,
+    ),
+]
+
+
+def _words(text: str) -> set[str]:
+    return set(re.findall(r"[a-z0-9]+", re.sub(r"\{\{.*?\}\}", " ", text.lower())))
+
+
+def _select_by_word_overlap(draft: str, prompt: str) -> CannedResponseSelectionSchema:
+    # Scores each candidate by how many of the draft's words it has, as they appear in the prompt
+    draft_words = _words(draft)
+
+    scores = {
+        canned_response_id: len(draft_words & _words(text)) / len(draft_words)
+        for canned_response_id, text in re.findall(
+            r'Template ID: (\S+) """\n(.*?)\n"""', prompt, re.DOTALL
+        )
+    }
+
+    best_id = max(scores, key=lambda i: scores[i])
+
+    if scores[best_id] < 0.5:
+        return CannedResponseSelectionSchema(match_quality="none")
+
+    return CannedResponseSelectionSchema(chosen_template_id=best_id, match_quality="high")
+
+
+@dataclass(frozen=True)
+class _GenerationOutcome:
+    message: str
+    canned_response_ids: Sequence[CannedResponseId]
+    field_prompts: Sequence[str]
+    selection_prompt: str
+
+
+async def _generate(
+    container: Container,
+    fixture: _SelectionFixture,
+    generator_type: type[CannedResponseGenerator],
+) -> _GenerationOutcome:
+    draft_generator = _FakeSchematicGenerator[CannedResponseDraftSchema](
+        lambda _: CannedResponseDraftSchema(
+            last_message_of_user="Hello",
+            guidelines=[],
+            response_body=fixture.draft,
+        )
+    )
+    selection_generator = _FakeSchematicGenerator[CannedResponseSelectionSchema](
+        lambda prompt: _select_by_word_overlap(fixture.draft, prompt)
+    )
+
+    def extract_field(prompt: str) -> CannedResponseFieldExtractionSchema:
+        match = re.search(r"value for the field 'generative\.(\w+)'", prompt)
+        assert match
+
+        return CannedResponseFieldExtractionSchema(
+            field_name=match.group(1),
+            field_value=fixture.field_values[match.group(1)],
+        )
+
+    field_generator = _FakeSchematicGenerator[CannedResponseFieldExtractionSchema](extract_field)
+
+    canned_response_store = AsyncMock(spec=CannedResponseStore)
+    canned_response_store.list_canned_responses.return_value = fixture.canned_responses
+    canned_response_store.find_relevant_canned_responses.return_value = [
+        CannedResponseRelevantResult(canned_response=r, score=1.0) for r in fixture.canned_responses
+    ]
+
+    overridden = container.clone()
+    overridden[SchematicGenerator[CannedResponseDraftSchema]] = draft_generator  # type: ignore
+    overridden[SchematicGenerator[CannedResponseSelectionSchema]] = selection_generator  # type: ignore
+    overridden[SchematicGenerator[CannedResponseFieldExtractionSchema]] = field_generator  # type: ignore
+    overridden[CannedResponseStore] = lambda: canned_response_store
+    overridden[EntityQueries] = Singleton(EntityQueries)
+    overridden[CannedResponseFieldExtractor] = Singleton(CannedResponseFieldExtractor)
+    overridden[CannedResponseGenerator] = Singleton(generator_type)
+
+    agent = await container[AgentStore].create_agent(
+        name="Test Agent",
+        composition_mode=CompositionMode.CANNED_STRICT,
+    )
+    customer = await container[CustomerStore].create_customer(name="Test Customer")
+    session = await create_session(container, agent.id, customer.id)
+
+    customer_message = await container[SessionStore].create_event(
+        session.id,
+        source=EventSource.CUSTOMER,
+        kind=EventKind.MESSAGE,
+        correlation_id="",
+        data={"message": "Hello", "participant": {"display_name": customer.name}},
+    )
+
+    event_buffer = EventBuffer(agent)
+
+    await overridden[CannedResponseGenerator].generate_response(
+        LoadedContext(
+            info=Context(session_id=session.id, agent_id=agent.id),
+            logger=container[Logger],
+            correlator=container[ContextualCorrelator],
+            agent=agent,
+            customer=customer,
+            session=session,
+            session_event_emitter=event_buffer,
+            response_event_emitter=event_buffer,
+            interaction=Interaction(history=[customer_message]),
+            state=ResponseState(
+                context_variables=[],
+                glossary_terms=set(),
+                capabilities=[],
+                iterations=[],
+                ordinary_guideline_matches=[],
+                tool_enabled_guideline_matches={},
+                journeys=[],
+                journey_paths={},
+                tool_events=[],
+                tool_insights=ToolInsights(),
+                prepared_to_respond=False,
+                message_events=[],
+            ),
+        )
+    )
+
+    message_data = next(
+        cast(MessageEventData, e.data) for e in event_buffer.events if e.kind == EventKind.MESSAGE
+    )
+
+    return _GenerationOutcome(
+        message=message_data["message"],
+        canned_response_ids=[id for id, _ in message_data.get("canned_responses", [])],
+        field_prompts=field_generator.prompts,
+        selection_prompt=selection_generator.prompts[0],
+    )
+
+
+@mark.parametrize("fixture", _SELECTION_FIXTURES)
+async def test_that_deferring_generative_fields_does_not_change_the_chosen_canned_response(
+    container: Container,
+    fixture: _SelectionFixture,
+) -> None:
+    deferred = await _generate(container, fixture, CannedResponseGenerator)
+    non_deferred = await _generate(container, fixture, _NonDeferringCannedResponseGenerator)
+
+    assert deferred.canned_response_ids == non_deferred.canned_response_ids
+    assert deferred.message == non_deferred.message
+
+    if fixture.expected_canned_response_id:
+        assert deferred.canned_response_ids == [fixture.expected_canned_response_id]
+    else:
+        assert deferred.message == DEFAULT_NO_MATCH_CANREP
+
+
+async def test_that_generative_fields_are_only_rendered_for_the_chosen_canned_response(
+    container: Container,
+) -> None:
+    outcome = await _generate(container, _SELECTION_FIXTURES[1], CannedResponseGenerator)
+
+    assert outcome.message == "We found the Grand Hotel for you."
+
+    assert len(outcome.field_prompts) == 1
+    assert "generative.hotel_name" in outcome.field_prompts[0]
+
+    assert "We found {{generative.hotel_name}} for you." in outcome.selection_prompt
+    assert "Your flight is {{generative.flight_number}}." in outcome.selection_prompt
+
+
+async def test_that_no_generative_field_is_rendered_when_no_canned_response_matches(
+    container: Container,
+) -> None:
+    outcome = await _generate(container, _SELECTION_FIXTURES[2], CannedResponseGenerator)
+
+    assert outcome.message == DEFAULT_NO_MATCH_CANREP
+    assert not outcome.field_prompts
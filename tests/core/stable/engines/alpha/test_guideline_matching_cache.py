@@ -0,0 +1,213 @@
+# Copyright 2025 Emcie Co Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Optional, Sequence, cast
+
+from lagom import Container
+from typing_extensions import override
+
+from parlant.core.agents import Agent
+from parlant.core.customers import Customer
+from parlant.core.engines.alpha.guideline_matching.generic.observational_batch import (
+    GenericObservationalGuidelineMatchesSchema,
+    GenericObservationalGuidelineMatchingBatch,
+)
+from parlant.core.engines.alpha.guideline_matching.guideline_match import GuidelineMatch
+from parlant.core.engines.alpha.guideline_matching.guideline_matcher import (
+    GuidelineMatcher,
+    GuidelineMatchingBatch,
+    GuidelineMatchingBatchResult,
+    GuidelineMatchingContext,
+    GuidelineMatchingStrategy,
+    GuidelineMatchingStrategyResolver,
+    ResponseAnalysisBatch,
+    ResponseAnalysisContext,
+)
+from parlant.core.engines.alpha.guideline_matching.guideline_matching_cache import (
+    BasicGuidelineMatchingCache,
+)
+from parlant.core.engines.alpha.loaded_context import LoadedContext
+from parlant.core.engines.alpha.optimization_policy import OptimizationPolicy
+from parlant.core.guidelines import Guideline
+from parlant.core.loggers import Logger
+from parlant.core.nlp.generation import SchematicGenerator
+from parlant.core.nlp.generation_info import GenerationInfo, UsageInfo
+from parlant.core.sessions import Event, EventId, EventKind, EventSource, Session
+
+from tests.test_utilities import make_guideline
+
+
+def _event(event_id: str, kind: EventKind, message: str = "") -> Event:
+    return Event(
+        id=EventId(event_id),
+        source=EventSource.CUSTOMER,
+        kind=kind,
+        creation_utc=datetime.now(timezone.utc),
+        offset=0,
+        correlation_id="",
+        data={"message": message, "participant": {"display_name": "Customer"}}
+        if kind == EventKind.MESSAGE
+        else {"status": "typing"},
+        deleted=False,
+    )
+
+
+class _CountingBatch(GuidelineMatchingBatch):
+    def __init__(self, guidelines: Sequence[Guideline], process_calls: list[int]) -> None:
+        self._guidelines = guidelines
+        self._process_calls = process_calls
+
+    @override
+    async def process(self) -> GuidelineMatchingBatchResult:
+        self._process_calls.append(1)
+
+        return GuidelineMatchingBatchResult(
+            matches=[GuidelineMatch(guideline=g, score=10, rationale="") for g in self._guidelines],
+            generation_info=GenerationInfo(
+                schema_name="counting",
+                model="counting",
+                duration=1.0,
+                usage=UsageInfo(input_tokens=100, output_tokens=10),
+            ),
+        )
+
+    @override
+    async def fingerprint(self) -> Optional[str]:
+        return ",".join(g.id for g in self._guidelines)
+
+
+class _CountingStrategy(GuidelineMatchingStrategy):
+    def __init__(self) -> None:
+        self.process_calls: list[int] = []
+
+    @override
+    async def create_matching_batches(
+        self,
+        guidelines: Sequence[Guideline],
+        context: GuidelineMatchingContext,
+    ) -> Sequence[GuidelineMatchingBatch]:
+        return [_CountingBatch([g], self.process_calls) for g in guidelines]
+
+    @override
+    async def create_response_analysis_batches(
+        self,
+        guideline_matches: Sequence[GuidelineMatch],
+        context: ResponseAnalysisContext,
+    ) -> Sequence[ResponseAnalysisBatch]:
+        return []
+
+    @override
+    async def transform_matches(
+        self,
+        matches: Sequence[GuidelineMatch],
+    ) -> Sequence[GuidelineMatch]:
+        return matches
+
+
+class _StrategyResolver(GuidelineMatchingStrategyResolver):
+    def __init__(self, strategy: GuidelineMatchingStrategy) -> None:
+        self._strategy = strategy
+
+    @override
+    async def resolve(self, guideline: Guideline) -> GuidelineMatchingStrategy:
+        return self._strategy
+
+
+def _loaded_context() -> LoadedContext:
+    return cast(
+        LoadedContext,
+        SimpleNamespace(
+            agent=None,
+            session=None,
+            customer=None,
+            interaction=SimpleNamespace(history=[]),
+            state=SimpleNamespace(
+                context_variables=[],
+                glossary_terms=set(),
+                capabilities=[],
+                tool_events=[],
+                journey_paths={},
+            ),
+        ),
+    )
+
+
+async def test_that_a_batch_with_an_already_seen_fingerprint_is_not_processed_again(
+    container: Container,
+) -> None:
+    strategy = _CountingStrategy()
+    matcher = GuidelineMatcher(
+        container[Logger],
+        _StrategyResolver(strategy),
+        BasicGuidelineMatchingCache(),
+    )
+
+    guidelines = [make_guideline("1", "the customer greets"), make_guideline("2", "it's late")]
+
+    first_result = await matcher.match_guidelines(_loaded_context(), [], guidelines)
+    second_result = await matcher.match_guidelines(_loaded_context(), [], guidelines)
+
+    assert len(strategy.process_calls) == 2
+
+    assert first_result.cached_batch_count == 0
+    assert second_result.cached_batch_count == 2
+
+    assert [m.guideline.id for m in second_result.matches] == ["1", "2"]
+
+    for generation in second_result.batch_generations:
+        assert generation.cache and generation.cache.hit
+        assert generation.usage.input_tokens == 0
+
+
+async def test_that_a_generic_batch_fingerprint_ignores_status_events_but_not_new_messages(
+    container: Container,
+) -> None:
+    async def fingerprint(history: Sequence[Event]) -> Optional[str]:
+        batch = GenericObservationalGuidelineMatchingBatch(
+            logger=container[Logger],
+            optimization_policy=container[OptimizationPolicy],
+            schematic_generator=container[
+                SchematicGenerator[GenericObservationalGuidelineMatchesSchema]
+            ],
+            guidelines=[make_guideline("1", "the customer asks about pizza")],
+            journeys=[],
+            context=GuidelineMatchingContext(
+                agent=cast(Agent, SimpleNamespace(name="Bob", description=None)),
+                session=cast(Session, None),
+                customer=cast(Customer, None),
+                context_variables=[],
+                interaction_history=history,
+                terms=[],
+                capabilities=[],
+                staged_events=[],
+                active_journeys=[],
+                journey_paths={},
+            ),
+        )
+
+        return await batch.fingerprint()
+
+    history = [_event("1", EventKind.MESSAGE, "Do you have pizza?")]
+
+    assert await fingerprint(history) is not None
+
+    assert await fingerprint(history) == await fingerprint(
+        history + [_event("2", EventKind.STATUS)]
+    )
+
+    assert await fingerprint(history) != await fingerprint(
+        history + [_event("3", EventKind.MESSAGE, "Actually, never mind")]
+    )
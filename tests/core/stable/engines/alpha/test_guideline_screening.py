@@ -0,0 +1,209 @@
+# Copyright 2025 Emcie Co Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from typing import AsyncIterator, Sequence
+
+from lagom import Container
+from pytest import fixture
+
+from parlant.adapters.db.transient import TransientDocumentDatabase
+from parlant.adapters.vector_db.transient import TransientVectorDatabase
+from parlant.core.common import IdGenerator
+from parlant.core.contextual_correlator import ContextualCorrelator
+from parlant.core.emission.event_buffer import EventBuffer
+from parlant.core.engines.alpha.guideline_matching.guideline_match import GuidelineMatch
+from parlant.core.engines.alpha.guideline_matching.guideline_screening import (
+    VectorGuidelineScreener,
+)
+from parlant.core.engines.alpha.loaded_context import Interaction, LoadedContext, ResponseState
+from parlant.core.engines.alpha.tool_calling.tool_caller import ToolInsights
+from parlant.core.engines.types import Context
+from parlant.core.guidelines import Guideline, GuidelineDocumentStore, GuidelineStore
+from parlant.core.loggers import Logger
+from parlant.core.nlp.embedding import Embedder, EmbedderFactory, NullEmbeddingCache
+from parlant.core.sessions import AgentState, EventKind, EventSource, SessionStore
+
+from tests.test_utilities import DummyEmbedder, create_agent, create_customer, create_session
+
+_TOPICS = ["refund", "pizza", "weather", "shipping", "password"]
+
+
+def _embed_topics(text: str) -> Sequence[float]:
+    # Embedding texts by the topics they mention makes their similarity predictable
+    return [float(topic in text) for topic in _TOPICS] + [0.1]
+
+
+@fixture
+async def guideline_store() -> AsyncIterator[GuidelineStore]:
+    async with GuidelineDocumentStore(IdGenerator(), TransientDocumentDatabase()) as store:
+        yield store
+
+
+def _create_screener(
+    container: Container,
+    guideline_store: GuidelineStore,
+    audit_rate: float = 0.0,
+) -> VectorGuidelineScreener:
+    embedder_container = Container()
+    embedder_container[DummyEmbedder] = DummyEmbedder(_embed_topics, dimensions=len(_TOPICS) + 1)
+
+    embedder_factory = EmbedderFactory(embedder_container)
+
+    async def get_embedder_type() -> type[Embedder]:
+        return DummyEmbedder
+
+    return VectorGuidelineScreener(
+        vector_db=TransientVectorDatabase(
+            container[Logger],
+            embedder_factory,
+            lambda: NullEmbeddingCache(),
+        ),
+        embedder_type_provider=get_embedder_type,
+        embedder_factory=embedder_factory,
+        guideline_store=guideline_store,
+        logger=container[Logger],
+        max_candidates=1,
+        audit_rate=audit_rate,
+    )
+
+
+async def _context(
+    container: Container,
+    message: str,
+    applied_guidelines: Sequence[Guideline] = [],
+) -> LoadedContext:
+    agent = await create_agent(container, "test-agent")
+    customer = await create_customer(container, "Test Customer")
+    session = await create_session(container, agent.id, customer.id)
+
+    session = await container[SessionStore].update_session(
+        session.id,
+        {
+            "agent_states": [
+                AgentState(
+                    correlation_id="",
+                    applied_guideline_ids=[g.id for g in applied_guidelines],
+                    journey_paths={},
+                )
+            ]
+        },
+    )
+
+    event = await container[SessionStore].create_event(
+        session.id,
+        source=EventSource.CUSTOMER,
+        kind=EventKind.MESSAGE,
+        correlation_id="",
+        data={"message": message, "participant": {"display_name": customer.name}},
+    )
+
+    return LoadedContext(
+        info=Context(session_id=session.id, agent_id=agent.id),
+        logger=container[Logger],
+        correlator=container[ContextualCorrelator],
+        agent=agent,
+        customer=customer,
+        session=session,
+        session_event_emitter=EventBuffer(agent),
+        response_event_emitter=EventBuffer(agent),
+        interaction=Interaction(history=[event]),
+        state=ResponseState(
+            context_variables=[],
+            glossary_terms=set(),
+            capabilities=[],
+            iterations=[],
+            ordinary_guideline_matches=[],
+            tool_enabled_guideline_matches={},
+            journeys=[],
+            journey_paths={},
+            tool_events=[],
+            tool_insights=ToolInsights(),
+            prepared_to_respond=False,
+            message_events=[],
+        ),
+    )
+
+
+async def test_that_only_the_most_similar_guidelines_and_those_always_matched_are_candidates(
+    container: Container,
+    guideline_store: GuidelineStore,
+) -> None:
+    refund = await guideline_store.create_guideline(condition="The customer asks for a refund")
+    pizza = await guideline_store.create_guideline(condition="The customer orders a pizza")
+    weather = await guideline_store.create_guideline(condition="The customer asks about weather")
+    password = await guideline_store.create_guideline(condition="The customer lost a password")
+    shipping = await guideline_store.create_guideline(
+        condition="The customer asks about shipping",
+        metadata={"continuous": True},
+    )
+
+    async with _create_screener(container, guideline_store) as screener:
+        result = await screener.screen(
+            await _context(
+                container, "Can I get a refund for my order?", applied_guidelines=[password]
+            ),
+            [refund, pizza, weather, password, shipping],
+        )
+
+    assert result.candidates == [refund, password, shipping]
+    assert result.ranks[refund.id] == 0
+
+
+async def test_that_guidelines_written_after_indexing_are_screened(
+    container: Container,
+    guideline_store: GuidelineStore,
+) -> None:
+    guidelines = [
+        await guideline_store.create_guideline(condition=f"The customer mentions {topic}")
+        for topic in ["refund", "pizza"]
+    ]
+
+    async with _create_screener(container, guideline_store) as screener:
+        weather = await guideline_store.create_guideline(
+            condition="The customer asks about weather"
+        )
+
+        result = await screener.screen(
+            await _context(container, "What's the weather like?"),
+            [*guidelines, weather],
+        )
+
+    assert result.candidates == [weather]
+
+
+async def test_that_audited_screenings_pass_on_all_guidelines_and_measure_recall(
+    container: Container,
+    guideline_store: GuidelineStore,
+) -> None:
+    refund = await guideline_store.create_guideline(condition="The customer asks for a refund")
+    pizza = await guideline_store.create_guideline(condition="The customer orders a pizza")
+
+    async with _create_screener(container, guideline_store, audit_rate=1.0) as screener:
+        result = await screener.screen(
+            await _context(container, "I'd like a refund for my pizza order"),
+            [refund, pizza],
+        )
+
+        screener.record_matches(
+            result,
+            [
+                GuidelineMatch(guideline=refund, score=10, rationale=""),
+                GuidelineMatch(guideline=pizza, score=10, rationale=""),
+            ],
+        )
+
+    assert result.audited
+    assert result.candidates == [refund, pizza]
+    assert screener.metrics.recall(max_candidates=1) == 0.5
+    assert screener.metrics.recall(max_candidates=2) == 1.0
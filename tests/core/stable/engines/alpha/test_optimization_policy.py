@@ -0,0 +1,123 @@
+# Copyright 2025 Emcie Co Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from typing import Optional
+
+from parlant.core.engines.alpha.optimization_policy import (
+    AdaptiveOptimizationPolicy,
+    BasicOptimizationPolicy,
+)
+from parlant.core.nlp.generation_info import GenerationCacheInfo, GenerationInfo, UsageInfo
+
+from tests.test_utilities import make_guideline
+
+_HINTS = {"type": "ObservationalBatch"}
+
+
+def _generation(
+    duration: float,
+    input_tokens: int,
+    cache: Optional[GenerationCacheInfo] = None,
+) -> GenerationInfo:
+    return GenerationInfo(
+        schema_name="ObservationalSchema",
+        model="model",
+        duration=duration,
+        usage=UsageInfo(input_tokens=input_tokens, output_tokens=0),
+        cache=cache,
+    )
+
+
+def _train(policy: AdaptiveOptimizationPolicy) -> None:
+    # Every batch takes 2s and 1,000 tokens, plus 0.5s and 100 tokens per guideline
+    for batch_size in [1, 2, 3, 4, 5]:
+        policy.record_guideline_matching_batch(
+            batch_size,
+            _generation(duration=2 + 0.5 * batch_size, input_tokens=1000 + 100 * batch_size),
+            hints=_HINTS,
+        )
+
+
+def test_that_batches_are_sized_like_the_basic_policy_until_enough_batches_were_observed() -> None:
+    policy = AdaptiveOptimizationPolicy(max_concurrent_batches=2)
+
+    policy.record_guideline_matching_batch(1, _generation(1.0, 1000), hints=_HINTS)
+
+    assert policy.get_guideline_matching_batch_size(
+        15, hints=_HINTS
+    ) == BasicOptimizationPolicy().get_guideline_matching_batch_size(15)
+
+    last_decision = policy.metrics[_HINTS["type"]].last_decision
+    assert last_decision and not last_decision.learned
+
+
+def test_that_the_batch_size_minimizing_wall_time_under_the_concurrency_limit_is_chosen() -> None:
+    constrained_policy = AdaptiveOptimizationPolicy(max_concurrent_batches=2)
+    unconstrained_policy = AdaptiveOptimizationPolicy(max_concurrent_batches=16)
+
+    _train(constrained_policy)
+    _train(unconstrained_policy)
+
+    # With two batches at a time, 10 single-guideline batches take 5 rounds of 2.5s,
+    # while 2 batches of 5 guidelines take one round of 4.5s
+    assert constrained_policy.get_guideline_matching_batch_size(10, hints=_HINTS) == 5
+
+    # When all batches run at once, the smallest batches finish first
+    assert unconstrained_policy.get_guideline_matching_batch_size(10, hints=_HINTS) == 1
+
+    metrics = constrained_policy.metrics[_HINTS["type"]]
+    assert metrics.observations == 5
+    assert metrics.last_decision and metrics.last_decision.learned
+    assert metrics.last_decision.batch_count == 2
+    assert metrics.batch_sizes[5] == 1
+
+
+def test_that_the_chosen_batch_size_keeps_token_usage_within_the_budget() -> None:
+    policy = AdaptiveOptimizationPolicy(max_concurrent_batches=16, token_budget=5000)
+
+    _train(policy)
+
+    # 3 batches of 4 guidelines use 4,200 tokens, while any smaller batches exceed the budget
+    assert policy.get_guideline_matching_batch_size(10, hints=_HINTS) == 4
+
+
+def test_that_cached_generations_are_not_learned_from() -> None:
+    policy = AdaptiveOptimizationPolicy()
+
+    policy.record_guideline_matching_batch(
+        3,
+        _generation(0.01, 0, cache=GenerationCacheInfo(hit=True, hits=1, misses=0)),
+        hints=_HINTS,
+    )
+
+    metrics = policy.metrics[_HINTS["type"]]
+    assert metrics.observations == 0
+    assert metrics.skipped_cache_hits == 1
+
+
+def test_that_guidelines_are_packed_into_batches_of_balanced_token_sizes() -> None:
+    policy = AdaptiveOptimizationPolicy(max_concurrent_batches=2)
+
+    _train(policy)
+
+    long_conditions = [make_guideline(f"long-{i}", "the customer " * 50) for i in range(2)]
+    short_conditions = [make_guideline(f"short-{i}", "hi") for i in range(8)]
+
+    batches = policy.get_guideline_matching_batches(
+        long_conditions + short_conditions,
+        hints=_HINTS,
+    )
+
+    assert [len(b) for b in batches] == [5, 5]
+    assert all(sum(g in b for g in long_conditions) == 1 for b in batches)
@@ -12,6 +12,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
+
 from lagom import Container
 
 from parlant.core.engines.alpha.guideline_matching.guideline_match import GuidelineMatch
@@ -721,3 +723,45 @@ async def test_that_relational_guideline_resolver_filters_dependent_guidelines_b
 
     assert len(result) == 1
     assert result[0].guideline.id == enabled_journey_tagged_guideline.id
+
+
+async def test_that_relational_guideline_resolver_infers_guidelines_from_tags_that_entail_themselves(
+    container: Container,
+) -> None:
+    relationship_store = container[RelationshipStore]
+    guideline_store = container[GuidelineStore]
+    tag_store = container[TagStore]
+    resolver = container[RelationalGuidelineResolver]
+
+    g1 = await guideline_store.create_guideline(condition="x", action="y")
+    g2 = await guideline_store.create_guideline(condition="y", action="z")
+
+    t1 = await tag_store.create_tag(name="t1")
+
+    await guideline_store.upsert_tag(guideline_id=g2.id, tag_id=t1.id)
+
+    for source_id in [g1.id, g2.id]:
+        await relationship_store.create_relationship(
+            source=RelationshipEntity(
+                id=source_id,
+                kind=RelationshipEntityKind.GUIDELINE,
+            ),
+            target=RelationshipEntity(
+                id=t1.id,
+                kind=RelationshipEntityKind.TAG,
+            ),
+            kind=RelationshipKind.ENTAILMENT,
+        )
+
+    result = await asyncio.wait_for(
+        resolver.resolve(
+            [g1, g2],
+            [
+                GuidelineMatch(guideline=g1, score=8, rationale=""),
+            ],
+            journeys=[],
+        ),
+        timeout=5,
+    )
+
+    assert [m.guideline.id for m in result] == [g1.id, g2.id]
@@ -0,0 +1,140 @@
+# Copyright 2025 Emcie Co Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+from typing import Any, Mapping, Sequence
+
+from pytest import raises
+from typing_extensions import override
+
+from parlant.core.nlp.embedding import CoalescingEmbedder, EmbeddingResult
+
+from tests.test_utilities import DummyEmbedder
+
+
+def _embed_text(text: str) -> Sequence[float]:
+    if text == "fail":
+        raise RuntimeError("Embedding failed")
+    if text == "cancel":
+        raise asyncio.CancelledError()
+
+    return [float(len(text))]
+
+
+class _VectorDroppingEmbedder(DummyEmbedder):
+    @override
+    async def embed(
+        self,
+        texts: list[str],
+        hints: Mapping[str, Any] = {},
+    ) -> EmbeddingResult:
+        result = await super().embed(texts, hints)
+        return EmbeddingResult(vectors=result.vectors[:-1])
+
+
+async def test_that_concurrent_requests_are_sent_in_one_deduplicated_call() -> None:
+    embedder = DummyEmbedder(_embed_text)
+    coalescer = CoalescingEmbedder(embedder)
+
+    first, second = await asyncio.gather(
+        coalescer.embed(["a", "bb"]),
+        coalescer.embed(["bb", "ccc"]),
+    )
+
+    assert embedder.calls == [["a", "bb", "ccc"]]
+    assert first.vectors == [[1.0], [2.0]]
+    assert second.vectors == [[2.0], [3.0]]
+
+
+async def test_that_requests_with_different_hints_are_not_coalesced() -> None:
+    embedder = DummyEmbedder(_embed_text)
+    coalescer = CoalescingEmbedder(embedder)
+
+    await asyncio.gather(
+        coalescer.embed(["a"]),
+        coalescer.embed(["a"], hints={"dimensions": 2}),
+    )
+
+    assert embedder.calls == [["a"], ["a"]]
+
+
+async def test_that_a_batch_reaching_max_tokens_is_sent_without_waiting() -> None:
+    embedder = DummyEmbedder(_embed_text, max_tokens=4)
+    coalescer = CoalescingEmbedder(embedder, window=60)
+
+    result = await asyncio.wait_for(coalescer.embed(["long enough text"]), timeout=1)
+
+    assert result.vectors == [[16.0]]
+
+
+async def test_that_a_request_that_would_exceed_max_tokens_is_sent_in_a_new_call() -> None:
+    embedder = DummyEmbedder(_embed_text, max_tokens=4)
+    coalescer = CoalescingEmbedder(embedder)
+
+    first, second = await asyncio.gather(
+        coalescer.embed(["aaaa"]),
+        coalescer.embed(["bbbbbbbb"]),
+    )
+
+    assert embedder.calls == [["aaaa"], ["bbbbbbbb"]]
+    assert first.vectors == [[4.0]]
+    assert second.vectors == [[8.0]]
+
+
+async def test_that_an_embedding_failure_is_raised_only_to_the_failing_request() -> None:
+    embedder = DummyEmbedder(_embed_text)
+    coalescer = CoalescingEmbedder(embedder)
+
+    succeeding, failing = await asyncio.gather(
+        coalescer.embed(["a"]),
+        coalescer.embed(["fail"]),
+        return_exceptions=True,
+    )
+
+    assert embedder.calls == [["a", "fail"], ["a"], ["fail"]]
+    assert isinstance(succeeding, EmbeddingResult) and succeeding.vectors == [[1.0]]
+    assert isinstance(failing, RuntimeError)
+
+    with raises(RuntimeError):
+        await coalescer.embed(["fail"])
+
+
+async def test_that_a_cancelled_embedding_call_does_not_leave_requests_waiting() -> None:
+    coalescer = CoalescingEmbedder(DummyEmbedder(_embed_text))
+
+    results = await asyncio.wait_for(
+        asyncio.gather(
+            coalescer.embed(["a"]),
+            coalescer.embed(["cancel"]),
+            return_exceptions=True,
+        ),
+        timeout=1,
+    )
+
+    assert all(isinstance(r, asyncio.CancelledError) for r in results)
+
+
+async def test_that_missing_vectors_are_raised_to_the_requests_instead_of_left_waiting() -> None:
+    coalescer = CoalescingEmbedder(_VectorDroppingEmbedder())
+
+    results = await asyncio.wait_for(
+        asyncio.gather(
+            coalescer.embed(["a"]),
+            coalescer.embed(["bb"]),
+            return_exceptions=True,
+        ),
+        timeout=1,
+    )
+
+    assert all(isinstance(r, ValueError) for r in results)
@@ -0,0 +1,105 @@
+# Copyright 2025 Emcie Co Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from typing import Any, Mapping, Optional, Sequence
+
+from typing_extensions import override
+
+from parlant.adapters.db.transient import TransientDocumentDatabase
+from parlant.core.nlp.embedding import (
+    BasicEmbeddingCache,
+    Embedder,
+    EmbeddingCache,
+    EmbeddingResult,
+    embed_with_cache,
+)
+
+from tests.test_utilities import DummyEmbedder
+
+
+class _BatchKeyedEmbeddingCache(EmbeddingCache):
+    def __init__(self) -> None:
+        self.entries: dict[tuple[str, ...], EmbeddingResult] = {}
+
+    @override
+    async def get(
+        self,
+        embedder_type: type[Embedder],
+        texts: list[str],
+        hints: Mapping[str, Any] = {},
+    ) -> Optional[EmbeddingResult]:
+        return self.entries.get(tuple(texts))
+
+    @override
+    async def set(
+        self,
+        embedder_type: type[Embedder],
+        texts: list[str],
+        vectors: Sequence[Sequence[float]],
+        hints: Mapping[str, Any] = {},
+    ) -> None:
+        self.entries[tuple(texts)] = EmbeddingResult(vectors=vectors)
+
+
+async def test_that_only_texts_missing_from_the_cache_are_embedded() -> None:
+    embedder = DummyEmbedder(lambda text: [float(len(text)), 0.5], dimensions=2)
+    cache = BasicEmbeddingCache(TransientDocumentDatabase())
+
+    await embed_with_cache(embedder, cache, ["a", "bb"])
+    vectors = await embed_with_cache(embedder, cache, ["bb", "ccc", "a"])
+
+    assert vectors == [[2.0, 0.5], [3.0, 0.5], [1.0, 0.5]]
+    assert embedder.embedded_texts == ["a", "bb", "ccc"]
+
+
+async def test_that_cached_vectors_are_read_back_from_the_persistent_tier() -> None:
+    database = TransientDocumentDatabase()
+
+    await BasicEmbeddingCache(database).set_many(DummyEmbedder, ["a", "bb"], [[1.0], [2.0]])
+
+    cache = BasicEmbeddingCache(database, max_memory_entries=1)
+
+    assert await cache.get_many(DummyEmbedder, ["bb", "missing", "a"]) == [[2.0], None, [1.0]]
+    assert await cache.get(DummyEmbedder, ["a", "bb"]) == EmbeddingResult(vectors=[[1.0], [2.0]])
+    assert await cache.get(DummyEmbedder, ["a", "missing"]) is None
+
+
+async def test_that_a_cache_implementing_only_get_and_set_caches_texts_one_at_a_time() -> None:
+    embedder = DummyEmbedder()
+    cache = _BatchKeyedEmbeddingCache()
+
+    await embed_with_cache(embedder, cache, ["a", "bb"])
+    vectors = await embed_with_cache(embedder, cache, ["bb", "ccc"])
+
+    assert vectors == [[2.0], [3.0]]
+    assert embedder.embedded_texts == ["a", "bb", "ccc"]
+    assert set(cache.entries) == {("a",), ("bb",), ("ccc",)}
+
+
+async def test_that_missing_texts_are_embedded_in_bounded_batches() -> None:
+    embedder = DummyEmbedder(max_tokens=6)
+    cache = BasicEmbeddingCache(TransientDocumentDatabase())
+
+    texts = [f"text {i}" for i in range(5)]
+
+    vectors = await embed_with_cache(embedder, cache, texts, max_batch_size=2)
+
+    assert vectors == [[6.0]] * 5
+    assert embedder.calls == [["text 0", "text 1"], ["text 2", "text 3"], ["text 4"]]
+
+    embedder = DummyEmbedder(max_tokens=3)
+
+    await embed_with_cache(embedder, BasicEmbeddingCache(TransientDocumentDatabase()), texts)
+
+    assert embedder.calls == [[text] for text in texts]
@@ -406,3 +406,18 @@ async def test_that_retry_succeeds_after_failures_with_higher_concurrency(
         assert mock_generators[i].generate.await_count == 3
         mock_generators[i].generate.assert_awaited_with(prompt="test prompt", hints={"a": i})
         assert results[i].content.result == "Success"
+
+
+def test_that_prompt_builder_lays_out_static_sections_before_volatile_ones() -> None:
+    builder = PromptBuilder()
+
+    builder.add_section(name="instructions", template="Instructions", static=True)
+    builder.add_section(name="history", template="History: {history}", props={"history": "Hi"})
+    builder.add_section(name="examples", template="Examples", static=True)
+    builder.add_section(name="output-format", template="Output format")
+
+    assert builder.build_parts() == (
+        "Instructions\n\nExamples",
+        "History: Hi\n\nOutput format",
+    )
+    assert builder.build() == "Instructions\n\nExamples\n\nHistory: Hi\n\nOutput format"
@@ -0,0 +1,135 @@
+# Copyright 2025 Emcie Co Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from unittest.mock import AsyncMock
+
+from parlant.adapters.db.transient import TransientDocumentDatabase
+from parlant.core.common import DefaultBaseModel
+from parlant.core.nlp.generation import SchematicGenerationResult, SchematicGenerator
+from parlant.core.nlp.generation_cache import (
+    BasicGenerationCache,
+    CachedGeneration,
+    CachingSchematicGenerator,
+)
+from parlant.core.nlp.generation_info import GenerationInfo, UsageInfo
+
+
+class DummySchema(DefaultBaseModel):
+    result: str
+
+
+def _create_mock_generator() -> AsyncMock:
+    mock_generator = AsyncMock(spec=SchematicGenerator[DummySchema])
+    mock_generator.id = "mock-model"
+    mock_generator.generate.side_effect = lambda prompt, hints: SchematicGenerationResult(
+        content=DummySchema(result=f"{prompt} @ {hints.get('temperature')}"),
+        info=GenerationInfo(
+            schema_name="DummySchema",
+            model="mock-model",
+            duration=1.0,
+            usage=UsageInfo(input_tokens=10, output_tokens=5),
+        ),
+    )
+    return mock_generator
+
+
+async def test_that_an_identical_generation_is_answered_from_the_cache() -> None:
+    mock_generator = _create_mock_generator()
+    generator = CachingSchematicGenerator[DummySchema](
+        mock_generator,
+        BasicGenerationCache(TransientDocumentDatabase()),
+    )
+
+    first = await generator.generate("prompt", hints={"temperature": 0.1})
+    second = await generator.generate("prompt", hints={"temperature": 0.1})
+
+    assert mock_generator.generate.call_count == 1
+    assert second.content == first.content
+    assert first.info.cache and not first.info.cache.hit
+    assert second.info.cache and second.info.cache.hit
+    assert (second.info.cache.hits, second.info.cache.misses) == (1, 1)
+
+    assert first.info.usage.input_tokens == 10
+    assert (second.info.usage.input_tokens, second.info.usage.output_tokens) == (0, 0)
+
+
+async def test_that_generations_with_different_prompts_or_hints_are_not_shared() -> None:
+    mock_generator = _create_mock_generator()
+    generator = CachingSchematicGenerator[DummySchema](
+        mock_generator,
+        BasicGenerationCache(TransientDocumentDatabase()),
+    )
+
+    await generator.generate("prompt", hints={"temperature": 0.1})
+    await generator.generate("prompt", hints={"temperature": 0.3})
+    result = await generator.generate("other prompt", hints={"temperature": 0.1})
+
+    assert mock_generator.generate.call_count == 3
+    assert result.content.result == "other prompt @ 0.1"
+
+
+async def test_that_the_least_recently_used_generation_is_evicted_when_the_cache_is_full() -> None:
+    database = TransientDocumentDatabase()
+    cache = BasicGenerationCache(database, max_entries=2)
+
+    def generation(content: str) -> CachedGeneration:
+        return CachedGeneration(
+            content={"result": content},
+            info=GenerationInfo(
+                schema_name="DummySchema",
+                model="mock-model",
+                duration=1.0,
+                usage=UsageInfo(input_tokens=10, output_tokens=5),
+            ),
+        )
+
+    await cache.set("a", generation("a"))
+    await cache.set("b", generation("b"))
+    await cache.get("a")
+    await cache.set("c", generation("c"))
+
+    assert cache.size == 2
+    assert await cache.get("b") is None
+    assert await cache.get("a") is not None
+
+    reloaded_cache = BasicGenerationCache(database, max_entries=2)
+
+    assert (retrieved := await reloaded_cache.get("c"))
+    assert retrieved.content == {"result": "c"}
+
+
+async def test_that_a_reloaded_cache_evicts_the_generation_that_was_least_recently_used() -> None:
+    database = TransientDocumentDatabase()
+    cache = BasicGenerationCache(database, max_entries=2)
+
+    def generation(content: str) -> CachedGeneration:
+        return CachedGeneration(
+            content={"result": content},
+            info=GenerationInfo(
+                schema_name="DummySchema",
+                model="mock-model",
+                duration=1.0,
+                usage=UsageInfo(input_tokens=10, output_tokens=5),
+            ),
+        )
+
+    await cache.set("a", generation("a"))
+    await cache.set("b", generation("b"))
+    await cache.get("a")
+
+    reloaded_cache = BasicGenerationCache(database, max_entries=2)
+    await reloaded_cache.set("c", generation("c"))
+
+    assert await reloaded_cache.get("b") is None
+    assert await reloaded_cache.get("a") is not None
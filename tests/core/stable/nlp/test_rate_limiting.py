@@ -0,0 +1,224 @@
+# Copyright 2025 Emcie Co Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+from types import SimpleNamespace
+from typing import Any
+from lagom import Container
+from unittest.mock import AsyncMock
+
+from pytest import raises
+
+from parlant.core.common import DefaultBaseModel
+from parlant.core.loggers import Logger
+from parlant.core.nlp.generation import SchematicGenerationResult, SchematicGenerator
+from parlant.core.nlp.generation_info import GenerationInfo, UsageInfo
+from parlant.core.nlp.policies import MAX_RETRY_AFTER, policy, retry, retry_after
+from parlant.core.nlp.rate_limiting import (
+    GenerationPriority,
+    ModelRateLimiter,
+    RateLimitedSchematicGenerator,
+    RateLimits,
+)
+
+
+class DummySchema(DefaultBaseModel):
+    result: str
+
+
+class RateLimitError(Exception):
+    def __init__(self, headers: dict[str, str]) -> None:
+        super().__init__("Too many requests")
+        self.status_code = 429
+        self.response = SimpleNamespace(headers=headers)
+
+
+async def test_that_queued_requests_are_admitted_by_priority() -> None:
+    limiter = ModelRateLimiter(RateLimits(max_concurrent_requests=1))
+    admitted: list[str] = []
+    release = asyncio.Event()
+
+    async def request(name: str, priority: GenerationPriority) -> None:
+        async with limiter.reserve(priority):
+            admitted.append(name)
+            await release.wait()
+
+    tasks = [asyncio.create_task(request("first", GenerationPriority.BACKGROUND))]
+    await asyncio.sleep(0)
+
+    tasks += [
+        asyncio.create_task(request("evaluation", GenerationPriority.BACKGROUND)),
+        asyncio.create_task(request("matching", GenerationPriority.INTERACTIVE)),
+        asyncio.create_task(request("message", GenerationPriority.MESSAGE)),
+    ]
+    await asyncio.sleep(0)
+
+    assert admitted == ["first"]
+    assert limiter.queue_size == 3
+
+    release.set()
+    await asyncio.gather(*tasks)
+
+    assert admitted == ["first", "message", "matching", "evaluation"]
+
+
+async def test_that_no_more_than_the_maximum_concurrent_requests_are_in_flight() -> None:
+    limiter = ModelRateLimiter(RateLimits(max_concurrent_requests=3))
+    in_flight = 0
+    max_in_flight = 0
+
+    async def request() -> None:
+        nonlocal in_flight, max_in_flight
+
+        async with limiter.reserve(GenerationPriority.INTERACTIVE):
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+
+    await asyncio.gather(*[request() for _ in range(10)])
+
+    assert max_in_flight == 3
+
+
+async def test_that_requests_wait_for_tokens_to_be_replenished() -> None:
+    now = 0.0
+    limiter = ModelRateLimiter(
+        RateLimits(max_tokens_per_minute=600),
+        clock=lambda: now,
+    )
+
+    async with limiter.reserve(GenerationPriority.INTERACTIVE, token_count=600):
+        pass
+
+    waiter = asyncio.create_task(_reserve(limiter, token_count=10))
+    await asyncio.sleep(0.05)
+
+    assert not waiter.done()
+
+    now = 1.0  # 10 tokens are replenished every second
+    limiter.record_success()
+
+    await asyncio.wait_for(waiter, timeout=1)
+
+
+async def _reserve(limiter: ModelRateLimiter, token_count: int) -> None:
+    async with limiter.reserve(GenerationPriority.INTERACTIVE, token_count=token_count):
+        pass
+
+
+async def test_that_a_rate_limit_error_lowers_concurrency_and_pauses_for_the_requested_time(
+    container: Container,
+) -> None:
+    limiter = ModelRateLimiter(RateLimits(max_concurrent_requests=8))
+
+    mock_generator = AsyncMock(spec=SchematicGenerator[DummySchema])
+    mock_generator.generate.side_effect = RateLimitError({"retry-after-ms": "50"})
+
+    generator = RateLimitedSchematicGenerator[DummySchema](
+        mock_generator,
+        limiter,
+        GenerationPriority.INTERACTIVE,
+        container[Logger],
+    )
+
+    with raises(RateLimitError):
+        await generator.generate("prompt")
+
+    assert limiter.concurrency_limit == 4
+
+    waiter = asyncio.create_task(_reserve(limiter, token_count=0))
+    await asyncio.sleep(0.01)
+
+    assert not waiter.done()
+
+    await asyncio.wait_for(waiter, timeout=1)
+
+
+def _generator_retrying_one_rate_limit_error(
+    container: Container,
+    limiter: ModelRateLimiter,
+    attempts: list[str],
+) -> RateLimitedSchematicGenerator[DummySchema]:
+    @policy(retry(RateLimitError))
+    async def generate(*args: Any, **kwargs: Any) -> SchematicGenerationResult[DummySchema]:
+        attempts.append("attempt")
+        await asyncio.sleep(0)
+
+        if len(attempts) == 1:
+            raise RateLimitError({"retry-after-ms": "50"})
+
+        return SchematicGenerationResult(
+            content=DummySchema(result="ok"),
+            info=GenerationInfo(
+                schema_name="DummySchema",
+                model="model",
+                duration=0.0,
+                usage=UsageInfo(input_tokens=0, output_tokens=0),
+            ),
+        )
+
+    mock_generator = AsyncMock(spec=SchematicGenerator[DummySchema])
+    mock_generator.generate.side_effect = generate
+
+    return RateLimitedSchematicGenerator[DummySchema](
+        mock_generator,
+        limiter,
+        GenerationPriority.INTERACTIVE,
+        container[Logger],
+    )
+
+
+async def test_that_a_rate_limit_error_retried_by_the_wrapped_generator_lowers_concurrency(
+    container: Container,
+) -> None:
+    limiter = ModelRateLimiter(RateLimits(max_concurrent_requests=8))
+    generator = _generator_retrying_one_rate_limit_error(container, limiter, attempts=[])
+
+    await generator.generate("prompt")
+
+    assert limiter.concurrency_limit == 4
+
+
+async def test_that_a_rate_limited_request_gives_up_its_slot_before_being_retried(
+    container: Container,
+) -> None:
+    limiter = ModelRateLimiter(RateLimits(max_concurrent_requests=1))
+    events: list[str] = []
+    generator = _generator_retrying_one_rate_limit_error(container, limiter, attempts=events)
+
+    async def other_request() -> None:
+        async with limiter.reserve(GenerationPriority.INTERACTIVE):
+            events.append("other")
+
+    await asyncio.wait_for(
+        asyncio.gather(
+            generator.generate("prompt"),
+            other_request(),
+        ),
+        timeout=1,
+    )
+
+    assert events == ["attempt", "other", "attempt"]
+
+
+def test_that_retry_after_is_read_from_response_headers() -> None:
+    assert retry_after(RateLimitError({"retry-after-ms": "1500"})) == 1.5
+    assert retry_after(RateLimitError({"retry-after": "3"})) == 3.0
+    assert retry_after(RateLimitError({})) is None
+    assert retry_after(Exception()) is None
+
+
+def test_that_retry_after_is_capped() -> None:
+    assert retry_after(RateLimitError({"retry-after": "86400"})) == MAX_RETRY_AFTER
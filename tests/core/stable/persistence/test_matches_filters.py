@@ -13,7 +13,7 @@
 # limitations under the License.
 
 import typing
-from parlant.core.persistence.common import Where, matches_filters
+from parlant.core.persistence.common import Where, compile_where, matches_filters
 
 
 def test_equal_to() -> None:
@@ -176,3 +176,24 @@ def test_nin_operator_false() -> None:
     field_filters: Where = {"id": {"$nin": ["a", "b"]}}
     candidate = {"id": "a"}
     assert not matches_filters(field_filters, candidate)
+
+
+def test_in_operator_with_unhashable_field_value() -> None:
+    field_filters: Where = {"tags": {"$in": ["a", "b"]}}
+    candidate = {"tags": ["a"]}
+    assert not matches_filters(field_filters, candidate)
+
+
+def test_compiled_filter_can_be_reused_across_candidates() -> None:
+    field_filters: Where = {
+        "$or": [
+            {"id": {"$in": ["a", "b"]}},
+            {"$and": [{"age": {"$gte": 30}}, {"id": {"$nin": ["c"]}}]},
+        ]
+    }
+    matches = compile_where(field_filters)
+
+    assert matches({"id": "a", "age": 20})
+    assert matches({"id": "d", "age": 30})
+    assert not matches({"id": "c", "age": 30})
+    assert not matches({"id": "d", "age": 20})
@@ -0,0 +1,51 @@
+# Copyright 2025 Emcie Co Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from parlant.core.persistence.vector_database_helper import QueryChunker, QueryEmbeddingCache
+
+from tests.test_utilities import DummyEmbedder
+
+
+async def test_that_a_query_is_split_into_chunks_that_fit_the_embedder() -> None:
+    chunker = QueryChunker(DummyEmbedder(max_tokens=15))
+
+    chunks = await chunker.chunk("a b c d e f g")
+
+    assert chunks == ["a b c", "d e f", "g"]
+
+
+async def test_that_a_grown_query_keeps_its_leading_chunks_and_only_tokenizes_its_tail() -> None:
+    embedder = DummyEmbedder(max_tokens=15)
+    chunker = QueryChunker(embedder)
+
+    first = await chunker.chunk("a b c d e f")
+
+    embedder.tokenizer.estimated_texts.clear()
+
+    second = await chunker.chunk("a b c d e f g h")
+
+    assert first == ["a b c", "d e f"]
+    assert second == ["a b c", "d e f", "g h"]
+    assert embedder.tokenizer.estimated_texts == ["g h"]
+
+
+async def test_that_query_embeddings_are_reused_across_calls() -> None:
+    embedder = DummyEmbedder(max_tokens=15)
+    cache = QueryEmbeddingCache(embedder)
+
+    await cache.embed(["a b c", "d e f"])
+    vectors = await cache.embed(["a b c", "d e f", "g h"])
+
+    assert vectors == [[5.0], [5.0], [3.0]]
+    assert embedder.embedded_texts == ["a b c", "d e f", "g h"]
@@ -0,0 +1,121 @@
+# Copyright 2025 Emcie Co Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from typing import Any
+
+from parlant.core.persistence.common import FieldIndex, IndexedDocuments, Where, plan_query
+
+
+def _make_documents() -> IndexedDocuments[dict[str, Any]]:
+    documents = IndexedDocuments(
+        [
+            {"id": "a", "session_id": "s1", "kind": "message", "offset": 0},
+            {"id": "b", "session_id": "s1", "kind": "status", "offset": 1},
+            {"id": "c", "session_id": "s2", "kind": "message", "offset": 0},
+            {"id": "d", "session_id": "s1", "kind": "message", "offset": 2},
+        ]
+    )
+
+    documents.create_index("id")
+    documents.create_index("session_id")
+
+    return documents
+
+
+def test_that_eq_on_an_indexed_field_is_fully_answered_by_the_index() -> None:
+    index = FieldIndex("session_id")
+    index.add(0, {"session_id": "s1"})
+    index.add(1, {"session_id": "s2"})
+
+    plan = plan_query({"session_id": {"$eq": "s1"}}, {"session_id": index})
+
+    assert plan.candidates == {0}
+    assert plan.residual == {}
+
+
+def test_that_non_indexed_predicates_are_left_as_residual() -> None:
+    index = FieldIndex("session_id")
+    index.add(0, {"session_id": "s1"})
+
+    plan = plan_query(
+        {"session_id": {"$eq": "s1"}, "kind": {"$eq": "message"}},
+        {"session_id": index},
+    )
+
+    assert plan.candidates == {0}
+    assert plan.residual == {"kind": {"$eq": "message"}}
+
+
+def test_that_filter_without_indexed_fields_falls_back_to_scanning() -> None:
+    plan = plan_query({"kind": {"$eq": "message"}}, {})
+
+    assert plan.candidates is None
+    assert plan.residual == {"kind": {"$eq": "message"}}
+
+
+def test_that_or_with_a_non_indexed_operand_falls_back_to_scanning() -> None:
+    index = FieldIndex("id")
+    index.add(0, {"id": "a"})
+
+    where: Where = {"$or": [{"id": {"$eq": "a"}}, {"kind": {"$eq": "status"}}]}
+    plan = plan_query(where, {"id": index})
+
+    assert plan.candidates is None
+    assert plan.residual == where
+
+
+def test_that_in_filter_is_answered_from_the_index_in_insertion_order() -> None:
+    documents = _make_documents()
+
+    result = documents.find({"id": {"$in": ["d", "a", "x"]}})
+
+    assert [d["id"] for _, d in result] == ["a", "d"]
+
+
+def test_that_and_filter_intersects_index_candidates_and_checks_residual() -> None:
+    documents = _make_documents()
+
+    result = documents.find(
+        {
+            "$and": [
+                {"session_id": {"$eq": "s1"}},
+                {"id": {"$in": ["a", "b", "c"]}},
+                {"kind": {"$eq": "message"}},
+            ]
+        }
+    )
+
+    assert [d["id"] for _, d in result] == ["a"]
+
+
+def test_that_or_of_eq_filters_is_answered_from_the_index() -> None:
+    documents = _make_documents()
+
+    where: Where = {"$or": [{"id": {"$eq": "c"}}, {"id": {"$eq": "b"}}]}
+
+    assert plan_query(where, documents._indexes).residual == {}
+    assert [d["id"] for _, d in documents.find(where)] == ["b", "c"]
+
+
+def test_that_indexes_follow_replaced_and_deleted_documents() -> None:
+    documents = _make_documents()
+
+    [(key, document)] = documents.find({"id": {"$eq": "a"}})
+    documents.replace(key, {**document, "session_id": "s2"})
+
+    [(key, _)] = documents.find({"id": {"$eq": "c"}})
+    documents.delete(key)
+
+    assert [d["id"] for _, d in documents.find({"session_id": {"$eq": "s2"}})] == ["a"]
+    assert [d["id"] for _, d in documents.find({"session_id": {"$eq": "s1"}})] == ["b", "d"]
@@ -16,10 +16,11 @@ import asyncio
 from datetime import datetime
 import enum
 import json
-from typing import Annotated, Any, Mapping, Optional, cast
+from typing import Annotated, Any, AsyncIterator, Mapping, Optional, Sequence, cast
 from lagom import Container
 from pydantic import BaseModel
 from pytest import fixture, raises
+import httpx
 import pytest
 
 from parlant.core.loggers import StdoutLogger
@@ -31,7 +32,8 @@ from parlant.core.tools import (
     ToolResultError,
     ToolOverlap,
 )
-from parlant.core.services.tools.plugins import PluginServer, tool
+from parlant.core.services.tools import plugins
+from parlant.core.services.tools.plugins import PluginServer, _read_json_lines, tool
 from parlant.core.agents import Agent, AgentId, AgentStore
 from parlant.core.contextual_correlator import ContextualCorrelator
 from parlant.core.emission.event_buffer import EventBuffer, EventBufferFactory
@@ -698,6 +700,85 @@ async def test_that_a_plugin_tool_that_returns_a_huge_payload_raises_an_error(
             assert "Response exceeds 16KB limit" in str(exc.value)
 
 
+async def test_that_a_plugin_tool_result_within_the_payload_limit_is_received_whole(
+    tool_context: ToolContext,
+    container: Container,
+) -> None:
+    @tool
+    async def large_payload_tool(context: ToolContext) -> ToolResult:
+        await context.emit_status("typing", {})
+        return ToolResult({"payload": "x" * 15000})
+
+    async with run_service_server([large_payload_tool]) as server:
+        async with create_client(server, container[EventBufferFactory]) as client:
+            result = await client.call_tool(
+                large_payload_tool.tool.name,
+                tool_context,
+                arguments={},
+            )
+
+            assert result.data == {"payload": "x" * 15000}
+
+
+async def test_that_a_response_of_an_earlier_plugin_server_without_newlines_is_decoded() -> None:
+    async def legacy_chunks(chunks: Sequence[bytes]) -> AsyncIterator[bytes]:
+        for chunk in chunks:
+            yield chunk
+
+    status = json.dumps({"status": "typing", "data": {}}).encode()
+    result = json.dumps({"result": {"data": "done", "metadata": {}}}).encode()
+
+    items = [
+        item
+        async for item in _read_json_lines(
+            legacy_chunks([status, result[:10], result[10:]]),
+            max_line_size=1024,
+            on_line_too_long=lambda: ToolResultError(tool_name="my_tool"),
+            newline_delimited=False,
+        )
+    ]
+
+    assert items == [json.loads(status), json.loads(result)]
+
+
+@pytest.mark.parametrize("newline_delimited", [True, False])
+async def test_that_a_large_item_streamed_in_small_chunks_is_decoded_once(
+    monkeypatch: pytest.MonkeyPatch,
+    newline_delimited: bool,
+) -> None:
+    decode_attempts = 0
+    raw_decode = plugins._JSON_DECODER.raw_decode
+
+    def counting_raw_decode(text: str, position: int = 0) -> tuple[Any, int]:
+        nonlocal decode_attempts
+        decode_attempts += 1
+        return raw_decode(text, position)
+
+    monkeypatch.setattr(plugins._JSON_DECODER, "raw_decode", counting_raw_decode)
+
+    result = json.dumps({"result": {"data": "x" * 1_000_000, "metadata": {}}}).encode()
+
+    if newline_delimited:
+        result += b"\n"
+
+    async def small_chunks() -> AsyncIterator[bytes]:
+        for i in range(0, len(result), 4096):
+            yield result[i : i + 4096]
+
+    items = [
+        item
+        async for item in _read_json_lines(
+            small_chunks(),
+            max_line_size=2_000_000,
+            on_line_too_long=lambda: ToolResultError(tool_name="my_tool"),
+            newline_delimited=newline_delimited,
+        )
+    ]
+
+    assert items == [json.loads(result)]
+    assert decode_attempts == (0 if newline_delimited else 1)
+
+
 @pytest.mark.parametrize(
     "arguments",
     [
@@ -803,3 +884,47 @@ async def test_that_tool_decorator_can_set_overlap() -> None:
         return ToolResult({})
 
     assert my_tool.tool.overlap == ToolOverlap.NONE
+
+
+async def test_that_a_plugin_server_tells_an_unchanged_tool_listing_by_its_etag(
+    container: Container,
+) -> None:
+    @tool
+    def my_tool(context: ToolContext) -> ToolResult:
+        return ToolResult({})
+
+    async with run_service_server([my_tool]) as server:
+        async with httpx.AsyncClient() as http_client:
+            response = await http_client.get(f"{server.url}/tools")
+            etag = response.headers["ETag"]
+
+            revalidation = await http_client.get(
+                f"{server.url}/tools",
+                headers={"If-None-Match": etag},
+            )
+
+            assert response.json()["context_dependent_tools"] == []
+            assert revalidation.status_code == 304
+
+
+async def test_that_a_plugin_resolves_a_tool_with_a_choice_provider_per_context(
+    container: Container,
+    tool_context: ToolContext,
+) -> None:
+    async def my_choice_provider(context: ToolContext) -> list[str]:
+        return [context.customer_id]
+
+    @tool
+    def my_tool(
+        context: ToolContext,
+        arg: Annotated[str, ToolParameterOptions(choice_provider=my_choice_provider)],
+    ) -> ToolResult:
+        return ToolResult(arg)
+
+    async with run_service_server([my_tool]) as server:
+        async with create_client(server, container[EventBufferFactory]) as client:
+            await client.read_tool(my_tool.tool.name)
+
+            resolved_tool = await client.resolve_tool(my_tool.tool.name, tool_context)
+
+            assert resolved_tool.parameters["arg"][0]["enum"] == [tool_context.customer_id]
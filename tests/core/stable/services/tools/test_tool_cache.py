@@ -0,0 +1,102 @@
+# Copyright 2025 Emcie Co Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+from datetime import datetime, timezone
+from typing import Optional
+
+from parlant.core.services.tools.tool_cache import ToolCache, ToolListing
+from parlant.core.tools import Tool, ToolOverlap
+
+
+def _create_tool(name: str) -> Tool:
+    return Tool(
+        name=name,
+        creation_utc=datetime.now(timezone.utc),
+        description="",
+        metadata={},
+        parameters={},
+        required=[],
+        consequential=False,
+        overlap=ToolOverlap.NONE,
+    )
+
+
+class _FakeToolService:
+    def __init__(self, *tool_names: str) -> None:
+        self.tool_names = list(tool_names)
+        self.version = 1
+        self.received_etags: list[Optional[str]] = []
+
+    async def fetch(self, etag: Optional[str]) -> Optional[ToolListing]:
+        self.received_etags.append(etag)
+
+        if etag == str(self.version):
+            return None
+
+        return ToolListing(
+            tools=[_create_tool(name) for name in self.tool_names],
+            etag=str(self.version),
+            context_dependent_tools=["dynamic_tool"],
+        )
+
+
+async def test_that_tools_are_read_from_memory_until_the_ttl_expires() -> None:
+    now = 0.0
+    service = _FakeToolService("tool_a", "tool_b")
+    cache = ToolCache(service.fetch, ttl=60, clock=lambda: now)
+
+    await asyncio.gather(*[cache.find_tool("tool_a") for _ in range(5)])
+    await cache.find_tool("tool_b")
+
+    assert service.received_etags == [None]
+
+    now = 61.0
+    tool = await cache.find_tool("tool_a")
+
+    assert tool and tool.name == "tool_a"
+    assert service.received_etags == [None, "1"]
+
+
+async def test_that_a_tool_missing_from_the_cached_listing_triggers_a_refetch() -> None:
+    service = _FakeToolService("tool_a")
+    cache = ToolCache(service.fetch)
+
+    await cache.find_tool("tool_a")
+
+    service.tool_names.append("tool_b")
+    service.version += 1
+
+    tool = await cache.find_tool("tool_b")
+
+    assert tool and tool.name == "tool_b"
+    assert await cache.find_tool("tool_c") is None
+
+
+async def test_that_an_invalidated_cache_refetches_the_listing() -> None:
+    service = _FakeToolService("tool_a")
+    cache = ToolCache(service.fetch)
+
+    await cache.list_tools()
+    cache.invalidate()
+    await cache.list_tools()
+
+    assert service.received_etags == [None, None]
+
+
+async def test_that_context_dependent_tools_are_reported_as_such() -> None:
+    cache = ToolCache(_FakeToolService("tool_a", "dynamic_tool").fetch)
+
+    assert not await cache.is_context_dependent("tool_a")
+    assert await cache.is_context_dependent("dynamic_tool")
@@ -0,0 +1,56 @@
+# Copyright 2025 Emcie Co Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from dataclasses import replace
+
+import jinja2
+from pytest import raises
+
+from parlant.core.canned_responses import CannedResponseTemplateCache
+
+from tests.test_utilities import make_canned_response
+
+
+def test_that_a_compiled_template_is_reused_until_its_value_changes() -> None:
+    cache = CannedResponseTemplateCache()
+    canrep = make_canned_response("r1", "Hello, {{ name }}!")
+
+    first = cache.get(canrep)
+
+    assert cache.get(canrep) is first
+    assert first.fields == {"name"}
+    assert first.template.render(name="Larry") == "Hello, Larry!"
+
+    updated = cache.get(replace(canrep, value="Bye, {{ name }} from {{ place }}"))
+
+    assert updated is not first
+    assert updated.fields == {"name", "place"}
+
+
+def test_that_the_least_recently_used_template_is_evicted_when_the_cache_is_full() -> None:
+    cache = CannedResponseTemplateCache(max_size=2)
+
+    first = cache.get(make_canned_response("r1", "One"))
+    second = cache.get(make_canned_response("r2", "Two"))
+    cache.get(make_canned_response("r1", "One"))
+    third = cache.get(make_canned_response("r3", "Three"))
+
+    assert cache.get(make_canned_response("r1", "One")) is first
+    assert cache.get(make_canned_response("r3", "Three")) is third
+    assert cache.get(make_canned_response("r2", "Two")) is not second
+
+
+def test_that_an_invalid_template_raises_a_syntax_error() -> None:
+    with raises(jinja2.TemplateSyntaxError):
+        CannedResponseTemplateCache().get(make_canned_response("r1", "Hello, {{ name"))
@@ -89,6 +89,42 @@ async def test_that_list_guidelines_global_guideline_is_returned(
     assert result[0].id == global_guideline.id
 
 
+async def test_that_guidelines_for_context_reflect_store_changes_after_being_cached(
+    container: Container,
+    agent: Agent,
+) -> None:
+    entity_queries = container[EntityQueries]
+    agent_store = container[AgentStore]
+    guideline_store = container[GuidelineStore]
+
+    first_guideline = await guideline_store.create_guideline(
+        condition="condition 1",
+        action="action 1",
+    )
+
+    result = await entity_queries.find_guidelines_for_context(agent.id, [])
+    assert [g.id for g in result] == [first_guideline.id]
+
+    second_guideline = await guideline_store.create_guideline(
+        condition="condition 2",
+        action="action 2",
+        tags=[TagId("tag_1")],
+    )
+
+    result = await entity_queries.find_guidelines_for_context(agent.id, [])
+    assert [g.id for g in result] == [first_guideline.id]
+
+    await agent_store.upsert_tag(agent_id=agent.id, tag_id=TagId("tag_1"))
+
+    result = await entity_queries.find_guidelines_for_context(agent.id, [])
+    assert {g.id for g in result} == {first_guideline.id, second_guideline.id}
+
+    await guideline_store.delete_guideline(first_guideline.id)
+
+    result = await entity_queries.find_guidelines_for_context(agent.id, [])
+    assert [g.id for g in result] == [second_guideline.id]
+
+
 async def test_that_guideline_with_not_hierarchy_tag_is_not_returned(
     container: Container,
     agent: Agent,
@@ -0,0 +1,77 @@
+# Copyright 2025 Emcie Co Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from typing import AsyncIterator
+from pytest import fixture
+
+from parlant.adapters.db.transient import TransientDocumentDatabase
+from parlant.core.common import IdGenerator
+from parlant.core.guidelines import GuidelineDocumentStore, GuidelineStore
+from parlant.core.tags import TagId
+
+
+@fixture
+async def guideline_store() -> AsyncIterator[GuidelineStore]:
+    async with GuidelineDocumentStore(IdGenerator(), TransientDocumentDatabase()) as store:
+        yield store
+
+
+async def test_that_guidelines_can_be_listed_by_tags(
+    guideline_store: GuidelineStore,
+) -> None:
+    first = await guideline_store.create_guideline(condition="A", tags=[TagId("t1")])
+    second = await guideline_store.create_guideline(condition="B", tags=[TagId("t2")])
+    untagged = await guideline_store.create_guideline(condition="C")
+
+    assert [g.id for g in await guideline_store.list_guidelines()] == [
+        first.id,
+        second.id,
+        untagged.id,
+    ]
+    assert [g.id for g in await guideline_store.list_guidelines(tags=[TagId("t1")])] == [first.id]
+    assert [
+        g.id for g in await guideline_store.list_guidelines(tags=[TagId("t1"), TagId("t2")])
+    ] == [first.id, second.id]
+    assert [
+        g.id for g in await guideline_store.list_guidelines(tags=[TagId("t2"), TagId("t1")])
+    ] == [first.id, second.id]
+    assert [g.id for g in await guideline_store.list_guidelines(tags=[])] == [untagged.id]
+    assert await guideline_store.list_guidelines(tags=[TagId("t3")]) == []
+
+
+async def test_that_listing_by_tags_reflects_tag_and_guideline_changes(
+    guideline_store: GuidelineStore,
+) -> None:
+    guideline = await guideline_store.create_guideline(condition="A")
+
+    await guideline_store.upsert_tag(guideline.id, TagId("t1"))
+
+    listed = await guideline_store.list_guidelines(tags=[TagId("t1")])
+    assert [g.id for g in listed] == [guideline.id]
+    assert listed[0].tags == [TagId("t1")]
+    assert await guideline_store.list_guidelines(tags=[]) == []
+
+    await guideline_store.update_guideline(guideline.id, {"condition": "B"})
+
+    listed = await guideline_store.list_guidelines(tags=[TagId("t1")])
+    assert listed[0].content.condition == "B"
+
+    await guideline_store.remove_tag(guideline.id, TagId("t1"))
+
+    assert await guideline_store.list_guidelines(tags=[TagId("t1")]) == []
+    assert [g.id for g in await guideline_store.list_guidelines(tags=[])] == [guideline.id]
+
+    await guideline_store.delete_guideline(guideline.id)
+
+    assert await guideline_store.list_guidelines() == []
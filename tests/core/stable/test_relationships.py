@@ -477,3 +477,54 @@ async def test_that_relationships_can_be_listed_with_both_source_and_target_filt
     unique_pairs = {(rel.source.id, rel.target.id) for rel in relationships}
 
     assert unique_pairs == {(a_id, b_id), (c_id, a_id)}
+
+
+async def test_that_indirect_relationships_reflect_relationships_created_and_deleted_after_listing(
+    relationship_store: RelationshipStore,
+) -> None:
+    a_id = GuidelineId("a")
+    b_id = GuidelineId("b")
+    c_id = GuidelineId("c")
+    d_id = GuidelineId("d")
+
+    def entity(id: GuidelineId) -> RelationshipEntity:
+        return RelationshipEntity(id=id, kind=RelationshipEntityKind.GUIDELINE)
+
+    a_to_b = await relationship_store.create_relationship(
+        source=entity(a_id),
+        target=entity(b_id),
+        kind=RelationshipKind.ENTAILMENT,
+    )
+    await relationship_store.create_relationship(
+        source=entity(c_id),
+        target=entity(d_id),
+        kind=RelationshipKind.ENTAILMENT,
+    )
+
+    assert len(await relationship_store.list_relationships(source_id=a_id, indirect=True)) == 1
+    assert len(await relationship_store.list_relationships(target_id=d_id, indirect=True)) == 1
+
+    await relationship_store.create_relationship(
+        source=entity(b_id),
+        target=entity(c_id),
+        kind=RelationshipKind.ENTAILMENT,
+    )
+
+    descendants = await relationship_store.list_relationships(source_id=a_id, indirect=True)
+    ancestors = await relationship_store.list_relationships(target_id=d_id, indirect=True)
+
+    assert {(r.source.id, r.target.id) for r in descendants} == {
+        (a_id, b_id),
+        (b_id, c_id),
+        (c_id, d_id),
+    }
+    assert {(r.source.id, r.target.id) for r in ancestors} == {
+        (a_id, b_id),
+        (b_id, c_id),
+        (c_id, d_id),
+    }
+
+    await relationship_store.delete_relationship(a_to_b.id)
+
+    assert await relationship_store.list_relationships(source_id=a_id, indirect=True) == []
+    assert len(await relationship_store.list_relationships(target_id=d_id, indirect=True)) == 2
@@ -0,0 +1,126 @@
+# Copyright 2025 Emcie Co Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+from typing import AsyncIterator
+from pytest import fixture
+
+from parlant.adapters.db.transient import TransientDocumentDatabase
+from parlant.core.agents import AgentId
+from parlant.core.async_utils import Timeout
+from parlant.core.customers import CustomerId
+from parlant.core.sessions import (
+    EventKind,
+    EventSource,
+    NotifyingSessionListener,
+    Session,
+    SessionDocumentStore,
+)
+
+
+@fixture
+async def session_store() -> AsyncIterator[SessionDocumentStore]:
+    async with SessionDocumentStore(database=TransientDocumentDatabase()) as store:
+        yield store
+
+
+@fixture
+async def session(session_store: SessionDocumentStore) -> Session:
+    return await session_store.create_session(
+        customer_id=CustomerId("customer"),
+        agent_id=AgentId("agent"),
+    )
+
+
+async def create_message(
+    session_store: SessionDocumentStore,
+    session: Session,
+    source: EventSource = EventSource.CUSTOMER,
+) -> None:
+    await session_store.create_event(
+        session_id=session.id,
+        source=source,
+        kind=EventKind.MESSAGE,
+        correlation_id="<main>",
+        data={"message": "Hello"},
+    )
+
+
+async def test_that_a_waiter_is_woken_when_a_matching_event_is_created(
+    session_store: SessionDocumentStore,
+    session: Session,
+) -> None:
+    listener = NotifyingSessionListener(session_store)
+
+    waiter = asyncio.create_task(
+        listener.wait_for_events(
+            session.id,
+            kinds=[EventKind.MESSAGE],
+            min_offset=0,
+            timeout=Timeout(5),
+        )
+    )
+
+    await asyncio.sleep(0.05)
+    assert not waiter.done()
+
+    await create_message(session_store, session)
+
+    assert await asyncio.wait_for(waiter, 1)
+
+
+async def test_that_a_waiter_is_not_woken_by_a_non_matching_event(
+    session_store: SessionDocumentStore,
+    session: Session,
+) -> None:
+    listener = NotifyingSessionListener(session_store)
+
+    waiter = asyncio.create_task(
+        listener.wait_for_events(
+            session.id,
+            source=EventSource.AI_AGENT,
+            timeout=Timeout(0.5),
+        )
+    )
+
+    await asyncio.sleep(0.05)
+    await create_message(session_store, session, source=EventSource.CUSTOMER)
+
+    assert not await waiter
+
+
+async def test_that_existing_events_are_found_without_waiting(
+    session_store: SessionDocumentStore,
+    session: Session,
+) -> None:
+    listener = NotifyingSessionListener(session_store)
+
+    await create_message(session_store, session)
+    await create_message(session_store, session)
+
+    assert await listener.wait_for_events(session.id, min_offset=1, timeout=Timeout.none())
+    assert not await listener.wait_for_events(session.id, min_offset=2, timeout=Timeout.none())
+
+
+async def test_that_what_is_known_of_a_session_is_dropped_when_it_is_deleted(
+    session_store: SessionDocumentStore,
+    session: Session,
+) -> None:
+    listener = NotifyingSessionListener(session_store)
+
+    await create_message(session_store, session)
+    assert session.id in listener._watermarks
+
+    await session_store.delete_session(session.id)
+    assert session.id not in listener._watermarks
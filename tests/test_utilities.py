@@ -14,6 +14,7 @@
 
 import asyncio
 from dataclasses import dataclass, field
+from datetime import datetime, timezone
 import hashlib
 import json
 import logging
@@ -50,6 +51,7 @@ from parlant.adapters.nlp.openai_service import GPT_4o
 from parlant.core.agents import Agent, AgentId, AgentStore
 from parlant.core.application import Application
 from parlant.core.async_utils import Timeout
+from parlant.core.canned_responses import CannedResponse, CannedResponseId
 from parlant.core.common import DefaultBaseModel, JSONSerializable, Version
 from parlant.core.context_variables import (
     ContextVariable,
@@ -63,8 +65,9 @@ from parlant.core.engines.alpha.loaded_context import LoadedContext
 from parlant.core.engines.alpha.prompt_builder import PromptBuilder
 from parlant.core.glossary import GlossaryStore, Term
 from parlant.core.guideline_tool_associations import GuidelineToolAssociationStore
-from parlant.core.guidelines import Guideline, GuidelineStore
+from parlant.core.guidelines import Guideline, GuidelineContent, GuidelineId, GuidelineStore
 from parlant.core.loggers import LogLevel, Logger
+from parlant.core.nlp.embedding import Embedder, EmbeddingResult
 from parlant.core.nlp.generation import (
     FallbackSchematicGenerator,
     SchematicGenerationResult,
@@ -179,6 +182,68 @@ class _TestLogger(Logger):
         yield
 
 
+class WordCountingTokenizer(EstimatingTokenizer):
+    """Estimates one token per word, recording the texts it was asked to estimate."""
+
+    def __init__(self) -> None:
+        self.estimated_texts: list[str] = []
+
+    @override
+    async def estimate_token_count(self, prompt: str) -> int:
+        self.estimated_texts.append(prompt)
+        return len(prompt.split())
+
+
+class DummyEmbedder(Embedder):
+    """Embeds each text with the given function (as its length, by default), recording calls."""
+
+    def __init__(
+        self,
+        embed_text: Callable[[str], Sequence[float]] = lambda text: [float(len(text))],
+        dimensions: int = 1,
+        max_tokens: int = 8192,
+    ) -> None:
+        self.calls: list[list[str]] = []
+
+        self._embed_text = embed_text
+        self._dimensions = dimensions
+        self._max_tokens = max_tokens
+        self._tokenizer = WordCountingTokenizer()
+
+    @property
+    def embedded_texts(self) -> list[str]:
+        return [text for call in self.calls for text in call]
+
+    @override
+    async def embed(
+        self,
+        texts: list[str],
+        hints: Mapping[str, Any] = {},
+    ) -> EmbeddingResult:
+        self.calls.append(texts)
+        return EmbeddingResult(vectors=[self._embed_text(text) for text in texts])
+
+    @property
+    @override
+    def id(self) -> str:
+        return "dummy"
+
+    @property
+    @override
+    def max_tokens(self) -> int:
+        return self._max_tokens
+
+    @property
+    @override
+    def tokenizer(self) -> WordCountingTokenizer:
+        return self._tokenizer
+
+    @property
+    @override
+    def dimensions(self) -> int:
+        return self._dimensions
+
+
 async def nlp_test(context: str, condition: str) -> bool:
     schematic_generator = GPT_4o[NLPTestSchema](logger=_TestLogger())
 
@@ -333,6 +398,28 @@ async def create_guideline(
     return guideline
 
 
+def make_guideline(guideline_id: str, condition: str) -> Guideline:
+    return Guideline(
+        id=GuidelineId(guideline_id),
+        creation_utc=datetime.now(timezone.utc),
+        content=GuidelineContent(condition=condition, action=None),
+        enabled=True,
+        tags=[],
+        metadata={},
+    )
+
+
+def make_canned_response(canned_response_id: str, value: str) -> CannedResponse:
+    return CannedResponse(
+        id=CannedResponseId(canned_response_id),
+        creation_utc=datetime.now(timezone.utc),
+        value=value,
+        fields=[],
+        signals=[],
+        tags=[],
+    )
+
+
 async def read_reply(
     container: Container,
     session_id: SessionId,